@@ -14,18 +14,44 @@ function getWeekDates() { const dates = []; const dayNames = ['Dom', 'Lun', 'Mar
 
 // --- Funciones de Fetching de Datos (Optimizadas) ---
 
+// Recorre GET /compras página a página siguiendo la cabecera X-Next-Cursor.
+// `desde`/`hasta` se envían en hora local (la columna fecha no tiene zona horaria).
+// `hasta` es exclusivo: para incluir un día completo se pasa la medianoche del día siguiente.
+function toLocalISOString(date) {
+    const pad = (n) => String(n).padStart(2, '0');
+    return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}T${pad(date.getHours())}:${pad(date.getMinutes())}:${pad(date.getSeconds())}`;
+}
+
+async function fetchComprasPaginadas(desde, hasta) {
+    const compras = [];
+    let cursor = null;
+    do {
+        const params = new URLSearchParams({ limit: '500' });
+        if (desde) params.set('desde', toLocalISOString(desde));
+        if (hasta) params.set('hasta', toLocalISOString(hasta));
+        if (cursor) params.set('after', cursor);
+        const response = await fetch(`${API_BASE_URL}/compras?${params}`);
+        if (!response.ok) throw new Error('Error al obtener las compras');
+        compras.push(...await response.json());
+        cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return compras;
+}
+
 async function fetchAllData() {
     try {
-        // Hacemos las dos únicas llamadas necesarias en paralelo
-        const [comprasResponse, alimentosResponse] = await Promise.all([
-            fetch(`${API_BASE_URL}/compras`),
+        // El dashboard solo muestra la última semana: no hace falta traer todo el historial
+        const inicioSemana = new Date();
+        inicioSemana.setDate(inicioSemana.getDate() - 6);
+        inicioSemana.setHours(0, 0, 0, 0);
+
+        const [allCompras, alimentosResponse] = await Promise.all([
+            fetchComprasPaginadas(inicioSemana, null),
             fetch(`${API_BASE_URL}/api/alimentos/`)
         ]);
 
-        if (!comprasResponse.ok) throw new Error('Error al obtener las compras');
         if (!alimentosResponse.ok) throw new Error('Error al obtener los alimentos');
 
-        const allCompras = await comprasResponse.json();
         const allAlimentos = await alimentosResponse.json();
 
         return { allCompras, allAlimentos };
@@ -28,25 +28,43 @@ const formatDateShort = (dateString) => {
 };
 
 // --- LÓGICA DE DATOS (Mejorada siguiendo el patrón del segundo código) ---
+
+// Recorre GET /compras página a página siguiendo la cabecera X-Next-Cursor.
+// `desde`/`hasta` se envían en hora local (la columna fecha no tiene zona horaria).
+// `hasta` es exclusivo: para incluir un día completo se pasa la medianoche del día siguiente.
+function toLocalISOString(date) {
+    const pad = (n) => String(n).padStart(2, '0');
+    return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}T${pad(date.getHours())}:${pad(date.getMinutes())}:${pad(date.getSeconds())}`;
+}
+
+async function fetchComprasPaginadas(desde, hasta) {
+    const compras = [];
+    let cursor = null;
+    do {
+        const params = new URLSearchParams({ limit: '500' });
+        if (desde) params.set('desde', toLocalISOString(desde));
+        if (hasta) params.set('hasta', toLocalISOString(hasta));
+        if (cursor) params.set('after', cursor);
+        const response = await fetch(`${API_BASE_URL}/compras?${params}`);
+        if (!response.ok) throw new Error('Error al obtener las compras');
+        compras.push(...await response.json());
+        cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return compras;
+}
 async function fetchInitialData() {
     const loadingOverlay = document.getElementById('loading-overlay');
     loadingOverlay.style.display = 'flex';
     
     try {
-        // Hacemos las llamadas en paralelo como en el segundo código
-        const [comprasResponse, alimentosResponse] = await Promise.all([
-            fetch(`${API_BASE_URL}/compras`),
-            fetch(`${API_BASE_URL}/api/alimentos/`)
-        ]);
+        // Las compras se piden por rango al generar cada reporte
+        const alimentosResponse = await fetch(`${API_BASE_URL}/api/alimentos/`);
 
-        if (!comprasResponse.ok) throw new Error('Error al obtener las compras');
         if (!alimentosResponse.ok) throw new Error('Error al obtener los alimentos');
         
-        allCompras = await comprasResponse.json();
         allAlimentos = await alimentosResponse.json();
         
         console.log('Datos cargados:', { 
-            compras: allCompras.length, 
             alimentos: allAlimentos.length 
         });
 
@@ -60,7 +78,7 @@ async function fetchInitialData() {
 }
 
 // --- LÓGICA DE REPORTES (Corregida) ---
-function generateReport() {
+async function generateReport() {
     const startDateInput = document.getElementById('start-date').value;
     const endDateInput = document.getElementById('end-date').value;
 
@@ -80,11 +98,22 @@ function generateReport() {
         return;
     }
 
-    // Filtrar compras por rango de fechas
-    const filteredCompras = allCompras.filter(compra => {
-        const compraDate = new Date(compra.fecha);
-        return compraDate >= startDate && compraDate <= endDate;
-    });
+    // El rango de fechas se filtra en el servidor, página a página
+    const loadingOverlay = document.getElementById('loading-overlay');
+    loadingOverlay.style.display = 'flex';
+    try {
+        const finExclusivo = new Date(endDate);
+        finExclusivo.setDate(finExclusivo.getDate() + 1);
+        finExclusivo.setHours(0, 0, 0, 0);
+        allCompras = await fetchComprasPaginadas(startDate, finExclusivo);
+    } catch (error) {
+        console.error('Error al obtener las compras del reporte:', error);
+        alert('No se pudieron cargar las compras del período seleccionado.');
+        return;
+    } finally {
+        loadingOverlay.style.display = 'none';
+    }
+    const filteredCompras = allCompras;
 
     console.log('Compras filtradas:', filteredCompras.length);
 
@@ -309,10 +309,14 @@ document.addEventListener("DOMContentLoaded", function () {
         costo_adicional: "100.00"
     };
 
+    // Misma clave para la precompra y el cobro: un reintento no los repite
+    const claveIdempotencia = crypto.randomUUID();
+
     try {
         // 1) Creación de la precompra
         const response = await hacerPeticionAutenticada(`${apiURL}/api/precompras/nueva`, {
             method: 'POST',
+            headers: { 'Idempotency-Key': claveIdempotencia },
             body: JSON.stringify(datosPrecompra)
         });
         if (!response.ok) {
@@ -329,7 +333,9 @@ document.addEventListener("DOMContentLoaded", function () {
             // 2) Llamada al endpoint que descuenta saldo del estudiante
             const descargaResp = await hacerPeticionAutenticada(`${apiURL}/estudiantes/${encodeURIComponent(idEstudiante)}/descargaSaldo`, {
                 method: 'POST',
-                body: JSON.stringify({ monto: montoDescarga })
+                headers: { 'Idempotency-Key': claveIdempotencia },
+                // tipo y referencia etiquetan el movimiento en el libro de saldos
+                body: JSON.stringify({ monto: montoDescarga, tipo: 'precompra', referencia: `precompra:${createdPrecompra.id}` })
             });
 
             if (!descargaResp.ok) {
@@ -19,6 +19,13 @@ document.addEventListener("DOMContentLoaded", async () => {
     let studentData = null;
     let alimentosList = [];
     let blockedFoodIds = new Set(); 
+    // Clave de idempotencia de la venta en confirmación: un doble clic o un reintento no cobra dos veces
+    let checkoutKey = null;
+    // Ventas confirmadas sin conexión, pendientes de enviar a /pos/sync con su misma clave
+    const PENDIENTES_KEY = "ventasPendientes";
+    const SYNC_INTERVAL_MS = 30000;
+    const MAX_VENTAS_POR_SYNC = 1000; // límite de /pos/sync por petición
+    let sincronizando = false;
 
     // ===============================
     // Elementos de la interfaz
@@ -201,6 +208,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         document.getElementById("confirm-total").textContent = formatCurrency(total);
         document.getElementById("confirm-balance").textContent = formatCurrency(studentData.saldo);
         document.getElementById("confirm-new-balance").textContent = formatCurrency(studentData.saldo - total);
+        checkoutKey = crypto.randomUUID();
         document.getElementById("confirm-modal").style.display = "flex";
     });
 
@@ -211,23 +219,9 @@ document.addEventListener("DOMContentLoaded", async () => {
         }
       
         try {
-            const saldoEndpoint = `${API_BASE_URL}/estudiantes/${encodeURIComponent(studentData.id)}/descargaSaldo`;
-            const saldoResponse = await fetch(saldoEndpoint, {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ monto: total })
-            });
-      
-            if (!saldoResponse.ok) throw new Error("Error al actualizar el saldo del estudiante");
-      
-            const updatedStudent = await saldoResponse.json();
-            studentData.saldo = updatedStudent.saldo;
-            document.getElementById("student-balance").textContent = formatCurrency(updatedStudent.saldo);
-      
-            const compraPayload = {
-                usuario_id: parseInt(studentData.id),
-                fecha: new Date().toISOString(),
-                total: parseFloat(total.toFixed(2)),
+            // Cobro y registro de la compra en una sola petición y una sola transacción
+            const checkoutPayload = {
+                estudiante_id: parseInt(studentData.id),
                 items: cart.map(item => ({
                     producto_id: parseInt(item.id),
                     cantidad: parseInt(item.quantity),
@@ -235,30 +229,45 @@ document.addEventListener("DOMContentLoaded", async () => {
                 }))
             };
 
-            const compraResponse = await fetch(`${API_BASE_URL}/guardarCompra`, {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify(compraPayload)
-            });
-      
-            if (!compraResponse.ok) {
-                const errorText = await compraResponse.text();
-                throw new Error(`Error al guardar la compra: ${compraResponse.status} - ${errorText}`);
+            let checkoutResponse;
+            try {
+                checkoutResponse = await fetch(`${API_BASE_URL}/pos/checkout`, {
+                    method: "POST",
+                    headers: {
+                        "Content-Type": "application/json",
+                        "Idempotency-Key": checkoutKey,
+                        ...authHeaders()
+                    },
+                    body: JSON.stringify(checkoutPayload)
+                });
+            } catch (networkError) {
+                // Sin red: la venta queda en cola con su clave y se sincroniza al volver la conexión
+                encolarVentaOffline(checkoutPayload);
+                return;
+            }
+
+            if (!checkoutResponse.ok) {
+                const errorData = await checkoutResponse.json().catch(() => ({}));
+                const detalle = errorData.detail && errorData.detail.mensaje ? errorData.detail.mensaje : errorData.detail;
+                throw new Error(detalle || `Error ${checkoutResponse.status}`);
             }
 
-            const compraResult = await compraResponse.json();
-            console.log('Compra guardada exitosamente:', compraResult);
+            const recibo = await checkoutResponse.json();
+            checkoutKey = null;
+            console.log('Venta registrada exitosamente:', recibo);
+            studentData.saldo = recibo.saldo_restante;
+            document.getElementById("student-balance").textContent = formatCurrency(recibo.saldo_restante);
       
             document.getElementById("confirm-modal").style.display = "none";
       
             document.getElementById("receipt-student").textContent = studentData.nombre;
-            document.getElementById("receipt-total").textContent = formatCurrency(total);
-            document.getElementById("receipt-balance").textContent = formatCurrency(updatedStudent.saldo);
-            const now = new Date();
+            document.getElementById("receipt-total").textContent = formatCurrency(recibo.total);
+            document.getElementById("receipt-balance").textContent = formatCurrency(recibo.saldo_restante);
+            const now = new Date(recibo.fecha);
             document.getElementById("receipt-date").textContent = now.toLocaleDateString() + ' ' + now.toLocaleTimeString();
             document.getElementById("success-modal").style.display = "flex";
       
-            addToRecentSales(studentData.nombre, total);
+            addToRecentSales(studentData.nombre, recibo.total);
       
             cart.length = 0;
             updateCart();
@@ -268,6 +277,85 @@ document.addEventListener("DOMContentLoaded", async () => {
         }
     });
 
+    // ===============================
+    // Ventas sin conexión
+    // ===============================
+    function authHeaders() {
+        const token = localStorage.getItem("jwtToken");
+        return token ? { Authorization: `Bearer ${token}` } : {};
+    }
+
+    function leerPendientes() {
+        try {
+            return JSON.parse(localStorage.getItem(PENDIENTES_KEY)) || [];
+        } catch (e) {
+            return [];
+        }
+    }
+
+    function guardarPendientes(ventas) {
+        localStorage.setItem(PENDIENTES_KEY, JSON.stringify(ventas));
+    }
+
+    function encolarVentaOffline(checkoutPayload) {
+        const pendientes = leerPendientes();
+        if (!pendientes.some(venta => venta.clave_idempotencia === checkoutKey)) {
+            pendientes.push({
+                clave_idempotencia: checkoutKey,
+                estudiante_id: checkoutPayload.estudiante_id,
+                items: checkoutPayload.items,
+                fecha_cliente: new Date().toISOString()
+            });
+            guardarPendientes(pendientes);
+        }
+        checkoutKey = null;
+
+        // Saldo estimado en pantalla; el servidor lo recalcula al sincronizar
+        studentData.saldo -= total;
+        document.getElementById("student-balance").textContent = formatCurrency(studentData.saldo);
+        document.getElementById("confirm-modal").style.display = "none";
+        addToRecentSales(studentData.nombre + " (sin conexión)", total);
+        cart.length = 0;
+        updateCart();
+        showNotification(`Venta guardada sin conexión (${pendientes.length} pendiente(s) por sincronizar)`, "warning");
+    }
+
+    async function sincronizarPendientes() {
+        const pendientes = leerPendientes();
+        if (sincronizando || pendientes.length === 0 || !navigator.onLine) return;
+        sincronizando = true;
+        try {
+            const response = await fetch(`${API_BASE_URL}/pos/sync`, {
+                method: "POST",
+                headers: { "Content-Type": "application/json", ...authHeaders() },
+                body: JSON.stringify({ ventas: pendientes.slice(0, MAX_VENTAS_POR_SYNC) })
+            });
+            if (!response.ok) {
+                console.error("Error al sincronizar ventas pendientes:", response.status);
+                return;
+            }
+            const resultado = await response.json();
+            const resueltas = new Set(resultado.resultados.map(r => r.clave_idempotencia));
+            resultado.resultados
+                .filter(r => r.estado === "rechazada")
+                .forEach(r => showNotification(`Venta sin conexión rechazada: ${r.motivo}`, "error"));
+            // Las ventas añadidas mientras se sincronizaba siguen en la cola
+            guardarPendientes(leerPendientes().filter(venta => !resueltas.has(venta.clave_idempotencia)));
+            if (resultado.aceptadas > 0) {
+                showNotification(`${resultado.aceptadas} venta(s) sin conexión sincronizadas`, "success");
+                fetchAlimentos();
+    sincronizarPendientes();
+            }
+        } catch (error) {
+            console.warn("Sin conexión, se reintentará la sincronización:", error);
+        } finally {
+            sincronizando = false;
+        }
+    }
+
+    window.addEventListener("online", sincronizarPendientes);
+    setInterval(sincronizarPendientes, SYNC_INTERVAL_MS);
+
     document.getElementById("cancel-sale").addEventListener("click", () => {
         document.getElementById("confirm-modal").style.display = "none";
     });
@@ -445,4 +533,5 @@ document.addEventListener("DOMContentLoaded", async () => {
     // Iniciar: Obtener productos desde el API
     // ===============================
     fetchAlimentos();
+    sincronizarPendientes();
 });
\ No newline at end of file
@@ -39,10 +39,20 @@ class AlimentoResponseDTO(AlimentoBaseDTO):
     id: int
     fecha_creacion: datetime
     fecha_actualizacion: Optional[datetime] = None
+    version: int = Field(0, description="Versión del catálogo en la que cambió por última vez")
     
     class Config:
         from_attributes = True
 
+class AlimentoCambioDTO(AlimentoResponseDTO):
+    activo: bool = Field(..., description="False si el alimento se dio de baja: el cliente debe quitarlo")
+
+class CambiosCatalogoDTO(BaseModel):
+    version: int = Field(..., description="Versión hasta la que llegan los cambios; usar como próximo since")
+    hay_mas: bool = Field(False, description="Quedan cambios por pedir desde version")
+    reiniciar: bool = Field(False, description="La respuesta empieza desde cero: descartar la copia local")
+    alimentos: List[AlimentoCambioDTO]
+
 class AlimentoFiltroDTO(BaseModel):
     nombre: Optional[str] = None
     categoria: Optional[str] = None
@@ -1,7 +1,11 @@
+import base64
+import json
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+from domain.exceptions.exceptions import CursorPaginacionInvalidoError
+
 class CompraItemDTO(BaseModel):
     producto_id: int
     cantidad: int
@@ -23,3 +27,25 @@ class CompraOutputDTO(BaseModel):
     usuario_id: int
     total: float
     items: List[CompraItemDTO]
+
+
+class PaginaComprasDTO(BaseModel):
+    """Una página del historial ordenado por (fecha, id) descendente."""
+    compras: List[CompraOutputDTO]
+    siguiente: Optional[str] = None   # cursor para ?after= (compras más antiguas)
+    anterior: Optional[str] = None    # cursor para ?before= (compras más recientes)
+
+
+def codificar_cursor_compra(fecha: datetime, compra_id: int) -> str:
+    """Cursor opaco con la clave (fecha, id) de una compra."""
+    crudo = json.dumps([fecha.isoformat(), compra_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(crudo).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor_compra(cursor: str) -> Tuple[datetime, int]:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha, compra_id = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return datetime.fromisoformat(fecha), int(compra_id)
+    except (ValueError, TypeError) as e:
+        raise CursorPaginacionInvalidoError("Cursor de paginación inválido") from e
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field, validator
 from datetime import date, datetime
-from typing import Optional, Union
+from typing import Literal, Optional, Union
 
 class EstudianteDTO(BaseModel):
     id: int
@@ -37,4 +37,6 @@ class RecargaSaldoDTO(BaseModel):
     monto: float = Field(gt=0, description="Monto a recargar, debe ser mayor que cero")
 
 class DescargaSaldoDTO(BaseModel):
-    monto: float = Field(gt=0, description="Monto a descargar, debe ser mayor que cero")
\ No newline at end of file
+    monto: float = Field(gt=0, description="Monto a descargar, debe ser mayor que cero")
+    tipo: Literal["descarga", "compra", "precompra"] = Field("descarga", description="Concepto del movimiento en el libro de saldos")
+    referencia: Optional[str] = Field(None, max_length=255, description="Compra o precompra que origina la descarga")
\ No newline at end of file
@@ -0,0 +1,75 @@
+# application/dto/pos_dto.py
+
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CheckoutItemDTO(BaseModel):
+    producto_id: int
+    cantidad: int
+    # Precio que mostraba la caja; solo se usa para detectar catálogos desactualizados
+    precio_unitario: Optional[float] = None
+
+
+class CheckoutInputDTO(BaseModel):
+    estudiante_id: int
+    items: List[CheckoutItemDTO] = Field(..., min_length=1)
+
+
+class ReciboItemDTO(BaseModel):
+    producto_id: int
+    nombre_alimento: str
+    cantidad: int
+    precio_unitario: float
+    subtotal: float
+
+
+class ReciboDTO(BaseModel):
+    """Recibo de una venta del punto de venta: compra registrada y saldo cobrado."""
+    compra_id: int
+    fecha: datetime
+    estudiante_id: int
+    estudiante_nombre: str
+    total: float
+    saldo_anterior: float
+    saldo_restante: float
+    items: List[ReciboItemDTO]
+
+
+# Ventas por sincronización: suficiente para una jornada sin conexión de una caja
+MAX_VENTAS_POR_SINCRONIZACION = 1000
+
+
+class VentaOfflineDTO(BaseModel):
+    """Venta hecha sin conexión y encolada en la caja."""
+    clave_idempotencia: str = Field(..., min_length=1, max_length=255)
+    estudiante_id: int
+    items: List[CheckoutItemDTO]
+    # Momento de la venta según la caja; es la fecha que se registra en la compra
+    fecha_cliente: datetime
+
+
+class SincronizacionInputDTO(BaseModel):
+    ventas: List[VentaOfflineDTO] = Field(..., min_length=1, max_length=MAX_VENTAS_POR_SINCRONIZACION)
+
+
+class ResultadoVentaDTO(BaseModel):
+    clave_idempotencia: str
+    estado: Literal["aceptada", "rechazada", "duplicada"]
+    compra_id: Optional[int] = None
+    total: Optional[float] = None
+    saldo_restante: Optional[float] = None
+    # estudiante_no_encontrado | venta_invalida | producto_no_disponible | alimento_bloqueado
+    # | stock_insuficiente | saldo_insuficiente
+    motivo: Optional[str] = None
+    detalle: Optional[str] = None
+
+
+class SincronizacionDTO(BaseModel):
+    """Resultado por venta, en el mismo orden en que llegaron."""
+    resultados: List[ResultadoVentaDTO]
+    aceptadas: int
+    rechazadas: int
+    duplicadas: int
@@ -0,0 +1,104 @@
+# benchmarks/busqueda_alimentos.py
+"""
+Latencia del índice de búsqueda de alimentos (GET /api/alimentos/buscar)
+frente al filtro por subcadena del catálogo en memoria (equivalente a
+nombre ILIKE '%x%'), sobre un catálogo sintético con nombres con tildes.
+
+No usa la base de datos. También mide la construcción del índice y la
+resincronización tras renombrar un alimento o tras una venta.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.busqueda_alimentos --alimentos 2000 --repeticiones 500
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime
+
+from domain.models.alimento import Alimento
+from domain.models.catalogo import Catalogo
+from infrastructure.busqueda.indice_alimentos import IndiceBusquedaAlimentos
+
+_PALABRAS = [
+    "café", "té", "jugo", "limonada", "malteada", "empanada", "arepa", "pandebono",
+    "buñuelo", "almojábana", "sándwich", "ensalada", "frutas", "galletas", "brownie",
+    "pastel", "yogur", "avena", "chocolate", "gaseosa", "agua", "papas", "maní",
+    "salchicha", "pollo", "queso", "jamón", "piña", "mango", "fresa", "mora", "guanábana",
+]
+_CATEGORIAS = ["Bebidas", "Bebidas calientes", "Panadería", "Snacks", "Almuerzos", "Postres", "Frutas"]
+
+_CONSULTAS = {
+    "prefijo corto": "em",
+    "prefijo": "empan",
+    "palabra sin tilde": "cafe",
+    "error de tipeo": "guanabna",
+    "dos palabras": "jugo pina",
+    "categoría": "postres",
+}
+
+
+def _catalogo(cantidad: int, version: int = 1) -> Catalogo:
+    azar = random.Random(7)
+    ahora = datetime.now()
+    alimentos = []
+    for i in range(1, cantidad + 1):
+        nombre = " ".join(azar.sample(_PALABRAS, azar.randint(1, 3))).capitalize() + f" {i}"
+        alimentos.append(Alimento(i, nombre, 1000.0, 100, 200, "", azar.choice(_CATEGORIAS), ahora, ahora, True, i))
+    return Catalogo.desde_alimentos(alimentos, version)
+
+
+def _medir(funcion, repeticiones: int):
+    latencias = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    latencias.sort()
+    return statistics.median(latencias), latencias[int(len(latencias) * 0.99) - 1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Índice de búsqueda frente a filtro por subcadena")
+    parser.add_argument("--alimentos", type=int, default=2000)
+    parser.add_argument("--repeticiones", type=int, default=500)
+    args = parser.parse_args()
+
+    catalogo = _catalogo(args.alimentos)
+    indice = IndiceBusquedaAlimentos()
+    inicio = time.perf_counter()
+    indice.buscar(catalogo, "x")
+    construccion = (time.perf_counter() - inicio) * 1000
+
+    print(f"{args.alimentos} alimentos sintéticos, {args.repeticiones} búsquedas por consulta")
+    print(f"construcción del índice: {construccion:.1f} ms")
+    print(f"{'':>18} | {'índice p50':>10} | {'índice p99':>10} | {'subcadena p50':>13} | resultados")
+    for nombre, consulta in _CONSULTAS.items():
+        p50, p99 = _medir(lambda: indice.buscar(catalogo, consulta), args.repeticiones)
+        subcadena, _ = _medir(lambda: catalogo.filtrar(nombre=consulta), args.repeticiones)
+        resultados = len(indice.buscar(catalogo, consulta, limite=args.alimentos))
+        print(f"{nombre:>18} | {p50:8.3f}ms | {p99:8.3f}ms | {subcadena:11.3f}ms | {resultados} "
+              f"(subcadena: {len(catalogo.filtrar(nombre=consulta))})")
+
+    # Una venta cambia el stock (nueva versión) pero no el texto: no se reindexa nada
+    vendido = replace(catalogo.alimentos[0], cantidad_en_stock=99)
+    tras_venta = Catalogo.desde_alimentos([vendido] + catalogo.alimentos[1:], catalogo.version + 1)
+    inicio = time.perf_counter()
+    indice.buscar(tras_venta, "cafe")
+    print(f"resincronización tras una venta: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    renombrado = replace(catalogo.alimentos[0], nombre="Tinto campesino")
+    tras_cambio = Catalogo.desde_alimentos([renombrado] + catalogo.alimentos[1:], catalogo.version + 2)
+    inicio = time.perf_counter()
+    indice.buscar(tras_cambio, "tinto")
+    print(f"resincronización tras renombrar uno: {(time.perf_counter() - inicio) * 1000:.2f} ms")
+    print(indice.estadisticas())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
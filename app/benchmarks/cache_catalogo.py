@@ -0,0 +1,103 @@
+# benchmarks/cache_catalogo.py
+"""
+Lecturas del catálogo (GET /api/alimentos/ con y sin filtros, y por id)
+contra la base de datos frente a la caché del catálogo.
+
+Inserta un catálogo sintético dentro de una transacción que se deshace al
+final, así que puede ejecutarse contra cualquier base de pruebas con el
+esquema migrado.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.cache_catalogo --alimentos 500 --repeticiones 200
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+from domain.services.alimento_service import AlimentoService
+from infrastructure.cache.cache_catalogo import CacheCatalogo
+from infrastructure.database.postgresql_alimento_repository import PostgresqlAlimentoRepository
+from infrastructure.database.postgresql_repository import get_connection_manager
+from infrastructure.database.row_mapper import cursor_tuplas
+
+
+class _ConexionSinCommit:
+    """Conexión compartida que no confirma nada."""
+
+    def __init__(self, conexion):
+        self._conexion = conexion
+
+    def commit(self):
+        pass
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+class _GestorCompartido:
+    def __init__(self, conexion):
+        self._conexion = _ConexionSinCommit(conexion)
+
+    @contextmanager
+    def get_connection(self):
+        yield self._conexion
+
+    def al_confirmar(self, funcion):
+        pass
+
+
+def _medir(funcion, repeticiones: int) -> float:
+    latencias = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(latencias)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Catálogo desde la base de datos frente a la caché")
+    parser.add_argument("--alimentos", type=int, default=500)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    try:
+        with connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("""
+                    INSERT INTO alimentos (nombre, precio, cantidad_en_stock, calorias, imagen, categoria)
+                    SELECT 'Benchmark ' || g, 1000 + g, 100, 200, '', 'categoria ' || (g %% 8)
+                    FROM generate_series(1, %s) AS g
+                    RETURNING id
+                """, (args.alimentos,))
+                un_id = cursor.fetchone()[0]
+            repositorio = PostgresqlAlimentoRepository(_GestorCompartido(conn))
+            sin_cache = AlimentoService(repositorio)
+            con_cache = AlimentoService(repositorio, CacheCatalogo(ttl=3600))
+
+            casos = {
+                "todo el catálogo": lambda s: s.listar_alimentos({}),
+                "por categoría": lambda s: s.listar_alimentos({"categoria": "categoria 3"}),
+                "por nombre": lambda s: s.listar_alimentos({"nombre": "mark 4"}),
+                "por id": lambda s: s.obtener_alimento_por_id(un_id),
+            }
+            print(f"{args.alimentos} alimentos sintéticos, mediana de {args.repeticiones} lecturas")
+            print(f"{'':>18} | {'base ms':>8} | {'caché ms':>8} | mejora")
+            for nombre, caso in casos.items():
+                base = _medir(lambda: caso(sin_cache), args.repeticiones)
+                cache = _medir(lambda: caso(con_cache), args.repeticiones)
+                print(f"{nombre:>18} | {base:8.3f} | {cache:8.3f} | {base / cache:5.0f}x")
+            conn.rollback()
+    finally:
+        connection_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
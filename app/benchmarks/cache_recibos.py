@@ -0,0 +1,84 @@
+# benchmarks/cache_recibos.py
+"""
+Lectura de un recibo (GET /compras/{compra_id}) desde la base de datos frente
+a la caché de recibos del proceso.
+
+Solo lee: toma las últimas compras existentes y mide obtener_recibo con la
+caché vacía en cada lectura (dos consultas más la serialización) y con la
+caché ya llena.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.cache_recibos --compras 200 --repeticiones 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from domain.services.compra_service import CompraService
+from infrastructure.cache.cache_recibos import CacheRecibos
+from infrastructure.cache.lru_cache import LRUCache
+from infrastructure.database.postgresql_compra_repository import PostgresqlCompraRepository
+from infrastructure.database.postgresql_producto_repository import PostgresqlProductoRepository
+from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository, get_connection_manager
+from infrastructure.database.row_mapper import cursor_tuplas
+
+
+def _medir(funcion, ids, repeticiones: int) -> float:
+    latencias = []
+    for _ in range(repeticiones):
+        for compra_id in ids:
+            inicio = time.perf_counter()
+            funcion(compra_id)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(latencias)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recibos desde la base de datos frente a la caché")
+    parser.add_argument("--compras", type=int, default=200)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    try:
+        with connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("SELECT id FROM compras ORDER BY id DESC LIMIT %s", (args.compras,))
+                ids = [fila[0] for fila in cursor.fetchall()]
+        if not ids:
+            print("❌ No hay compras para leer")
+            return 1
+
+        cache = LRUCache(len(ids), nombre="benchmark")
+        service = CompraService(
+            PostgresqlCompraRepository(connection_manager),
+            PostgresqlUsuarioRepository(connection_manager),
+            PostgresqlProductoRepository(connection_manager),
+            CacheRecibos(cache)
+        )
+
+        def sin_cache(compra_id):
+            cache.invalidar(compra_id)
+            service.obtener_recibo(compra_id)
+
+        base_datos = _medir(sin_cache, ids, args.repeticiones)
+        for compra_id in ids:
+            service.obtener_recibo(compra_id)
+        en_cache = _medir(service.obtener_recibo, ids, args.repeticiones)
+
+        print(f"{len(ids)} recibos x {args.repeticiones} lecturas (mediana por lectura)")
+        print(f"{'base de datos':>14} | {base_datos:8.3f} ms")
+        print(f"{'caché':>14} | {en_cache:8.3f} ms")
+        print(f"{'mejora':>14} | {base_datos / en_cache:8.0f}x")
+        print(cache.estadisticas())
+    finally:
+        connection_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
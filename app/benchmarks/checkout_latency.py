@@ -0,0 +1,162 @@
+# benchmarks/checkout_latency.py
+"""
+Compara guardar_compra tal como estaba (un INSERT de item y un UPDATE de stock
+por línea) con la versión por lotes (un UPDATE ... FROM (VALUES ...) y un
+INSERT multi-fila), para carritos de distinto tamaño.
+
+Cuenta las sentencias enviadas al servidor y mide la latencia por compra.
+Todo ocurre dentro de una transacción que se deshace al final, así que puede
+ejecutarse contra cualquier base de pruebas con el esquema migrado.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.checkout_latency --tamanos 1 5 10 20 --repeticiones 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from domain.models.compra import Compra, CompraItem
+from infrastructure.database.postgresql_compra_repository import PostgresqlCompraRepository
+from infrastructure.database.postgresql_repository import get_connection_manager
+from infrastructure.database.row_mapper import cursor_tuplas
+
+
+class _CursorContado:
+    def __init__(self, cursor, contador: list):
+        self._cursor = cursor
+        self._contador = contador
+
+    def execute(self, *args, **kwargs):
+        self._contador[0] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class _ConexionContada:
+    """Conexión compartida que cuenta cada execute y no confirma nada."""
+
+    def __init__(self, conexion, contador: list):
+        self._conexion = conexion
+        self._contador = contador
+
+    def cursor(self, *args, **kwargs):
+        return _CursorContado(self._conexion.cursor(*args, **kwargs), self._contador)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        # Un rollback real desharía también los datos de prueba de la sesión
+        raise RuntimeError("El benchmark no espera compras rechazadas: revisa el stock de prueba")
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+class _GestorContado:
+    def __init__(self, conexion, contador: list):
+        self._conexion = _ConexionContada(conexion, contador)
+
+    @contextmanager
+    def get_connection(self):
+        yield self._conexion
+
+    def al_confirmar(self, funcion):
+        # Todo se deshace al final: nada llega a confirmarse
+        pass
+
+
+def _guardar_compra_por_linea(connection_manager, compra: Compra) -> Compra:
+    """La implementación anterior de guardar_compra."""
+    with connection_manager.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO compras (usuario_id, fecha, total) VALUES (%s, %s, %s) RETURNING id",
+                (compra.usuario_id, compra.fecha, compra.total)
+            )
+            compra_id = cursor.fetchone()["id"]
+            for item in compra.items:
+                cursor.execute(
+                    "INSERT INTO compra_items (compra_id, producto_id, cantidad, precio_unitario) VALUES (%s, %s, %s, %s)",
+                    (compra_id, item.producto_id, item.cantidad, item.precio_unitario)
+                )
+                cursor.execute(
+                    "UPDATE alimentos SET cantidad_en_stock = cantidad_en_stock - %s WHERE id = %s",
+                    (item.cantidad, item.producto_id)
+                )
+            conn.commit()
+    compra.id = compra_id
+    return compra
+
+
+def _compra(usuario_id: int, productos: list, tamano: int) -> Compra:
+    items = [CompraItem(producto_id=productos[i % len(productos)], cantidad=1, precio_unitario=1000) for i in range(tamano)]
+    compra = Compra(usuario_id=usuario_id, items=items, fecha=datetime.now())
+    compra.calcular_total()
+    return compra
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Latencia de guardar_compra por tamaño de carrito")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    try:
+        with connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("SELECT id FROM usuarios ORDER BY id LIMIT 1")
+                usuario = cursor.fetchone()
+                cursor.execute("SELECT id FROM alimentos ORDER BY id")
+                productos = [fila[0] for fila in cursor.fetchall()]
+                if not usuario or not productos:
+                    print("❌ Se necesita al menos un usuario y un alimento en la base de pruebas")
+                    return 1
+                # Stock holgado para que ninguna compra del benchmark se rechace
+                cursor.execute("UPDATE alimentos SET cantidad_en_stock = 1000000000 WHERE id = ANY(%s)", (productos,))
+
+            contador = [0]
+            gestor = _GestorContado(conn, contador)
+            repositorio = PostgresqlCompraRepository(gestor)
+            variantes = {
+                "por línea": lambda compra: _guardar_compra_por_linea(gestor, compra),
+                "por lotes": repositorio.guardar_compra,
+            }
+
+            print(f"{'líneas':>7} | {'variante':>10} | {'sentencias':>10} | {'p50 ms':>8} | {'p95 ms':>8}")
+            for tamano in args.tamanos:
+                for nombre, guardar in variantes.items():
+                    latencias = []
+                    for _ in range(args.repeticiones):
+                        compra = _compra(usuario[0], productos, tamano)
+                        contador[0] = 0
+                        inicio = time.perf_counter()
+                        guardar(compra)
+                        latencias.append((time.perf_counter() - inicio) * 1000)
+                    sentencias = contador[0]
+                    latencias.sort()
+                    p95 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]
+                    print(f"{tamano:>7} | {nombre:>10} | {sentencias:>10} | {statistics.median(latencias):8.2f} | {p95:8.2f}")
+            conn.rollback()
+    finally:
+        connection_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# benchmarks/compras_query_count.py
+"""
+Cuenta las consultas que emiten los listados de compras y comprueba que no
+crecen con el número de compras (sin N+1). Sale con código 1 si alguno crece.
+
+Crea compras de prueba dentro de una transacción que se deshace al final, así
+que puede ejecutarse contra cualquier base de pruebas con el esquema migrado.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.compras_query_count --compras 400
+"""
+
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from infrastructure.database.postgresql_compra_repository import PostgresqlCompraRepository
+from infrastructure.database.postgresql_repository import get_connection_manager
+from infrastructure.database.row_mapper import cursor_tuplas
+
+
+class _CursorContado:
+    def __init__(self, cursor, contador: list):
+        self._cursor = cursor
+        self._contador = contador
+
+    def execute(self, *args, **kwargs):
+        self._contador[0] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class _ConexionContada:
+    """Conexión compartida que cuenta cada execute y no confirma nada."""
+
+    def __init__(self, conexion, contador: list):
+        self._conexion = conexion
+        self._contador = contador
+
+    def cursor(self, *args, **kwargs):
+        return _CursorContado(self._conexion.cursor(*args, **kwargs), self._contador)
+
+    def commit(self):
+        pass
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+class _GestorContado:
+    def __init__(self, conexion, contador: list):
+        self._conexion = _ConexionContada(conexion, contador)
+
+    @contextmanager
+    def get_connection(self):
+        yield self._conexion
+
+
+def _crear_compras(cursor, usuario_id: int, producto_id: int, cantidad: int) -> None:
+    ahora = datetime.now()
+    for i in range(cantidad):
+        cursor.execute(
+            "INSERT INTO compras (usuario_id, fecha, total) VALUES (%s, %s, %s) RETURNING id",
+            (usuario_id, ahora - timedelta(seconds=i), 1000)
+        )
+        compra_id = cursor.fetchone()[0]
+        cursor.execute(
+            "INSERT INTO compra_items (compra_id, producto_id, cantidad, precio_unitario) VALUES (%s, %s, 2, 500)",
+            (compra_id, producto_id)
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Consultas por listado de compras según el número de compras")
+    parser.add_argument("--compras", type=int, default=400)
+    args = parser.parse_args()
+
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    fallos = 0
+    try:
+        with connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("SELECT id FROM usuarios ORDER BY id LIMIT 1")
+                usuario = cursor.fetchone()
+                cursor.execute("SELECT id FROM alimentos ORDER BY id LIMIT 1")
+                alimento = cursor.fetchone()
+            if not usuario or not alimento:
+                print("❌ Se necesita al menos un usuario y un alimento en la base de pruebas")
+                return 1
+            usuario_id, producto_id = usuario[0], alimento[0]
+
+            contador = [0]
+            repositorio = PostgresqlCompraRepository(_GestorContado(conn, contador))
+            listados = {
+                "obtener_compras_por_usuario_id": lambda: repositorio.obtener_compras_por_usuario_id(usuario_id),
+                "obtener_ultimas_compras_por_usuario_id": lambda: repositorio.obtener_ultimas_compras_por_usuario_id(usuario_id, 50),
+                "obtener_todas_las_compras": repositorio.obtener_todas_las_compras,
+            }
+
+            medidas = {}
+            ya_creadas = 0
+            for total in (1, args.compras):
+                with cursor_tuplas(conn) as cursor:
+                    _crear_compras(cursor, usuario_id, producto_id, total - ya_creadas)
+                ya_creadas = total
+                for nombre, listar in listados.items():
+                    contador[0] = 0
+                    inicio = time.perf_counter()
+                    filas = len(listar())
+                    medidas.setdefault(nombre, []).append((total, contador[0], filas, (time.perf_counter() - inicio) * 1000))
+            conn.rollback()
+
+        for nombre, puntos in medidas.items():
+            consultas = {c for _, c, _, _ in puntos}
+            ok = len(consultas) == 1
+            fallos += not ok
+            detalle = ", ".join(f"{t} compras → {c} consultas, {f} filas, {ms:.1f} ms" for t, c, f, ms in puntos)
+            print(f"{'✅' if ok else '❌'} {nombre}: {detalle}")
+    finally:
+        connection_manager.close()
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
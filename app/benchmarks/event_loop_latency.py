@@ -0,0 +1,94 @@
+# benchmarks/event_loop_latency.py
+"""
+Mide la latencia del event loop mientras llegan peticiones concurrentes que
+hacen consultas lentas, comparando DB_ASYNC_MODE=inline con DB_ASYNC_MODE=executor.
+
+Uso (desde la carpeta app/, con las variables DB_* apuntando a una base de pruebas):
+
+    python -m benchmarks.event_loop_latency --peticiones 200 --concurrencia 20 --consulta-ms 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from infrastructure.database import db_executor
+from infrastructure.database.db_executor import ejecutar_en_bd, shutdown_db_executor
+from infrastructure.database.postgresql_repository import get_connection_manager
+
+
+def _consulta_lenta(connection_manager, segundos: float) -> None:
+    with connection_manager.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_sleep(%s)", (segundos,))
+
+
+async def _medir_latencia(intervalo: float, muestras: list, detener: asyncio.Event) -> None:
+    """Mide cuánto se retrasa un `sleep` corto: ese retraso es el bloqueo del loop."""
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(intervalo)
+        muestras.append((time.perf_counter() - inicio - intervalo) * 1000)
+
+
+async def _escenario(modo: str, peticiones: int, concurrencia: int, consulta_ms: float) -> dict:
+    db_executor.DB_ASYNC_MODE = modo
+    connection_manager = get_connection_manager()
+    semaforo = asyncio.Semaphore(concurrencia)
+    tiempos = []
+
+    async def peticion():
+        async with semaforo:
+            inicio = time.perf_counter()
+            await ejecutar_en_bd(_consulta_lenta, connection_manager, consulta_ms / 1000)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            # Cede el control como lo haría la serialización de la respuesta
+            await asyncio.sleep(0)
+
+    muestras = []
+    detener = asyncio.Event()
+    medidor = asyncio.create_task(_medir_latencia(0.005, muestras, detener))
+    inicio = time.perf_counter()
+    await asyncio.gather(*(peticion() for _ in range(peticiones)))
+    duracion = time.perf_counter() - inicio
+    detener.set()
+    await medidor
+
+    muestras.sort()
+    tiempos.sort()
+    return {
+        "modo": modo,
+        "rps": peticiones / duracion,
+        "peticion_p50_ms": statistics.median(tiempos),
+        "loop_p50_ms": statistics.median(muestras) if muestras else 0.0,
+        "loop_p99_ms": muestras[int(len(muestras) * 0.99) - 1] if muestras else 0.0,
+        "loop_max_ms": muestras[-1] if muestras else 0.0,
+        "muestras_loop": len(muestras),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latencia del event loop con acceso a datos bloqueante")
+    parser.add_argument("--peticiones", type=int, default=200)
+    parser.add_argument("--concurrencia", type=int, default=20)
+    parser.add_argument("--consulta-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    try:
+        for modo in ("inline", "executor"):
+            r = asyncio.run(_escenario(modo, args.peticiones, args.concurrencia, args.consulta_ms))
+            print(
+                f"{r['modo']:>9}: {r['rps']:8.1f} req/s | petición p50 {r['peticion_p50_ms']:7.1f} ms | "
+                f"retraso del loop p50 {r['loop_p50_ms']:6.1f} ms, p99 {r['loop_p99_ms']:6.1f} ms, "
+                f"máx {r['loop_max_ms']:6.1f} ms ({r['muestras_loop']} muestras)"
+            )
+    finally:
+        shutdown_db_executor()
+        connection_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# benchmarks/invalidacion_workers.py
+"""
+Verificación de la invalidación entre procesos (LISTEN/NOTIFY) con dos
+procesos trabajadores reales contra la base de datos configurada.
+
+Cada proceso abre su pool, arranca su escucha de invalidaciones y calienta
+su propia caché del catálogo, igual que un worker de uvicorn. El proceso A
+escribe y el B debe ver el cambio en su caché sin reiniciarse:
+
+1. Un cambio de precio confirmado en A llega a B (se mide la demora).
+2. Un cambio deshecho en una unidad de trabajo de A no llega a B.
+3. Se corta la conexión de escucha de B y A escribe mientras B está
+   desconectado: al reconectar, B descarta su caché y ve el precio nuevo.
+
+Crea un alimento de prueba y lo borra al final. Sale con código 1 si algún
+paso falla.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.invalidacion_workers
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+from domain.services.alimento_service import AlimentoService
+from infrastructure.cache.cache_catalogo import cache_catalogo
+from infrastructure.cache.escucha_invalidaciones import escucha_invalidaciones
+from infrastructure.cache.invalidacion import INVALIDACION_ENTRE_PROCESOS
+from infrastructure.database.postgresql_alimento_repository import PostgresqlAlimentoRepository
+from infrastructure.database.postgresql_repository import get_connection_manager
+from infrastructure.database.row_mapper import cursor_tuplas
+from infrastructure.database.unit_of_work import UnitOfWork
+
+_ESPERA_MAXIMA = 10.0
+
+
+class _Deshacer(Exception):
+    pass
+
+
+def _esperar_precio(service: AlimentoService, alimento_id: int, precio: float, timeout: float):
+    """Momento (time.time) en que la caché de este proceso muestra el precio, o None."""
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        alimento = service.catalogo().buscar_por_id(alimento_id)
+        if alimento is not None and alimento.precio == precio:
+            return time.time()
+        time.sleep(0.001)
+    return None
+
+
+def _trabajador(conexion) -> None:
+    """Bucle de órdenes de un proceso trabajador."""
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    escucha_invalidaciones.iniciar(connection_manager.pool.connect_kwargs)
+    escucha_invalidaciones.esperar_conexion(_ESPERA_MAXIMA)
+    service = AlimentoService(PostgresqlAlimentoRepository(connection_manager), cache_catalogo)
+    try:
+        while True:
+            orden, argumentos = conexion.recv()
+            if orden == "salir":
+                conexion.send(None)
+                return
+            if orden == "catalogo":
+                conexion.send(service.catalogo().version)
+            elif orden == "crear":
+                alimento = service.crear_alimento(
+                    nombre=argumentos, precio=1000, cantidad_en_stock=10,
+                    calorias=100, imagen="", categoria="verificacion"
+                )
+                conexion.send(alimento.id)
+            elif orden == "precio":
+                alimento_id, precio = argumentos
+                service.actualizar_alimento(alimento_id, precio=precio)
+                conexion.send(time.time())
+            elif orden == "precio_deshecho":
+                alimento_id, precio = argumentos
+                try:
+                    with UnitOfWork(connection_manager) as unidad_de_trabajo:
+                        AlimentoService(PostgresqlAlimentoRepository(unidad_de_trabajo)).actualizar_alimento(
+                            alimento_id, precio=precio
+                        )
+                        raise _Deshacer()
+                except _Deshacer:
+                    pass
+                conexion.send(None)
+            elif orden == "esperar_precio":
+                conexion.send(_esperar_precio(service, *argumentos, timeout=_ESPERA_MAXIMA))
+            elif orden == "estadisticas":
+                conexion.send(escucha_invalidaciones.estadisticas())
+            elif orden == "cortar_escucha":
+                pid = escucha_invalidaciones.estadisticas()["pid_backend"]
+                with connection_manager.get_connection() as conn:
+                    with cursor_tuplas(conn) as cursor:
+                        cursor.execute("SELECT pg_terminate_backend(%s)", (pid,))
+                    conn.commit()
+                conexion.send(pid)
+    finally:
+        escucha_invalidaciones.detener()
+        connection_manager.close()
+
+
+class _Proceso:
+    def __init__(self, contexto, nombre: str):
+        self.nombre = nombre
+        self._conexion, remota = contexto.Pipe()
+        self._proceso = contexto.Process(target=_trabajador, args=(remota,), name=nombre, daemon=True)
+        self._proceso.start()
+
+    def enviar(self, orden: str, argumentos=None) -> None:
+        self._conexion.send((orden, argumentos))
+
+    def recibir(self, timeout: float = _ESPERA_MAXIMA * 2):
+        if not self._conexion.poll(timeout):
+            raise TimeoutError(f"{self.nombre} no respondió a tiempo")
+        return self._conexion.recv()
+
+    def pedir(self, orden: str, argumentos=None):
+        self.enviar(orden, argumentos)
+        return self.recibir()
+
+    def cerrar(self) -> None:
+        try:
+            self.pedir("salir")
+        finally:
+            self._proceso.join(5)
+
+
+def _borrar_alimento(alimento_id: int) -> None:
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    try:
+        with connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("DELETE FROM alimentos WHERE id = %s", (alimento_id,))
+            conn.commit()
+    finally:
+        connection_manager.close()
+
+
+def main() -> int:
+    if not INVALIDACION_ENTRE_PROCESOS:
+        print("❌ INVALIDACION_ENTRE_PROCESOS está desactivado")
+        return 1
+
+    contexto = multiprocessing.get_context("spawn")
+    a = _Proceso(contexto, "worker-a")
+    b = _Proceso(contexto, "worker-b")
+    fallos = 0
+    alimento_id = None
+
+    def comprobar(condicion: bool, mensaje: str) -> None:
+        nonlocal fallos
+        print(f"{'✅' if condicion else '❌'} {mensaje}")
+        fallos += 0 if condicion else 1
+
+    try:
+        alimento_id = a.pedir("crear", f"Verificacion invalidacion {os.getpid()}")
+        # Ambos calientan su caché con el alimento recién creado
+        a.pedir("catalogo")
+        b.pedir("catalogo")
+
+        # 1. Escritura confirmada en A, leída de la caché de B
+        b.enviar("esperar_precio", (alimento_id, 1500.0))
+        escrito = a.pedir("precio", (alimento_id, 1500.0))
+        visto = b.recibir()
+        comprobar(visto is not None, "B ve el precio escrito por A" +
+                  (f" ({max(visto - escrito, 0) * 1000:.1f} ms después del commit)" if visto else ""))
+
+        # 2. Escritura deshecha: no debe generar avisos
+        recibidos = b.pedir("estadisticas")["recibidos"]
+        a.pedir("precio_deshecho", (alimento_id, 9999.0))
+        time.sleep(0.5)
+        comprobar(b.pedir("estadisticas")["recibidos"] == recibidos, "Un cambio deshecho no avisa a B")
+
+        # 3. Corte de la escucha de B con una escritura mientras está desconectado
+        reconexiones = b.pedir("estadisticas")["reconexiones"]
+        b.pedir("cortar_escucha")
+        a.pedir("precio", (alimento_id, 2000.0))
+        limite = time.monotonic() + _ESPERA_MAXIMA
+        while time.monotonic() < limite and b.pedir("estadisticas")["reconexiones"] == reconexiones:
+            time.sleep(0.1)
+        comprobar(b.pedir("estadisticas")["reconexiones"] > reconexiones, "B reconecta su escucha")
+        b.enviar("esperar_precio", (alimento_id, 2000.0))
+        comprobar(b.recibir() is not None, "B ve la escritura hecha mientras estaba desconectado")
+
+        for proceso in (a, b):
+            print(f"{proceso.nombre}: {proceso.pedir('estadisticas')}")
+    finally:
+        a.cerrar()
+        b.cerrar()
+        if alimento_id is not None:
+            _borrar_alimento(alimento_id)
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
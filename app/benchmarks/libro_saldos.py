@@ -0,0 +1,100 @@
+# benchmarks/libro_saldos.py
+"""
+Saldo y estado de cuenta desde el libro: sumando todo el historial frente a
+la última foto más el delta.
+
+Inserta un historial sintético para un titular dentro de una transacción que
+se deshace al final, así que puede ejecutarse contra cualquier base de pruebas
+con el esquema migrado.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.libro_saldos --movimientos 200000 --delta 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+from domain.models.movimiento_saldo import TitularSaldo
+from infrastructure.database.postgresql_movimiento_saldo_repository import PostgresqlMovimientoSaldoRepository
+from infrastructure.database.postgresql_repository import get_connection_manager
+from infrastructure.database.row_mapper import cursor_tuplas
+
+
+class _ConexionSinCommit:
+    """Conexión compartida que no confirma nada."""
+
+    def __init__(self, conexion):
+        self._conexion = conexion
+
+    def commit(self):
+        pass
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+class _GestorCompartido:
+    def __init__(self, conexion):
+        self._conexion = _ConexionSinCommit(conexion)
+
+    @contextmanager
+    def get_connection(self):
+        yield self._conexion
+
+
+def _medir(funcion, repeticiones: int) -> float:
+    latencias = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(latencias)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Saldo desde el libro con y sin fotos")
+    parser.add_argument("--movimientos", type=int, default=200000)
+    parser.add_argument("--delta", type=int, default=50, help="movimientos posteriores a la foto")
+    parser.add_argument("--repeticiones", type=int, default=30)
+    args = parser.parse_args()
+
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    try:
+        with connection_manager.get_connection() as conn:
+            repositorio = PostgresqlMovimientoSaldoRepository(_GestorCompartido(conn))
+            titular_id = -1  # no choca con titulares reales
+            insertar = """
+                INSERT INTO movimientos_saldo (titular_tipo, titular_id, tipo, monto, referencia)
+                SELECT 'estudiante', %s, CASE WHEN g %% 5 = 0 THEN 'recarga' ELSE 'compra' END,
+                       CASE WHEN g %% 5 = 0 THEN 10000 ELSE -2500 END, 'benchmark'
+                FROM generate_series(1, %s) AS g
+            """
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute(insertar, (titular_id, args.movimientos))
+                cursor.execute("ANALYZE movimientos_saldo")
+
+            saldo = lambda: repositorio.saldo(TitularSaldo.ESTUDIANTE, titular_id)
+            estado = lambda: repositorio.estado_de_cuenta(TitularSaldo.ESTUDIANTE, titular_id, limite=20)
+            sin_foto = (_medir(saldo, args.repeticiones), _medir(estado, args.repeticiones), saldo())
+
+            repositorio.tomar_fotos(margen_segundos=0)
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute(insertar, (titular_id, args.delta))
+            con_foto = (_medir(saldo, args.repeticiones), _medir(estado, args.repeticiones), saldo())
+            conn.rollback()
+
+        print(f"{'':>22} | {'saldo ms':>9} | {'estado ms':>9} | saldo")
+        print(f"{'sin foto':>22} | {sin_foto[0]:9.2f} | {sin_foto[1]:9.2f} | {sin_foto[2]}")
+        print(f"{'foto + ' + str(args.delta) + ' movimientos':>22} | {con_foto[0]:9.2f} | {con_foto[1]:9.2f} | {con_foto[2]}")
+    finally:
+        connection_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
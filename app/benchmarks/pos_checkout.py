@@ -0,0 +1,116 @@
+# benchmarks/pos_checkout.py
+"""
+Latencia de POST /pos/checkout de punta a punta (HTTP en proceso + base de
+datos) frente al flujo anterior del POS: descargaSaldo y luego guardarCompra.
+
+Cada petición corre en su unidad de trabajo habitual, pero la dependencia se
+sustituye por una que deshace la transacción al final: la base de pruebas
+queda como estaba. Objetivo: p95 < 30 ms con un PostgreSQL local.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.pos_checkout --ventas 300 --lineas 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from infrastructure.database.postgresql_repository import get_connection_manager
+from infrastructure.database.row_mapper import cursor_tuplas
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
+from infrastructure.security.jwt_handler import JWTHandler
+
+
+def _unidad_de_trabajo_sin_confirmar():
+    unidad_de_trabajo = UnitOfWork(get_connection_manager())
+    try:
+        yield unidad_de_trabajo
+    finally:
+        unidad_de_trabajo.rollback()
+        unidad_de_trabajo.close()
+
+
+def _percentiles(latencias):
+    latencias = sorted(latencias)
+    p95 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]
+    return statistics.median(latencias), p95, latencias[-1]
+
+
+def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description="Latencia del cierre de venta del POS")
+    parser.add_argument("--ventas", type=int, default=300)
+    parser.add_argument("--lineas", type=int, default=5)
+    parser.add_argument("--objetivo-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    main.app.dependency_overrides[get_unit_of_work] = _unidad_de_trabajo_sin_confirmar
+    with TestClient(main.app) as cliente:
+        with get_connection_manager().get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("SELECT usuario FROM usuarios ORDER BY id LIMIT 1")
+                usuario = cursor.fetchone()
+                cursor.execute("SELECT id, saldo FROM estudiantes ORDER BY saldo DESC LIMIT 1")
+                estudiante = cursor.fetchone()
+                cursor.execute("""
+                    SELECT a.id, a.precio FROM alimentos a
+                    WHERE a.activo AND a.cantidad_en_stock >= %s
+                      AND NOT EXISTS (SELECT 1 FROM alimentos_bloqueados b
+                                      WHERE b.id_estudiante = %s AND b.id_alimento = a.id)
+                    ORDER BY a.precio
+                """, (args.lineas, estudiante[0] if estudiante else None))
+                productos = cursor.fetchall()
+        if not usuario or not estudiante or not productos:
+            print("❌ Se necesita un usuario, un estudiante y alimentos con stock en la base de pruebas")
+            return 1
+
+        cabeceras = {"Authorization": "Bearer " + JWTHandler().create_access_token({"sub": usuario[0]})}
+        lineas = [productos[i % len(productos)] for i in range(args.lineas)]
+        total = float(sum(precio for _, precio in lineas))
+        if total > float(estudiante[1]):
+            print(f"❌ El estudiante {estudiante[0]} no tiene saldo para un carrito de {total}")
+            return 1
+
+        venta = {"estudiante_id": estudiante[0],
+                 "items": [{"producto_id": producto_id, "cantidad": 1} for producto_id, _ in lineas]}
+        compra = {"usuario_id": estudiante[0],
+                  "items": [{"producto_id": producto_id, "cantidad": 1, "precio_unitario": float(precio)}
+                            for producto_id, precio in lineas]}
+
+        def checkout():
+            respuesta = cliente.post("/pos/checkout", json=venta, headers=cabeceras)
+            respuesta.raise_for_status()
+
+        def flujo_anterior():
+            respuesta = cliente.post(f"/estudiantes/{estudiante[0]}/descargaSaldo", json={"monto": total}, headers=cabeceras)
+            respuesta.raise_for_status()
+            respuesta = cliente.post("/guardarCompra", json=compra, headers=cabeceras)
+            respuesta.raise_for_status()
+
+        resultados = {}
+        for nombre, vender in (("descargaSaldo + guardarCompra", flujo_anterior), ("/pos/checkout", checkout)):
+            for _ in range(min(20, args.ventas)):
+                vender()
+            latencias = []
+            for _ in range(args.ventas):
+                inicio = time.perf_counter()
+                vender()
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            resultados[nombre] = _percentiles(latencias)
+
+    main.app.dependency_overrides.pop(get_unit_of_work, None)
+    for nombre, (p50, p95, maximo) in resultados.items():
+        print(f"{nombre:>30}: p50 {p50:6.2f} ms | p95 {p95:6.2f} ms | máx {maximo:6.2f} ms "
+              f"({args.ventas} ventas de {args.lineas} líneas)")
+    p95_checkout = resultados["/pos/checkout"][1]
+    ok = p95_checkout < args.objetivo_ms
+    print(f"{'✅' if ok else '❌'} p95 de /pos/checkout {p95_checkout:.2f} ms (objetivo < {args.objetivo_ms:.0f} ms)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_benchmark())
@@ -0,0 +1,173 @@
+# benchmarks/pos_sync.py
+"""
+Sincronización de ventas sin conexión: un lote por /pos/sync (validación por
+conjuntos) frente a una llamada de checkout por venta.
+
+Crea estudiantes de prueba y un lote de ventas sintéticas dentro de una
+transacción que se deshace al final; cuenta sentencias y mide el tiempo de
+PosService.sincronizar y de N × PosService.checkout sobre los mismos datos.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.pos_sync --ventas 500 --estudiantes 40
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from application.dto.pos_dto import CheckoutItemDTO, VentaOfflineDTO
+from domain.services.compra_service import CompraService
+from domain.services.pos_service import PosService
+from infrastructure.database.postgresql_alimentoBloqueado_repository import PostgresqlAlimentoBloqueadoRepository
+from infrastructure.database.postgresql_compra_repository import PostgresqlCompraRepository
+from infrastructure.database.postgresql_estudiante_repository import PostgresqlEstudianteRepository
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
+from infrastructure.database.postgresql_producto_repository import PostgresqlProductoRepository
+from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository, get_connection_manager
+from infrastructure.database.row_mapper import cursor_tuplas
+
+
+class _CursorContado:
+    def __init__(self, cursor, contador: list):
+        self._cursor = cursor
+        self._contador = contador
+
+    def execute(self, *args, **kwargs):
+        self._contador[0] += 1
+        return self._cursor.execute(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class _ConexionContada:
+    """Conexión compartida que cuenta cada execute y no confirma nada."""
+
+    def __init__(self, conexion, contador: list):
+        self._conexion = conexion
+        self._contador = contador
+
+    def cursor(self, *args, **kwargs):
+        return _CursorContado(self._conexion.cursor(*args, **kwargs), self._contador)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        # Un rollback real desharía también los datos de prueba de la sesión
+        raise RuntimeError("El benchmark no espera ventas fallidas: revisa el saldo y el stock de prueba")
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+class _GestorContado:
+    def __init__(self, conexion, contador: list):
+        self._conexion = _ConexionContada(conexion, contador)
+
+    @contextmanager
+    def get_connection(self):
+        yield self._conexion
+
+    def al_confirmar(self, funcion):
+        # Todo se deshace al final: nada llega a confirmarse
+        pass
+
+
+def _servicio(gestor) -> PosService:
+    compra_repo = PostgresqlCompraRepository(gestor)
+    producto_repo = PostgresqlProductoRepository(gestor)
+    return PosService(
+        PostgresqlEstudianteRepository(gestor),
+        PostgresqlAlimentoBloqueadoRepository(gestor),
+        compra_repo,
+        producto_repo,
+        CompraService(compra_repo, PostgresqlUsuarioRepository(gestor), producto_repo),
+        PostgresqlSaldoRepository(gestor)
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sincronización por lote frente a un checkout por venta")
+    parser.add_argument("--ventas", type=int, default=500)
+    parser.add_argument("--estudiantes", type=int, default=40)
+    parser.add_argument("--lineas", type=int, default=3)
+    args = parser.parse_args()
+
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    aleatorio = random.Random(7)
+    try:
+        with connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("SELECT id FROM alimentos WHERE activo ORDER BY id")
+                productos = [fila[0] for fila in cursor.fetchall()]
+                if not productos:
+                    print("❌ Se necesita al menos un alimento activo en la base de pruebas")
+                    return 1
+                cursor.execute("UPDATE alimentos SET cantidad_en_stock = 1000000 WHERE id = ANY(%s)", (productos,))
+                cursor.execute(
+                    """
+                    INSERT INTO estudiantes (nombre, email, responsablefinanciero, saldo, cedula)
+                    SELECT 'Benchmark ' || g, 'bench' || g || '@foodcash.test', 'bench', 100000000, 'BENCH' || g
+                    FROM generate_series(1, %s) AS g
+                    RETURNING id
+                    """,
+                    (args.estudiantes,)
+                )
+                estudiantes = [fila[0] for fila in cursor.fetchall()]
+
+            inicio_jornada = datetime.now() - timedelta(hours=3)
+            ventas = [
+                VentaOfflineDTO(
+                    clave_idempotencia=str(uuid.uuid4()),
+                    estudiante_id=aleatorio.choice(estudiantes),
+                    items=[CheckoutItemDTO(producto_id=aleatorio.choice(productos), cantidad=aleatorio.randint(1, 3))
+                           for _ in range(args.lineas)],
+                    fecha_cliente=inicio_jornada + timedelta(seconds=10 * i)
+                )
+                for i in range(args.ventas)
+            ]
+
+            contador = [0]
+            servicio = _servicio(_GestorContado(conn, contador))
+
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("SAVEPOINT antes_de_vender")
+            inicio = time.perf_counter()
+            resultado = servicio.sincronizar(ventas)
+            lote_ms = (time.perf_counter() - inicio) * 1000
+            lote_sentencias = contador[0]
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute("ROLLBACK TO SAVEPOINT antes_de_vender")
+
+            contador[0] = 0
+            inicio = time.perf_counter()
+            for venta in ventas:
+                servicio.checkout(venta.estudiante_id, venta.items, venta.clave_idempotencia)
+            uno_a_uno_ms = (time.perf_counter() - inicio) * 1000
+            uno_a_uno_sentencias = contador[0]
+            conn.rollback()
+
+        print(f"{'lote /pos/sync':>22}: {lote_ms:8.1f} ms | {lote_sentencias:5d} sentencias | "
+              f"{resultado.aceptadas} aceptadas, {resultado.rechazadas} rechazadas")
+        print(f"{'checkout por venta':>22}: {uno_a_uno_ms:8.1f} ms | {uno_a_uno_sentencias:5d} sentencias")
+        print(f"{'mejora':>22}: {uno_a_uno_ms / lote_ms:.1f}x tiempo ({args.ventas} ventas, {args.lineas} líneas)")
+    finally:
+        connection_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
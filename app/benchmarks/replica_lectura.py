@@ -0,0 +1,278 @@
+# benchmarks/replica_lectura.py
+"""
+Comprobación del enrutado a la réplica de lectura (EnrutadorReplica y
+@solo_lectura) contra un primario y una réplica reales:
+
+  1. una lectura @solo_lectura sin unidad de trabajo va a la réplica;
+  2. dentro de una unidad de trabajo, antes de escribir lee de la réplica y,
+     una vez tomada la conexión del primario, lee en esa misma conexión (ve
+     sus propias escrituras sin confirmar);
+  3. con un retraso mayor que DB_REPLICA_MAX_LAG las lecturas van al primario
+     y vuelven a la réplica cuando se pone al día;
+  4. una réplica que no responde queda descartada DB_REPLICA_RETRY_INTERVAL
+     segundos: en ese tiempo no se intenta conectar y todo va al primario.
+
+El primario es el de DB_HOST/DB_PORT/DB_NAME y la réplica la de --replica-dsn
+(por defecto DB_REPLICA_DSN). Si la réplica es una standby en streaming, el
+retraso se provoca de verdad con pg_wal_replay_pause() (requiere permisos en
+la standby); si son dos instancias independientes, o no hay permisos, se
+fuerza con un retraso máximo negativo. La réplica caída del punto 4 es un
+socket local que acepta y cierra cada conexión, y cuenta los intentos.
+
+No escribe en las tablas: la escritura del punto 2 es una tabla temporal que
+se deshace con la unidad de trabajo. Sale con código 1 si algo falla.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.replica_lectura --replica-dsn "host=localhost port=5433 dbname=foodcash_db user=postgres"
+"""
+
+import argparse
+import socket
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import psycopg2
+
+from infrastructure.database.postgresql_repository import DB_REPLICA_DSN, PostgresqlConnectionManager
+from infrastructure.database.read_replica import solo_lectura
+from infrastructure.database.row_mapper import cursor_tuplas
+from infrastructure.database.unit_of_work import UnitOfWork
+
+
+def _servidor(conexion) -> Tuple[str, int, str]:
+    """Servidor al que está conectada una conexión (también a través de la unidad de trabajo)."""
+    info = conexion.info
+    return info.host, info.port, info.dbname
+
+
+@solo_lectura
+def _leer(gestor, sql: str = "SELECT 1") -> Tuple[Tuple[str, int, str], tuple]:
+    """Lectura marcada como de solo lectura: devuelve el servidor que la atendió y la fila leída."""
+    with gestor.get_connection() as conn:
+        with cursor_tuplas(conn) as cursor:
+            cursor.execute(sql)
+            fila = cursor.fetchone()
+        return _servidor(conn), fila
+
+
+def _primario(gestor) -> Tuple[str, int, str]:
+    with gestor.get_connection() as conn:
+        return _servidor(conn)
+
+
+def _nombre(servidor, primario) -> str:
+    return "primario" if servidor == primario else "réplica"
+
+
+class _ReplicaCaida:
+    """Socket local que acepta cada conexión y la cierra en el acto: una réplica que no responde."""
+
+    def __init__(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(16)
+        self.puerto = self._socket.getsockname()[1]
+        self.intentos = 0
+        self._hilo = threading.Thread(target=self._aceptar, daemon=True)
+        self._hilo.start()
+
+    @property
+    def dsn(self) -> str:
+        return (f"host=127.0.0.1 port={self.puerto} dbname=caida user=caida "
+                f"connect_timeout=2 sslmode=disable gssencmode=disable")
+
+    def _aceptar(self) -> None:
+        while True:
+            try:
+                conexion, _ = self._socket.accept()
+            except OSError:
+                return
+            self.intentos += 1
+            conexion.close()
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+def _esperar(condicion, plazo: float, pausa: float = 0.2) -> bool:
+    limite = time.monotonic() + plazo
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(pausa)
+    return condicion()
+
+
+def _pausar_replay(dsn: str) -> Optional[psycopg2.extensions.connection]:
+    """Pausa la aplicación del WAL en la standby; None si no es standby o no hay permisos."""
+    try:
+        conexion = psycopg2.connect(dsn)
+        conexion.autocommit = True
+        with conexion.cursor() as cursor:
+            cursor.execute("SELECT pg_is_in_recovery()")
+            if not cursor.fetchone()[0]:
+                conexion.close()
+                return None
+            cursor.execute("SELECT pg_wal_replay_pause()")
+        return conexion
+    except psycopg2.Error as e:
+        print(f"⚠️ No se pudo pausar la réplica ({str(e).strip()})")
+        return None
+
+
+def _comprobar_retraso(gestor, replica_dsn: str, primario, max_lag: float, errores: List[str]) -> None:
+    enrutador = gestor.replica
+    pausada = _pausar_replay(replica_dsn)
+    if pausada is None:
+        print("⚠️ La réplica no es una standby pausable: se fuerza el retraso con DB_REPLICA_MAX_LAG=-1")
+        enrutador.max_lag = -1.0
+        try:
+            servidor, _ = _leer(gestor)
+            retraso = enrutador.estadisticas()["retraso_segundos"]
+            if servidor != primario:
+                errores.append(f"retraso {retraso} > máximo -1: la lectura fue a la réplica")
+            else:
+                print(f"✅ Retraso {retraso}s > máximo -1s: lectura en el primario")
+        finally:
+            enrutador.max_lag = max_lag
+    else:
+        try:
+            # Una transacción con xid deja un commit en el WAL que la standby recibe pero no aplica
+            with gestor.get_connection() as conn:
+                with cursor_tuplas(conn) as cursor:
+                    cursor.execute("SELECT txid_current()")
+                conn.commit()
+            atrasada = _esperar(
+                lambda: _leer(gestor)[0] == primario
+                and (enrutador.estadisticas()["retraso_segundos"] or 0) > max_lag,
+                plazo=max_lag + 15
+            )
+            retraso = enrutador.estadisticas()["retraso_segundos"]
+            if not atrasada:
+                errores.append(f"réplica pausada (retraso {retraso}s, máximo {max_lag}s): las lecturas no pasaron al primario")
+            else:
+                print(f"✅ Réplica pausada con {retraso:.1f}s de retraso (máximo {max_lag}s): lectura en el primario")
+        finally:
+            with pausada.cursor() as cursor:
+                cursor.execute("SELECT pg_wal_replay_resume()")
+            pausada.close()
+
+    if not _esperar(lambda: _leer(gestor)[0] != primario, plazo=30):
+        errores.append("la réplica al día no volvió a recibir lecturas")
+    else:
+        print("✅ Réplica al día: las lecturas vuelven a la réplica")
+
+
+def _comprobar_caida(reintento: float, primario, errores: List[str]) -> None:
+    caida = _ReplicaCaida()
+    gestor = PostgresqlConnectionManager(pool_min_size=0, pool_max_size=2, replica_dsn=caida.dsn)
+    gestor.replica.check_interval = 0
+    gestor.replica.retry_interval = reintento
+    try:
+        servidor, _ = _leer(gestor)
+        intentos = caida.intentos
+        if servidor != primario or not gestor.replica.estadisticas()["caida"] or intentos == 0:
+            errores.append(f"réplica caída: lectura en {_nombre(servidor, primario)}, {intentos} intentos, "
+                           f"estadísticas {gestor.replica.estadisticas()}")
+            return
+        print(f"✅ Réplica caída: lectura en el primario y réplica descartada por {reintento}s")
+
+        # Durante el intervalo no se vuelve a intentar conectar
+        limite = time.monotonic() + reintento * 0.8
+        lecturas = 0
+        while time.monotonic() < limite:
+            servidor, _ = _leer(gestor)
+            lecturas += 1
+            if servidor != primario:
+                errores.append("réplica descartada: una lectura fue a la réplica")
+                return
+            time.sleep(0.05)
+        if caida.intentos != intentos:
+            errores.append(f"réplica descartada: {caida.intentos - intentos} intentos de conexión dentro del intervalo")
+            return
+        print(f"✅ {lecturas} lecturas en el primario durante el intervalo, sin intentos de conexión a la réplica")
+
+        # Pasado el intervalo se vuelve a probar (y, como sigue caída, se descarta de nuevo)
+        time.sleep(reintento * 0.2 + 0.5)
+        servidor, _ = _leer(gestor)
+        if caida.intentos == intentos:
+            errores.append("pasado el intervalo no se volvió a probar la réplica")
+        elif servidor != primario or not gestor.replica.estadisticas()["caida"]:
+            errores.append("pasado el intervalo, la réplica aún caída no se volvió a descartar")
+        else:
+            print("✅ Pasado el intervalo se vuelve a probar la réplica y, aún caída, se descarta otra vez")
+    finally:
+        gestor.close()
+        caida.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Enrutado de lecturas a la réplica")
+    parser.add_argument("--replica-dsn", default=DB_REPLICA_DSN,
+                        help="DSN de la réplica; por defecto DB_REPLICA_DSN")
+    parser.add_argument("--retraso", type=float, default=1.0,
+                        help="DB_REPLICA_MAX_LAG para la prueba, en segundos")
+    parser.add_argument("--reintento", type=float, default=3.0,
+                        help="DB_REPLICA_RETRY_INTERVAL para la prueba, en segundos")
+    args = parser.parse_args()
+    if not args.replica_dsn:
+        print("❌ Indique la réplica con --replica-dsn o DB_REPLICA_DSN")
+        return 2
+
+    gestor = PostgresqlConnectionManager(pool_min_size=0, pool_max_size=4,
+                                         replica_dsn=args.replica_dsn, replica_max_lag=args.retraso)
+    gestor.replica.check_interval = 0
+    gestor.replica.retry_interval = args.reintento
+    gestor.open()
+    errores: List[str] = []
+    try:
+        primario = _primario(gestor)
+        if gestor.replica.estadisticas()["caida"]:
+            print("❌ La réplica no responde")
+            return 1
+
+        # 1. Lectura fuera de una unidad de trabajo
+        servidor, _ = _leer(gestor)
+        if servidor == primario:
+            print(f"❌ La réplica ({args.replica_dsn}) y el primario son el mismo servidor, o la réplica no está al día")
+            return 1
+        print(f"✅ Lectura en la réplica {servidor}; primario {primario}")
+
+        # 2. Leer lo propio: la unidad de trabajo ya tiene conexión del primario
+        with UnitOfWork(gestor) as unidad_de_trabajo:
+            servidor, _ = _leer(unidad_de_trabajo)
+            if servidor == primario:
+                errores.append("unidad de trabajo sin escrituras: la lectura fue al primario")
+            with unidad_de_trabajo.get_connection() as conn:
+                with cursor_tuplas(conn) as cursor:
+                    cursor.execute("CREATE TEMP TABLE replica_lectura_prueba (valor INTEGER) ON COMMIT DROP")
+                    cursor.execute("INSERT INTO replica_lectura_prueba VALUES (42)")
+            servidor, fila = _leer(unidad_de_trabajo, "SELECT valor FROM replica_lectura_prueba")
+            unidad_de_trabajo.marcar_para_rollback()
+        if servidor != primario or fila != (42,):
+            errores.append(f"leer lo propio: lectura en {_nombre(servidor, primario)} con {fila}")
+        else:
+            print("✅ Tras escribir, la lectura de la unidad de trabajo usa su conexión del primario y ve lo escrito")
+
+        # 3. Réplica atrasada
+        _comprobar_retraso(gestor, args.replica_dsn, primario, args.retraso, errores)
+
+        # 4. Réplica caída
+        _comprobar_caida(args.reintento, primario, errores)
+    finally:
+        gestor.close()
+
+    estadisticas = gestor.replica.estadisticas()
+    print(f"Lecturas: {estadisticas['lecturas_replica']} en la réplica, {estadisticas['lecturas_primario']} en el primario")
+    for error in errores:
+        print(f"❌ {error}")
+    if not errores:
+        print("✅ Enrutado a la réplica correcto")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
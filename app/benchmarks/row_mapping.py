@@ -0,0 +1,152 @@
+# benchmarks/row_mapping.py
+"""
+Compara el mapeo de filas de los listados: RealDictCursor + Alimento sin slots
+(como estaba) frente a cursor de tuplas + MapeadorFilas + Alimento con slots.
+
+Mide tiempo y memoria (tracemalloc: pico durante el mapeo y lo que queda
+retenido por la lista resultante) sobre 100k filas sintéticas. Con --bd las
+filas salen de PostgreSQL con generate_series, usando ambos tipos de cursor.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.row_mapping --filas 100000
+    python -m benchmarks.row_mapping --filas 100000 --bd
+"""
+
+import argparse
+import dataclasses
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+
+from psycopg2.extensions import Column
+from psycopg2.extras import RealDictCursor, RealDictRow
+
+from domain.models.alimento import Alimento
+from infrastructure.database.postgresql_alimento_repository import _MAPEADOR_ALIMENTO
+from infrastructure.database.row_mapper import cursor_tuplas
+
+COLUMNAS = _MAPEADOR_ALIMENTO.columnas
+
+# La misma entidad tal como era antes: dataclass con __dict__ por instancia
+AlimentoSinSlots = dataclasses.make_dataclass(
+    "AlimentoSinSlots",
+    [(f.name, f.type) if f.default is dataclasses.MISSING else (f.name, f.type, f.default)
+     for f in dataclasses.fields(Alimento)]
+)
+
+_CONSULTA_BD = """
+    SELECT g AS id, 'Alimento ' || g AS nombre, (g %% 9000 + 1000)::numeric(10, 2) AS precio,
+           g %% 50 AS cantidad_en_stock, g %% 700 AS calorias, 'img/' || g || '.png' AS imagen,
+           'Snacks' AS categoria, now() AS fecha_creacion, NULL::timestamp AS fecha_actualizacion,
+           TRUE AS activo
+    FROM generate_series(1, %s) AS g
+"""
+
+
+class _CursorSintetico:
+    """Imita lo que el repositorio lee de un cursor: description y fetchall."""
+
+    def __init__(self, filas, diccionarios: bool):
+        self.description = [Column(name=c) for c in COLUMNAS]
+        self._filas = filas
+        self._diccionarios = diccionarios
+
+    def fetchall(self):
+        if not self._diccionarios:
+            return list(self._filas)
+        # RealDictCursor construye un RealDictRow por fila a partir de la tupla del driver
+        return [RealDictRow(zip(COLUMNAS, tupla)) for tupla in self._filas]
+
+
+def _mapear_dicts(cursor):
+    """El mapeo anterior de listar_alimentos."""
+    return [
+        AlimentoSinSlots(
+            id=row["id"],
+            nombre=row["nombre"],
+            precio=float(row["precio"]),
+            cantidad_en_stock=row["cantidad_en_stock"],
+            calorias=row["calorias"],
+            imagen=row["imagen"],
+            categoria=row["categoria"],
+            fecha_creacion=row["fecha_creacion"],
+            fecha_actualizacion=row["fecha_actualizacion"],
+            activo=row["activo"]
+        )
+        for row in cursor.fetchall()
+    ]
+
+
+def _filas_sinteticas(n: int):
+    ahora = datetime.now()
+    return [
+        (i, f"Alimento {i}", Decimal(i % 9000 + 1000), i % 50, i % 700, f"img/{i}.png", "Snacks", ahora, None, True)
+        for i in range(1, n + 1)
+    ]
+
+
+def _medir(nombre: str, hacer_cursor, mapear) -> dict:
+    # El tiempo se mide sin tracemalloc: el rastreo encarece cada asignación
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = mapear(hacer_cursor())
+    duracion = time.perf_counter() - inicio
+    filas = len(resultado)
+    del resultado
+
+    gc.collect()
+    tracemalloc.start()
+    resultado = mapear(hacer_cursor())
+    retenida, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return {"nombre": nombre, "ms": duracion * 1000, "pico_mb": pico / 2**20, "retenida_mb": retenida / 2**20,
+            "filas": filas}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mapeo de filas: dict por fila frente a tuplas con posiciones")
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--bd", action="store_true", help="leer las filas de PostgreSQL en lugar de generarlas")
+    args = parser.parse_args()
+
+    connection_manager = None
+    if args.bd:
+        from infrastructure.database.postgresql_repository import get_connection_manager
+        connection_manager = get_connection_manager()
+        connection_manager.open()
+
+        def escenario(diccionarios: bool):
+            def ejecutar():
+                with connection_manager.get_connection() as conn:
+                    cursor = conn.cursor(cursor_factory=RealDictCursor) if diccionarios else cursor_tuplas(conn)
+                    cursor.execute(_CONSULTA_BD, (args.filas,))
+                    return cursor
+            return ejecutar
+    else:
+        filas = _filas_sinteticas(args.filas)
+
+        def escenario(diccionarios: bool):
+            return lambda: _CursorSintetico(filas, diccionarios)
+
+    try:
+        for _ in range(args.repeticiones):
+            antes = _medir("RealDictCursor + dataclass", escenario(True), _mapear_dicts)
+            despues = _medir("tuplas + MapeadorFilas + slots", escenario(False), _MAPEADOR_ALIMENTO.mapear)
+            for r in (antes, despues):
+                print(f"{r['nombre']:>32}: {r['ms']:8.1f} ms | pico {r['pico_mb']:7.1f} MB | "
+                      f"retenida {r['retenida_mb']:7.1f} MB ({r['filas']} filas)")
+            print(f"{'mejora':>32}: {antes['ms'] / despues['ms']:.2f}x tiempo, "
+                  f"{antes['pico_mb'] / despues['pico_mb']:.2f}x pico, "
+                  f"{antes['retenida_mb'] / despues['retenida_mb']:.2f}x retenida\n")
+    finally:
+        if connection_manager is not None:
+            connection_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# benchmarks/saldo_concurrencia.py
+"""
+Prueba de carga de los débitos de saldo: muchos cobros simultáneos contra un
+mismo estudiante. Cada débito corre en su propio hilo y todos se liberan a la
+vez con una barrera, como mil cajas cobrando en el mismo instante.
+
+Compara el patrón anterior (leer el saldo, restar en Python y escribir el
+resultado con un UPDATE directo, que la aplicación ya no tiene) con
+SaldoRepository.aplicar (un único UPDATE condicional que además
+registra el movimiento). Con el primero se pierden actualizaciones; con el
+segundo el saldo final debe ser exacto, nunca negativo, y cuadrar con el libro.
+
+Usa un pool propio con tantas conexiones como débitos, hasta lo que permita
+max_connections del servidor; el resto de hilos espera turno en el pool.
+Crea un estudiante de prueba, lo usa y lo borra junto con sus movimientos, así
+que puede ejecutarse contra cualquier base de pruebas con el esquema migrado.
+Sale con código 1 si el resultado de SaldoRepository no es exacto.
+
+Uso (desde la carpeta app/):
+
+    python -m benchmarks.saldo_concurrencia --debitos 1000 --monto 100 --saldo 60000
+"""
+
+import argparse
+import sys
+import threading
+import time
+from decimal import Decimal
+
+from domain.exceptions.exceptions import SaldoInsuficienteError
+from domain.models.movimiento_saldo import MovimientoSaldo, TipoMovimiento, TitularSaldo
+from infrastructure.database.postgresql_estudiante_repository import PostgresqlEstudianteRepository
+from infrastructure.database.postgresql_movimiento_saldo_repository import PostgresqlMovimientoSaldoRepository
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
+from infrastructure.database.row_mapper import cursor_tuplas
+
+
+def _ejecutar(connection_manager, sql: str, parametros=()):
+    with connection_manager.get_connection() as conn:
+        with cursor_tuplas(conn) as cursor:
+            cursor.execute(sql, parametros)
+            fila = cursor.fetchone() if cursor.description else None
+        conn.commit()
+    return fila
+
+
+# Conexiones del servidor que se dejan libres para otros clientes y para la limpieza
+_CONEXIONES_RESERVADAS = 10
+
+
+def _en_paralelo(funcion, debitos: int):
+    """Un hilo por débito; la barrera los suelta todos juntos."""
+    resultados = [False] * debitos
+    barrera = threading.Barrier(debitos + 1)
+
+    def hilo(posicion: int) -> None:
+        barrera.wait()
+        resultados[posicion] = funcion()
+
+    hilos = [threading.Thread(target=hilo, args=(i,), daemon=True) for i in range(debitos)]
+    for h in hilos:
+        h.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for h in hilos:
+        h.join()
+    return resultados, (time.perf_counter() - inicio) * 1000
+
+
+def _conexiones_disponibles(conexiones_pedidas: int) -> int:
+    conn = PostgresqlConnectionManager(pool_min_size=0, pool_max_size=1)
+    conn.open()
+    try:
+        maximo = int(_ejecutar(conn, "SHOW max_connections")[0])
+        en_uso = _ejecutar(conn, "SELECT COUNT(*) FROM pg_stat_activity")[0]
+    finally:
+        conn.close()
+    return max(1, min(conexiones_pedidas, maximo - en_uso - _CONEXIONES_RESERVADAS))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Débitos concurrentes contra un mismo saldo")
+    parser.add_argument("--debitos", type=int, default=1000)
+    parser.add_argument("--monto", type=Decimal, default=Decimal("100"))
+    parser.add_argument("--saldo", type=Decimal, default=Decimal("60000"),
+                        help="saldo inicial; menor que debitos * monto para forzar rechazos")
+    parser.add_argument("--conexiones", type=int, default=None,
+                        help="tamaño del pool; por defecto uno por débito, hasta max_connections")
+    args = parser.parse_args()
+
+    conexiones = _conexiones_disponibles(args.conexiones or args.debitos)
+    # Ningún débito debe fallar por esperar el pool: todos los hilos caben en la cola
+    connection_manager = PostgresqlConnectionManager(
+        pool_min_size=conexiones, pool_max_size=conexiones,
+        pool_timeout=120, pool_max_waiting=args.debitos
+    )
+    connection_manager.open()
+    estudiante_repo = PostgresqlEstudianteRepository(connection_manager)
+    saldo_repo = PostgresqlSaldoRepository(connection_manager)
+    libro = PostgresqlMovimientoSaldoRepository(connection_manager)
+
+    estudiante_id = _ejecutar(
+        connection_manager,
+        "INSERT INTO estudiantes (nombre, saldo, cedula) VALUES ('BENCHMARK CONCURRENCIA', 0, %s) RETURNING id",
+        (f"bench{time.time_ns() % 10**12}",)
+    )[0]
+    try:
+        # Patrón anterior: lectura, resta en memoria y escritura del valor calculado
+        def debito_leer_escribir():
+            estudiante = estudiante_repo.obtener_por_id(estudiante_id)
+            if estudiante.saldo < args.monto:
+                return False
+            _ejecutar(connection_manager, "UPDATE estudiantes SET saldo = %s WHERE id = %s",
+                      (estudiante.saldo - args.monto, estudiante_id))
+            return True
+
+        _ejecutar(connection_manager, "UPDATE estudiantes SET saldo = %s WHERE id = %s", (args.saldo, estudiante_id))
+        resultados, ms_anterior = _en_paralelo(debito_leer_escribir, args.debitos)
+        final_anterior = estudiante_repo.obtener_por_id(estudiante_id).saldo
+        cobrados_anterior = sum(resultados)
+
+        # SaldoRepository: el saldo de partida entra como movimiento para que el libro cuadre
+        _ejecutar(connection_manager, "UPDATE estudiantes SET saldo = 0 WHERE id = %s", (estudiante_id,))
+        saldo_repo.aplicar(MovimientoSaldo.credito(
+            TitularSaldo.ESTUDIANTE, estudiante_id, TipoMovimiento.APERTURA, args.saldo, "benchmark"
+        ))
+
+        def debito_atomico():
+            try:
+                saldo_repo.aplicar(MovimientoSaldo.debito(
+                    TitularSaldo.ESTUDIANTE, estudiante_id, TipoMovimiento.COMPRA, args.monto, "benchmark"
+                ))
+                return True
+            except SaldoInsuficienteError:
+                return False
+
+        resultados, ms_atomico = _en_paralelo(debito_atomico, args.debitos)
+        final_atomico = estudiante_repo.obtener_por_id(estudiante_id).saldo
+        cobrados_atomico = sum(resultados)
+        saldo_libro = libro.saldo(TitularSaldo.ESTUDIANTE, estudiante_id)
+        movimientos = _ejecutar(
+            connection_manager,
+            "SELECT COUNT(*) FROM movimientos_saldo WHERE titular_tipo = 'estudiante' AND titular_id = %s AND tipo = 'compra'",
+            (estudiante_id,)
+        )[0]
+    finally:
+        _ejecutar(connection_manager, "DELETE FROM saldos_snapshot WHERE titular_tipo = 'estudiante' AND titular_id = %s", (estudiante_id,))
+        _ejecutar(connection_manager, "DELETE FROM movimientos_saldo WHERE titular_tipo = 'estudiante' AND titular_id = %s", (estudiante_id,))
+        _ejecutar(connection_manager, "DELETE FROM estudiantes WHERE id = %s", (estudiante_id,))
+        connection_manager.close()
+
+    esperados = min(args.debitos, int(args.saldo // args.monto))
+    esperado_final = args.saldo - esperados * args.monto
+    print(f"{args.debitos} débitos simultáneos de {args.monto} ({args.debitos} hilos, {conexiones} conexiones) "
+          f"sobre un saldo de {args.saldo}")
+    print(f"{'':>16} | {'cobrados':>8} | {'saldo final':>11} | {'esperado':>9} | {'ms':>8}")
+    print(f"{'leer y escribir':>16} | {cobrados_anterior:8} | {final_anterior:11} | {esperado_final:9} | {ms_anterior:8.0f}")
+    print(f"{'SaldoRepository':>16} | {cobrados_atomico:8} | {final_atomico:11} | {esperado_final:9} | {ms_atomico:8.0f}")
+    perdido = cobrados_anterior * args.monto - (args.saldo - final_anterior)
+    if perdido:
+        print(f"⚠️ leer y escribir: {perdido} cobrados pero no descontados (actualizaciones perdidas)")
+
+    errores = []
+    if cobrados_atomico != esperados:
+        errores.append(f"se cobraron {cobrados_atomico} débitos, se esperaban {esperados}")
+    if final_atomico != esperado_final:
+        errores.append(f"saldo final {final_atomico}, se esperaba {esperado_final}")
+    if movimientos != cobrados_atomico:
+        errores.append(f"{movimientos} movimientos en el libro para {cobrados_atomico} cobros")
+    if saldo_libro != final_atomico:
+        errores.append(f"el libro dice {saldo_libro} y la columna saldo {final_atomico}")
+    for error in errores:
+        print(f"❌ {error}")
+    if not errores:
+        print("✅ SaldoRepository: saldo exacto, sin negativos y cuadrado con el libro")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
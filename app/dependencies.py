@@ -1,31 +1,34 @@
 # dependencies.py
 import os
 from dotenv import load_dotenv
-from infrastructure.database.postgresql_repository import PostgresqlConnectionManager, PostgresqlUsuarioRepository
+from infrastructure.database.postgresql_repository import get_connection_manager, PostgresqlUsuarioRepository
 from infrastructure.database.postgresql_alimento_repository import PostgresqlAlimentoRepository
+from infrastructure.cache.cache_catalogo import cache_catalogo
+from infrastructure.busqueda.indice_alimentos import indice_alimentos
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
 from infrastructure.security.password_hasher import PasswordHasher
 from domain.services.autenticacion_service import AutenticacionService
 from domain.services.alimento_service import AlimentoService
 
 load_dotenv()
 
-# Configurar el connection manager usando variables de entorno
-connection_manager = PostgresqlConnectionManager(
-    db_name=os.getenv("DB_NAME", "foodcash_db"),
-    db_user=os.getenv("DB_USER", "postgres"),
-    db_password=os.getenv("DB_PASSWORD", "postgres"),
-    db_host=os.getenv("DB_HOST", "localhost"),
-    db_port=os.getenv("DB_PORT", "5432")
-)
+# Gestor de conexiones compartido (el mismo pool que usa el resto de la aplicación)
+connection_manager = get_connection_manager()
 
 # Configurar repositorios y servicios para usuarios (si se necesitan)
 usuario_repository = PostgresqlUsuarioRepository(connection_manager)
 password_hasher = PasswordHasher()
-autenticacion_service = AutenticacionService(usuario_repository, password_hasher)
+autenticacion_service = AutenticacionService(
+    usuario_repository, password_hasher, PostgresqlSaldoRepository(connection_manager)
+)
 
 # Configurar repositorio y servicio de alimentos
 alimento_repository = PostgresqlAlimentoRepository(connection_manager)
-alimento_service = AlimentoService(alimento_repository)
+# Búsqueda en memoria por defecto; con catálogos muy grandes puede pasarse a pg_trgm (migración 0009)
+BUSQUEDA_ALIMENTOS_EN_BD = os.getenv("BUSQUEDA_ALIMENTOS_EN_BD", "false").lower() in ("1", "true", "yes")
+alimento_service = AlimentoService(
+    alimento_repository, cache_catalogo, None if BUSQUEDA_ALIMENTOS_EN_BD else indice_alimentos
+)
 
 
 def get_alimento_service():
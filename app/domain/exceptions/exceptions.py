@@ -19,6 +19,31 @@ class ProductoNoEncontradoError(Exception):
     """Excepción que se lanza cuando no se encuentra un producto"""
     pass
 
+class StockInsuficienteError(CompraError):
+    """Excepción que se lanza cuando una compra dejaría el stock de algún producto en negativo"""
+    def __init__(self, productos_ids):
+        self.productos_ids = list(productos_ids)
+        super().__init__(f"Stock insuficiente para los productos: {', '.join(map(str, self.productos_ids))}")
+
+class CompraDuplicadaError(CompraError):
+    """Excepción que se lanza cuando ya existe una compra con la misma clave de idempotencia"""
+    pass
+
+class SaldoInsuficienteError(CompraError, ValueError):
+    """
+    Excepción que se lanza cuando un débito dejaría el saldo en negativo.
+    También es ValueError: los endpoints de descarga ya responden 400 con ella.
+    """
+    pass
+
+class LineasCompraInvalidasError(CompraError):
+    """Excepción que se lanza cuando una o más líneas del carrito no se pueden vender"""
+    def __init__(self, errores):
+        # errores: [{"linea": n (desde 1), "producto_id": id, "error": motivo}, ...]
+        self.errores = list(errores)
+        detalle = "; ".join(f"línea {e['linea']} (producto {e['producto_id']}): {e['error']}" for e in self.errores)
+        super().__init__(f"La compra tiene líneas inválidas: {detalle}")
+
 
 
 class DomainException(Exception):
@@ -68,4 +93,16 @@ class RepositoryError(DomainException):
 
 class ServiceError(DomainException):
     """Excepción para errores en servicios de dominio"""
-    pass
\ No newline at end of file
+    pass
+
+class CapacidadAgotadaError(RepositoryError):
+    """Excepción base cuando la base de datos no puede atender la petición a tiempo"""
+    pass
+
+class TiempoAgotadoError(CapacidadAgotadaError):
+    """Excepción lanzada cuando una consulta supera el plazo asignado a la petición"""
+    pass
+
+class CursorPaginacionInvalidoError(ValidationError):
+    """Excepción lanzada cuando un cursor de paginación no se puede decodificar"""
+    pass
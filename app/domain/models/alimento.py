@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Alimento:
     """Entidad de dominio para Alimento."""
     id: Optional[int]  # id autoincrementable
@@ -15,6 +15,8 @@ class Alimento:
     fecha_creacion: datetime
     fecha_actualizacion: Optional[datetime] = None
     activo: bool = True
+    # Versión del catálogo en la que se escribió por última vez; la asigna la base de datos
+    version: int = 0
 
     @classmethod
     def crear(cls, nombre: str, precio: float, cantidad_en_stock: int, 
@@ -29,6 +31,7 @@ class Alimento:
         if not nombre or not categoria:
             raise ValueError("El nombre y la categoría son obligatorios")
             
+        ahora = datetime.now()
         return cls(
             id=None,  # Se asignará al guardar en la BD
             nombre=nombre,
@@ -37,7 +40,8 @@ class Alimento:
             calorias=calorias,
             imagen=imagen,
             categoria=categoria,
-            fecha_creacion=datetime.now()
+            fecha_creacion=ahora,
+            fecha_actualizacion=ahora  # la columna es NOT NULL
         )
     
     def actualizar(self, nombre: Optional[str] = None, precio: Optional[float] = None,
@@ -0,0 +1,70 @@
+# domain/models/catalogo.py
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+from domain.models.alimento import Alimento
+
+@dataclass(frozen=True)
+class Catalogo:
+    """
+    Alimentos activos con vistas por id, categoría y nombre, para resolver en
+    memoria las mismas consultas que el repositorio. Las entidades son
+    compartidas entre peticiones: quien necesite modificarlas debe leerlas
+    del repositorio.
+
+    `version` es la versión del catálogo en la base de datos al leerlo: cambia
+    con cada alta, cambio, baja o movimiento de stock.
+    """
+    alimentos: List[Alimento]
+    version: int = 0
+    por_id: Dict[int, Alimento] = field(default_factory=dict)
+    por_categoria: Dict[str, List[Alimento]] = field(default_factory=dict)
+    por_nombre: Dict[str, Alimento] = field(default_factory=dict)
+
+    @classmethod
+    def desde_alimentos(cls, alimentos: List[Alimento], version: int = 0) -> "Catalogo":
+        activos = sorted((a for a in alimentos if a.activo), key=lambda a: a.id)
+        por_categoria: Dict[str, List[Alimento]] = {}
+        for alimento in activos:
+            por_categoria.setdefault(alimento.categoria, []).append(alimento)
+        return cls(
+            alimentos=activos,
+            version=version,
+            por_id={a.id: a for a in activos},
+            por_categoria=por_categoria,
+            por_nombre={a.nombre.lower(): a for a in activos},
+        )
+
+    def buscar_por_id(self, alimento_id: int) -> Optional[Alimento]:
+        return self.por_id.get(alimento_id)
+
+    def buscar_por_nombre(self, nombre: str) -> Optional[Alimento]:
+        return self.por_nombre.get(nombre.lower())
+
+    def filtrar(self, nombre: Optional[str] = None, categoria: Optional[str] = None) -> List[Alimento]:
+        """Equivalente a `categoria = x AND nombre ILIKE '%y%'` sobre los activos."""
+        alimentos = self.por_categoria.get(categoria, []) if categoria else self.alimentos
+        if nombre:
+            buscado = nombre.lower()
+            alimentos = [a for a in alimentos if buscado in a.nombre.lower()]
+        return list(alimentos)
+
+
+@dataclass(frozen=True)
+class CambiosCatalogo:
+    """
+    Alimentos que cambiaron después de una versión del catálogo, en orden de
+    versión. Incluye los dados de baja (activo = False) para que el cliente
+    los quite. `version` es hasta dónde llega la respuesta: el próximo
+    `since`. Con `hay_mas` quedan cambios por pedir desde esa versión; con
+    `reiniciar` la respuesta empieza desde cero y el cliente debe descartar
+    su copia.
+    """
+    version: int
+    alimentos: List[Alimento]
+    hay_mas: bool = False
+    reiniciar: bool = False
+
+    def desde_cero(self) -> "CambiosCatalogo":
+        return replace(self, reiniciar=True)
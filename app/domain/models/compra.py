@@ -8,6 +8,9 @@ class CompraItem:
     cantidad: int
     precio_unitario: float
     subtotal: float = field(init=False)
+    # Datos del alimento al momento de la venta; el recibo los muestra siempre iguales
+    nombre_alimento: Optional[str] = None
+    calorias: Optional[int] = None
 
     def __post_init__(self):
         self.subtotal = self.cantidad * self.precio_unitario
@@ -19,6 +22,8 @@ class Compra:
     fecha: datetime = field(default_factory=datetime.now)
     total: float = 0
     id: Optional[int] = None
+    # Clave de idempotencia del POS (Idempotency-Key o venta sin conexión)
+    clave_idempotencia: Optional[str] = None
 
     def calcular_total(self):
         self.total = sum(item.subtotal for item in self.items)
@@ -0,0 +1,51 @@
+# domain/models/movimiento_saldo.py
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Optional
+
+class TitularSaldo(str, Enum):
+    ESTUDIANTE = "estudiante"
+    USUARIO = "usuario"
+
+class TipoMovimiento(str, Enum):
+    APERTURA = "apertura"
+    RECARGA = "recarga"
+    COMPRA = "compra"
+    PRECOMPRA = "precompra"
+    DESCARGA = "descarga"
+    REEMBOLSO = "reembolso"
+    AJUSTE = "ajuste"
+
+@dataclass(slots=True)
+class MovimientoSaldo:
+    """
+    Entrada del libro de saldos. El monto lleva signo: positivo acredita y
+    negativo debita. Los movimientos no se modifican ni se borran; una
+    corrección es otro movimiento (reembolso o ajuste).
+    """
+    titular_tipo: TitularSaldo
+    titular_id: int
+    tipo: TipoMovimiento
+    monto: Decimal
+    referencia: Optional[str] = None
+    fecha: datetime = field(default_factory=datetime.now)
+    id: Optional[int] = None
+
+    @staticmethod
+    def credito(titular_tipo: TitularSaldo, titular_id: int, tipo: TipoMovimiento,
+                monto, referencia: Optional[str] = None) -> "MovimientoSaldo":
+        return MovimientoSaldo(titular_tipo, int(titular_id), tipo, abs(Decimal(str(monto))), referencia)
+
+    @staticmethod
+    def debito(titular_tipo: TitularSaldo, titular_id: int, tipo: TipoMovimiento,
+               monto, referencia: Optional[str] = None) -> "MovimientoSaldo":
+        return MovimientoSaldo(titular_tipo, int(titular_id), tipo, -abs(Decimal(str(monto))), referencia)
+
+@dataclass(slots=True)
+class LineaEstadoCuenta:
+    """Movimiento con el saldo que dejó, para estados de cuenta."""
+    movimiento: MovimientoSaldo
+    saldo: Decimal
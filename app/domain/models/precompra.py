@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Precompra:
     # ===============================================================
     # PASO 1: Todos los campos OBLIGATORIOS se declaran primero.
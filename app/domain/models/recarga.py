@@ -11,7 +11,7 @@ class EstadoRecarga(Enum):
     RECHAZADA = "RECHAZADA"
     CANCELADA = "CANCELADA"
 
-@dataclass
+@dataclass(slots=True)
 class Recarga:
     """
     Entidad de dominio que representa una recarga de saldo
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 from domain.models.alimentoBloqueado import AlimentoBloqueado
 
 class AlimentoBloqueadoRepository(ABC):
@@ -30,3 +30,10 @@ class AlimentoBloqueadoRepository(ABC):
         Verifica si ya existe un bloqueo para el estudiante y alimento específico.
         """
         pass
+
+    @abstractmethod
+    def obtener_bloqueos_por_estudiantes(self, ids_estudiantes: List[int]) -> Dict[int, Set[int]]:
+        """
+        Obtiene los alimentos bloqueados de varios estudiantes: {id_estudiante: {id_alimento, ...}}.
+        """
+        pass
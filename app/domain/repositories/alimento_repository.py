@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
 from domain.models.alimento import Alimento
+from domain.models.catalogo import CambiosCatalogo, Catalogo
 
 class AlimentoRepository(ABC):
     """Interfaz de repositorio para gestionar Alimentos."""
@@ -9,6 +10,21 @@ class AlimentoRepository(ABC):
     def listar_alimentos(self, filtros: Optional[Dict[str, Any]] = None) -> List[Alimento]:
         pass
 
+    @abstractmethod
+    def listar_catalogo(self) -> Catalogo:
+        """Todos los alimentos activos con la versión del catálogo; fuente de la caché del catálogo."""
+        pass
+
+    @abstractmethod
+    def listar_cambios(self, desde_version: int, limite: int) -> CambiosCatalogo:
+        """Hasta `limite` alimentos (activos o no) con versión mayor que `desde_version`."""
+        pass
+
+    @abstractmethod
+    def buscar_similares(self, consulta: str, limite: int) -> List[Alimento]:
+        """Alimentos activos cuyo nombre o categoría se parece a la consulta, del más al menos parecido."""
+        pass
+
     @abstractmethod
     def buscar_por_id(self, alimento_id: int) -> Optional[Alimento]:
         pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, List, Optional
 from domain.models.compra import Compra
 
 class CompraRepository(ABC):
@@ -7,6 +7,16 @@ class CompraRepository(ABC):
     def guardar_compra(self, compra: Compra) -> Compra:
         pass
 
+    @abstractmethod
+    def guardar_compras(self, compras: List[Compra]) -> List[Compra]:
+        """Guarda un lote de compras en una sola transacción."""
+        pass
+
+    @abstractmethod
+    def buscar_ids_por_claves(self, claves: List[str]) -> Dict[str, int]:
+        """Ids de las compras ya registradas con esas claves de idempotencia."""
+        pass
+
     @abstractmethod
     def obtener_compra_por_id(self, compra_id: int) -> Optional[Compra]:
         pass
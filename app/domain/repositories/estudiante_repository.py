@@ -1,7 +1,7 @@
 # domain/repositories/estudiante_repository.py
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from domain.models.estudiante import Estudiante
 
 class EstudianteRepository(ABC):
@@ -10,9 +10,19 @@ class EstudianteRepository(ABC):
         pass
 
     @abstractmethod
-    def guardar(self, estudiante: Estudiante) -> Estudiante:
+    def bloquear_para_cobro(self, estudiante_id: int) -> Optional[Estudiante]:
+        """
+        Obtiene el estudiante bloqueando su fila hasta el final de la transacción.
+        """
+        pass
+
+    @abstractmethod
+    def bloquear_varios_para_cobro(self, estudiante_ids: List[int]) -> Dict[int, Estudiante]:
+        """
+        Obtiene varios estudiantes bloqueando sus filas hasta el final de la transacción.
+        """
         pass
-    
+
     @abstractmethod
     def crear(self, estudiante: Estudiante) -> Estudiante:
         """Crea un nuevo estudiante en la base de datos"""
@@ -28,10 +38,3 @@ class EstudianteRepository(ABC):
         Busca y retorna un estudiante por su cédula.
         """
         pass
-
-    @abstractmethod
-    def actualizar_saldo(self, estudiante_id: int, nuevo_saldo: float) -> Optional[Estudiante]:
-        """
-        Actualiza el saldo de un estudiante y retorna el estudiante actualizado.
-        """
-        pass
\ No newline at end of file
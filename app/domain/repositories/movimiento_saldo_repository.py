@@ -0,0 +1,23 @@
+# domain/repositories/movimiento_saldo_repository.py
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from domain.models.movimiento_saldo import LineaEstadoCuenta, TitularSaldo
+
+class MovimientoSaldoRepository(ABC):
+    """Lectura del libro. Los movimientos se escriben con SaldoRepository, junto con el saldo."""
+
+    @abstractmethod
+    def saldo(self, titular_tipo: TitularSaldo, titular_id: int) -> Decimal:
+        """Saldo según el libro: última foto más los movimientos posteriores."""
+        pass
+
+    @abstractmethod
+    def estado_de_cuenta(
+        self, titular_tipo: TitularSaldo, titular_id: int,
+        desde: Optional[datetime] = None, limite: int = 100
+    ) -> List[LineaEstadoCuenta]:
+        """Movimientos más recientes primero, cada uno con el saldo que dejó."""
+        pass
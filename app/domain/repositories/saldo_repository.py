@@ -0,0 +1,30 @@
+# domain/repositories/saldo_repository.py
+
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Dict, List
+from domain.models.movimiento_saldo import MovimientoSaldo
+
+class SaldoRepository(ABC):
+    """
+    Único punto de escritura de saldos. Cada operación es una sola sentencia
+    condicional que cambia el saldo y registra el movimiento en el libro, así
+    que dos cobros concurrentes no pueden pisarse ni dejar el saldo negativo.
+    """
+
+    @abstractmethod
+    def aplicar(self, movimiento: MovimientoSaldo) -> Decimal:
+        """
+        Aplica el movimiento y devuelve el saldo resultante.
+        Lanza UsuarioNoEncontradoError si el titular no existe y
+        SaldoInsuficienteError si un débito dejaría el saldo en negativo.
+        """
+        pass
+
+    @abstractmethod
+    def aplicar_varios(self, movimientos: List[MovimientoSaldo]) -> Dict[int, Decimal]:
+        """
+        Aplica varios movimientos de un mismo tipo de titular en una sola
+        sentencia; todos o ninguno. Devuelve el saldo final por titular.
+        """
+        pass
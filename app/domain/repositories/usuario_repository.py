@@ -30,14 +30,9 @@ class UsuarioRepository(ABC):
 
     @abstractmethod
     def actualizar(self, usuario: Usuario) -> None:
-        """Actualiza el registro de un usuario en el repositorio"""
+        """Actualiza nombre, contraseña y rol; el saldo solo cambia con movimientos del libro"""
         pass
 
-    @abstractmethod
-    def actualizar_saldo(self, nombre_usuario: str, nuevo_saldo: float) -> Optional[Usuario]:
-        """Actualiza el saldo de un usuario"""
-        pass
-    
     @abstractmethod
     def listar_por_rol(self, rol: str) -> List[Usuario]:
         """Lista todos los usuarios con un rol específico"""
@@ -1,18 +1,74 @@
 from typing import List, Optional, Dict, Any
 from domain.models.alimento import Alimento
+from domain.models.catalogo import CambiosCatalogo, Catalogo
 from domain.repositories.alimento_repository import AlimentoRepository
 from domain.exceptions.alimento_exceptions import AlimentoNoEncontradoError, AlimentoYaExisteError
 
 class AlimentoService:
     """Servicio de dominio para la lógica de negocio relacionada con Alimentos."""
     
-    def __init__(self, alimento_repository: AlimentoRepository):
+    def __init__(self, alimento_repository: AlimentoRepository, cache_catalogo=None, indice_busqueda=None):
         self.alimento_repository = alimento_repository
+        # CacheCatalogo opcional: las lecturas se resuelven en memoria y las
+        # escrituras del repositorio la invalidan al confirmarse
+        self.cache_catalogo = cache_catalogo
+        # IndiceBusquedaAlimentos opcional: sin él la búsqueda la resuelve la base (pg_trgm)
+        self.indice_busqueda = indice_busqueda
+
+    def catalogo(self) -> Catalogo:
+        """Catálogo de alimentos activos; sin caché configurada se lee completo cada vez."""
+        if self.cache_catalogo is None:
+            return self.alimento_repository.listar_catalogo()
+        return self.cache_catalogo.obtener(self.alimento_repository.listar_catalogo)
+    
+    def buscar_alimentos(self, consulta: str, limite: int = 20) -> List[Alimento]:
+        """
+        Alimentos activos ordenados por parecido con la consulta, sin importar
+        tildes ni mayúsculas: primero las palabras exactas, luego los prefijos
+        ("empa"), las subcadenas y por último los errores de tipeo ("empnada").
+        """
+        if limite <= 0:
+            raise ValueError("El límite debe ser mayor que 0")
+        if not consulta or not consulta.strip():
+            return []
+        if self.indice_busqueda is None:
+            return self.alimento_repository.buscar_similares(consulta, limite)
+        return self.indice_busqueda.buscar(self.catalogo(), consulta, limite)
+
+    def listar_cambios(self, desde_version: int, limite: int = 500) -> CambiosCatalogo:
+        """
+        Cambios del catálogo posteriores a `desde_version`, para clientes que
+        guardan el catálogo y lo actualizan por partes. Se responde desde la
+        base principal: solo si ella misma no llegó a `desde_version` (por
+        ejemplo, tras restaurarla) no puede continuarse, y se devuelve todo
+        desde el principio marcado con `reiniciar`.
+        """
+        if desde_version < 0:
+            raise ValueError("La versión no puede ser negativa")
+        if limite <= 0:
+            raise ValueError("El límite debe ser mayor que 0")
+        cambios = self.alimento_repository.listar_cambios(desde_version, limite)
+        if desde_version > cambios.version:
+            return self.alimento_repository.listar_cambios(0, limite).desde_cero()
+        return cambios
     
     def listar_alimentos(self, filtros: Optional[Dict[str, Any]] = None) -> List[Alimento]:
-        return self.alimento_repository.listar_alimentos(filtros)
+        if self.cache_catalogo is None:
+            return self.alimento_repository.listar_alimentos(filtros)
+        filtros = filtros or {}
+        return self.catalogo().filtrar(nombre=filtros.get("nombre"), categoria=filtros.get("categoria"))
     
     def obtener_alimento_por_id(self, alimento_id: int) -> Alimento:
+        if self.cache_catalogo is None:
+            alimento = self.alimento_repository.buscar_por_id(alimento_id)
+        else:
+            alimento = self.catalogo().buscar_por_id(alimento_id)
+        if not alimento:
+            raise AlimentoNoEncontradoError(f"No existe un alimento con el ID {alimento_id}")
+        return alimento
+
+    def _obtener_para_modificar(self, alimento_id: int) -> Alimento:
+        # Las entidades del catálogo en caché son compartidas: se modifica una copia leída de la base
         alimento = self.alimento_repository.buscar_por_id(alimento_id)
         if not alimento:
             raise AlimentoNoEncontradoError(f"No existe un alimento con el ID {alimento_id}")
@@ -38,7 +94,7 @@ class AlimentoService:
                             precio: Optional[float] = None, cantidad_en_stock: Optional[int] = None,
                             calorias: Optional[int] = None, imagen: Optional[str] = None, 
                             categoria: Optional[str] = None) -> Alimento:
-        alimento = self.obtener_alimento_por_id(alimento_id)
+        alimento = self._obtener_para_modificar(alimento_id)
 
         if nombre and nombre != alimento.nombre:
             alimento_existente = self.alimento_repository.buscar_por_nombre(nombre)
@@ -58,7 +114,7 @@ class AlimentoService:
 
     
     def eliminar_alimento(self, alimento_id: int) -> bool:
-        alimento = self.obtener_alimento_por_id(alimento_id)
+        alimento = self._obtener_para_modificar(alimento_id)
         resultado = self.alimento_repository.eliminar(alimento_id)
         if not resultado:
             raise AlimentoNoEncontradoError(f"No se pudo eliminar el alimento con ID {alimento_id}")
@@ -80,8 +136,8 @@ class AlimentoService:
             AlimentoNoEncontradoError: Si el alimento no existe
             ValueError: Si la cantidad es inválida o el stock es insuficiente
         """
-        # Obtener alimento usando el método existente para mantener consistencia
-        alimento = self.obtener_alimento_por_id(alimento_id)
+        # Se lee de la base, no del catálogo en caché: el objeto se modifica y se guarda
+        alimento = self._obtener_para_modificar(alimento_id)
         
         if cantidad <= 0:
             raise ValueError("La cantidad a disminuir debe ser mayor que 0")
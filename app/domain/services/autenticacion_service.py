@@ -1,7 +1,9 @@
 # domain/services/autenticacion_service.py
 
 from domain.models.usuario import Usuario
+from domain.models.movimiento_saldo import MovimientoSaldo, TipoMovimiento, TitularSaldo
 from domain.repositories.usuario_repository import UsuarioRepository
+from domain.repositories.saldo_repository import SaldoRepository
 from domain.exceptions.exceptions import UsuarioYaExisteError, CredencialesInvalidasError, UsuarioNoEncontradoError
 from infrastructure.security.password_hasher import PasswordHasher
 from infrastructure.utils.text_normalizer import TextNormalizer
@@ -11,9 +13,11 @@ from typing import List
 class AutenticacionService:
     """Servicio de dominio para gestionar la autenticación y usuarios"""
     
-    def __init__(self, usuario_repository: UsuarioRepository, password_hasher: PasswordHasher):
+    def __init__(self, usuario_repository: UsuarioRepository, password_hasher: PasswordHasher,
+                 saldo_repository: SaldoRepository):
         self.usuario_repository = usuario_repository
         self.password_hasher = password_hasher
+        self.saldo_repository = saldo_repository
         self.text_normalizer = TextNormalizer()
         
     def registrar_usuario(self, usuario: str, contrasena: str, nombre: str, rol: str) -> Usuario:
@@ -71,28 +75,28 @@ class AutenticacionService:
 
     def actualizar_saldo_usuario(self, nombre_usuario: str, recarga: float) -> Usuario:
         """Recarga el saldo de un usuario."""
+        if recarga <= 0:
+            raise ValueError("La cantidad a agregar debe ser positiva")
         usuario_actual = self.usuario_repository.buscar_por_nombre_usuario(nombre_usuario)
         if not usuario_actual:
             raise UsuarioNoEncontradoError("Usuario no encontrado")
 
-        usuario_actual.agregar_saldo(recarga)
-        
-        usuario_actualizado = self.usuario_repository.actualizar_saldo(nombre_usuario, usuario_actual.saldo)
-        if not usuario_actualizado:
-             raise RuntimeError("No se pudo actualizar el saldo.")
-             
-        return usuario_actualizado
+        # El saldo se suma en la base de datos, no sobre el valor leído
+        usuario_actual.saldo = float(self.saldo_repository.aplicar(MovimientoSaldo.credito(
+            TitularSaldo.USUARIO, usuario_actual.id, TipoMovimiento.RECARGA, recarga
+        )))
+        return usuario_actual
     
     def descargar_saldo_usuario(self, nombre_usuario: str, descarga: float) -> Usuario:
         """Descarga saldo de un usuario."""
+        if descarga <= 0:
+            raise ValueError("La cantidad a descargar debe ser positiva")
         usuario_actual = self.usuario_repository.buscar_por_nombre_usuario(nombre_usuario)
         if not usuario_actual:
             raise UsuarioNoEncontradoError("Usuario no encontrado")
 
-        usuario_actual.descargar_saldo(descarga)
-
-        usuario_actualizado = self.usuario_repository.actualizar_saldo(nombre_usuario, usuario_actual.saldo)
-        if not usuario_actualizado:
-             raise RuntimeError("No se pudo actualizar el saldo.")
-
-        return usuario_actualizado
\ No newline at end of file
+        # Débito condicional: con saldo insuficiente lanza SaldoInsuficienteError (un ValueError)
+        usuario_actual.saldo = float(self.saldo_repository.aplicar(MovimientoSaldo.debito(
+            TitularSaldo.USUARIO, usuario_actual.id, TipoMovimiento.DESCARGA, descarga
+        )))
+        return usuario_actual
\ No newline at end of file
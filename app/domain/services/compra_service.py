@@ -1,36 +1,65 @@
+import csv
+import io
+import json
+import logging
 from datetime import datetime
-from typing import List, Optional,Union
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Collection, Dict, Iterator, List, Optional, Tuple, Union
+from domain.models.alimento import Alimento
 from domain.models.compra import Compra, CompraItem
-from application.dto.compra_dto import CompraInputDTO, CompraOutputDTO, CompraItemDTO
+from application.dto.compra_dto import (
+    CompraInputDTO, CompraOutputDTO, CompraItemDTO, PaginaComprasDTO,
+    codificar_cursor_compra, decodificar_cursor_compra
+)
 from domain.repositories.compra_repository import CompraRepository
-from domain.exceptions.exceptions import UsuarioNoEncontradoError, ProductoNoEncontradoError
+from infrastructure.cache.cache_recibos import ReciboCacheado
+from domain.exceptions.exceptions import (
+    UsuarioNoEncontradoError, ProductoNoEncontradoError, CursorPaginacionInvalidoError, CompraError,
+    LineasCompraInvalidasError
+)
+
+logger = logging.getLogger(__name__)
+
+# Columnas de la exportación: una fila por item vendido
+COLUMNAS_EXPORTACION = (
+    "compra_id", "fecha", "usuario_id", "total_compra", "producto_id",
+    "nombre_alimento", "categoria", "cantidad", "precio_unitario", "subtotal",
+)
+FORMATOS_EXPORTACION = ("csv", "ndjson")
+
+
+def _dinero(valor) -> float:
+    """Como NUMERIC(12, 2): el recibo armado al guardar es igual al leído después de la base."""
+    return float(Decimal(str(valor)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def _valor_exportable(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
 
 class CompraService:
     def __init__(
         self,
         compra_repository: CompraRepository,
         usuario_repository,
-        producto_repository
+        producto_repository,
+        cache_recibos=None
     ):
         self.compra_repository = compra_repository
         self.usuario_repository = usuario_repository
         self.producto_repository = producto_repository
+        # CacheRecibos opcional: las compras no cambian, sus recibos se sirven desde memoria
+        self.cache_recibos = cache_recibos
 
     def guardar_compra(self, datos: CompraInputDTO) -> CompraOutputDTO:
         if not self.usuario_repository.buscar_por_id(datos.usuario_id):
             raise UsuarioNoEncontradoError(f"Usuario {datos.usuario_id} no existe.")
 
-        items_compra: List[CompraItem] = []
-        for item_dto in datos.items:
-            if not self.producto_repository.obtener_producto_por_id(item_dto.producto_id):
-                raise ProductoNoEncontradoError(f"Producto {item_dto.producto_id} no existe.")
-            items_compra.append(
-                CompraItem(
-                    producto_id=item_dto.producto_id,
-                    cantidad=item_dto.cantidad,
-                    precio_unitario=item_dto.precio_unitario,
-                )
-            )
+        items_compra, productos = self.validar_items(datos.items)
 
         compra = Compra(
             usuario_id=datos.usuario_id,
@@ -39,13 +68,97 @@ class CompraService:
         )
         compra.calcular_total()
         compra_guardada = self.compra_repository.guardar_compra(compra)
-        return self._to_dto(compra_guardada)
+        return self.recordar_compras([compra_guardada], productos)[0]
 
-    def obtener_compra_por_id(self, compra_id: int) -> Optional[CompraOutputDTO]:
+    def validar_items(self, items, bloqueados: Collection[int] = ()) -> Tuple[List[CompraItem], Dict[int, Alimento]]:
+        """
+        Valida todo el carrito con una sola consulta de productos y reporta
+        todas las líneas con problemas a la vez. El precio unitario se toma del
+        catálogo, no del cliente: una caja con el catálogo desactualizado no
+        puede registrar precios viejos.
+
+        `items` son objetos con producto_id, cantidad y, opcionalmente,
+        precio_unitario; `bloqueados` son los alimentos que el estudiante no
+        puede comprar. Devuelve las líneas listas para guardar y los productos leídos.
+        """
+        if not items:
+            raise CompraError("La compra no tiene productos.")
+
+        productos = self.producto_repository.obtener_productos_por_ids(item.producto_id for item in items)
+
+        pedidas: Dict[int, int] = {}
+        for item in items:
+            pedidas[item.producto_id] = pedidas.get(item.producto_id, 0) + item.cantidad
+
+        errores = []
+        items_compra: List[CompraItem] = []
+        for linea, item in enumerate(items, start=1):
+            producto = productos.get(item.producto_id)
+            if item.cantidad <= 0:
+                error = "la cantidad debe ser mayor que cero"
+            elif producto is None:
+                error = "el producto no existe"
+            elif not producto.activo:
+                error = f"{producto.nombre} no está disponible"
+            elif item.producto_id in bloqueados:
+                error = f"{producto.nombre} está bloqueado para este estudiante"
+            elif pedidas[item.producto_id] > producto.cantidad_en_stock:
+                error = (f"stock insuficiente para {producto.nombre} "
+                         f"(pedido {pedidas[item.producto_id]}, disponible {producto.cantidad_en_stock})")
+            else:
+                error = None
+
+            if error:
+                errores.append({"linea": linea, "producto_id": item.producto_id, "error": error})
+                continue
+            precio_cliente = getattr(item, "precio_unitario", None)
+            if precio_cliente is not None and abs(precio_cliente - producto.precio) > 0.005:
+                logger.warning(f"⚠️ Precio de cliente desactualizado para el producto {producto.id}: "
+                               f"{precio_cliente} != {producto.precio}; se usa el del catálogo")
+            items_compra.append(
+                CompraItem(
+                    producto_id=item.producto_id,
+                    cantidad=item.cantidad,
+                    precio_unitario=producto.precio,
+                    nombre_alimento=producto.nombre,
+                    calorias=producto.calorias,
+                )
+            )
+
+        if errores:
+            raise LineasCompraInvalidasError(errores)
+        return items_compra, productos
+
+    def recordar_compras(self, compras: List[Compra], productos: Dict[int, Alimento]) -> List[CompraOutputDTO]:
+        """
+        Recibos completos de compras recién guardadas, armados con los productos
+        ya leídos al validar, y guardados en la caché (si hay) para la primera lectura.
+        """
+        recibos = [self._to_dto(compra, productos) for compra in compras]
+        if self.cache_recibos is not None:
+            for recibo in recibos:
+                self.cache_recibos.recordar(recibo)
+        return recibos
+
+    def obtener_recibo(self, compra_id: int) -> Optional[ReciboCacheado]:
+        """
+        Recibo de una compra con su cuerpo serializado y su ETag, o None si no existe. Sin caché configurada siempre va a la base de datos.
+        """
+        if self.cache_recibos is not None:
+            cacheado = self.cache_recibos.obtener(compra_id)
+            if cacheado is not None:
+                return cacheado
         compra_data = self.compra_repository.obtener_compra_por_id(compra_id)
         if not compra_data:
             return None
-        return self._to_dto(compra_data)
+        recibo = self._to_dto(compra_data)
+        if self.cache_recibos is None:
+            return ReciboCacheado.desde_dto(recibo)
+        return self.cache_recibos.recordar(recibo)
+
+    def obtener_compra_por_id(self, compra_id: int) -> Optional[CompraOutputDTO]:
+        cacheado = self.obtener_recibo(compra_id)
+        return cacheado.recibo if cacheado else None
 
     def obtener_compras_por_usuario_id(self, usuario_id: int) -> List[CompraOutputDTO]:
         if not self.usuario_repository.buscar_por_id(usuario_id):
@@ -59,26 +172,36 @@ class CompraService:
         lista_compras = self.compra_repository.obtener_ultimas_compras_por_usuario_id(usuario_id, limit)
         return [self._to_dto(c) for c in lista_compras]
 
-    def _to_dto(self, compra: Union[Compra, dict]) -> CompraOutputDTO:
+    def _to_dto(self, compra: Union[Compra, dict],
+                productos: Optional[Dict[int, Alimento]] = None) -> CompraOutputDTO:
         """
         Convierte un objeto Compra (modelo) o dict (desde repositorio) a CompraOutputDTO,
         asegurándose de incluir todos los campos, incluso nombre_alimento y calorías.
         """
-        # Si es instancia de Compra (modelo), creamos DTO básico sin nombre/calorías
+        # Si es instancia de Compra (modelo), nombre y calorías son los que se guardaron con cada item
         if isinstance(compra, Compra):
-            items_dto = [
-                CompraItemDTO(
-                    producto_id=item.producto_id,
-                    cantidad=item.cantidad,
-                    precio_unitario=item.precio_unitario
+            productos = productos or {}
+            items_dto = []
+            for item in compra.items:
+                producto = productos.get(item.producto_id)
+                nombre, calorias = item.nombre_alimento, item.calorias
+                if nombre is None and producto is not None:
+                    nombre, calorias = producto.nombre, producto.calorias
+                items_dto.append(
+                    CompraItemDTO(
+                        producto_id=item.producto_id,
+                        cantidad=item.cantidad,
+                        precio_unitario=_dinero(item.precio_unitario),
+                        nombre_alimento=nombre,
+                        # Igual que al leer de la base
+                        calorias=float(calorias) if calorias is not None else 0.0
+                    )
                 )
-                for item in compra.items
-            ]
             return CompraOutputDTO(
                 id=compra.id,
                 fecha=compra.fecha,
                 usuario_id=compra.usuario_id,
-                total=compra.total,
+                total=_dinero(compra.total),
                 items=items_dto
             )
 
@@ -90,7 +213,7 @@ class CompraService:
                 CompraItemDTO(
                     producto_id=item_dict["producto_id"],
                     cantidad=item_dict["cantidad"],
-                    precio_unitario=item_dict["precio_unitario"],
+                    precio_unitario=_dinero(item_dict["precio_unitario"]),
                     nombre_alimento=item_dict.get("nombre_alimento"),
                     calorias=item_dict.get("calorias")
                 )
@@ -99,11 +222,86 @@ class CompraService:
             id=compra_dict["id"],
             fecha=compra_dict["fecha"],
             usuario_id=compra_dict["usuario_id"],
-            total=compra_dict["total"],
+            total=_dinero(compra_dict["total"]),
             items=items_dto
         )
     
     def obtener_todas_las_compras(self) -> List[CompraOutputDTO]:
         """Obtiene todas las compras registradas en el sistema."""
         lista_compras = self.compra_repository.obtener_todas_las_compras()
-        return [self._to_dto(c) for c in lista_compras]
\ No newline at end of file
+        return [self._to_dto(c) for c in lista_compras]
+
+    def obtener_todas_las_compras_en_rango(self, desde: Optional[datetime] = None,
+                                           hasta: Optional[datetime] = None) -> List[CompraOutputDTO]:
+        """Todas las compras, sin paginar, dentro del rango de fechas dado."""
+        lista_compras = self.compra_repository.obtener_todas_las_compras(desde=desde, hasta=hasta)
+        return [self._to_dto(c) for c in lista_compras]
+
+    def obtener_pagina_compras(self,
+                               usuario_id: Optional[int] = None,
+                               limite: int = 50,
+                               after: Optional[str] = None,
+                               before: Optional[str] = None,
+                               desde: Optional[datetime] = None,
+                               hasta: Optional[datetime] = None) -> PaginaComprasDTO:
+        """
+        Página del historial de compras (de un usuario o de todo el sistema).
+        `after` y `before` son los cursores devueltos por una página anterior.
+        """
+        if after and before:
+            raise CursorPaginacionInvalidoError("Use solo uno de los cursores: after o before")
+        if usuario_id is not None and not self.usuario_repository.buscar_por_id(usuario_id):
+            raise UsuarioNoEncontradoError(f"Usuario {usuario_id} no existe.")
+
+        despues_de = decodificar_cursor_compra(after) if after else None
+        antes_de = decodificar_cursor_compra(before) if before else None
+        compras, hay_mas = self.compra_repository.obtener_pagina_compras(
+            usuario_id=usuario_id, limite=limite, despues_de=despues_de, antes_de=antes_de,
+            desde=desde, hasta=hasta
+        )
+
+        pagina = PaginaComprasDTO(compras=[self._to_dto(c) for c in compras])
+        if compras:
+            primera, ultima = compras[0], compras[-1]
+            # Hacia las más antiguas hay página si el repositorio lo indicó o si venimos de ellas
+            if hay_mas or before:
+                pagina.siguiente = codificar_cursor_compra(ultima["fecha"], ultima["id"])
+            if (hay_mas and before) or after:
+                pagina.anterior = codificar_cursor_compra(primera["fecha"], primera["id"])
+        return pagina
+
+    def exportar_compras(self,
+                         formato: str = "csv",
+                         desde: Optional[datetime] = None,
+                         hasta: Optional[datetime] = None,
+                         categoria: Optional[str] = None,
+                         tamano_lote: int = 1000) -> Iterator[str]:
+        """
+        Genera la exportación de ventas por trozos de texto, un trozo por lote
+        de filas, sin cargar el historial completo en memoria.
+        """
+        if formato not in FORMATOS_EXPORTACION:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        lotes = self.compra_repository.exportar_items_compras(
+            desde=desde, hasta=hasta, categoria=categoria, tamano_lote=tamano_lote
+        )
+        try:
+            if formato == "csv":
+                buffer = io.StringIO()
+                escritor = csv.writer(buffer)
+                escritor.writerow(COLUMNAS_EXPORTACION)
+                yield buffer.getvalue()
+                for lote in lotes:
+                    buffer.seek(0)
+                    buffer.truncate()
+                    escritor.writerows([_valor_exportable(v) for v in fila] for fila in lote)
+                    yield buffer.getvalue()
+            else:
+                for lote in lotes:
+                    yield "".join(
+                        json.dumps(dict(zip(COLUMNAS_EXPORTACION, map(_valor_exportable, fila))), ensure_ascii=False) + "\n"
+                        for fila in lote
+                    )
+        finally:
+            # Si el cliente corta la descarga, se libera el cursor y la conexión de inmediato
+            lotes.close()
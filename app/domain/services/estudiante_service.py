@@ -1,14 +1,17 @@
 # domain/services/estudiante_service.py
 
-from typing import List
+from typing import List, Optional
 from domain.models.estudiante import Estudiante
+from domain.models.movimiento_saldo import MovimientoSaldo, TipoMovimiento, TitularSaldo
 from domain.repositories.estudiante_repository import EstudianteRepository
+from domain.repositories.saldo_repository import SaldoRepository
 from domain.exceptions.exceptions import UsuarioNoEncontradoError
 from infrastructure.utils.text_normalizer import TextNormalizer
 
 class EstudianteService:
-    def __init__(self, estudiante_repository: EstudianteRepository):
+    def __init__(self, estudiante_repository: EstudianteRepository, saldo_repository: SaldoRepository):
         self.estudiante_repository = estudiante_repository
+        self.saldo_repository = saldo_repository
         self.text_normalizer = TextNormalizer()
     
     def crear_estudiante(
@@ -42,19 +45,32 @@ class EstudianteService:
             raise UsuarioNoEncontradoError(f"No se encontraron estudiantes asociados a {responsable}")
         return estudiantes
 
-    def actualizar_saldo_estudiante(self, estudiante_id: int, recarga: float) -> Estudiante:
+    def actualizar_saldo_estudiante(self, estudiante_id: int, recarga: float, referencia: Optional[str] = None) -> Estudiante:
+        if recarga <= 0:
+            raise ValueError("El monto de recarga debe ser mayor que cero")
         estudiante = self.estudiante_repository.obtener_por_id(estudiante_id)
         if not estudiante:
             raise UsuarioNoEncontradoError(f"Estudiante con ID {estudiante_id} no encontrado")
-        estudiante.recargar_saldo(recarga)
-        return self.estudiante_repository.guardar(estudiante)
+        # El saldo se suma en la base de datos, no sobre el valor leído
+        estudiante.saldo = self.saldo_repository.aplicar(MovimientoSaldo.credito(
+            TitularSaldo.ESTUDIANTE, estudiante_id, TipoMovimiento.RECARGA, recarga, referencia
+        ))
+        return estudiante
 
-    def descargar_saldo_estudiante(self, estudiante_id: int, descarga: float) -> Estudiante:
+    def descargar_saldo_estudiante(
+        self, estudiante_id: int, descarga: float,
+        tipo: TipoMovimiento = TipoMovimiento.DESCARGA, referencia: Optional[str] = None
+    ) -> Estudiante:
+        if descarga <= 0:
+            raise ValueError("El monto de descarga debe ser mayor que cero")
         estudiante = self.estudiante_repository.obtener_por_id(estudiante_id)
         if not estudiante:
             raise UsuarioNoEncontradoError(f"Estudiante con ID {estudiante_id} no encontrado")
-        estudiante.descargar_saldo(descarga)
-        return self.estudiante_repository.guardar(estudiante)
+        # Débito condicional: con saldo insuficiente lanza SaldoInsuficienteError (un ValueError)
+        estudiante.saldo = self.saldo_repository.aplicar(MovimientoSaldo.debito(
+            TitularSaldo.ESTUDIANTE, estudiante_id, tipo, descarga, referencia
+        ))
+        return estudiante
 
     def buscar_por_cedula(self, cedula: str) -> Estudiante:
         estudiante = self.estudiante_repository.buscar_por_cedula(cedula)
@@ -0,0 +1,224 @@
+# domain/services/pos_service.py
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from application.dto.pos_dto import (
+    CheckoutItemDTO, ReciboDTO, ReciboItemDTO, VentaOfflineDTO, ResultadoVentaDTO, SincronizacionDTO
+)
+from domain.models.alimento import Alimento
+from domain.models.compra import Compra, CompraItem
+from domain.models.movimiento_saldo import MovimientoSaldo, TipoMovimiento, TitularSaldo
+from domain.repositories.alimentoBloqueado_repository import AlimentoBloqueadoRepository
+from domain.repositories.compra_repository import CompraRepository
+from domain.repositories.estudiante_repository import EstudianteRepository
+from domain.repositories.saldo_repository import SaldoRepository
+from domain.services.compra_service import CompraService
+from domain.services.producto_service import ProductoRepository
+from domain.exceptions.exceptions import UsuarioNoEncontradoError, SaldoInsuficienteError
+
+
+class PosService:
+    """
+    Venta del punto de venta en una sola transacción: cobro al estudiante y
+    registro de la compra se confirman juntos o no se confirma ninguno.
+
+    Los repositorios deben compartir la unidad de trabajo de la petición.
+    """
+
+    def __init__(
+        self,
+        estudiante_repository: EstudianteRepository,
+        alimento_bloqueado_repository: AlimentoBloqueadoRepository,
+        compra_repository: CompraRepository,
+        producto_repository: ProductoRepository,
+        compra_service: CompraService,
+        saldo_repository: SaldoRepository
+    ):
+        self.estudiante_repository = estudiante_repository
+        self.alimento_bloqueado_repository = alimento_bloqueado_repository
+        self.compra_repository = compra_repository
+        self.producto_repository = producto_repository
+        self.compra_service = compra_service
+        self.saldo_repository = saldo_repository
+
+    def checkout(self, estudiante_id: int, items: List[CheckoutItemDTO],
+                 clave_idempotencia: Optional[str] = None) -> ReciboDTO:
+        # Primero la fila del estudiante: los cobros concurrentes esperan aquí
+        estudiante = self.estudiante_repository.bloquear_para_cobro(estudiante_id)
+        if not estudiante:
+            raise UsuarioNoEncontradoError(f"Estudiante con ID {estudiante_id} no encontrado")
+
+        bloqueados = {
+            bloqueo.id_alimento
+            for bloqueo in self.alimento_bloqueado_repository.obtener_alimentos_bloqueados_por_estudiante(estudiante_id)
+        }
+        items_compra, productos = self.compra_service.validar_items(items, bloqueados)
+
+        compra = Compra(usuario_id=estudiante_id, items=items_compra, fecha=datetime.now(),
+                        clave_idempotencia=clave_idempotencia)
+        total = Decimal(str(compra.calcular_total()))
+        saldo_anterior = estudiante.saldo
+        if total > saldo_anterior:
+            raise SaldoInsuficienteError(f"Saldo insuficiente. Saldo actual: {saldo_anterior}, total: {total}")
+
+        compra = self.compra_repository.guardar_compra(compra)
+        saldo_restante = self.saldo_repository.aplicar(MovimientoSaldo.debito(
+            TitularSaldo.ESTUDIANTE, estudiante_id, TipoMovimiento.COMPRA, total, f"compra:{compra.id}"
+        ))
+        self.compra_service.recordar_compras([compra], productos)
+
+        return ReciboDTO(
+            compra_id=compra.id,
+            fecha=compra.fecha,
+            estudiante_id=estudiante_id,
+            estudiante_nombre=estudiante.nombre,
+            total=float(total),
+            saldo_anterior=float(saldo_anterior),
+            saldo_restante=float(saldo_restante),
+            items=[
+                ReciboItemDTO(
+                    producto_id=item.producto_id,
+                    nombre_alimento=productos[item.producto_id].nombre,
+                    cantidad=item.cantidad,
+                    precio_unitario=item.precio_unitario,
+                    subtotal=item.subtotal
+                )
+                for item in compra.items
+            ]
+        )
+
+    def sincronizar(self, ventas: List[VentaOfflineDTO]) -> SincronizacionDTO:
+        """
+        Aplica las ventas que una caja encoló sin conexión en el orden en que se
+        hicieron (fecha_cliente; las de la misma hora, en el orden recibido), en una sola
+        transacción y con un número fijo de consultas: estudiantes (bloqueados),
+        claves ya registradas, bloqueos y productos (bloqueados) se leen con una
+        consulta cada uno para todo el lote, la validación avanza en memoria con
+        el saldo y el stock que van quedando, y las aceptadas se escriben juntas.
+
+        Cada venta se acepta o se rechaza por separado; una rechazada no afecta
+        a las demás. Las claves ya registradas se devuelven como duplicadas con
+        su compra original. Los resultados siguen el orden de la petición.
+        """
+        estudiantes = self.estudiante_repository.bloquear_varios_para_cobro([v.estudiante_id for v in ventas])
+        ya_registradas = self.compra_repository.buscar_ids_por_claves(
+            list({v.clave_idempotencia for v in ventas})
+        )
+        bloqueos = self.alimento_bloqueado_repository.obtener_bloqueos_por_estudiantes(list(estudiantes))
+        productos = self.producto_repository.obtener_productos_por_ids(
+            (item.producto_id for venta in ventas for item in venta.items), bloquear=True
+        )
+
+        saldos: Dict[int, Decimal] = {id_estudiante: e.saldo for id_estudiante, e in estudiantes.items()}
+        stock: Dict[int, int] = {id_producto: p.cantidad_en_stock for id_producto, p in productos.items()}
+        ahora = datetime.now()
+        # Se ordena por la hora de la caja sin recortar: dos ventas "en el futuro" siguen ordenadas
+        horas = [self._hora_local(venta.fecha_cliente) for venta in ventas]
+
+        # (venta, estado, compra o id, motivo, detalle, saldo_restante), en la posición de la petición
+        filas: List[Optional[Tuple]] = [None] * len(ventas)
+        aceptadas: Dict[str, Compra] = {}
+        # sorted es estable: las ventas con la misma hora conservan el orden recibido
+        for posicion in sorted(range(len(ventas)), key=horas.__getitem__):
+            venta = ventas[posicion]
+            clave = venta.clave_idempotencia
+            if clave in ya_registradas:
+                filas[posicion] = (venta, "duplicada", ya_registradas[clave], None, None, None)
+                continue
+            if clave in aceptadas:
+                filas[posicion] = (venta, "duplicada", aceptadas[clave], None, None, None)
+                continue
+
+            estudiante = estudiantes.get(venta.estudiante_id)
+            if estudiante is None:
+                filas[posicion] = (venta, "rechazada", None, "estudiante_no_encontrado",
+                                   f"Estudiante con ID {venta.estudiante_id} no encontrado", None)
+                continue
+            rechazo, items_compra = self._validar_venta(venta, productos, stock,
+                                                        bloqueos.get(venta.estudiante_id, set()))
+            if rechazo:
+                filas[posicion] = (venta, "rechazada", None, *rechazo, None)
+                continue
+
+            # Se registra la hora de la caja, nunca en el futuro
+            compra = Compra(usuario_id=venta.estudiante_id, items=items_compra,
+                            fecha=min(horas[posicion], ahora), clave_idempotencia=clave)
+            total = Decimal(str(compra.calcular_total()))
+            if total > saldos[venta.estudiante_id]:
+                filas[posicion] = (venta, "rechazada", None, "saldo_insuficiente",
+                                   f"Saldo insuficiente. Saldo actual: {saldos[venta.estudiante_id]}, total: {total}", None)
+                continue
+
+            saldos[venta.estudiante_id] -= total
+            for item in items_compra:
+                stock[item.producto_id] -= item.cantidad
+            aceptadas[clave] = compra
+            filas[posicion] = (venta, "aceptada", compra, None, None, saldos[venta.estudiante_id])
+
+        if aceptadas:
+            self.compra_repository.guardar_compras(list(aceptadas.values()))
+            # Un débito por compra en el libro y un único UPDATE de saldos por estudiante
+            self.saldo_repository.aplicar_varios([
+                MovimientoSaldo.debito(TitularSaldo.ESTUDIANTE, compra.usuario_id, TipoMovimiento.COMPRA,
+                                       compra.total, f"compra:{compra.id}")
+                for compra in aceptadas.values()
+            ])
+            self.compra_service.recordar_compras(list(aceptadas.values()), productos)
+
+        resultados = []
+        for venta, estado, compra, motivo, detalle, saldo_restante in filas:
+            resultados.append(ResultadoVentaDTO(
+                clave_idempotencia=venta.clave_idempotencia,
+                estado=estado,
+                compra_id=compra.id if isinstance(compra, Compra) else compra,
+                total=compra.total if estado == "aceptada" else None,
+                saldo_restante=float(saldo_restante) if saldo_restante is not None else None,
+                motivo=motivo,
+                detalle=detalle
+            ))
+        return SincronizacionDTO(
+            resultados=resultados,
+            aceptadas=sum(r.estado == "aceptada" for r in resultados),
+            rechazadas=sum(r.estado == "rechazada" for r in resultados),
+            duplicadas=sum(r.estado == "duplicada" for r in resultados)
+        )
+
+    @staticmethod
+    def _validar_venta(venta: VentaOfflineDTO, productos: Dict[int, Alimento], stock: Dict[int, int],
+                       bloqueados: Set[int]) -> Tuple[Optional[Tuple[str, str]], List[CompraItem]]:
+        """Valida una venta contra el stock que dejan las anteriores del lote; precios del catálogo."""
+        if not venta.items:
+            return ("venta_invalida", "La venta no tiene productos"), []
+        pedidas: Dict[int, int] = {}
+        for item in venta.items:
+            if item.cantidad <= 0:
+                return ("venta_invalida", f"Cantidad inválida para el producto {item.producto_id}"), []
+            pedidas[item.producto_id] = pedidas.get(item.producto_id, 0) + item.cantidad
+
+        for producto_id, cantidad in pedidas.items():
+            producto = productos.get(producto_id)
+            if producto is None or not producto.activo:
+                return ("producto_no_disponible", f"El producto {producto_id} no existe o no está disponible"), []
+            if producto_id in bloqueados:
+                return ("alimento_bloqueado", f"{producto.nombre} está bloqueado para este estudiante"), []
+            if cantidad > stock[producto_id]:
+                return ("stock_insuficiente",
+                        f"Stock insuficiente para {producto.nombre} (pedido {cantidad}, disponible {stock[producto_id]})"), []
+
+        items_compra = [
+            CompraItem(producto_id=item.producto_id, cantidad=item.cantidad,
+                       precio_unitario=productos[item.producto_id].precio,
+                       nombre_alimento=productos[item.producto_id].nombre,
+                       calorias=productos[item.producto_id].calorias)
+            for item in venta.items
+        ]
+        return None, items_compra
+
+    @staticmethod
+    def _hora_local(fecha_cliente: datetime) -> datetime:
+        """Hora local del servidor, sin zona como el resto de fechas."""
+        if fecha_cliente.tzinfo is not None:
+            return fecha_cliente.astimezone().replace(tzinfo=None)
+        return fecha_cliente
@@ -1,15 +1,25 @@
 # app/domain/services/producto_service.py
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Dict, Iterable, Optional
+
+from domain.models.alimento import Alimento
 
 class ProductoRepository(ABC):
     @abstractmethod
     def obtener_producto_por_id(self, producto_id: int):
         pass
 
+    @abstractmethod
+    def obtener_productos_por_ids(self, producto_ids: Iterable[int], bloquear: bool = False) -> Dict[int, Alimento]:
+        """
+        Productos encontrados por id, activos o no; los ids inexistentes no aparecen.
+        Con bloquear=True las filas quedan bloqueadas hasta el final de la transacción.
+        """
+        pass
+
 class ProductoService:
     def __init__(self, producto_repository: ProductoRepository):
         self.producto_repository = producto_repository
 
     def obtener_producto_por_id(self, producto_id: int):
-        return self.producto_repository.obtener_producto_por_id(producto_id)
\ No newline at end of file
+        return self.producto_repository.obtener_producto_por_id(producto_id)
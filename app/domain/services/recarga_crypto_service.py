@@ -7,6 +7,7 @@ from typing import Optional, List, Tuple
 import secrets
 
 from domain.models.recarga_crypto import RecargaCrypto, TipoCrypto, EstadoRecargaCrypto
+from domain.models.movimiento_saldo import MovimientoSaldo, TipoMovimiento, TitularSaldo
 from infrastructure.service.celo_service import CeloService
 
 logger = logging.getLogger(__name__)
@@ -17,7 +18,7 @@ class RecargaCryptoService:
     Maneja la lógica de negocio relacionada con pagos en Celo (cCOP).
     """
     
-    def __init__(self, celo_service: CeloService, recarga_crypto_repository, usuario_repository):
+    def __init__(self, celo_service: CeloService, recarga_crypto_repository, usuario_repository, saldo_repository):
         """
         Inicializa el servicio.
         
@@ -25,10 +26,12 @@ class RecargaCryptoService:
             celo_service: Servicio para interactuar con Celo blockchain
             recarga_crypto_repository: Repositorio para persistir recargas crypto
             usuario_repository: Repositorio de usuarios
+            saldo_repository: Escrituras atómicas de saldo (con su movimiento)
         """
         self.celo_service = celo_service
         self.recarga_crypto_repository = recarga_crypto_repository
         self.usuario_repository = usuario_repository
+        self.saldo_repository = saldo_repository
         
         # Configuración
         self.tiempo_expiracion_minutos = 30
@@ -50,7 +53,7 @@ class RecargaCryptoService:
     
     def _validar_usuario_existe(self, usuario_id: int) -> None:
         """Valida que el usuario exista"""
-        usuario = self.usuario_repository.obtener_por_id(usuario_id)
+        usuario = self.usuario_repository.buscar_por_id(str(usuario_id))
         if not usuario:
             raise ValueError(f"Usuario con ID {usuario_id} no encontrado")
     
@@ -229,13 +232,11 @@ class RecargaCryptoService:
             
             # Acreditar saldo al usuario
             try:
-                usuario = self.usuario_repository.obtener_por_id(recarga.usuario_id)
-                if not usuario:
-                    raise ValueError("Usuario no encontrado")
-                
-                # Acreditar saldo
-                usuario.saldo += recarga.monto_cop
-                self.usuario_repository.actualizar(usuario)
+                # Acreditar saldo: suma y movimiento del libro en una sola sentencia
+                self.saldo_repository.aplicar(MovimientoSaldo.credito(
+                    TitularSaldo.USUARIO, recarga.usuario_id, TipoMovimiento.RECARGA,
+                    recarga.monto_cop, f"recarga_crypto:{recarga.id}"
+                ))
                 
                 # Marcar como completada
                 recarga.marcar_como_completada()
@@ -2,14 +2,15 @@
 
 from typing import List, Optional
 from datetime import datetime
-from decimal import Decimal
 import logging
 
 from domain.models.recarga import Recarga, EstadoRecarga
+from domain.models.movimiento_saldo import MovimientoSaldo, TipoMovimiento, TitularSaldo
 from domain.repositories.recarga_repository import RecargaRepository
 from domain.repositories.estudiante_repository import EstudianteRepository
 from domain.repositories.usuario_repository import UsuarioRepository
-from domain.exceptions.exceptions import UsuarioNoEncontradoError
+from domain.repositories.saldo_repository import SaldoRepository
+from domain.exceptions.exceptions import UsuarioNoEncontradoError, CapacidadAgotadaError
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +23,12 @@ class RecargaService:
     def __init__(self, 
                  recarga_repository: RecargaRepository,
                  usuario_repository: UsuarioRepository,
-                 estudiante_repository: EstudianteRepository): 
+                 estudiante_repository: EstudianteRepository,
+                 saldo_repository: SaldoRepository): 
         self.recarga_repository = recarga_repository
         self.usuario_repository = usuario_repository
         self.estudiante_repository = estudiante_repository
+        self.saldo_repository = saldo_repository
     
     def crear_recarga_pendiente(self, usuario_id: str, monto: float) -> Recarga:
         """Crea una recarga en estado pendiente"""
@@ -40,6 +43,8 @@ class RecargaService:
             usuario = self.usuario_repository.buscar_por_id(usuario_id)
             if not usuario:
                 raise UsuarioNoEncontradoError(f"Usuario con ID {usuario_id} no encontrado")
+        except CapacidadAgotadaError:
+            raise
         except Exception as e:
             raise UsuarioNoEncontradoError(f"Error al validar usuario: {str(e)}")
         
@@ -68,6 +73,8 @@ class RecargaService:
             self.recarga_repository.guardar(recarga)
             return recarga
             
+        except CapacidadAgotadaError:
+            raise
         except Exception as e:
             raise ValueError(f"Error al crear la recarga: {str(e)}")
     
@@ -162,6 +169,8 @@ class RecargaService:
             
             return recarga
             
+        except CapacidadAgotadaError:
+            raise
         except Exception as e:
             logger.error(f"❌ Error procesando webhook: {str(e)}", exc_info=True)
             raise ValueError(f"Error al procesar webhook: {str(e)}")
@@ -226,42 +235,28 @@ class RecargaService:
             recarga.aprobar()
             logger.info(f"   Estado cambiado: {estado_anterior.value} → {recarga.estado.value}")
             
-            # 2️⃣ Actualizar saldo del ESTUDIANTE
+            # 2️⃣ Acreditar al ESTUDIANTE: suma y movimiento del libro en una sola sentencia
             estudiante_id = int(recarga.usuario_id)
-            logger.info(f"👤 Buscando estudiante ID: {estudiante_id}")
-            
-            estudiante = self.estudiante_repository.obtener_por_id(estudiante_id)
-            if not estudiante:
+            logger.info(f"💵 Acreditando +${recarga.monto:,.0f} al estudiante {estudiante_id}")
+            try:
+                nuevo_saldo = self.saldo_repository.aplicar(MovimientoSaldo.credito(
+                    TitularSaldo.ESTUDIANTE, estudiante_id, TipoMovimiento.RECARGA,
+                    recarga.monto, f"recarga:{recarga.id}"
+                ))
+            except UsuarioNoEncontradoError:
                 logger.error(f"❌ Estudiante {estudiante_id} no encontrado")
                 # Rollback del estado
                 recarga.estado = estado_anterior
-                raise UsuarioNoEncontradoError(f"Estudiante con ID {estudiante_id} no encontrado")
-            
-            saldo_anterior = estudiante.saldo
-            nuevo_saldo = saldo_anterior + Decimal(str(recarga.monto))
-            
-            logger.info(f"💵 Actualizando saldo:")
-            logger.info(f"   Anterior: ${saldo_anterior:,.0f}")
-            logger.info(f"   Recarga:  +${recarga.monto:,.0f}")
-            logger.info(f"   Nuevo:    ${nuevo_saldo:,.0f}")
-            
-            # 3️⃣ Actualizar saldo en la base de datos
-            estudiante_actualizado = self.estudiante_repository.actualizar_saldo(
-                estudiante_id=estudiante_id,
-                nuevo_saldo=nuevo_saldo
-            )
-            
-            if not estudiante_actualizado:
-                logger.error("❌ Error al actualizar saldo en BD")
-                # Rollback del estado
-                recarga.estado = estado_anterior
-                raise Exception("Error al actualizar saldo del estudiante en la base de datos")
+                raise
+            logger.info(f"   Nuevo saldo: ${nuevo_saldo:,.0f}")
             
             logger.info(f"✅ Saldo actualizado exitosamente")
             logger.info(f"💰 === FIN APROBACIÓN RECARGA ===")
                 
         except UsuarioNoEncontradoError:
             raise
+        except CapacidadAgotadaError:
+            raise
         except Exception as e:
             logger.error(f"❌ Error en _aprobar_recarga: {str(e)}", exc_info=True)
             # Asegurar rollback
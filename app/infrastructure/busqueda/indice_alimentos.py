@@ -0,0 +1,68 @@
+# infrastructure/busqueda/indice_alimentos.py
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from domain.models.alimento import Alimento
+from domain.models.catalogo import Catalogo
+from infrastructure.busqueda.indice_ngramas import IndiceNgramas
+
+# El nombre pesa más que la categoría: "jugo" pone primero los jugos que se llaman así
+PESO_NOMBRE = 1.0
+PESO_CATEGORIA = 0.6
+
+
+class IndiceBusquedaAlimentos:
+    """
+    Índice de búsqueda del catálogo de alimentos activos, compartido por el proceso.
+
+    Se sincroniza con el catálogo que recibe en cada búsqueda. El catálogo en
+    caché ya se descarta con cada escritura (también las de otros procesos), y
+    cada versión nueva se compara con la indexada: solo se reindexan los
+    alimentos cuyo nombre o categoría cambió. Una venta cambia el stock pero no
+    el texto, así que no toca el índice. Los resultados se devuelven con las
+    entidades del catálogo recibido, con precio y stock al día.
+    """
+
+    def __init__(self, indice: Optional[IndiceNgramas] = None):
+        self._indice = indice or IndiceNgramas()
+        self._lock = threading.Lock()
+        self._textos: Dict[int, Tuple[str, str]] = {}
+        self._version: Optional[int] = None
+        self._sincronizaciones = 0
+        self._reindexados = 0
+        self._busquedas = 0
+
+    def _sincronizar(self, catalogo: Catalogo) -> None:
+        if catalogo.version == self._version and len(catalogo.alimentos) == len(self._textos):
+            return
+        actuales = {a.id: (a.nombre, a.categoria or "") for a in catalogo.alimentos}
+        for alimento_id in self._textos.keys() - actuales.keys():
+            self._indice.quitar(alimento_id)
+        for alimento_id, (nombre, categoria) in actuales.items():
+            if self._textos.get(alimento_id) != (nombre, categoria):
+                self._indice.indexar(alimento_id, ((nombre, PESO_NOMBRE), (categoria, PESO_CATEGORIA)))
+                self._reindexados += 1
+        self._textos = actuales
+        self._version = catalogo.version
+        self._sincronizaciones += 1
+
+    def buscar(self, catalogo: Catalogo, consulta: str, limite: int = 20) -> List[Alimento]:
+        with self._lock:
+            self._sincronizar(catalogo)
+            self._busquedas += 1
+            resultados = self._indice.buscar(consulta, limite)
+        return [catalogo.por_id[alimento_id] for alimento_id, _ in resultados if alimento_id in catalogo.por_id]
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._indice.estadisticas(),
+                "version": self._version,
+                "sincronizaciones": self._sincronizaciones,
+                "reindexados": self._reindexados,
+                "busquedas": self._busquedas,
+            }
+
+
+indice_alimentos = IndiceBusquedaAlimentos()
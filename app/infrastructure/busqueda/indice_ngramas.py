@@ -0,0 +1,170 @@
+# infrastructure/busqueda/indice_ngramas.py
+
+from bisect import bisect_left
+from typing import Dict, FrozenSet, List, Sequence, Set, Tuple
+
+from infrastructure.utils.text_normalizer import TextNormalizer
+
+# Puntajes por tipo de coincidencia de una palabra de la consulta: una palabra
+# exacta siempre gana a un prefijo, un prefijo a una subcadena y una subcadena
+# a una palabra con errores de tipeo
+_PUNTAJE_EXACTA = 1.0
+_PUNTAJE_PREFIJO_MINIMO = 0.6
+_PUNTAJE_SUBCADENA = 0.55
+_PUNTAJE_APROXIMADA_MAXIMO = 0.5
+
+# Con una o dos letras solo se buscan prefijos: no hay trigramas suficientes para comparar
+_LONGITUD_MINIMA_APROXIMADA = 3
+
+
+def trigramas(palabra: str) -> FrozenSet[str]:
+    """Trigramas de una palabra con el mismo relleno que pg_trgm: dos espacios al inicio y uno al final."""
+    rellena = f"  {palabra} "
+    return frozenset(rellena[i:i + 3] for i in range(len(rellena) - 2))
+
+
+class IndiceNgramas:
+    """
+    Índice invertido de palabras normalizadas (sin tildes ni signos, en
+    mayúsculas, con TextNormalizer) y de sus trigramas.
+
+    Cada documento es un id con uno o más textos ponderados (p. ej. nombre y
+    categoría). Una consulta se separa en palabras y cada una se resuelve
+    contra el vocabulario por coincidencia exacta, prefijo (búsqueda binaria en
+    el vocabulario ordenado), subcadena o semejanza de trigramas (errores de
+    tipeo). Un documento aparece solo si coincide con todas las palabras.
+
+    No es seguro para hilos: quien lo comparta debe serializar el acceso.
+    """
+
+    def __init__(self, umbral_semejanza: float = 0.5, max_palabras_por_termino: int = 200):
+        # Fracción de los trigramas de la palabra buscada que debe tener una palabra del índice
+        self.umbral_semejanza = umbral_semejanza
+        # Tope de palabras del vocabulario que puede expandir un prefijo corto
+        self.max_palabras_por_termino = max_palabras_por_termino
+        self._documentos: Dict[int, Dict[str, float]] = {}
+        self._publicaciones: Dict[str, Dict[int, float]] = {}
+        self._por_trigrama: Dict[str, Set[str]] = {}
+        self._trigramas: Dict[str, FrozenSet[str]] = {}
+        self._vocabulario: List[str] = []
+        self._vocabulario_vigente = True
+
+    @staticmethod
+    def normalizar(texto: str) -> List[str]:
+        return TextNormalizer.normalizar_nombre(texto or "").split()
+
+    def __len__(self) -> int:
+        return len(self._documentos)
+
+    def indexar(self, documento_id: int, textos: Sequence[Tuple[str, float]]) -> None:
+        """Agrega o reemplaza un documento; cada texto lleva su peso."""
+        self.quitar(documento_id)
+        pesos: Dict[str, float] = {}
+        for texto, peso in textos:
+            for palabra in self.normalizar(texto):
+                pesos[palabra] = max(peso, pesos.get(palabra, 0.0))
+        self._documentos[documento_id] = pesos
+        for palabra, peso in pesos.items():
+            publicaciones = self._publicaciones.get(palabra)
+            if publicaciones is None:
+                publicaciones = self._publicaciones[palabra] = {}
+                self._agregar_palabra(palabra)
+            publicaciones[documento_id] = peso
+
+    def quitar(self, documento_id: int) -> None:
+        pesos = self._documentos.pop(documento_id, None)
+        if not pesos:
+            return
+        for palabra in pesos:
+            publicaciones = self._publicaciones[palabra]
+            del publicaciones[documento_id]
+            if not publicaciones:
+                del self._publicaciones[palabra]
+                self._quitar_palabra(palabra)
+
+    def _agregar_palabra(self, palabra: str) -> None:
+        grupo = trigramas(palabra)
+        self._trigramas[palabra] = grupo
+        for trigrama in grupo:
+            self._por_trigrama.setdefault(trigrama, set()).add(palabra)
+        self._vocabulario_vigente = False
+
+    def _quitar_palabra(self, palabra: str) -> None:
+        for trigrama in self._trigramas.pop(palabra):
+            palabras = self._por_trigrama[trigrama]
+            palabras.discard(palabra)
+            if not palabras:
+                del self._por_trigrama[trigrama]
+        self._vocabulario_vigente = False
+
+    def _vocabulario_ordenado(self) -> List[str]:
+        if not self._vocabulario_vigente:
+            self._vocabulario = sorted(self._publicaciones)
+            self._vocabulario_vigente = True
+        return self._vocabulario
+
+    def _palabras_coincidentes(self, termino: str) -> Dict[str, float]:
+        """Palabras del vocabulario que coinciden con un término de la consulta, con su puntaje."""
+        coincidencias: Dict[str, float] = {}
+        if termino in self._publicaciones:
+            coincidencias[termino] = _PUNTAJE_EXACTA
+
+        vocabulario = self._vocabulario_ordenado()
+        inicio = bisect_left(vocabulario, termino)
+        for palabra in vocabulario[inicio:inicio + self.max_palabras_por_termino]:
+            if not palabra.startswith(termino):
+                break
+            if palabra != termino:
+                # Cuanto más completa está la palabra, más se acerca a una coincidencia exacta
+                completitud = len(termino) / len(palabra)
+                coincidencias[palabra] = _PUNTAJE_PREFIJO_MINIMO + (_PUNTAJE_EXACTA - _PUNTAJE_PREFIJO_MINIMO) * completitud
+
+        if len(termino) < _LONGITUD_MINIMA_APROXIMADA:
+            return coincidencias
+
+        buscados = trigramas(termino)
+        comunes: Dict[str, int] = {}
+        for trigrama in buscados:
+            for palabra in self._por_trigrama.get(trigrama, ()):
+                comunes[palabra] = comunes.get(palabra, 0) + 1
+        for palabra, cantidad in comunes.items():
+            if palabra in coincidencias:
+                continue
+            if termino in palabra:
+                coincidencias[palabra] = _PUNTAJE_SUBCADENA
+                continue
+            # Como word_similarity de pg_trgm: qué parte del término aparece en la palabra
+            semejanza = cantidad / len(buscados)
+            if semejanza >= self.umbral_semejanza:
+                coincidencias[palabra] = _PUNTAJE_APROXIMADA_MAXIMO * semejanza
+        return coincidencias
+
+    def buscar(self, consulta: str, limite: int = 20) -> List[Tuple[int, float]]:
+        """Ids de documento con su puntaje, del más al menos relevante."""
+        terminos = list(dict.fromkeys(self.normalizar(consulta)))
+        if not terminos or limite <= 0:
+            return []
+        puntajes: Dict[int, float] = {}
+        for posicion, termino in enumerate(terminos):
+            mejores: Dict[int, float] = {}
+            for palabra, puntaje in self._palabras_coincidentes(termino).items():
+                for documento_id, peso in self._publicaciones[palabra].items():
+                    valor = puntaje * peso
+                    if valor > mejores.get(documento_id, 0.0):
+                        mejores[documento_id] = valor
+            if posicion == 0:
+                puntajes = mejores
+            else:
+                # Todas las palabras de la consulta deben coincidir
+                puntajes = {d: p + mejores[d] for d, p in puntajes.items() if d in mejores}
+            if not puntajes:
+                return []
+        ordenados = sorted(puntajes.items(), key=lambda par: (-par[1], par[0]))
+        return ordenados[:limite]
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {
+            "documentos": len(self._documentos),
+            "palabras": len(self._publicaciones),
+            "trigramas": len(self._por_trigrama),
+        }
@@ -0,0 +1,92 @@
+# infrastructure/cache/cache_catalogo.py
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from domain.models.catalogo import Catalogo
+from infrastructure.cache.invalidacion import TEMA_ALIMENTOS, bus_invalidacion
+
+load_dotenv()
+
+# Red de seguridad: aunque se pierda una invalidación, el catálogo no se sirve más viejo que esto
+CATALOGO_CACHE_TTL_SEGUNDOS = float(os.getenv("CATALOGO_CACHE_TTL_SECONDS", "300"))
+
+
+class CacheCatalogo:
+    """
+    Catálogo de alimentos activos en memoria, compartido por el proceso.
+
+    Se carga completo con una consulta en el primer uso y se descarta con cada
+    invalidación del tema "alimentos" (altas, cambios, bajas y movimientos de
+    stock) o al vencer el TTL. Las cargas concurrentes se hacen una sola vez, y
+    una carga que empezó antes de una invalidación no se guarda: podría no
+    incluir la escritura que la provocó.
+    """
+
+    def __init__(self, ttl: float = CATALOGO_CACHE_TTL_SEGUNDOS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._carga = threading.Lock()
+        self._catalogo: Optional[Catalogo] = None
+        self._cargado = 0.0
+        self._generacion = 0
+        self._aciertos = 0
+        self._fallos = 0
+        self._cargas = 0
+        self._invalidaciones = 0
+
+    def _vigente(self) -> Optional[Catalogo]:
+        if self._catalogo is not None and time.monotonic() - self._cargado < self.ttl:
+            return self._catalogo
+        return None
+
+    def obtener(self, cargar: Callable[[], Catalogo]) -> Catalogo:
+        with self._lock:
+            catalogo = self._vigente()
+            if catalogo is not None:
+                self._aciertos += 1
+                return catalogo
+            self._fallos += 1
+        with self._carga:
+            with self._lock:
+                # Otro hilo pudo cargarlo mientras esperábamos
+                catalogo = self._vigente()
+                if catalogo is not None:
+                    return catalogo
+                generacion = self._generacion
+            catalogo = cargar()
+            with self._lock:
+                self._cargas += 1
+                if generacion == self._generacion:
+                    self._catalogo = catalogo
+                    self._cargado = time.monotonic()
+            return catalogo
+
+    def invalidar(self, clave: Optional[str] = None) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._catalogo = None
+            self._invalidaciones += 1
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                "alimentos": len(self._catalogo.alimentos) if self._catalogo else 0,
+                "version": self._catalogo.version if self._catalogo else None,
+                "edad_segundos": round(time.monotonic() - self._cargado, 1) if self._catalogo else None,
+                "ttl_segundos": self.ttl,
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "tasa_aciertos": round(self._aciertos / consultas, 4) if consultas else None,
+                "cargas": self._cargas,
+                "invalidaciones": self._invalidaciones,
+            }
+
+
+cache_catalogo = CacheCatalogo()
+bus_invalidacion.suscribir(TEMA_ALIMENTOS, cache_catalogo.invalidar)
@@ -0,0 +1,59 @@
+# infrastructure/cache/cache_recibos.py
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from application.dto.compra_dto import CompraOutputDTO
+from infrastructure.cache.lru_cache import LRUCache
+
+load_dotenv()
+
+# Recibos en memoria por proceso; unos 1-2 KB cada uno con carritos típicos
+RECIBOS_CACHE_MAX_ENTRADAS = int(os.getenv("RECIBOS_CACHE_MAX_ENTRADAS", "10000"))
+
+
+@dataclass(frozen=True)
+class ReciboCacheado:
+    """Recibo ya serializado: el cuerpo se sirve tal cual y el ETag es el hash de esos bytes."""
+    recibo: CompraOutputDTO
+    cuerpo: bytes
+    etag: str
+
+    @classmethod
+    def desde_dto(cls, recibo: CompraOutputDTO) -> "ReciboCacheado":
+        cuerpo = recibo.model_dump_json().encode("utf-8")
+        return cls(recibo=recibo, cuerpo=cuerpo, etag=f'"{hashlib.sha256(cuerpo).hexdigest()[:32]}"')
+
+
+# Una compra no cambia después de creada, así que sus recibos no vencen: solo
+# salen de la caché por tamaño.
+cache_recibos: LRUCache[ReciboCacheado] = LRUCache(RECIBOS_CACHE_MAX_ENTRADAS, nombre="recibos")
+
+
+class CacheRecibos:
+    """
+    Acceso de una petición a la caché de recibos del proceso.
+
+    Con una unidad de trabajo, los recibos nuevos entran a la caché solo
+    después del commit: una compra deshecha nunca queda servida desde memoria.
+    """
+
+    def __init__(self, cache: LRUCache[ReciboCacheado] = cache_recibos, unidad_de_trabajo=None):
+        self.cache = cache
+        self.unidad_de_trabajo = unidad_de_trabajo
+
+    def obtener(self, compra_id: int) -> Optional[ReciboCacheado]:
+        return self.cache.obtener(compra_id)
+
+    def recordar(self, recibo: CompraOutputDTO) -> ReciboCacheado:
+        cacheado = ReciboCacheado.desde_dto(recibo)
+        guardar = lambda: self.cache.guardar(recibo.id, cacheado)
+        if self.unidad_de_trabajo is not None:
+            self.unidad_de_trabajo.al_confirmar(guardar)
+        else:
+            guardar()
+        return cacheado
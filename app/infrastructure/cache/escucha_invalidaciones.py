@@ -0,0 +1,154 @@
+# infrastructure/cache/escucha_invalidaciones.py
+
+import logging
+import select
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+from infrastructure.cache.invalidacion import (
+    CANAL_INVALIDACIONES, BusInvalidacion, bus_invalidacion, leer_mensaje_invalidacion
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EscuchaInvalidaciones:
+    """
+    Hilo de fondo que hace LISTEN foodcash_invalidate con una conexión propia
+    (fuera del pool: LISTEN necesita una sesión fija, así que debe ir directo a
+    Postgres y no a un pgbouncer en modo transacción) y reenvía cada aviso a
+    los suscriptores de este proceso.
+
+    Si la conexión se cae se reintenta con espera exponencial. Los avisos
+    enviados mientras no había conexión se pierden, así que al reconectar se
+    invalidan por completo todos los temas suscritos.
+
+    El proceso que escribe también recibe su propio aviso; invalidar dos veces
+    es inocuo y evita tener que distinguir el origen.
+    """
+
+    def __init__(self,
+                 bus: BusInvalidacion = bus_invalidacion,
+                 canal: str = CANAL_INVALIDACIONES,
+                 espera_reconexion: float = 1.0,
+                 espera_maxima: float = 30.0,
+                 intervalo_sondeo: float = 5.0):
+        self.bus = bus
+        self.canal = canal
+        self.espera_reconexion = espera_reconexion
+        self.espera_maxima = espera_maxima
+        # Sin avisos durante este tiempo se comprueba que la conexión siga viva
+        self.intervalo_sondeo = intervalo_sondeo
+        self._connect_kwargs: Dict[str, Any] = {}
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+        self._conectada = threading.Event()
+        self._lock = threading.Lock()
+        self._pid_backend: Optional[int] = None
+        self._recibidos = 0
+        self._conexiones = 0
+        self._fallos = 0
+        self._ultimo_error: Optional[str] = None
+
+    def iniciar(self, connect_kwargs: Dict[str, Any]) -> None:
+        """Arranca el hilo; se invoca una vez al arrancar la aplicación."""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        # Los avisos se leen por pid y carga útil: no hace falta el RealDictCursor del pool
+        self._connect_kwargs = {k: v for k, v in connect_kwargs.items() if k != "cursor_factory"}
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="invalidaciones-listener", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    def esperar_conexion(self, timeout: float) -> bool:
+        """True en cuanto el LISTEN está activo; útil al arrancar y en las verificaciones."""
+        return self._conectada.wait(timeout)
+
+    def _bucle(self) -> None:
+        espera = self.espera_reconexion
+        while not self._detener.is_set():
+            conexion = None
+            try:
+                conexion = self._conectar()
+                espera = self.espera_reconexion
+                self._escuchar(conexion)
+            except (psycopg2.Error, OSError) as e:
+                with self._lock:
+                    self._fallos += 1
+                    self._ultimo_error = str(e).strip()
+                logger.warning(f"⚠️ Escucha de invalidaciones desconectada, reintento en {espera:.0f}s: {e}")
+            except Exception as e:
+                with self._lock:
+                    self._fallos += 1
+                    self._ultimo_error = str(e).strip()
+                logger.error(f"❌ Error en la escucha de invalidaciones: {e}", exc_info=True)
+            finally:
+                self._conectada.clear()
+                with self._lock:
+                    self._pid_backend = None
+                if conexion is not None:
+                    try:
+                        conexion.close()
+                    except Exception:
+                        pass
+            if self._detener.wait(espera):
+                break
+            espera = min(espera * 2, self.espera_maxima)
+
+    def _conectar(self):
+        conexion = psycopg2.connect(**self._connect_kwargs)
+        conexion.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conexion.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.canal}")
+        with self._lock:
+            self._conexiones += 1
+            reconexion = self._conexiones > 1
+            self._pid_backend = conexion.get_backend_pid()
+        self._conectada.set()
+        if reconexion:
+            # Lo publicado mientras no escuchábamos no llegará: se descarta todo
+            for tema in self.bus.temas():
+                self.bus.publicar(tema, None)
+            logger.info("✅ Escucha de invalidaciones reconectada; cachés invalidadas por completo")
+        return conexion
+
+    def _escuchar(self, conexion) -> None:
+        while not self._detener.is_set():
+            listos, _, _ = select.select([conexion], [], [], self.intervalo_sondeo)
+            if not listos:
+                # Una conexión cortada sin aviso (red, failover) no despierta al select
+                with conexion.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                continue
+            conexion.poll()
+            while conexion.notifies:
+                aviso = conexion.notifies.pop(0)
+                with self._lock:
+                    self._recibidos += 1
+                tema, clave = leer_mensaje_invalidacion(aviso.payload)
+                self.bus.publicar(tema, clave)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "activa": self._hilo is not None and self._hilo.is_alive(),
+                "conectada": self._conectada.is_set(),
+                "pid_backend": self._pid_backend,
+                "recibidos": self._recibidos,
+                "reconexiones": max(self._conexiones - 1, 0),
+                "fallos": self._fallos,
+                "ultimo_error": self._ultimo_error,
+            }
+
+
+escucha_invalidaciones = EscuchaInvalidaciones()
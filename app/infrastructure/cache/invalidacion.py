@@ -0,0 +1,112 @@
+# infrastructure/cache/invalidacion.py
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Temas de invalidación; la clave, si la hay, es el id afectado
+TEMA_ALIMENTOS = "alimentos"
+
+# Canal de Postgres por el que se avisan los demás procesos (workers de uvicorn o instancias)
+CANAL_INVALIDACIONES = "foodcash_invalidate"
+
+# Con un solo proceso no hace falta: cada escritura ya invalida la caché local
+INVALIDACION_ENTRE_PROCESOS = os.getenv("INVALIDACION_ENTRE_PROCESOS", "true").lower() in ("1", "true", "yes")
+
+Suscriptor = Callable[[Optional[str]], None]
+
+_NOTIFICAR = "SELECT pg_notify(%s, mensaje) FROM unnest(%s::text[]) AS mensaje"
+
+
+def mensaje_invalidacion(tema: str, clave: Optional[str] = None) -> str:
+    """Carga útil del NOTIFY: '<tema>:<clave>', o '<tema>:' si se invalida todo el tema."""
+    return f"{tema}:{clave or ''}"
+
+
+def leer_mensaje_invalidacion(mensaje: str) -> Tuple[str, Optional[str]]:
+    tema, _, clave = mensaje.partition(":")
+    return tema, clave or None
+
+
+class BusInvalidacion:
+    """
+    Publicación y suscripción de invalidaciones de caché.
+
+    Los repositorios publican las escrituras y cada caché se suscribe a los
+    temas que le afectan. Un suscriptor que falla no impide que los demás
+    reciban el aviso. Los demás procesos se enteran por un NOTIFY en el canal
+    foodcash_invalidate, que escucha EscuchaInvalidaciones en cada uno.
+    """
+
+    def __init__(self, entre_procesos: bool = INVALIDACION_ENTRE_PROCESOS):
+        self.entre_procesos = entre_procesos
+        self._lock = threading.Lock()
+        self._suscriptores: Dict[str, List[Suscriptor]] = {}
+        self._publicadas: Dict[str, int] = {}
+
+    def suscribir(self, tema: str, suscriptor: Suscriptor) -> None:
+        with self._lock:
+            self._suscriptores.setdefault(tema, []).append(suscriptor)
+
+    def temas(self) -> List[str]:
+        with self._lock:
+            return list(self._suscriptores)
+
+    def publicar(self, tema: str, clave: Optional[str] = None) -> None:
+        """Avisa a los suscriptores de este proceso."""
+        with self._lock:
+            suscriptores = list(self._suscriptores.get(tema, ()))
+            self._publicadas[tema] = self._publicadas.get(tema, 0) + 1
+        for suscriptor in suscriptores:
+            try:
+                suscriptor(clave)
+            except Exception as e:
+                logger.warning(f"⚠️ Falló la invalidación {tema}:{clave}: {e}")
+
+    def publicar_al_confirmar(self, connection_manager, tema: str, clave: Optional[str] = None) -> None:
+        """
+        Publica cuando la escritura queda confirmada: al final de la unidad de
+        trabajo, o de inmediato si el repositorio usa el gestor de conexiones.
+        """
+        self.publicar_varios_al_confirmar(connection_manager, tema, [clave])
+
+    def publicar_varios_al_confirmar(self, connection_manager, tema: str, claves: Iterable[Optional[str]]) -> None:
+        """
+        Como publicar_al_confirmar, para varias claves del mismo tema con un
+        solo NOTIFY en la base de datos.
+        """
+        claves = list(claves)
+        if not claves:
+            return
+        if self.entre_procesos:
+            self._notificar(connection_manager, [mensaje_invalidacion(tema, clave) for clave in claves])
+        connection_manager.al_confirmar(lambda: self._publicar_varios(tema, claves))
+
+    def _publicar_varios(self, tema: str, claves: List[Optional[str]]) -> None:
+        for clave in claves:
+            self.publicar(tema, clave)
+
+    @staticmethod
+    def _notificar(connection_manager, mensajes: List[str]) -> None:
+        # Dentro de una unidad de trabajo el NOTIFY viaja con su transacción:
+        # Postgres lo entrega al confirmar y lo descarta si se deshace. Con el
+        # gestor de conexiones la escritura ya está confirmada y se envía ya.
+        # Un error aquí se propaga: ignorarlo dejaría abortada la transacción.
+        with connection_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(_NOTIFICAR, (CANAL_INVALIDACIONES, mensajes))
+            conn.commit()
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._publicadas)
+
+
+bus_invalidacion = BusInvalidacion()
@@ -0,0 +1,83 @@
+# infrastructure/cache/lru_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """
+    Caché en memoria acotada a `max_entradas`, con expulsión de la entrada
+    usada hace más tiempo y vencimiento opcional (`ttl` en segundos).
+
+    Es segura entre hilos: los endpoints se ejecutan en el executor de base de
+    datos y comparten una misma instancia por proceso. Cuenta aciertos, fallos,
+    expulsiones por tamaño y vencimientos para exponerlos en las métricas.
+    """
+
+    def __init__(self, max_entradas: int, ttl: Optional[float] = None, nombre: str = "cache"):
+        if max_entradas <= 0:
+            raise ValueError("max_entradas debe ser mayor que cero")
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.nombre = nombre
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[Hashable, Tuple[V, float]]" = OrderedDict()
+        self._aciertos = 0
+        self._fallos = 0
+        self._expulsiones = 0
+        self._vencidas = 0
+
+    def obtener(self, clave: Hashable) -> Optional[V]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return None
+            valor, vence = entrada
+            if vence and time.monotonic() >= vence:
+                del self._entradas[clave]
+                self._vencidas += 1
+                self._fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self._aciertos += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: V) -> None:
+        vence = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            self._entradas[clave] = (valor, vence)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self._expulsiones += 1
+
+    def invalidar(self, clave: Hashable) -> bool:
+        with self._lock:
+            return self._entradas.pop(clave, None) is not None
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entradas)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl,
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "tasa_aciertos": round(self._aciertos / consultas, 4) if consultas else None,
+                "expulsiones": self._expulsiones,
+                "vencidas": self._vencidas,
+            }
@@ -0,0 +1,374 @@
+# infrastructure/database/connection_pool.py
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+from domain.exceptions.exceptions import CapacidadAgotadaError
+
+logger = logging.getLogger(__name__)
+
+# Muestras de latencia de adquisición que se conservan para los percentiles
+_MUESTRAS_LATENCIA = 2048
+
+
+class ConexionNoDisponibleError(CapacidadAgotadaError):
+    """Se lanza cuando el pool no puede entregar una conexión a tiempo"""
+    pass
+
+
+def _percentil_ms(ordenadas: List[float], fraccion: float) -> float:
+    if not ordenadas:
+        return 0.0
+    indice = min(len(ordenadas) - 1, max(0, int(round(fraccion * len(ordenadas))) - 1))
+    return round(ordenadas[indice] * 1000, 3)
+
+
+class _RegistroConexion:
+    """Conexión física del pool junto con sus marcas de tiempo"""
+
+    __slots__ = ("conexion", "creada_en", "ultimo_uso")
+
+    def __init__(self, conexion):
+        ahora = time.monotonic()
+        self.conexion = conexion
+        self.creada_en = ahora
+        self.ultimo_uso = ahora
+
+
+class PostgresqlConnectionPool:
+    """
+    Pool de conexiones psycopg2 seguro entre hilos.
+
+    - Mantiene entre `min_size` y `max_size` conexiones abiertas.
+    - Recicla conexiones que superan `max_lifetime` segundos de vida.
+    - Un hilo de mantenimiento cierra las conexiones ociosas más de
+      `max_idle` segundos (sin bajar de `min_size`).
+    - Antes de entregar una conexión que lleva más de `pre_ping_idle`
+      segundos sin usarse ejecuta un `SELECT 1` para descartar conexiones muertas.
+    - La cola de espera está acotada: como máximo `max_waiting` hilos
+      esperan `timeout` segundos; el resto falla de inmediato.
+
+    `estadisticas()` expone ocupación, latencia de adquisición y contadores
+    de reciclaje para el endpoint de salud de la base de datos.
+    """
+
+    def __init__(self,
+                 connect_kwargs: Dict[str, Any],
+                 min_size: int = 1,
+                 max_size: int = 10,
+                 max_lifetime: float = 1800.0,
+                 max_idle: float = 300.0,
+                 timeout: float = 5.0,
+                 max_waiting: int = 50,
+                 pre_ping: bool = True,
+                 pre_ping_idle: float = 10.0,
+                 reap_interval: float = 30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Tamaños de pool inválidos: se requiere 0 <= min_size <= max_size y max_size >= 1")
+
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self.pre_ping = pre_ping
+        self.pre_ping_idle = pre_ping_idle
+        self.reap_interval = reap_interval
+
+        self._condicion = threading.Condition()
+        self._ociosas: Deque[_RegistroConexion] = deque()
+        self._en_uso: Dict[int, _RegistroConexion] = {}
+        self._total = 0
+        self._esperando = 0
+        self._cerrado = False
+        self._detener_mantenimiento = threading.Event()
+        self._hilo_mantenimiento: Optional[threading.Thread] = None
+
+        # Métricas (protegidas por self._condicion)
+        self._latencias: Deque[float] = deque(maxlen=_MUESTRAS_LATENCIA)
+        self._adquisiciones = 0
+        self._agotadas = 0
+        self._creadas = 0
+        self._recicladas = 0
+        self._cerradas_inactivas = 0
+        self._descartadas = 0
+        self._pings_fallidos = 0
+        self._max_esperando = 0
+
+    # --- Ciclo de vida ---
+
+    def open(self) -> None:
+        """Abre las conexiones mínimas y arranca el hilo de mantenimiento."""
+        with self._condicion:
+            self._cerrado = False
+        self._rellenar_minimo()
+        if self._hilo_mantenimiento is None or not self._hilo_mantenimiento.is_alive():
+            self._detener_mantenimiento.clear()
+            self._hilo_mantenimiento = threading.Thread(
+                target=self._bucle_mantenimiento,
+                name="postgresql-pool-reaper",
+                daemon=True
+            )
+            self._hilo_mantenimiento.start()
+
+    def close(self) -> None:
+        """Cierra las conexiones ociosas; las que están en uso se cierran al devolverse."""
+        self._detener_mantenimiento.set()
+        with self._condicion:
+            self._cerrado = True
+            registros = list(self._ociosas)
+            self._ociosas.clear()
+            self._total -= len(registros)
+            self._condicion.notify_all()
+        for registro in registros:
+            self._cerrar(registro)
+
+    # --- Préstamo y devolución ---
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Entrega una conexión sana del pool o lanza ConexionNoDisponibleError.
+        `timeout` permite esperar menos que el valor configurado del pool.
+        """
+        espera = self.timeout if timeout is None else min(timeout, self.timeout)
+        inicio = time.monotonic()
+        limite = inicio + espera
+        while True:
+            try:
+                registro = self._reservar(limite)
+            except ConexionNoDisponibleError:
+                with self._condicion:
+                    self._agotadas += 1
+                raise
+            if registro is None:
+                # Se reservó un hueco: abrir una conexión nueva fuera del candado
+                try:
+                    registro = _RegistroConexion(self._conectar())
+                except Exception:
+                    self._liberar_hueco()
+                    raise
+            elif not self._es_reutilizable(registro):
+                self._descartar(registro)
+                continue
+
+            with self._condicion:
+                self._en_uso[id(registro.conexion)] = registro
+                self._adquisiciones += 1
+                self._latencias.append(time.monotonic() - inicio)
+            return registro.conexion
+
+    def release(self, conexion, discard: bool = False) -> None:
+        """Devuelve una conexión al pool, deshaciendo cualquier transacción abierta."""
+        with self._condicion:
+            registro = self._en_uso.pop(id(conexion), None)
+        if registro is None:
+            # No pertenece al pool (o ya fue devuelta)
+            if not conexion.closed:
+                conexion.close()
+            return
+
+        if discard or not self._restablecer(conexion):
+            self._contar("_descartadas")
+            self._descartar(registro)
+            return
+        if self._expirada(registro, time.monotonic()):
+            self._contar("_recicladas")
+            self._descartar(registro)
+            return
+
+        registro.ultimo_uso = time.monotonic()
+        with self._condicion:
+            if not self._cerrado:
+                self._ociosas.append(registro)
+                self._condicion.notify()
+                return
+            self._total -= 1
+        self._cerrar(registro)
+
+    # --- Métricas ---
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Foto de la ocupación del pool y de sus contadores desde el arranque."""
+        with self._condicion:
+            latencias = sorted(self._latencias)
+            foto = {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "abiertas": self._total,
+                "en_uso": len(self._en_uso),
+                "ociosas": len(self._ociosas),
+                "esperando": self._esperando,
+                "max_esperando": self._max_esperando,
+                "adquisiciones": self._adquisiciones,
+                "agotadas": self._agotadas,
+                "creadas": self._creadas,
+                "recicladas": self._recicladas,
+                "cerradas_inactivas": self._cerradas_inactivas,
+                "descartadas": self._descartadas,
+                "pings_fallidos": self._pings_fallidos,
+            }
+        foto["adquisicion_ms"] = {
+            "p50": _percentil_ms(latencias, 0.50),
+            "p95": _percentil_ms(latencias, 0.95),
+            "p99": _percentil_ms(latencias, 0.99),
+            "max": _percentil_ms(latencias, 1.0),
+            "muestras": len(latencias),
+        }
+        return foto
+
+    # --- Internos ---
+
+    def _reservar(self, limite: float) -> Optional[_RegistroConexion]:
+        """
+        Devuelve una conexión ociosa, o None si se reservó un hueco para abrir
+        una nueva. Espera en la cola acotada cuando el pool está lleno.
+        """
+        with self._condicion:
+            while True:
+                if self._cerrado:
+                    raise ConexionNoDisponibleError("El pool de conexiones está cerrado")
+                if self._ociosas:
+                    # LIFO: la conexión más reciente tiene menos riesgo de estar muerta
+                    return self._ociosas.pop()
+                if self._total < self.max_size:
+                    self._total += 1
+                    return None
+                if self._esperando >= self.max_waiting:
+                    raise ConexionNoDisponibleError(
+                        f"Pool de conexiones saturado ({self.max_size} en uso, {self._esperando} en espera)"
+                    )
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise ConexionNoDisponibleError("No se obtuvo una conexión del pool a tiempo")
+                self._esperando += 1
+                self._max_esperando = max(self._max_esperando, self._esperando)
+                try:
+                    self._condicion.wait(restante)
+                finally:
+                    self._esperando -= 1
+
+    def _conectar(self):
+        conexion = psycopg2.connect(**self.connect_kwargs)
+        self._contar("_creadas")
+        return conexion
+
+    def _contar(self, contador: str) -> None:
+        with self._condicion:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def _es_reutilizable(self, registro: _RegistroConexion) -> bool:
+        ahora = time.monotonic()
+        if registro.conexion.closed:
+            self._contar("_descartadas")
+            return False
+        if self._expirada(registro, ahora):
+            self._contar("_recicladas")
+            return False
+        if self.pre_ping and ahora - registro.ultimo_uso >= self.pre_ping_idle:
+            return self._ping(registro.conexion)
+        return True
+
+    def _expirada(self, registro: _RegistroConexion, ahora: float) -> bool:
+        return bool(self.max_lifetime) and ahora - registro.creada_en >= self.max_lifetime
+
+    def _ping(self, conexion) -> bool:
+        try:
+            with conexion.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conexion.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"⚠️ Conexión descartada por pre-ping fallido: {e}")
+            self._contar("_pings_fallidos")
+            return False
+
+    def _restablecer(self, conexion) -> bool:
+        """Deja la conexión lista para el siguiente uso; False si no es recuperable."""
+        if conexion.closed:
+            return False
+        try:
+            estado = conexion.get_transaction_status()
+            if estado == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if estado != extensions.TRANSACTION_STATUS_IDLE:
+                conexion.rollback()
+            if conexion.autocommit:
+                conexion.autocommit = False
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _descartar(self, registro: _RegistroConexion) -> None:
+        self._liberar_hueco()
+        self._cerrar(registro)
+
+    def _liberar_hueco(self) -> None:
+        with self._condicion:
+            self._total -= 1
+            self._condicion.notify()
+
+    @staticmethod
+    def _cerrar(registro: _RegistroConexion) -> None:
+        try:
+            if not registro.conexion.closed:
+                registro.conexion.close()
+        except psycopg2.Error:
+            pass
+
+    def _rellenar_minimo(self) -> None:
+        while True:
+            with self._condicion:
+                if self._cerrado or self._total >= self.min_size:
+                    return
+                self._total += 1
+            try:
+                registro = _RegistroConexion(self._conectar())
+            except psycopg2.Error as e:
+                self._liberar_hueco()
+                logger.warning(f"⚠️ No se pudo precalentar el pool de conexiones: {e}")
+                return
+            with self._condicion:
+                self._ociosas.appendleft(registro)
+                self._condicion.notify()
+
+    def _bucle_mantenimiento(self) -> None:
+        while not self._detener_mantenimiento.wait(self.reap_interval):
+            try:
+                self._cosechar()
+                self._rellenar_minimo()
+            except Exception as e:
+                logger.error(f"❌ Error en el mantenimiento del pool: {e}", exc_info=True)
+
+    def _cosechar(self) -> None:
+        """Cierra conexiones ociosas vencidas por inactividad o por tiempo de vida."""
+        ahora = time.monotonic()
+        cerrar = []
+        with self._condicion:
+            conservar: Deque[_RegistroConexion] = deque()
+            abiertas = self._total
+            # Las conexiones usadas hace más tiempo quedan al inicio de la cola
+            for registro in self._ociosas:
+                ocioso = self.max_idle and ahora - registro.ultimo_uso >= self.max_idle
+                if self._expirada(registro, ahora):
+                    self._recicladas += 1
+                elif ocioso and abiertas > self.min_size:
+                    self._cerradas_inactivas += 1
+                else:
+                    conservar.append(registro)
+                    continue
+                cerrar.append(registro)
+                abiertas -= 1
+            self._ociosas = conservar
+            self._total -= len(cerrar)
+            if cerrar:
+                self._condicion.notify_all()
+        for registro in cerrar:
+            self._cerrar(registro)
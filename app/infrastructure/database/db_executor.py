@@ -0,0 +1,64 @@
+# infrastructure/database/db_executor.py
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+from infrastructure.database.postgresql_repository import DB_POOL_MAX_SIZE
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# "executor": las llamadas a la base de datos corren en un pool de hilos propio
+# "inline": se ejecutan en el hilo del event loop (comportamiento anterior)
+DB_ASYNC_MODE = os.getenv("DB_ASYNC_MODE", "executor").lower()
+# Por defecto un hilo por conexión del pool: más hilos solo esperarían al pool
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_MAX_SIZE)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Devuelve el pool de hilos dedicado al acceso a datos (se crea en el primer uso)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_WORKERS,
+                    thread_name_prefix="postgresql-db"
+                )
+    return _executor
+
+
+def shutdown_db_executor() -> None:
+    """Detiene el pool de hilos esperando a que terminen las consultas en curso."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def ejecutar_en_bd(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Ejecuta una llamada bloqueante de servicio o repositorio sin detener el event loop.
+
+    Los endpoints `async def` deben esperar sus llamadas a servicios con
+    `await ejecutar_en_bd(service.metodo, ...)`. Las variables de contexto de la
+    petición se copian al hilo que ejecuta la llamada.
+    """
+    if DB_ASYNC_MODE == "inline":
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    contexto = contextvars.copy_context()
+    llamada = functools.partial(contexto.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_db_executor(), llamada)
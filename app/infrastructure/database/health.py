@@ -0,0 +1,100 @@
+# infrastructure/database/health.py
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from infrastructure.busqueda.indice_alimentos import indice_alimentos
+from infrastructure.cache.cache_catalogo import cache_catalogo
+from infrastructure.cache.cache_recibos import cache_recibos
+from infrastructure.cache.escucha_invalidaciones import escucha_invalidaciones
+from infrastructure.cache.invalidacion import bus_invalidacion
+from infrastructure.database import db_executor
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.prepared_statements import registro_sentencias
+from infrastructure.database.query_deadlines import estadisticas_plazos
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Segundos que se reutiliza el resultado del SELECT 1 del health check profundo
+DB_HEALTH_CACHE_SECONDS = float(os.getenv("DB_HEALTH_CACHE_SECONDS", "5"))
+# Espera máxima por una conexión del pool durante el chequeo
+DB_HEALTH_TIMEOUT = float(os.getenv("DB_HEALTH_TIMEOUT", "1"))
+
+
+class VerificadorSaludBD:
+    """
+    Health check profundo: un `SELECT 1` contra el primario cacheado `ttl` segundos.
+
+    Los balanceadores sondean con frecuencia; con la caché, como mucho una
+    sonda por intervalo llega a la base de datos y las demás reciben el último
+    resultado. Si una sonda ya está en curso, las concurrentes no esperan a la
+    base de datos: reciben el resultado anterior.
+    """
+
+    def __init__(self, connection_manager: PostgresqlConnectionManager,
+                 ttl: float = DB_HEALTH_CACHE_SECONDS, timeout: float = DB_HEALTH_TIMEOUT):
+        self.connection_manager = connection_manager
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sondeando = False
+        self._resultado: Optional[Dict[str, Any]] = None
+        self._vence = 0.0
+
+    def verificar(self) -> Dict[str, Any]:
+        with self._lock:
+            ahora = time.monotonic()
+            vigente = self._resultado is not None and ahora < self._vence
+            if vigente or (self._sondeando and self._resultado is not None):
+                return {**self._resultado, "cacheado": True}
+            self._sondeando = True
+        try:
+            resultado = self._sondear()
+        finally:
+            with self._lock:
+                self._sondeando = False
+        with self._lock:
+            self._resultado = resultado
+            self._vence = time.monotonic() + self.ttl
+        return {**resultado, "cacheado": False}
+
+    def _sondear(self) -> Dict[str, Any]:
+        inicio = time.monotonic()
+        pool = self.connection_manager.pool
+        conexion = None
+        try:
+            conexion = pool.acquire(timeout=self.timeout)
+            with conexion.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            return {"ok": True, "latencia_ms": round((time.monotonic() - inicio) * 1000, 3)}
+        except Exception as e:
+            logger.warning(f"⚠️ Health check de base de datos fallido: {e}")
+            return {"ok": False, "latencia_ms": round((time.monotonic() - inicio) * 1000, 3), "error": str(e)}
+        finally:
+            if conexion is not None:
+                pool.release(conexion)
+
+
+def estadisticas_bd(connection_manager: PostgresqlConnectionManager) -> Dict[str, Any]:
+    """Todas las métricas de acceso a datos en un solo documento para operaciones."""
+    return {
+        **connection_manager.estadisticas(),
+        "executor": {"modo": db_executor.DB_ASYNC_MODE, "hilos": db_executor.DB_EXECUTOR_WORKERS},
+        "sentencias_preparadas": registro_sentencias.estadisticas(),
+        "plazos": estadisticas_plazos(),
+        "caches": {
+            "recibos": cache_recibos.estadisticas(),
+            "catalogo": cache_catalogo.estadisticas(),
+            "invalidaciones_publicadas": bus_invalidacion.estadisticas(),
+            "escucha_invalidaciones": escucha_invalidaciones.estadisticas(),
+            "busqueda_alimentos": indice_alimentos.estadisticas(),
+        },
+    }
@@ -0,0 +1,77 @@
+# infrastructure/database/libro_saldos.py
+"""
+Tareas del libro de saldos: fotos periódicas y conciliación con la columna saldo.
+
+Uso (desde la carpeta app/):
+
+    python -m infrastructure.database.libro_saldos fotos                  # toma las fotos pendientes
+    python -m infrastructure.database.libro_saldos conciliar              # libro (fotos + delta) vs saldo
+    python -m infrastructure.database.libro_saldos conciliar --desde-cero # suma todo el historial
+
+`conciliar` sale con código 1 si algún titular no cuadra, para usarlo en cron
+o en la verificación de un despliegue.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from infrastructure.database.db_executor import ejecutar_en_bd
+from infrastructure.database.postgresql_movimiento_saldo_repository import (
+    MARGEN_FOTOS_SEGUNDOS, PostgresqlMovimientoSaldoRepository
+)
+from infrastructure.database.postgresql_repository import get_connection_manager
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto toma fotos la propia API (0 lo desactiva, p. ej. si se usa cron)
+INTERVALO_FOTOS_SEGUNDOS = int(os.getenv("SALDOS_SNAPSHOT_INTERVAL_SECONDS", "3600"))
+
+
+async def tomar_fotos_periodicamente(repositorio: PostgresqlMovimientoSaldoRepository,
+                                     intervalo: int = INTERVALO_FOTOS_SEGUNDOS) -> None:
+    """Bucle de fondo de la API. Varias instancias pueden correrlo: las fotos repetidas se ignoran."""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            await ejecutar_en_bd(repositorio.tomar_fotos)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudieron tomar las fotos de saldo: {e}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m infrastructure.database.libro_saldos")
+    parser.add_argument("comando", choices=["fotos", "conciliar"])
+    parser.add_argument("--desde-cero", action="store_true", help="conciliar ignorando las fotos")
+    parser.add_argument("--margen", type=int, default=MARGEN_FOTOS_SEGUNDOS,
+                        help="antigüedad mínima (s) de los movimientos que entran en una foto")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    connection_manager = get_connection_manager()
+    connection_manager.open()
+    repositorio = PostgresqlMovimientoSaldoRepository(connection_manager)
+    try:
+        if args.comando == "fotos":
+            print(f"✅ Fotos de saldo tomadas: {repositorio.tomar_fotos(args.margen)}")
+            return 0
+
+        descuadres = repositorio.conciliar(desde_cero=args.desde_cero)
+        for d in descuadres:
+            print(f"❌ {d['titular_tipo']} {d['titular_id']}: saldo {d['saldo']} | "
+                  f"libro {d['saldo_libro']} | diferencia {d['diferencia']}")
+        if descuadres:
+            print(f"❌ {len(descuadres)} titular(es) no cuadran con el libro")
+            return 1
+        print("✅ El libro de saldos cuadra con todos los saldos")
+        return 0
+    finally:
+        connection_manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
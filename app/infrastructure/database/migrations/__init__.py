@@ -0,0 +1,20 @@
+# infrastructure/database/migrations/__init__.py
+
+from infrastructure.database.migrations.migrador import Migracion, MigracionError, Migrador, cargar_migraciones
+from infrastructure.database.migrations.normalizacion import sql_normalizar_busqueda
+from infrastructure.database.migrations.verificacion import (
+    CONSULTAS_FRECUENTES,
+    verificar_indices,
+    verificar_normalizacion,
+)
+
+__all__ = [
+    "Migracion",
+    "MigracionError",
+    "Migrador",
+    "cargar_migraciones",
+    "CONSULTAS_FRECUENTES",
+    "verificar_indices",
+    "verificar_normalizacion",
+    "sql_normalizar_busqueda",
+]
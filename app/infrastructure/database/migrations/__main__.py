@@ -0,0 +1,63 @@
+# infrastructure/database/migrations/__main__.py
+"""
+Uso (desde la carpeta app/):
+
+    python -m infrastructure.database.migrations aplicar     # aplica las pendientes
+    python -m infrastructure.database.migrations estado      # lista aplicadas / pendientes
+    python -m infrastructure.database.migrations verificar   # EXPLAIN de las consultas frecuentes y normalizar_busqueda()
+    python -m infrastructure.database.migrations normalizacion  # imprime normalizar_busqueda() generada de TextNormalizer
+"""
+
+import argparse
+import logging
+import sys
+
+from infrastructure.database.migrations import Migrador, sql_normalizar_busqueda, verificar_indices, verificar_normalizacion
+from infrastructure.database.postgresql_repository import get_connection_manager
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m infrastructure.database.migrations")
+    parser.add_argument("comando", choices=["aplicar", "estado", "verificar", "normalizacion"], nargs="?", default="aplicar")
+    args = parser.parse_args()
+
+    if args.comando == "normalizacion":
+        print(sql_normalizar_busqueda(), end="")
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    connection_manager = get_connection_manager()
+    try:
+        if args.comando == "aplicar":
+            aplicadas = Migrador(connection_manager).aplicar()
+            print(f"✅ Migraciones aplicadas: {', '.join(aplicadas)}" if aplicadas else "✅ El esquema ya está al día")
+            return 0
+
+        if args.comando == "estado":
+            for migracion in Migrador(connection_manager).estado():
+                print(f"{migracion['version']}  {migracion['estado']:<10}  {migracion['nombre']}")
+            return 0
+
+        fallos = 0
+        for resultado in verificar_indices(connection_manager):
+            marca = "✅" if resultado["ok"] else "❌"
+            usados = ", ".join(i for i in resultado["indices_usados"] if i) or "seq scan"
+            print(f"{marca} {resultado['consulta']}: {usados} (esperado {' o '.join(resultado['indices_aceptados'])})")
+            fallos += not resultado["ok"]
+
+        diferencias = verificar_normalizacion(connection_manager)
+        for diferencia in diferencias[:20]:
+            print(f"❌ normalizar_busqueda({diferencia['texto']!r}) = {diferencia['sql']!r}, "
+                  f"TextNormalizer da {diferencia['python']!r}")
+        if diferencias:
+            print(f"❌ normalizar_busqueda() difiere de TextNormalizer en {len(diferencias)} textos")
+        else:
+            print("✅ normalizar_busqueda() coincide con TextNormalizer en el catálogo y en cada carácter")
+        fallos += bool(diferencias)
+        return 1 if fallos else 0
+    finally:
+        connection_manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# infrastructure/database/migrations/migrador.py
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from domain.exceptions.exceptions import RepositoryError
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_VERSIONES = Path(__file__).parent / "versiones"
+
+# Clave fija del advisory lock: serializa migraciones entre instancias que arrancan a la vez
+_CLAVE_BLOQUEO = 7_412_003_001
+
+_NOMBRE_ARCHIVO = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+_SIN_TRANSACCION = "-- migracion: sin-transaccion"
+
+
+class MigracionError(RepositoryError):
+    """Se lanza cuando una migración no puede aplicarse o no coincide con la registrada"""
+    pass
+
+
+@dataclass(frozen=True)
+class Migracion:
+    version: str
+    nombre: str
+    sql: str
+    checksum: str
+    transaccional: bool
+
+    @property
+    def sentencias(self) -> List[str]:
+        """Sentencias individuales, para migraciones fuera de transacción (CREATE INDEX CONCURRENTLY)."""
+        sin_comentarios = "\n".join(
+            linea for linea in self.sql.splitlines() if not linea.strip().startswith("--")
+        )
+        return [s.strip() for s in sin_comentarios.split(";") if s.strip()]
+
+
+def cargar_migraciones(directorio: Path = DIRECTORIO_VERSIONES) -> List[Migracion]:
+    """Lee los archivos NNNN_nombre.sql en orden de versión."""
+    migraciones = []
+    for archivo in sorted(directorio.glob("*.sql")):
+        coincidencia = _NOMBRE_ARCHIVO.match(archivo.name)
+        if not coincidencia:
+            raise MigracionError(f"Nombre de migración inválido: {archivo.name}")
+        sql = archivo.read_text(encoding="utf-8")
+        migraciones.append(Migracion(
+            version=coincidencia.group(1),
+            nombre=coincidencia.group(2),
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+            transaccional=not sql.lstrip().startswith(_SIN_TRANSACCION)
+        ))
+    return migraciones
+
+
+class Migrador:
+    """
+    Aplica las migraciones pendientes y registra cada una en `schema_migrations`.
+
+    Un advisory lock de sesión garantiza que una sola instancia migre a la vez.
+    Cada migración transaccional se aplica en su propia transacción; las
+    marcadas como `sin-transaccion` se ejecutan sentencia a sentencia y por eso
+    deben ser idempotentes (IF NOT EXISTS).
+    """
+
+    def __init__(self, connection_manager: PostgresqlConnectionManager, directorio: Path = DIRECTORIO_VERSIONES):
+        self.connection_manager = connection_manager
+        self.directorio = directorio
+
+    def aplicar(self) -> List[str]:
+        """Aplica las migraciones pendientes y devuelve las versiones aplicadas."""
+        migraciones = cargar_migraciones(self.directorio)
+        aplicadas = []
+        with self.connection_manager.get_connection() as conn:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(%s)", (_CLAVE_BLOQUEO,))
+                try:
+                    self._crear_tabla_control(cursor)
+                    registradas = self._registradas(cursor)
+                    for migracion in migraciones:
+                        if migracion.version in registradas:
+                            if registradas[migracion.version] != migracion.checksum:
+                                raise MigracionError(
+                                    f"La migración {migracion.version}_{migracion.nombre} cambió después de aplicarse"
+                                )
+                            continue
+                        self._aplicar_una(conn, cursor, migracion)
+                        aplicadas.append(migracion.version)
+                finally:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (_CLAVE_BLOQUEO,))
+        return aplicadas
+
+    def estado(self) -> List[Dict[str, str]]:
+        """Lista cada migración conocida con su estado (aplicada / pendiente / modificada)."""
+        migraciones = cargar_migraciones(self.directorio)
+        with self.connection_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                self._crear_tabla_control(cursor)
+                registradas = self._registradas(cursor)
+                conn.commit()
+        resultado = []
+        for migracion in migraciones:
+            checksum = registradas.get(migracion.version)
+            if checksum is None:
+                estado = "pendiente"
+            elif checksum != migracion.checksum:
+                estado = "modificada"
+            else:
+                estado = "aplicada"
+            resultado.append({"version": migracion.version, "nombre": migracion.nombre, "estado": estado})
+        return resultado
+
+    @staticmethod
+    def _crear_tabla_control(cursor) -> None:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version     VARCHAR(4) PRIMARY KEY,
+                nombre      VARCHAR(200) NOT NULL,
+                checksum    CHAR(64) NOT NULL,
+                aplicada_en TIMESTAMP NOT NULL DEFAULT now()
+            )
+        """)
+
+    @staticmethod
+    def _registradas(cursor) -> Dict[str, str]:
+        cursor.execute("SELECT version, checksum FROM schema_migrations")
+        return {fila["version"]: fila["checksum"] for fila in cursor.fetchall()}
+
+    @staticmethod
+    def _aplicar_una(conn, cursor, migracion: Migracion) -> None:
+        logger.info(f"🔧 Aplicando migración {migracion.version}_{migracion.nombre}")
+        registro = (
+            "INSERT INTO schema_migrations (version, nombre, checksum) VALUES (%s, %s, %s)",
+            (migracion.version, migracion.nombre, migracion.checksum)
+        )
+        try:
+            if migracion.transaccional:
+                cursor.execute("BEGIN")
+                try:
+                    cursor.execute(migracion.sql)
+                    cursor.execute(*registro)
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+            else:
+                for sentencia in migracion.sentencias:
+                    cursor.execute(sentencia)
+                cursor.execute(*registro)
+        except Exception as e:
+            if not migracion.transaccional:
+                logger.error(
+                    "❌ Migración fuera de transacción interrumpida: revisa índices inválidos "
+                    "(pg_index.indisvalid = false) y bórralos antes de reintentar"
+                )
+            raise MigracionError(f"Error aplicando la migración {migracion.version}_{migracion.nombre}: {e}") from e
+        logger.info(f"✅ Migración {migracion.version}_{migracion.nombre} aplicada")
@@ -0,0 +1,100 @@
+# infrastructure/database/migrations/normalizacion.py
+"""
+normalizar_busqueda() de la base de datos, generada a partir de
+TextNormalizer.normalizar_nombre para que ambas den el mismo texto.
+
+TextNormalizer trata cada carácter por separado (NFD, sin marcas Mn, en
+mayúsculas y solo A-Z, 0-9 y espacios), así que su efecto cabe en una tabla
+carácter -> resultado: translate() para los que dan una letra o un espacio,
+replace() para los pocos que dan varias (ß -> SS, ligaduras) y una expresión
+regular que quita el resto. No depende de unaccent ni de la configuración
+regional del servidor.
+
+Para regenerar la función tras cambiar TextNormalizer:
+
+    python -m infrastructure.database.migrations normalizacion
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from infrastructure.utils.text_normalizer import TextNormalizer
+
+_CONSERVADOS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "
+_CARACTERES_POR_LINEA = 16
+
+
+@lru_cache(maxsize=1)
+def tabla_normalizacion() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Caracteres que TextNormalizer no quita ni deja igual: (los que dan un solo
+    carácter, los que dan varios). Los espacios de cualquier tipo dan ' '.
+    """
+    simples: Dict[str, str] = {}
+    multiples: Dict[str, str] = {}
+    for codigo in range(0x110000):
+        if 0xD800 <= codigo <= 0xDFFF:
+            continue
+        caracter = chr(codigo)
+        if caracter in _CONSERVADOS:
+            continue
+        # Entre dos letras para distinguir un espacio (queda "X X") de un carácter que se quita
+        resultado = TextNormalizer.normalizar_nombre(f"X{caracter}X")
+        if resultado == "X X":
+            simples[caracter] = " "
+        elif len(resultado) == 3:
+            simples[caracter] = resultado[1]
+        elif len(resultado) > 3:
+            multiples[caracter] = resultado[1:-1]
+    return simples, multiples
+
+
+def _literal(texto: str) -> str:
+    """Literal de SQL con escapes Unicode para todo lo que no sea ASCII visible."""
+    partes = []
+    for caracter in texto:
+        codigo = ord(caracter)
+        if caracter == "'":
+            partes.append("''")
+        elif caracter == "\\":
+            partes.append("\\\\")
+        elif 0x20 <= codigo < 0x7F:
+            partes.append(caracter)
+        elif codigo <= 0xFFFF:
+            partes.append(f"\\{codigo:04X}")
+        else:
+            partes.append(f"\\+{codigo:06X}")
+    return "U&'" + "".join(partes) + "'"
+
+
+def _literal_partido(texto: str, sangria: str) -> str:
+    lineas = [_literal(texto[i:i + _CARACTERES_POR_LINEA]) for i in range(0, len(texto), _CARACTERES_POR_LINEA)]
+    return f"\n{sangria}|| ".join(lineas)
+
+
+def sql_normalizar_busqueda() -> str:
+    """CREATE FUNCTION normalizar_busqueda generada desde TextNormalizer."""
+    simples, multiples = tabla_normalizacion()
+    # Los conservados van primero y se traducen a sí mismos: translate() busca cada carácter de
+    # forma lineal en la lista, y así el texto habitual se resuelve en las primeras posiciones
+    desde = _CONSERVADOS + "".join(simples)
+    hacia = _CONSERVADOS + "".join(simples.values())
+    texto = "texto"
+    for caracter, resultado in multiples.items():
+        texto = f"replace({texto}, {_literal(caracter)}, {_literal(resultado)})"
+    sangria = " " * 12
+    return (
+        "CREATE OR REPLACE FUNCTION normalizar_busqueda(texto TEXT) RETURNS TEXT AS $$\n"
+        "    SELECT btrim(regexp_replace(regexp_replace(\n"
+        f"        translate({texto},\n"
+        f"            {_literal_partido(desde, sangria)},\n"
+        f"            {_literal_partido(hacia, sangria)}),\n"
+        "        '[^A-Z0-9 ]', '', 'g'), ' +', ' ', 'g'))\n"
+        "$$ LANGUAGE sql IMMUTABLE STRICT;\n"
+    )
+
+
+def muestras_normalizacion() -> List[str]:
+    """Cada carácter de la tabla entre dos letras, para comparar ambas normalizaciones."""
+    simples, multiples = tabla_normalizacion()
+    return [f"a{caracter}b" for caracter in [*simples, *multiples]]
@@ -0,0 +1,138 @@
+# infrastructure/database/migrations/verificacion.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from infrastructure.database.migrations.normalizacion import muestras_normalizacion
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.row_mapper import cursor_tuplas
+from infrastructure.utils.text_normalizer import TextNormalizer
+
+_NODOS_INDICE = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+@dataclass(frozen=True)
+class ConsultaFrecuente:
+    nombre: str
+    sql: str
+    parametros: Tuple
+    indices_aceptados: Tuple[str, ...]
+
+
+# Las mismas formas de consulta que usan los repositorios
+CONSULTAS_FRECUENTES: List[ConsultaFrecuente] = [
+    ConsultaFrecuente("compras por usuario",
+                      "SELECT id FROM compras WHERE usuario_id = %s ORDER BY fecha DESC, id DESC",
+                      (1,), ("idx_compras_usuario_fecha_id",)),
+    ConsultaFrecuente("página de compras por usuario",
+                      "SELECT id FROM compras WHERE usuario_id = %s AND (fecha, id) < (%s, %s) "
+                      "ORDER BY fecha DESC, id DESC LIMIT %s",
+                      (1, "2030-01-01", 1, 51), ("idx_compras_usuario_fecha_id",)),
+    ConsultaFrecuente("página de compras",
+                      "SELECT id FROM compras WHERE (fecha, id) < (%s, %s) ORDER BY fecha DESC, id DESC LIMIT %s",
+                      ("2030-01-01", 1, 51), ("idx_compras_fecha_id",)),
+    ConsultaFrecuente("items de una compra",
+                      "SELECT ci.producto_id, ci.cantidad FROM compra_items ci WHERE ci.compra_id = %s",
+                      (1,), ("idx_compra_items_compra",)),
+    ConsultaFrecuente("precompras de un estudiante",
+                      "SELECT * FROM precompras WHERE id_estudiante = %s AND activo = TRUE ORDER BY fecha_precompra DESC",
+                      (1,), ("idx_precompras_estudiante",)),
+    ConsultaFrecuente("precompras pendientes",
+                      "SELECT * FROM precompras WHERE entregado = FALSE AND activo = TRUE ORDER BY fecha_precompra ASC",
+                      (), ("idx_precompras_pendientes",)),
+    ConsultaFrecuente("precompras pendientes de un estudiante",
+                      "SELECT * FROM precompras WHERE id_estudiante = %s AND entregado = FALSE AND activo = TRUE "
+                      "ORDER BY fecha_precompra ASC",
+                      (1,), ("idx_precompras_estudiante", "idx_precompras_pendientes")),
+    ConsultaFrecuente("recarga por referencia WOMPI",
+                      "SELECT id FROM recharges WHERE wompi_reference = %s",
+                      ("REF",), ("idx_recharges_wompi_reference",)),
+    ConsultaFrecuente("recargas de un usuario",
+                      "SELECT id FROM recharges WHERE user_id = %s ORDER BY created_at DESC LIMIT %s",
+                      (1, 10), ("idx_recharges_user_created",)),
+    ConsultaFrecuente("estudiante por cédula",
+                      "SELECT id FROM estudiantes WHERE cedula = %s",
+                      ("123",), ("idx_estudiantes_cedula",)),
+    ConsultaFrecuente("hijos de un responsable",
+                      "SELECT id FROM estudiantes WHERE responsablefinanciero = %s",
+                      ("padre@correo.com",), ("idx_estudiantes_responsable",)),
+    ConsultaFrecuente("alimento por nombre",
+                      "SELECT id FROM alimentos WHERE LOWER(nombre) = LOWER(%s) AND activo = TRUE",
+                      ("Empanada",), ("idx_alimentos_nombre_lower",)),
+    ConsultaFrecuente("cambios del catálogo desde una versión",
+                      "SELECT id FROM alimentos WHERE version > %s ORDER BY version LIMIT %s",
+                      (0, 501), ("idx_alimentos_version",)),
+    ConsultaFrecuente("recarga crypto por tx_hash",
+                      "SELECT id FROM recargas_crypto WHERE tx_hash = %s",
+                      ("0xabc",), ("idx_recargas_crypto_tx_hash",)),
+    ConsultaFrecuente("movimientos de saldo desde la última foto",
+                      "SELECT SUM(monto) FROM movimientos_saldo "
+                      "WHERE titular_tipo = %s AND titular_id = %s AND id > %s",
+                      ("estudiante", 1, 0), ("idx_movimientos_saldo_titular",)),
+]
+
+
+def _indices_del_plan(nodo: Dict[str, Any]) -> List[str]:
+    encontrados = []
+    if nodo.get("Node Type") in _NODOS_INDICE:
+        encontrados.append(nodo.get("Index Name"))
+    for hijo in nodo.get("Plans", []):
+        encontrados.extend(_indices_del_plan(hijo))
+    return encontrados
+
+
+def verificar_indices(connection_manager: PostgresqlConnectionManager,
+                      consultas: Optional[List[ConsultaFrecuente]] = None) -> List[Dict[str, Any]]:
+    """
+    Ejecuta EXPLAIN sobre cada consulta frecuente y comprueba que use uno de sus índices.
+
+    Con tablas pequeñas el planificador prefiere un seq scan aunque exista el
+    índice, así que se desactiva enable_seqscan dentro de una transacción que
+    luego se deshace: si aun así no aparece un index scan, el índice falta.
+    """
+    resultados = []
+    with connection_manager.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            for consulta in consultas or CONSULTAS_FRECUENTES:
+                cursor.execute("EXPLAIN (FORMAT JSON) " + consulta.sql, consulta.parametros)
+                fila = cursor.fetchone()
+                plan = (fila["QUERY PLAN"] if isinstance(fila, dict) else fila[0])[0]["Plan"]
+                indices = _indices_del_plan(plan)
+                resultados.append({
+                    "consulta": consulta.nombre,
+                    "indices_aceptados": consulta.indices_aceptados,
+                    "indices_usados": indices,
+                    "ok": any(indice in indices for indice in consulta.indices_aceptados),
+                })
+        conn.rollback()
+    return resultados
+
+
+# Los mismos textos que indexa idx_alimentos_busqueda_trgm, más nombres y categorías por separado
+_TEXTOS_CATALOGO = """
+    SELECT nombre || ' ' || COALESCE(categoria, '') FROM alimentos
+    UNION SELECT nombre FROM alimentos
+    UNION SELECT categoria FROM alimentos WHERE categoria IS NOT NULL
+"""
+
+
+def verificar_normalizacion(connection_manager: PostgresqlConnectionManager) -> List[Dict[str, str]]:
+    """
+    Compara normalizar_busqueda() de la base con TextNormalizer.normalizar_nombre
+    sobre los textos del catálogo y sobre cada carácter que TextNormalizer
+    transforma. Devuelve las diferencias; vacía si ambas coinciden.
+    """
+    with connection_manager.get_connection() as conn:
+        with cursor_tuplas(conn) as cursor:
+            cursor.execute(_TEXTOS_CATALOGO)
+            textos = [fila[0] for fila in cursor.fetchall()] + muestras_normalizacion()
+            cursor.execute("SELECT texto, normalizar_busqueda(texto) FROM unnest(%s::text[]) AS texto", (textos,))
+            filas = cursor.fetchall()
+        conn.rollback()
+    diferencias = []
+    for texto, en_sql in filas:
+        en_python = TextNormalizer.normalizar_nombre(texto)
+        if en_sql != en_python:
+            diferencias.append({"texto": texto, "sql": en_sql, "python": en_python})
+    return diferencias
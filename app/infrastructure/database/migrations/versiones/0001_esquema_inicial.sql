@@ -0,0 +1,102 @@
+-- Esquema base de FoodCash.
+-- Idempotente: en bases existentes solo crea las tablas que falten.
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id          SERIAL PRIMARY KEY,
+    usuario     VARCHAR(100) NOT NULL UNIQUE,
+    contrasena  VARCHAR(255) NOT NULL,
+    nombre      VARCHAR(150) NOT NULL,
+    rol         VARCHAR(20)  NOT NULL,
+    saldo       NUMERIC(12, 2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS estudiantes (
+    id                     SERIAL PRIMARY KEY,
+    nombre                 VARCHAR(150) NOT NULL,
+    email                  VARCHAR(150),
+    fecha_nacimiento       DATE,
+    responsablefinanciero  VARCHAR(100),
+    saldo                  NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    cedula                 VARCHAR(20)
+);
+
+CREATE TABLE IF NOT EXISTS alimentos (
+    id                   SERIAL PRIMARY KEY,
+    nombre               VARCHAR(100) NOT NULL,
+    precio               NUMERIC(12, 2) NOT NULL,
+    cantidad_en_stock    INTEGER NOT NULL DEFAULT 0,
+    calorias             INTEGER,
+    imagen               TEXT,
+    categoria            VARCHAR(50),
+    fecha_creacion       TIMESTAMP NOT NULL DEFAULT now(),
+    fecha_actualizacion  TIMESTAMP NOT NULL DEFAULT now(),
+    activo               BOOLEAN NOT NULL DEFAULT TRUE
+);
+
+CREATE TABLE IF NOT EXISTS alimentos_bloqueados (
+    id_estudiante  INTEGER NOT NULL REFERENCES estudiantes (id) ON DELETE CASCADE,
+    id_alimento    INTEGER NOT NULL REFERENCES alimentos (id) ON DELETE CASCADE,
+    fecha_bloqueo  TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (id_estudiante, id_alimento)
+);
+
+-- usuario_id guarda el id del estudiante (POS y precompras) o del usuario que compra
+CREATE TABLE IF NOT EXISTS compras (
+    id          SERIAL PRIMARY KEY,
+    usuario_id  INTEGER NOT NULL,
+    fecha       TIMESTAMP NOT NULL DEFAULT now(),
+    total       NUMERIC(12, 2) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS compra_items (
+    id               SERIAL PRIMARY KEY,
+    compra_id        INTEGER NOT NULL REFERENCES compras (id) ON DELETE CASCADE,
+    producto_id      INTEGER NOT NULL REFERENCES alimentos (id),
+    cantidad         INTEGER NOT NULL CHECK (cantidad > 0),
+    precio_unitario  NUMERIC(12, 2) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS precompras (
+    id                   SERIAL PRIMARY KEY,
+    id_compra            INTEGER REFERENCES compras (id),
+    id_estudiante        INTEGER NOT NULL REFERENCES estudiantes (id),
+    fecha_precompra      TIMESTAMP NOT NULL DEFAULT now(),
+    costo_total          NUMERIC(12, 2) NOT NULL,
+    costo_adicional      NUMERIC(12, 2) NOT NULL DEFAULT 0,
+    entregado            BOOLEAN NOT NULL DEFAULT FALSE,
+    fecha_entrega        TIMESTAMP,
+    activo               BOOLEAN NOT NULL DEFAULT TRUE,
+    fecha_creacion       TIMESTAMP NOT NULL DEFAULT now(),
+    fecha_actualizacion  TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Recargas con WOMPI (estados PENDING, APPROVED, REJECTED, CANCELLED)
+CREATE TABLE IF NOT EXISTS recharges (
+    id                    VARCHAR(64) PRIMARY KEY,
+    user_id               INTEGER NOT NULL,
+    amount                NUMERIC(12, 2) NOT NULL,
+    status                VARCHAR(20) NOT NULL,
+    wompi_reference       VARCHAR(100),
+    wompi_transaction_id  VARCHAR(100),
+    created_at            TIMESTAMP NOT NULL DEFAULT now(),
+    updated_at            TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS recargas_crypto (
+    id                   VARCHAR(64) PRIMARY KEY,
+    usuario_id           INTEGER NOT NULL,
+    monto_cop            NUMERIC(14, 2) NOT NULL,
+    monto_crypto         NUMERIC(36, 18) NOT NULL,
+    tipo_crypto          VARCHAR(10) NOT NULL,
+    tasa_conversion      NUMERIC(36, 18) NOT NULL,
+    estado               VARCHAR(20) NOT NULL,
+    direccion_destino    VARCHAR(64) NOT NULL,
+    tx_hash              VARCHAR(80),
+    wallet_address       VARCHAR(64),
+    block_number         BIGINT,
+    fecha_creacion       TIMESTAMP NOT NULL DEFAULT now(),
+    fecha_actualizacion  TIMESTAMP NOT NULL DEFAULT now(),
+    fecha_confirmacion   TIMESTAMP,
+    mensaje              TEXT,
+    detalles_blockchain  JSONB
+);
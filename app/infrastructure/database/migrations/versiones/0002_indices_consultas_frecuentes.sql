@@ -0,0 +1,54 @@
+-- migracion: sin-transaccion
+-- Índices de las consultas frecuentes de los repositorios.
+-- CONCURRENTLY evita bloquear las escrituras del POS mientras se construyen,
+-- por eso esta migración se ejecuta sentencia a sentencia fuera de una transacción.
+
+-- Historial de compras por usuario (obtener_compras_por_usuario_id / ultimas)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_compras_usuario_fecha
+    ON compras (usuario_id, fecha DESC);
+
+-- Items de cada compra (obtener_compra_por_id y los listados de precompras)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_compra_items_compra
+    ON compra_items (compra_id);
+
+-- Precompras activas de un estudiante (también sirve a sus pendientes: son pocas filas)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_precompras_estudiante
+    ON precompras (id_estudiante, fecha_precompra DESC)
+    WHERE activo;
+
+-- Cola global de entregas pendientes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_precompras_pendientes
+    ON precompras (fecha_precompra)
+    WHERE activo AND NOT entregado;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_precompras_compra
+    ON precompras (id_compra)
+    WHERE activo;
+
+-- Webhook de WOMPI: búsqueda por referencia
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recharges_wompi_reference
+    ON recharges (wompi_reference);
+
+-- Historial de recargas por usuario
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recharges_user_created
+    ON recharges (user_id, created_at DESC);
+
+-- Búsqueda del estudiante en el POS y listado de hijos del responsable
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estudiantes_cedula
+    ON estudiantes (cedula);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estudiantes_responsable
+    ON estudiantes (responsablefinanciero);
+
+-- buscar_por_nombre compara LOWER(nombre) sobre alimentos activos
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alimentos_nombre_lower
+    ON alimentos (LOWER(nombre))
+    WHERE activo;
+
+-- Verificación de transacciones on-chain
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recargas_crypto_tx_hash
+    ON recargas_crypto (tx_hash)
+    WHERE tx_hash IS NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_recargas_crypto_usuario
+    ON recargas_crypto (usuario_id, fecha_creacion DESC);
@@ -0,0 +1,13 @@
+-- migracion: sin-transaccion
+-- Paginación por keyset de los listados de compras: ORDER BY fecha DESC, id DESC
+-- con WHERE (fecha, id) < (cursor). El id desempata compras con la misma fecha.
+
+-- GET /compras (todo el sistema)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_compras_fecha_id
+    ON compras (fecha DESC, id DESC);
+
+-- GET /compras/usuario/{usuario_id}; reemplaza a idx_compras_usuario_fecha
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_compras_usuario_fecha_id
+    ON compras (usuario_id, fecha DESC, id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_compras_usuario_fecha;
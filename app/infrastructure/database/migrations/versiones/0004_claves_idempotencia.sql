@@ -0,0 +1,24 @@
+-- Claves de idempotencia de los endpoints que mueven dinero o stock.
+-- Una fila por (alcance, clave): alcance es "MÉTODO /ruta" y clave la cabecera
+-- Idempotency-Key. Mientras la primera petición se ejecuta la fila está
+-- 'en_proceso'; al terminar guarda la respuesta para repetirla tal cual.
+
+CREATE TABLE IF NOT EXISTS claves_idempotencia (
+    alcance          VARCHAR(200) NOT NULL,
+    clave            VARCHAR(255) NOT NULL,
+    -- sha256 de método, ruta, query, credenciales y cuerpo de la petición original
+    huella           CHAR(64)     NOT NULL,
+    estado           VARCHAR(20)  NOT NULL CHECK (estado IN ('en_proceso', 'completada')),
+    codigo_estado    SMALLINT,
+    tipo_contenido   VARCHAR(100),
+    cuerpo           BYTEA,
+    -- Una reserva 'en_proceso' abandonada (proceso caído) se puede retomar después de esta fecha
+    bloqueada_hasta  TIMESTAMP    NOT NULL,
+    expira_en        TIMESTAMP    NOT NULL,
+    fecha_creacion   TIMESTAMP    NOT NULL DEFAULT now(),
+    PRIMARY KEY (alcance, clave)
+);
+
+-- Purga periódica de claves vencidas
+CREATE INDEX IF NOT EXISTS idx_claves_idempotencia_expira
+    ON claves_idempotencia (expira_en);
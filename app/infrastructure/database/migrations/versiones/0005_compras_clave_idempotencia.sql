@@ -0,0 +1,10 @@
+-- migracion: sin-transaccion
+-- Clave de idempotencia de las ventas del POS (en línea y sin conexión).
+-- Se guarda en la misma transacción que la compra: una venta sincronizada dos
+-- veces se reconoce aunque la respuesta de la primera se haya perdido.
+
+ALTER TABLE compras ADD COLUMN IF NOT EXISTS clave_idempotencia VARCHAR(255);
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_compras_clave_idempotencia
+    ON compras (clave_idempotencia)
+    WHERE clave_idempotencia IS NOT NULL;
@@ -0,0 +1,52 @@
+-- Libro de movimientos de saldo (solo inserciones) y fotos periódicas del saldo.
+-- Cada operación que cambia estudiantes.saldo o usuarios.saldo inserta aquí su
+-- movimiento en la misma transacción. El saldo de un titular es la última foto
+-- más la suma de los movimientos posteriores a ella.
+
+CREATE TABLE IF NOT EXISTS movimientos_saldo (
+    id            BIGSERIAL PRIMARY KEY,
+    titular_tipo  VARCHAR(20)    NOT NULL CHECK (titular_tipo IN ('estudiante', 'usuario')),
+    titular_id    INTEGER        NOT NULL,
+    tipo          VARCHAR(20)    NOT NULL CHECK (tipo IN ('apertura', 'recarga', 'compra', 'precompra', 'descarga', 'reembolso', 'ajuste')),
+    -- Con signo: positivo acredita, negativo debita
+    monto         NUMERIC(14, 2) NOT NULL CHECK (monto <> 0),
+    -- Compra, recarga o clave de idempotencia que originó el movimiento
+    referencia    VARCHAR(255),
+    -- Hora de inserción (no de inicio de la transacción): las fotos solo cubren
+    -- movimientos con más antigüedad que el margen, ya confirmados
+    fecha         TIMESTAMP      NOT NULL DEFAULT clock_timestamp()
+);
+
+-- Estado de cuenta y delta desde la última foto de un titular
+CREATE INDEX IF NOT EXISTS idx_movimientos_saldo_titular
+    ON movimientos_saldo (titular_tipo, titular_id, id);
+
+CREATE TABLE IF NOT EXISTS saldos_snapshot (
+    titular_tipo          VARCHAR(20)    NOT NULL,
+    titular_id            INTEGER        NOT NULL,
+    -- La foto incluye todos los movimientos con id <= ultimo_movimiento_id
+    ultimo_movimiento_id  BIGINT         NOT NULL,
+    saldo                 NUMERIC(14, 2) NOT NULL,
+    fecha                 TIMESTAMP      NOT NULL DEFAULT now(),
+    PRIMARY KEY (titular_tipo, titular_id, ultimo_movimiento_id)
+);
+
+-- Hasta dónde llegó la última toma de fotos
+CREATE INDEX IF NOT EXISTS idx_saldos_snapshot_ultimo_movimiento
+    ON saldos_snapshot (ultimo_movimiento_id);
+
+-- Los saldos anteriores al libro entran como un movimiento de apertura por
+-- titular, así el libro cuadra con la columna saldo desde el primer día.
+INSERT INTO movimientos_saldo (titular_tipo, titular_id, tipo, monto, referencia)
+SELECT 'estudiante', e.id, 'apertura', e.saldo, 'saldo inicial'
+FROM estudiantes e
+WHERE e.saldo <> 0
+  AND NOT EXISTS (SELECT 1 FROM movimientos_saldo m
+                  WHERE m.titular_tipo = 'estudiante' AND m.titular_id = e.id);
+
+INSERT INTO movimientos_saldo (titular_tipo, titular_id, tipo, monto, referencia)
+SELECT 'usuario', u.id, 'apertura', u.saldo, 'saldo inicial'
+FROM usuarios u
+WHERE u.saldo <> 0
+  AND NOT EXISTS (SELECT 1 FROM movimientos_saldo m
+                  WHERE m.titular_tipo = 'usuario' AND m.titular_id = u.id);
@@ -0,0 +1,56 @@
+-- Versión del catálogo de alimentos. Cada alta, cambio, baja lógica o
+-- movimiento de stock de un alimento toma el siguiente número del contador
+-- y lo guarda en alimentos.version; la versión del catálogo es el contador.
+--
+-- El contador es una sola fila que se actualiza dentro de la transacción que
+-- escribe: su bloqueo ordena a los escritores, así que las versiones crecen
+-- en el mismo orden en que se confirman (una secuencia no lo garantiza) y
+-- quien ya vio la versión N no puede recibir después un cambio con versión
+-- menor.
+
+CREATE TABLE IF NOT EXISTS catalogo_version (
+    unica    BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (unica),
+    version  BIGINT  NOT NULL
+);
+
+INSERT INTO catalogo_version (unica, version) VALUES (TRUE, 0)
+ON CONFLICT (unica) DO NOTHING;
+
+ALTER TABLE alimentos ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+
+-- Los alimentos existentes entran con versiones 1..n, antes de crear los disparadores
+UPDATE alimentos a
+SET version = numerados.version
+FROM (SELECT id, row_number() OVER (ORDER BY id) AS version FROM alimentos) AS numerados
+WHERE a.id = numerados.id;
+
+UPDATE catalogo_version SET version = (SELECT count(*) FROM alimentos);
+
+CREATE OR REPLACE FUNCTION alimentos_siguiente_version() RETURNS trigger AS $$
+BEGIN
+    -- Un UPDATE que no cambia nada no mueve la versión
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NEW;
+    END IF;
+    UPDATE catalogo_version SET version = version + 1 RETURNING version INTO NEW.version;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION alimentos_version_borrado() RETURNS trigger AS $$
+BEGIN
+    UPDATE catalogo_version SET version = version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_alimentos_version ON alimentos;
+CREATE TRIGGER trg_alimentos_version
+    BEFORE INSERT OR UPDATE ON alimentos
+    FOR EACH ROW EXECUTE FUNCTION alimentos_siguiente_version();
+
+-- La aplicación solo hace bajas lógicas; un DELETE manual también cambia el catálogo
+DROP TRIGGER IF EXISTS trg_alimentos_version_borrado ON alimentos;
+CREATE TRIGGER trg_alimentos_version_borrado
+    AFTER DELETE ON alimentos
+    FOR EACH STATEMENT EXECUTE FUNCTION alimentos_version_borrado();
@@ -0,0 +1,6 @@
+-- migracion: sin-transaccion
+-- GET /api/alimentos/changes?since=N: alimentos con version > N en orden de
+-- versión. Los terminales POS lo consultan cada pocos segundos y casi siempre
+-- la respuesta está vacía, así que debe resolverse con un recorrido de índice.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_alimentos_version
+    ON alimentos (version);
@@ -0,0 +1,35 @@
+-- Búsqueda de alimentos en la base de datos con pg_trgm, para catálogos que
+-- no convenga indexar en memoria (BUSQUEDA_ALIMENTOS_EN_BD=true).
+--
+-- pg_trgm es opcional: si el servidor no la ofrece o el usuario no puede
+-- instalarla, la migración sigue y la API usa el índice en memoria.
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        EXCEPTION WHEN insufficient_privilege THEN
+            RAISE NOTICE 'Sin permisos para instalar pg_trgm: la búsqueda queda en memoria';
+        END;
+    ELSE
+        RAISE NOTICE 'pg_trgm no está disponible en el servidor: la búsqueda queda en memoria';
+    END IF;
+END $$;
+
+-- Misma normalización que TextNormalizer.normalizar_nombre para el español:
+-- sin tildes, en mayúsculas, solo letras, números y espacios simples
+CREATE OR REPLACE FUNCTION normalizar_busqueda(texto TEXT) RETURNS TEXT AS $$
+    SELECT btrim(regexp_replace(regexp_replace(
+        upper(translate(texto, 'áéíóúüñÁÉÍÓÚÜÑ', 'aeiouunAEIOUUN')),
+        '[^A-Z0-9\s]', '', 'g'), '\s+', ' ', 'g'))
+$$ LANGUAGE sql IMMUTABLE STRICT;
+
+-- GIN de trigramas sobre nombre y categoría normalizados (operador <%)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+        CREATE INDEX IF NOT EXISTS idx_alimentos_busqueda_trgm
+            ON alimentos USING gin (normalizar_busqueda(nombre || ' ' || COALESCE(categoria, '')) gin_trgm_ops);
+    END IF;
+END $$;
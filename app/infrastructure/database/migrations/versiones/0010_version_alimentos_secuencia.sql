@@ -0,0 +1,74 @@
+-- Versión de los alimentos desde una secuencia, sin el contador de una fila
+-- de 0007: su bloqueo se tomaba en cada escritura de alimentos (también en
+-- cada descuento de stock) y se mantenía hasta el commit, así que todas las
+-- ventas con productos se confirmaban de a una.
+--
+-- nextval no bloquea, pero las versiones ya no se confirman en orden: una
+-- transacción lenta puede confirmar la versión 15 después de que otra
+-- confirmó la 16. Para que GET /changes no salte la 15, cada transacción
+-- anuncia la primera versión que va a tomar con un advisory lock compartido
+-- (clases 74120 y objsubid 2 en pg_locks) antes de pedirla, y la consulta de
+-- cambios no pasa de la menor versión anunciada que siga en curso (ver
+-- version_confirmada()). Los locks compartidos no se bloquean entre sí.
+--
+-- La clave del lock es un int4: las versiones deben quedar por debajo de
+-- 2^31, lejos de lo que genera un catálogo de cafetería.
+
+CREATE SEQUENCE IF NOT EXISTS alimentos_version_seq AS BIGINT;
+
+SELECT setval('alimentos_version_seq', GREATEST(
+    (SELECT version FROM catalogo_version),
+    (SELECT COALESCE(MAX(version), 0) FROM alimentos),
+    1
+));
+
+CREATE OR REPLACE FUNCTION alimentos_siguiente_version() RETURNS trigger AS $$
+BEGIN
+    -- Un UPDATE que no cambia nada no mueve la versión
+    IF TG_OP = 'UPDATE' AND NEW IS NOT DISTINCT FROM OLD THEN
+        RETURN NEW;
+    END IF;
+    -- Basta con anunciar la primera: las siguientes de la transacción son mayores
+    IF COALESCE(current_setting('foodcash.version_anunciada', true), '') = '' THEN
+        PERFORM pg_advisory_xact_lock_shared(74120, (SELECT last_value FROM alimentos_version_seq)::int);
+        PERFORM set_config('foodcash.version_anunciada', '1', true);
+    END IF;
+    NEW.version := nextval('alimentos_version_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Última versión sin transacciones pendientes por debajo: todo cambio con
+-- versión menor o igual ya está confirmado o deshecho. Se consulta en una
+-- sentencia anterior a la que lee los alimentos, para que la foto de esa
+-- lectura incluya lo que se confirmó entretanto.
+CREATE OR REPLACE FUNCTION version_confirmada() RETURNS BIGINT AS $$
+    SELECT LEAST(
+        (SELECT last_value FROM alimentos_version_seq),
+        (SELECT MIN(objid::bigint) - 1 FROM pg_locks
+         WHERE locktype = 'advisory' AND classid = 74120 AND objsubid = 2)
+    )
+$$ LANGUAGE sql VOLATILE;
+
+-- La versión del catálogo (ETag de GET /api/alimentos/) pasa a ser la suma de
+-- las versiones más el contador de borrados: cada cambio confirmado sube la
+-- versión de su fila, así que la suma crece con cada commit sin importar su
+-- orden. El contador de una fila solo se toca en los DELETE manuales.
+CREATE OR REPLACE FUNCTION alimentos_version_borrado() RETURNS trigger AS $$
+BEGIN
+    UPDATE catalogo_version
+    SET version = version + 1 + (SELECT COALESCE(SUM(version), 0) FROM borrados);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_alimentos_version_borrado ON alimentos;
+CREATE TRIGGER trg_alimentos_version_borrado
+    AFTER DELETE ON alimentos
+    REFERENCING OLD TABLE AS borrados
+    FOR EACH STATEMENT EXECUTE FUNCTION alimentos_version_borrado();
+
+CREATE OR REPLACE FUNCTION version_catalogo() RETURNS BIGINT AS $$
+    SELECT (SELECT COALESCE(SUM(version), 0) FROM alimentos)::bigint
+           + (SELECT version FROM catalogo_version)
+$$ LANGUAGE sql STABLE;
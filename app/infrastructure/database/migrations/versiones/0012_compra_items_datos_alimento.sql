@@ -0,0 +1,31 @@
+-- Nombre y calorías del alimento tal como estaban al vender, guardados con
+-- cada item. Los recibos se leían con un JOIN a alimentos: tras editar un
+-- producto, un recibo en caché mostraba los datos viejos y uno leído de la
+-- base los nuevos, con ETags distintos para la misma compra. Con la copia
+-- en compra_items el recibo no cambia después de creado.
+
+ALTER TABLE compra_items ADD COLUMN IF NOT EXISTS nombre_alimento VARCHAR(100);
+ALTER TABLE compra_items ADD COLUMN IF NOT EXISTS calorias INTEGER;
+
+-- Las compras anteriores toman los datos actuales: son los que ya mostraban sus recibos
+UPDATE compra_items ci
+SET nombre_alimento = a.nombre, calorias = a.calorias
+FROM alimentos a
+WHERE a.id = ci.producto_id AND ci.nombre_alimento IS NULL;
+
+-- Quien inserte items sin los datos (precompras, una versión anterior de la
+-- aplicación durante un despliegue) los recibe del alimento en ese momento
+CREATE OR REPLACE FUNCTION compra_items_datos_alimento() RETURNS trigger AS $$
+BEGIN
+    IF NEW.nombre_alimento IS NULL THEN
+        SELECT nombre, calorias INTO NEW.nombre_alimento, NEW.calorias
+        FROM alimentos WHERE id = NEW.producto_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_compra_items_datos_alimento ON compra_items;
+CREATE TRIGGER trg_compra_items_datos_alimento
+    BEFORE INSERT ON compra_items
+    FOR EACH ROW EXECUTE FUNCTION compra_items_datos_alimento();
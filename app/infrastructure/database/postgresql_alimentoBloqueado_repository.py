@@ -1,11 +1,22 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 from domain.models.alimentoBloqueado import AlimentoBloqueado
 from domain.repositories.alimentoBloqueado_repository import AlimentoBloqueadoRepository
 from domain.exceptions.exceptions import UsuarioNoEncontradoError
 from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.prepared_statements import registro_sentencias
+from infrastructure.database.row_mapper import cursor_tuplas
 from psycopg2.extras import RealDictCursor
 import psycopg2
 
+_BLOQUEADOS_POR_ESTUDIANTE = registro_sentencias.registrar(
+    "alimentos_bloqueados_por_estudiante",
+    """
+        SELECT id_estudiante, id_alimento, fecha_bloqueo
+        FROM alimentos_bloqueados
+        WHERE id_estudiante = %s
+    """
+)
+
 class PostgresqlAlimentoBloqueadoRepository(AlimentoBloqueadoRepository):
     def __init__(self, connection_manager: PostgresqlConnectionManager):
         self.connection_manager = connection_manager
@@ -73,14 +84,9 @@ class PostgresqlAlimentoBloqueadoRepository(AlimentoBloqueadoRepository):
                 return cur.rowcount > 0
 
     def obtener_alimentos_bloqueados_por_estudiante(self, id_estudiante: int) -> List[AlimentoBloqueado]:
-        query = """
-            SELECT id_estudiante, id_alimento, fecha_bloqueo
-            FROM alimentos_bloqueados
-            WHERE id_estudiante = %s
-        """
         with self.connection_manager.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, (id_estudiante,))
+                _BLOQUEADOS_POR_ESTUDIANTE.ejecutar(cur, (id_estudiante,))
                 results = cur.fetchall()
                 return [
                     AlimentoBloqueado(
@@ -91,6 +97,22 @@ class PostgresqlAlimentoBloqueadoRepository(AlimentoBloqueadoRepository):
                     for result in results
                 ]
 
+    def obtener_bloqueos_por_estudiantes(self, ids_estudiantes: List[int]) -> Dict[int, Set[int]]:
+        query = """
+            SELECT id_estudiante, id_alimento
+            FROM alimentos_bloqueados
+            WHERE id_estudiante = ANY(%s)
+        """
+        bloqueos: Dict[int, Set[int]] = {}
+        if not ids_estudiantes:
+            return bloqueos
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cur:
+                cur.execute(query, (sorted(set(ids_estudiantes)),))
+                for id_estudiante, id_alimento in cur.fetchall():
+                    bloqueos.setdefault(id_estudiante, set()).add(id_alimento)
+        return bloqueos
+
     def existe_bloqueo(self, id_estudiante: int, id_alimento: int) -> bool:
         query = """
             SELECT 1 FROM alimentos_bloqueados
@@ -1,57 +1,88 @@
-from contextlib import contextmanager
-import os
-from dotenv import load_dotenv
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 from domain.models.alimento import Alimento
+from domain.models.catalogo import CambiosCatalogo, Catalogo
 from domain.repositories.alimento_repository import AlimentoRepository
+from infrastructure.cache.invalidacion import TEMA_ALIMENTOS, bus_invalidacion
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.read_replica import solo_lectura
+from infrastructure.database.prepared_statements import registro_sentencias
+from infrastructure.database.row_mapper import MapeadorFilas, cursor_tuplas
+from infrastructure.utils.text_normalizer import TextNormalizer
 
-# Cargar variables del archivo .env
-load_dotenv()
+_ALIMENTO_POR_ID = registro_sentencias.registrar(
+    "alimento_por_id",
+    """
+        SELECT id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
+               fecha_creacion, fecha_actualizacion, activo, version
+        FROM alimentos
+        WHERE id = %s AND activo = TRUE
+    """
+)
 
-DB_NAME     = os.getenv("DB_NAME")
-DB_USER     = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST     = os.getenv("DB_HOST", "localhost")
-DB_PORT     = os.getenv("DB_PORT", "5432")
 
-class PostgresqlConnectionManager:
-    """Gestiona conexiones a la base de datos PostgreSQL para Alimentos."""
-    
-    def __init__(self, 
-                 db_name: str = DB_NAME, 
-                 db_user: str = DB_USER, 
-                 db_password: str = DB_PASSWORD, 
-                 db_host: str = DB_HOST, 
-                 db_port: str = DB_PORT):
-        self.db_name = db_name
-        self.db_user = db_user
-        self.db_password = db_password
-        self.db_host = db_host
-        self.db_port = db_port
-
-    @contextmanager
-    def get_connection(self):
-        conexion = None
-        try:
-            conexion = psycopg2.connect(
-                dbname=self.db_name,
-                user=self.db_user,
-                password=self.db_password,
-                host=self.db_host,
-                port=self.db_port,
-                cursor_factory=RealDictCursor
-            )
-            yield conexion
-        except psycopg2.OperationalError as e:
-            print(f"❌ Error de conexión a PostgreSQL: {e}")
-            raise
-        finally:
-            if conexion is not None:
-                conexion.close()
+def _alimento_desde_fila(id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
+                         fecha_creacion, fecha_actualizacion, activo, version) -> Alimento:
+    return Alimento(id, nombre, float(precio), cantidad_en_stock, calorias, imagen, categoria,
+                    fecha_creacion, fecha_actualizacion, activo, version)
+
+_MAPEADOR_ALIMENTO = MapeadorFilas(
+    _alimento_desde_fila,
+    ("id", "nombre", "precio", "cantidad_en_stock", "calorias", "imagen", "categoria",
+     "fecha_creacion", "fecha_actualizacion", "activo", "version")
+)
+
+_ALIMENTOS_ACTIVOS = """
+    SELECT id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
+           fecha_creacion, fecha_actualizacion, activo, version
+    FROM alimentos
+    WHERE activo = TRUE
+"""
+
+# La versión sale en la misma sentencia que las filas: ambas son de la misma foto
+_CATALOGO = """
+    SELECT version_catalogo() AS catalogo_version,
+           id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
+           fecha_creacion, fecha_actualizacion, activo, version
+    FROM alimentos
+    WHERE activo = TRUE
+    ORDER BY id
+"""
+
+_MAPEADOR_CATALOGO = MapeadorFilas(
+    lambda catalogo_version, *columnas: (catalogo_version, _alimento_desde_fila(*columnas)),
+    ("catalogo_version",) + _MAPEADOR_ALIMENTO.columnas
+)
+
+_VERSION_CATALOGO = "SELECT version_catalogo()"
+
+# Hasta dónde se puede responder sin saltar versiones de transacciones en curso,
+# y la última versión entregada (migración 0010)
+_VERSIONES_CONFIRMADAS = "SELECT version_confirmada(), (SELECT last_value FROM alimentos_version_seq)"
+
+# Incluye las bajas lógicas: el cliente las necesita para quitar el alimento
+_CAMBIOS_DESDE = """
+    SELECT id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
+           fecha_creacion, fecha_actualizacion, activo, version
+    FROM alimentos
+    WHERE version > %s AND version <= %s
+    ORDER BY version
+    LIMIT %s
+"""
+
+# Necesita pg_trgm (migración 0009); la consulta llega ya normalizada con TextNormalizer
+_BUSCAR_SIMILARES = """
+    SELECT id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
+           fecha_creacion, fecha_actualizacion, activo, version,
+           word_similarity(%(consulta)s, normalizar_busqueda(nombre || ' ' || COALESCE(categoria, ''))) AS puntaje
+    FROM alimentos
+    WHERE activo = TRUE
+      AND %(consulta)s <%% normalizar_busqueda(nombre || ' ' || COALESCE(categoria, ''))
+    ORDER BY puntaje DESC, id
+    LIMIT %(limite)s
+"""
 
 class PostgresqlAlimentoRepository(AlimentoRepository):
     """Implementación del repositorio de Alimento con PostgreSQL."""
@@ -59,16 +90,12 @@ class PostgresqlAlimentoRepository(AlimentoRepository):
     def __init__(self, connection_manager: PostgresqlConnectionManager):
         self.connection_manager = connection_manager
 
+    @solo_lectura
     def listar_alimentos(self, filtros: Optional[Dict[str, Any]] = None) -> List[Alimento]:
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = cursor_tuplas(conn)
             
-            query = """
-                SELECT id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
-                       fecha_creacion, fecha_actualizacion, activo
-                FROM alimentos
-                WHERE activo = TRUE
-            """
+            query = _ALIMENTOS_ACTIVOS
             params = []
             if filtros:
                 if 'categoria' in filtros and filtros['categoria']:
@@ -79,75 +106,67 @@ class PostgresqlAlimentoRepository(AlimentoRepository):
                     params.append(f"%{filtros['nombre']}%")
             
             cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            alimentos = []
-            for row in rows:
-                alimentos.append(
-                    Alimento(
-                        id=row["id"],
-                        nombre=row["nombre"],
-                        precio=float(row["precio"]),
-                        cantidad_en_stock=row["cantidad_en_stock"],
-                        calorias=row["calorias"],
-                        imagen=row["imagen"],
-                        categoria=row["categoria"],
-                        fecha_creacion=row["fecha_creacion"],
-                        fecha_actualizacion=row["fecha_actualizacion"],
-                        activo=row["activo"]
-                    )
-                )
-            return alimentos
+            return _MAPEADOR_ALIMENTO.mapear(cursor)
+
+    def listar_catalogo(self) -> Catalogo:
+        # Sin @solo_lectura: tras una invalidación, una réplica atrasada dejaría la caché vieja hasta el TTL
+        with self.connection_manager.get_connection() as conn:
+            cursor = cursor_tuplas(conn)
+            cursor.execute(_CATALOGO)
+            filas = _MAPEADOR_CATALOGO.mapear(cursor)
+            if filas:
+                version = filas[0][0]
+            else:
+                cursor.execute(_VERSION_CATALOGO)
+                version = cursor.fetchone()[0]
+            return Catalogo.desde_alimentos([alimento for _, alimento in filas], version)
+
+    def listar_cambios(self, desde_version: int, limite: int) -> CambiosCatalogo:
+        # Sin @solo_lectura: una réplica atrasada vería since por delante de su versión y el
+        # cliente recibiría el catálogo entero con reiniciar; además pg_locks solo muestra
+        # las transacciones en curso de la principal
+        with self.connection_manager.get_connection() as conn:
+            cursor = cursor_tuplas(conn)
+            # En su propia sentencia: la lectura de alimentos toma una foto posterior
+            cursor.execute(_VERSIONES_CONFIRMADAS)
+            confirmada, ultima = cursor.fetchone()
+            if desde_version > ultima:
+                # La base no llegó a esa versión (p. ej. se restauró): quien llama decide
+                return CambiosCatalogo(version=ultima, alimentos=[])
+            # Se pide uno de más para saber si quedan cambios sin devolver
+            cursor.execute(_CAMBIOS_DESDE, (desde_version, confirmada, limite + 1))
+            alimentos = _MAPEADOR_ALIMENTO.mapear(cursor)
+            if len(alimentos) > limite:
+                return CambiosCatalogo(version=alimentos[limite - 1].version, alimentos=alimentos[:limite], hay_mas=True)
+            # Con una transacción en curso por debajo de since, la versión no retrocede
+            return CambiosCatalogo(version=max(confirmada, desde_version), alimentos=alimentos)
+
+    @solo_lectura
+    def buscar_similares(self, consulta: str, limite: int) -> List[Alimento]:
+        normalizada = TextNormalizer.normalizar_nombre(consulta)
+        if not normalizada:
+            return []
+        with self.connection_manager.get_connection() as conn:
+            cursor = cursor_tuplas(conn)
+            cursor.execute(_BUSCAR_SIMILARES, {"consulta": normalizada, "limite": limite})
+            return _MAPEADOR_ALIMENTO.mapear(cursor)
 
     def buscar_por_id(self, alimento_id: int) -> Optional[Alimento]:
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("""
-                SELECT id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
-                       fecha_creacion, fecha_actualizacion, activo
-                FROM alimentos
-                WHERE id = %s AND activo = TRUE
-            """, (alimento_id,))
-            row = cursor.fetchone()
-            if not row:
-                return None
-            return Alimento(
-                id=row["id"],
-                nombre=row["nombre"],
-                precio=float(row["precio"]),
-                cantidad_en_stock=row["cantidad_en_stock"],
-                calorias=row["calorias"],
-                imagen=row["imagen"],
-                categoria=row["categoria"],
-                fecha_creacion=row["fecha_creacion"],
-                fecha_actualizacion=row["fecha_actualizacion"],
-                activo=row["activo"]
-            )
+            cursor = cursor_tuplas(conn)
+            _ALIMENTO_POR_ID.ejecutar(cursor, (alimento_id,))
+            return _MAPEADOR_ALIMENTO.mapear_uno(cursor)
     
     def buscar_por_nombre(self, nombre: str) -> Optional[Alimento]:
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = cursor_tuplas(conn)
             cursor.execute("""
                 SELECT id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
-                       fecha_creacion, fecha_actualizacion, activo
+                       fecha_creacion, fecha_actualizacion, activo, version
                 FROM alimentos
                 WHERE LOWER(nombre) = LOWER(%s) AND activo = TRUE
             """, (nombre,))
-            row = cursor.fetchone()
-            if not row:
-                return None
-            return Alimento(
-                id=row["id"],
-                nombre=row["nombre"],
-                precio=float(row["precio"]),
-                cantidad_en_stock=row["cantidad_en_stock"],
-                calorias=row["calorias"],
-                imagen=row["imagen"],
-                categoria=row["categoria"],
-                fecha_creacion=row["fecha_creacion"],
-                fecha_actualizacion=row["fecha_actualizacion"],
-                activo=row["activo"]
-            )
+            return _MAPEADOR_ALIMENTO.mapear_uno(cursor)
     
     def guardar(self, alimento: Alimento) -> Alimento:
         with self.connection_manager.get_connection() as conn:
@@ -160,7 +179,7 @@ class PostgresqlAlimentoRepository(AlimentoRepository):
                     SET nombre = %s, precio = %s, cantidad_en_stock = %s, calorias = %s,
                         imagen = %s, categoria = %s, fecha_actualizacion = %s, activo = %s
                     WHERE id = %s
-                    RETURNING id
+                    RETURNING id, version
                 """, (
                     alimento.nombre,
                     alimento.precio,
@@ -178,7 +197,7 @@ class PostgresqlAlimentoRepository(AlimentoRepository):
                     INSERT INTO alimentos (nombre, precio, cantidad_en_stock, calorias,
                                            imagen, categoria, fecha_creacion, fecha_actualizacion, activo)
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
+                    RETURNING id, version
                 """, (
                     alimento.nombre,
                     alimento.precio,
@@ -190,11 +209,14 @@ class PostgresqlAlimentoRepository(AlimentoRepository):
                     alimento.fecha_actualizacion,
                     alimento.activo
                 ))
-                returned_id = cursor.fetchone()['id']
-                alimento.id = returned_id
+            fila = cursor.fetchone()
+            if fila is not None:
+                alimento.id = fila['id']
+                alimento.version = fila['version']
             
             conn.commit()
-            return alimento
+        bus_invalidacion.publicar_al_confirmar(self.connection_manager, TEMA_ALIMENTOS, str(alimento.id))
+        return alimento
     
     def eliminar(self, alimento_id: int) -> bool:
         with self.connection_manager.get_connection() as conn:
@@ -207,31 +229,47 @@ class PostgresqlAlimentoRepository(AlimentoRepository):
             """, (datetime.now(), alimento_id))
             result = cursor.fetchone()
             conn.commit()
-            return result is not None
+        if result is not None:
+            bus_invalidacion.publicar_al_confirmar(self.connection_manager, TEMA_ALIMENTOS, str(alimento_id))
+        return result is not None
 
     def disminuir_inventario(self, alimento_id: int, cantidad: int):
-        connection = self.connection_manager.get_connection()
-        cursor = connection.cursor()
-        try:
-            # Actualizar el stock solo si hay suficientes unidades
-            cursor.execute(
-                """
-                UPDATE alimentos
-                SET cantidad_en_stock = cantidad_en_stock - %s
-                WHERE id = %s AND cantidad_en_stock >= %s
-                RETURNING id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria
-                """,
-                (cantidad, alimento_id, cantidad)
-            )
-            result = cursor.fetchone()
-            if not result:
-                raise Exception("No hay stock suficiente o el alimento no existe")
-            connection.commit()
-            # Suponiendo que transformas el resultado en un objeto de dominio
-            return self._map_row_to_alimento(result)
-        except Exception as e:
-            connection.rollback()
-            raise e
-        finally:
-            cursor.close()
-            connection.close()
+        with self.connection_manager.get_connection() as connection:
+            cursor = connection.cursor(cursor_factory=RealDictCursor)
+            try:
+                # Actualizar el stock solo si hay suficientes unidades
+                cursor.execute(
+                    """
+                    UPDATE alimentos
+                    SET cantidad_en_stock = cantidad_en_stock - %s
+                    WHERE id = %s AND cantidad_en_stock >= %s
+                    RETURNING id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
+                              fecha_creacion, fecha_actualizacion, activo, version
+                    """,
+                    (cantidad, alimento_id, cantidad)
+                )
+                row = cursor.fetchone()
+                if not row:
+                    raise Exception("No hay stock suficiente o el alimento no existe")
+                connection.commit()
+                alimento = Alimento(
+                    id=row["id"],
+                    nombre=row["nombre"],
+                    precio=float(row["precio"]),
+                    cantidad_en_stock=row["cantidad_en_stock"],
+                    calorias=row["calorias"],
+                    imagen=row["imagen"],
+                    categoria=row["categoria"],
+                    fecha_creacion=row["fecha_creacion"],
+                    fecha_actualizacion=row["fecha_actualizacion"],
+                    activo=row["activo"],
+                    version=row["version"]
+                )
+            except Exception as e:
+                connection.rollback()
+                raise e
+            finally:
+                cursor.close()
+        # Fuera del bloque: sin unidad de trabajo el aviso usa otra conexión del pool
+        bus_invalidacion.publicar_al_confirmar(self.connection_manager, TEMA_ALIMENTOS, str(alimento_id))
+        return alimento
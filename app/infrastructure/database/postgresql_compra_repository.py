@@ -1,8 +1,40 @@
-from typing import Optional, List
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, Optional, List, Tuple
 from domain.models.compra import Compra, CompraItem
-from psycopg2.extras import RealDictCursor
+from psycopg2.errors import UniqueViolation
+from psycopg2.extras import RealDictCursor, execute_values
 from domain.repositories.compra_repository import CompraRepository
+from domain.exceptions.exceptions import StockInsuficienteError, CompraDuplicadaError
+from infrastructure.cache.invalidacion import TEMA_ALIMENTOS, bus_invalidacion
 from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.read_replica import solo_lectura
+from infrastructure.database.row_mapper import CursorTuplas, cursor_tuplas
+
+
+_DESCONTAR_STOCK = """
+    WITH pedido (id, cantidad) AS (VALUES %s),
+    bloqueados AS (
+        -- Bloquea las filas en orden de id: dos cajas con los mismos productos no se interbloquean
+        SELECT a.id
+        FROM alimentos a
+        JOIN pedido p ON p.id = a.id
+        ORDER BY a.id
+        FOR UPDATE OF a
+    )
+    UPDATE alimentos a
+    SET cantidad_en_stock = a.cantidad_en_stock - p.cantidad
+    FROM pedido p
+    WHERE a.id = p.id
+      AND a.id IN (SELECT id FROM bloqueados)
+      AND a.cantidad_en_stock >= p.cantidad
+    RETURNING a.id
+"""
+
+_INSERTAR_ITEMS = """
+    INSERT INTO compra_items (compra_id, producto_id, cantidad, precio_unitario, nombre_alimento, calorias)
+    VALUES %s
+"""
 
 
 class PostgresqlCompraRepository(CompraRepository):
@@ -10,175 +42,332 @@ class PostgresqlCompraRepository(CompraRepository):
         self.connection_manager = connection_manager
 
     def guardar_compra(self, compra: Compra) -> Compra:
-        query_insert_compra = """
-            INSERT INTO compras (usuario_id, fecha, total)
-            VALUES (%s, %s, %s)
-            RETURNING id
         """
-        query_insert_item = """
-            INSERT INTO compra_items (compra_id, producto_id, cantidad, precio_unitario)
-            VALUES (%s, %s, %s, %s)
+        Guarda la compra con un número fijo de sentencias, sin importar cuántas líneas tenga:
+        descuento de stock (un UPDATE ... FROM (VALUES ...)), cabecera e items (un INSERT multi-fila).
+        Si algún producto no tiene stock suficiente no se escribe nada y se lanza StockInsuficienteError.
         """
-        query_update_stock = """
-            UPDATE alimentos
-            SET cantidad_en_stock = cantidad_en_stock - %s
-            WHERE id = %s
+        query_insert_compra = """
+            INSERT INTO compras (usuario_id, fecha, total, clave_idempotencia)
+            VALUES (%s, %s, %s, %s)
+            RETURNING id
         """
 
         with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(
-                    query_insert_compra,
-                    (compra.usuario_id, compra.fecha, compra.total)
-                )
-                row = cursor.fetchone()
-                compra_id = row["id"]
+            with cursor_tuplas(conn) as cursor:
+                self._descontar_stock(conn, cursor, [compra])
 
-                for item in compra.items:
+                try:
                     cursor.execute(
-                        query_insert_item,
-                        (compra_id, item.producto_id, item.cantidad, item.precio_unitario)
+                        query_insert_compra,
+                        (compra.usuario_id, compra.fecha, compra.total, compra.clave_idempotencia)
                     )
-                    cursor.execute(
-                        query_update_stock,
-                        (item.cantidad, item.producto_id)
+                except UniqueViolation:
+                    conn.rollback()
+                    raise CompraDuplicadaError(f"Ya existe una compra con la clave {compra.clave_idempotencia}")
+                compra_id = cursor.fetchone()[0]
+
+                if compra.items:
+                    execute_values(
+                        cursor, _INSERTAR_ITEMS,
+                        [(compra_id, item.producto_id, item.cantidad, item.precio_unitario,
+                          item.nombre_alimento, item.calorias) for item in compra.items],
+                        page_size=len(compra.items)
                     )
 
                 conn.commit()
 
         compra.id = compra_id
+        self._avisar_stock([compra])
         return compra
 
-    def obtener_compra_por_id(self, compra_id: int) -> Optional[dict]:
+    def guardar_compras(self, compras: List[Compra]) -> List[Compra]:
         """
-        Devuelve un diccionario con los datos de la compra, incluyendo:
-          - id, usuario_id, fecha (timestamp), total
-          - items: lista de { producto_id, cantidad, precio_unitario, nombre_alimento, calorias }
+        Guarda un lote de compras con cuatro sentencias en total: descuento de
+        stock agregado, reserva de ids, cabeceras e items (INSERT multi-fila).
+        Los ids se reservan antes del INSERT para asociar cada item a su compra
+        sin depender del orden de RETURNING. Todo el lote se guarda o ninguno.
+        """
+        if not compras:
+            return compras
+        query_reservar_ids = """
+            SELECT nextval(pg_get_serial_sequence('compras', 'id'))
+            FROM generate_series(1, %s)
+        """
+        query_insert_compras = """
+            INSERT INTO compras (id, usuario_id, fecha, total, clave_idempotencia)
+            VALUES %s
+        """
+
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                self._descontar_stock(conn, cursor, compras)
+
+                cursor.execute(query_reservar_ids, (len(compras),))
+                for compra, (compra_id,) in zip(compras, cursor.fetchall()):
+                    compra.id = compra_id
+
+                try:
+                    execute_values(
+                        cursor, query_insert_compras,
+                        [(c.id, c.usuario_id, c.fecha, c.total, c.clave_idempotencia) for c in compras],
+                        page_size=len(compras)
+                    )
+                except UniqueViolation:
+                    conn.rollback()
+                    raise CompraDuplicadaError("Alguna compra del lote ya estaba registrada con su clave")
+                items = [
+                    (compra.id, item.producto_id, item.cantidad, item.precio_unitario,
+                     item.nombre_alimento, item.calorias)
+                    for compra in compras for item in compra.items
+                ]
+                if items:
+                    execute_values(cursor, _INSERTAR_ITEMS, items, page_size=len(items))
+
+                conn.commit()
+        self._avisar_stock(compras)
+        return compras
+
+    def buscar_ids_por_claves(self, claves: List[str]) -> Dict[str, int]:
         """
-        query_compra = """
+        Compras ya registradas con alguna de estas claves de idempotencia: {clave: compra_id}.
+        Siempre en el primario: una réplica atrasada dejaría pasar un duplicado.
+        """
+        if not claves:
+            return {}
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute(
+                    "SELECT clave_idempotencia, id FROM compras WHERE clave_idempotencia = ANY(%s)",
+                    (list(claves),)
+                )
+                return dict(cursor.fetchall())
+
+    def _avisar_stock(self, compras: List[Compra]) -> None:
+        """El stock de estos productos cambió: las cachés del catálogo se invalidan al confirmar."""
+        producto_ids = sorted({item.producto_id for compra in compras for item in compra.items})
+        bus_invalidacion.publicar_varios_al_confirmar(
+            self.connection_manager, TEMA_ALIMENTOS, [str(producto_id) for producto_id in producto_ids]
+        )
+
+    @staticmethod
+    def _descontar_stock(conn, cursor, compras: List[Compra]) -> None:
+        """Descuenta el stock de todas las compras en un solo UPDATE; si no alcanza, deshace y lanza StockInsuficienteError."""
+        # Las líneas repetidas del mismo producto se descuentan juntas
+        cantidades: Dict[int, int] = {}
+        for compra in compras:
+            for item in compra.items:
+                cantidades[item.producto_id] = cantidades.get(item.producto_id, 0) + item.cantidad
+        if not cantidades:
+            return
+        pedido = sorted(cantidades.items())
+        descontados = execute_values(
+            cursor, _DESCONTAR_STOCK, pedido,
+            template="(%s::integer, %s::integer)", page_size=len(pedido), fetch=True
+        )
+        sin_stock = set(cantidades) - {fila[0] for fila in descontados}
+        if sin_stock:
+            conn.rollback()
+            raise StockInsuficienteError(sorted(sin_stock))
+
+    def _compras_con_items(self, cursor, filtro: str = "", parametros: tuple = (), limite: Optional[int] = None,
+                           orden: str = "DESC") -> List[dict]:
+        """
+        Carga compras y sus items con dos consultas en total, sin importar cuántas
+        compras haya: primero las compras y luego todos sus items con ANY(%s).
+
+        Cada compra es un diccionario con id, usuario_id, fecha (timestamp), total
+        e items: lista de { producto_id, cantidad, precio_unitario, nombre_alimento, calorias }.
+        """
+        query_compras = f"""
             SELECT id, usuario_id, fecha, total
             FROM compras
-            WHERE id = %s
+            {filtro}
+            ORDER BY fecha {orden}, id {orden}
         """
+        if limite is not None:
+            query_compras += " LIMIT %s"
+            parametros = parametros + (limite,)
         query_items = """
             SELECT 
+                ci.compra_id,
                 ci.producto_id,
                 ci.cantidad,
                 ci.precio_unitario,
-                a.nombre      AS nombre_alimento,
-                a.calorias    AS calorias
+                ci.nombre_alimento,
+                ci.calorias
             FROM compra_items ci
-            INNER JOIN alimentos a ON ci.producto_id = a.id
-            WHERE ci.compra_id = %s
+            WHERE ci.compra_id = ANY(%s)
+            ORDER BY ci.compra_id, ci.id
         """
 
-        with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                # 1) Obtener datos generales de la compra
-                cursor.execute(query_compra, (compra_id,))
-                compra_row = cursor.fetchone()
-                if not compra_row:
-                    return None
-
-                # 2) Obtener items asociados a esa compra, junto con nombre y calorías del alimento
-                cursor.execute(query_items, (compra_id,))
-                items_raw = cursor.fetchall()
-
-                items: List[dict] = []
-                for item in items_raw:
-                    # Cada item_raw ya es un dict con las columnas: producto_id, cantidad,
-                    # precio_unitario, nombre_alimento y calorias.
-                    items.append({
-                        "producto_id": item["producto_id"],
-                        "cantidad": item["cantidad"],
-                        "precio_unitario": float(item["precio_unitario"]),
-                        "nombre_alimento": item["nombre_alimento"],
-                        "calorias": float(item["calorias"]) if item["calorias"] is not None else 0.0
-                    })
-
-                return {
-                    "id": compra_row["id"],
-                    "usuario_id": compra_row["usuario_id"],
-                    "fecha": compra_row["fecha"],               # Timestamp
-                    "total": float(compra_row["total"]),
-                    "items": items
-                }
+        # 1) Datos generales de las compras
+        cursor.execute(query_compras, parametros)
+        compras: List[dict] = []
+        items_por_compra: Dict[int, List[dict]] = {}
+        for compra_id, usuario_id, fecha, total in cursor.fetchall():
+            items: List[dict] = []
+            items_por_compra[compra_id] = items
+            compras.append({
+                "id": compra_id,
+                "usuario_id": usuario_id,
+                "fecha": fecha,               # Timestamp
+                "total": float(total),
+                "items": items
+            })
+        if not compras:
+            return compras
 
-    def obtener_compras_por_usuario_id(self, usuario_id: int) -> List[dict]:
-        """
-        Trae únicamente el ID de cada compra de un usuario y luego,
-        para cada ID, invoca obtener_compra_por_id para traer los datos completos
-        (incluyendo nombre_alimento y calorias).
+        # 2) Items de todas esas compras, con el nombre y las calorías guardados al vender
+        cursor.execute(query_items, (list(items_por_compra),))
+        for compra_id, producto_id, cantidad, precio_unitario, nombre_alimento, calorias in cursor.fetchall():
+            items_por_compra[compra_id].append({
+                "producto_id": producto_id,
+                "cantidad": cantidad,
+                "precio_unitario": float(precio_unitario),
+                "nombre_alimento": nombre_alimento,
+                "calorias": float(calorias) if calorias is not None else 0.0
+            })
+        return compras
+
+    @staticmethod
+    def _filtro_fechas(condiciones: List[str], parametros: list,
+                       desde: Optional[datetime], hasta: Optional[datetime]) -> None:
+        """Rango [desde, hasta): las fechas tienen microsegundos, así que un día se pide hasta la medianoche siguiente."""
+        if desde is not None:
+            condiciones.append("fecha >= %s")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("fecha < %s")
+            parametros.append(hasta)
+
+    def obtener_pagina_compras(self,
+                               usuario_id: Optional[int] = None,
+                               limite: int = 50,
+                               despues_de: Optional[Tuple[datetime, int]] = None,
+                               antes_de: Optional[Tuple[datetime, int]] = None,
+                               desde: Optional[datetime] = None,
+                               hasta: Optional[datetime] = None) -> Tuple[List[dict], bool]:
         """
-        query = """
-            SELECT id
-            FROM compras
-            WHERE usuario_id = %s
-            ORDER BY fecha DESC
+        Página de compras por keyset sobre (fecha, id), de la más reciente a la más antigua.
+
+        `despues_de` devuelve las compras más antiguas que esa clave y `antes_de`
+        las más recientes. Se pide una fila de más para saber si hay otra página
+        en esa dirección; el segundo valor devuelto lo indica. El costo no depende
+        de cuántas páginas se hayan recorrido (no hay OFFSET).
         """
+        condiciones: List[str] = []
+        parametros: list = []
+        if usuario_id is not None:
+            condiciones.append("usuario_id = %s")
+            parametros.append(usuario_id)
+        self._filtro_fechas(condiciones, parametros, desde, hasta)
+        orden = "DESC"
+        if despues_de is not None:
+            condiciones.append("(fecha, id) < (%s, %s)")
+            parametros.extend(despues_de)
+        elif antes_de is not None:
+            # Hacia atrás se recorre en orden ascendente y luego se invierte
+            condiciones.append("(fecha, id) > (%s, %s)")
+            parametros.extend(antes_de)
+            orden = "ASC"
+        filtro = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
 
         with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, (usuario_id,))
-                compras_rows = cursor.fetchall()
+            with cursor_tuplas(conn) as cursor:
+                compras = self._compras_con_items(cursor, filtro, tuple(parametros), limite=limite + 1, orden=orden)
+        hay_mas = len(compras) > limite
+        compras = compras[:limite]
+        if orden == "ASC":
+            compras.reverse()
+        return compras, hay_mas
 
-                compras: List[dict] = []
-                for row in compras_rows:
-                    compra_id = row["id"]
-                    compra_completa = self.obtener_compra_por_id(compra_id)
-                    if compra_completa:
-                        compras.append(compra_completa)
+    def obtener_compra_por_id(self, compra_id: int) -> Optional[dict]:
+        """
+        Devuelve un diccionario con los datos de la compra, incluyendo:
+          - id, usuario_id, fecha (timestamp), total
+          - items: lista de { producto_id, cantidad, precio_unitario, nombre_alimento, calorias }
+        """
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                compras = self._compras_con_items(cursor, "WHERE id = %s", (compra_id,))
+                return compras[0] if compras else None
 
-                return compras
+    def obtener_compras_por_usuario_id(self, usuario_id: int) -> List[dict]:
+        """Todas las compras de un usuario, de la más reciente a la más antigua, con sus items."""
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                return self._compras_con_items(cursor, "WHERE usuario_id = %s", (usuario_id,))
 
     def obtener_ultimas_compras_por_usuario_id(self, usuario_id: int, limit: int = 5) -> List[dict]:
         """
         Mismo procedimiento, pero con LIMIT para traer sólo las últimas N compras.
         """
-        query = """
-            SELECT id
-            FROM compras
-            WHERE usuario_id = %s
-            ORDER BY fecha DESC
-            LIMIT %s
-        """
-
         with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query, (usuario_id, limit))
-                compras_rows = cursor.fetchall()
-
-                compras: List[dict] = []
-                for row in compras_rows:
-                    compra_id = row["id"]
-                    compra_completa = self.obtener_compra_por_id(compra_id)
-                    if compra_completa:
-                        compras.append(compra_completa)
-
-                return compras
+            with cursor_tuplas(conn) as cursor:
+                return self._compras_con_items(cursor, "WHERE usuario_id = %s", (usuario_id,), limite=limit)
     
-    def obtener_todas_las_compras(self) -> List[dict]:
+    @solo_lectura
+    def obtener_todas_las_compras(self, desde: Optional[datetime] = None, hasta: Optional[datetime] = None) -> List[dict]:
         """
-        Obtiene todas las compras de la base de datos.
-        Primero trae todos los IDs de compra y luego invoca
-        obtener_compra_por_id para cada uno para obtener los detalles completos.
+        Obtiene todas las compras de la base de datos con sus items
+        (dos consultas en total, ver _compras_con_items), opcionalmente en un rango de fechas.
         """
-        query = """
-            SELECT id
-            FROM compras
-            ORDER BY fecha DESC
+        condiciones: List[str] = []
+        parametros: list = []
+        self._filtro_fechas(condiciones, parametros, desde, hasta)
+        filtro = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                return self._compras_con_items(cursor, filtro, tuple(parametros))
+
+    @solo_lectura
+    def exportar_items_compras(self,
+                               desde: Optional[datetime] = None,
+                               hasta: Optional[datetime] = None,
+                               categoria: Optional[str] = None,
+                               tamano_lote: int = 1000) -> Iterator[List[tuple]]:
+        """
+        Recorre los items de las compras con un cursor de servidor (named cursor)
+        y los entrega en lotes de `tamano_lote` tuplas:
+        (compra_id, fecha, usuario_id, total_compra, producto_id, nombre_alimento,
+         categoria, cantidad, precio_unitario, subtotal).
+
+        PostgreSQL conserva el resultado y cada lote es un FETCH, así que la
+        memoria no depende del tamaño del historial. La conexión queda tomada
+        hasta que el generador termina o se cierra.
+        """
+        condiciones: List[str] = []
+        parametros: list = []
+        if desde is not None:
+            condiciones.append("c.fecha >= %s")
+            parametros.append(desde)
+        if hasta is not None:
+            condiciones.append("c.fecha < %s")
+            parametros.append(hasta)
+        if categoria:
+            condiciones.append("a.categoria = %s")
+            parametros.append(categoria)
+        filtro = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        query = f"""
+            SELECT
+                c.id, c.fecha, c.usuario_id, c.total,
+                ci.producto_id, a.nombre, a.categoria,
+                ci.cantidad, ci.precio_unitario, ci.cantidad * ci.precio_unitario
+            FROM compras c
+            INNER JOIN compra_items ci ON ci.compra_id = c.id
+            INNER JOIN alimentos a ON a.id = ci.producto_id
+            {filtro}
+            ORDER BY c.fecha, c.id, ci.id
         """
 
         with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(query)
-                compras_rows = cursor.fetchall()
-
-                compras: List[dict] = []
-                for row in compras_rows:
-                    compra_id = row["id"]
-                    compra_completa = self.obtener_compra_por_id(compra_id)
-                    if compra_completa:
-                        compras.append(compra_completa)
-
-                return compras
+            nombre = f"exportar_compras_{uuid.uuid4().hex[:12]}"
+            with conn.cursor(name=nombre, cursor_factory=CursorTuplas) as cursor:
+                cursor.itersize = tamano_lote
+                cursor.execute(query, parametros)
+                while True:
+                    lote = cursor.fetchmany(tamano_lote)
+                    if not lote:
+                        break
+                    yield lote
@@ -1,12 +1,23 @@
 # infrastructure/database/postgresql_estudiante_repository.py
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from domain.models.estudiante import Estudiante
 from domain.repositories.estudiante_repository import EstudianteRepository
 from domain.exceptions.exceptions import UsuarioNoEncontradoError
 from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.prepared_statements import registro_sentencias
 from psycopg2.extras import RealDictCursor
 
+# Consulta del punto de venta: se prepara una vez por conexión del pool
+_ESTUDIANTE_POR_CEDULA = registro_sentencias.registrar(
+    "estudiante_por_cedula",
+    """
+        SELECT id, nombre, email, fecha_nacimiento, responsablefinanciero, saldo, cedula
+        FROM estudiantes
+        WHERE cedula = %s
+    """
+)
+
 class PostgresqlEstudianteRepository(EstudianteRepository):
     def __init__(self, connection_manager: PostgresqlConnectionManager):
         self.connection_manager = connection_manager
@@ -33,33 +44,23 @@ class PostgresqlEstudianteRepository(EstudianteRepository):
                     cedula=result.get('cedula')
                 )
 
-    def guardar(self, estudiante: Estudiante) -> Estudiante:
+    def bloquear_para_cobro(self, estudiante_id: int) -> Optional[Estudiante]:
+        """
+        Lee el estudiante con SELECT ... FOR UPDATE: dos cobros simultáneos al
+        mismo estudiante se serializan hasta que termine la transacción.
+        """
         query = """
-            UPDATE estudiantes 
-            SET nombre = %s, 
-                email = %s,
-                fecha_nacimiento = %s,
-                responsablefinanciero = %s,
-                saldo = %s,
-                cedula = %s
-            WHERE id = %s 
-            RETURNING id, nombre, email, fecha_nacimiento, responsablefinanciero, saldo, cedula
+            SELECT id, nombre, email, fecha_nacimiento, responsablefinanciero, saldo, cedula
+            FROM estudiantes
+            WHERE id = %s
+            FOR UPDATE
         """
         with self.connection_manager.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, (
-                    estudiante.nombre,
-                    estudiante.email,
-                    estudiante.fecha_nacimiento,
-                    estudiante.responsableFinanciero,
-                    float(estudiante.saldo),
-                    estudiante.cedula,
-                    estudiante.id
-                ))
-                conn.commit()
-                if cur.rowcount == 0:
-                    raise UsuarioNoEncontradoError(f"Estudiante con ID {estudiante.id} no encontrado")
+                cur.execute(query, (estudiante_id,))
                 result = cur.fetchone()
+                if result is None:
+                    return None
                 return Estudiante(
                     id=result.get('id'),
                     nombre=result.get('nombre'),
@@ -69,7 +70,35 @@ class PostgresqlEstudianteRepository(EstudianteRepository):
                     saldo=result.get('saldo'),
                     cedula=result.get('cedula')
                 )
-    
+
+    def bloquear_varios_para_cobro(self, estudiante_ids: List[int]) -> Dict[int, Estudiante]:
+        """Como bloquear_para_cobro para un lote; las filas se bloquean en orden de id."""
+        ids = sorted(set(estudiante_ids))
+        if not ids:
+            return {}
+        query = """
+            SELECT id, nombre, email, fecha_nacimiento, responsablefinanciero, saldo, cedula
+            FROM estudiantes
+            WHERE id = ANY(%s)
+            ORDER BY id
+            FOR UPDATE
+        """
+        with self.connection_manager.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(query, (ids,))
+                return {
+                    result['id']: Estudiante(
+                        id=result.get('id'),
+                        nombre=result.get('nombre'),
+                        email=result.get('email'),
+                        fecha_nacimiento=result.get('fecha_nacimiento'),
+                        responsableFinanciero=result.get('responsablefinanciero'),
+                        saldo=result.get('saldo'),
+                        cedula=result.get('cedula')
+                    )
+                    for result in cur.fetchall()
+                }
+
     def crear(self, estudiante: Estudiante) -> Estudiante:
         """Crea un nuevo estudiante en la base de datos"""
         query = """
@@ -123,14 +152,9 @@ class PostgresqlEstudianteRepository(EstudianteRepository):
                 ]
 
     def buscar_por_cedula(self, cedula: str) -> Optional[Estudiante]:
-        query = """
-            SELECT id, nombre, email, fecha_nacimiento, responsablefinanciero, saldo, cedula
-            FROM estudiantes
-            WHERE cedula = %s
-        """
         with self.connection_manager.get_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, (cedula,))
+                _ESTUDIANTE_POR_CEDULA.ejecutar(cur, (cedula,))
                 result = cur.fetchone()
                 if result is None:
                     return None
@@ -143,32 +167,3 @@ class PostgresqlEstudianteRepository(EstudianteRepository):
                     saldo=result.get('saldo'),
                     cedula=result.get('cedula')
                 )
-
-    def actualizar_saldo(self, estudiante_id: int, nuevo_saldo: float) -> Optional[Estudiante]:
-        """
-        Actualiza el saldo de un estudiante.
-        """
-        query = """
-            UPDATE estudiantes 
-            SET saldo = %s
-            WHERE id = %s 
-            RETURNING id, nombre, email, fecha_nacimiento, responsablefinanciero, saldo, cedula
-        """
-        with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, (float(nuevo_saldo), estudiante_id))
-                conn.commit()
-                
-                if cur.rowcount == 0:
-                    raise UsuarioNoEncontradoError(f"Estudiante con ID {estudiante_id} no encontrado")
-                
-                result = cur.fetchone()
-                return Estudiante(
-                    id=result.get('id'),
-                    nombre=result.get('nombre'),
-                    email=result.get('email'),
-                    fecha_nacimiento=result.get('fecha_nacimiento'),
-                    responsableFinanciero=result.get('responsablefinanciero'),
-                    saldo=result.get('saldo'),
-                    cedula=result.get('cedula')
-                )
\ No newline at end of file
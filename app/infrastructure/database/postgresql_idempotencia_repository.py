@@ -0,0 +1,133 @@
+# infrastructure/database/postgresql_idempotencia_repository.py
+
+from dataclasses import dataclass
+from typing import Optional
+
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.row_mapper import cursor_tuplas
+
+
+@dataclass(slots=True)
+class RegistroIdempotencia:
+    """Estado de una clave ya reservada por otra petición."""
+    huella: str
+    estado: str
+    codigo_estado: Optional[int] = None
+    tipo_contenido: Optional[str] = None
+    cuerpo: Optional[bytes] = None
+
+
+class PostgresqlIdempotenciaRepository:
+    """
+    Tabla claves_idempotencia. Cada operación se confirma en su propia
+    transacción, fuera de la unidad de trabajo de la petición: la reserva debe
+    verse desde otros procesos antes de que empiece la operación protegida.
+    """
+
+    def __init__(self, connection_manager: PostgresqlConnectionManager):
+        self.connection_manager = connection_manager
+
+    def reservar(self, alcance: str, clave: str, huella: str,
+                 bloqueo_segundos: float, ttl_segundos: float) -> Optional[RegistroIdempotencia]:
+        """
+        Intenta quedarse con la clave. Devuelve None si la reserva es de quien
+        llama, o el registro existente si otra petición ya la tiene o la completó.
+        Las claves vencidas y las reservas abandonadas se reutilizan.
+        """
+        query_reservar = """
+            INSERT INTO claves_idempotencia (alcance, clave, huella, estado, bloqueada_hasta, expira_en)
+            VALUES (%s, %s, %s, 'en_proceso',
+                    now() + make_interval(secs => %s), now() + make_interval(secs => %s))
+            ON CONFLICT (alcance, clave) DO UPDATE
+            SET huella = EXCLUDED.huella,
+                estado = 'en_proceso',
+                codigo_estado = NULL,
+                tipo_contenido = NULL,
+                cuerpo = NULL,
+                bloqueada_hasta = EXCLUDED.bloqueada_hasta,
+                expira_en = EXCLUDED.expira_en,
+                fecha_creacion = now()
+            WHERE claves_idempotencia.expira_en <= now()
+               OR (claves_idempotencia.estado = 'en_proceso' AND claves_idempotencia.bloqueada_hasta <= now())
+            RETURNING 1
+        """
+        query_existente = """
+            SELECT huella, estado, codigo_estado, tipo_contenido, cuerpo
+            FROM claves_idempotencia
+            WHERE alcance = %s AND clave = %s
+        """
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                while True:
+                    cursor.execute(query_reservar, (alcance, clave, huella, bloqueo_segundos, ttl_segundos))
+                    if cursor.fetchone() is not None:
+                        conn.commit()
+                        return None
+                    cursor.execute(query_existente, (alcance, clave))
+                    fila = cursor.fetchone()
+                    conn.commit()
+                    # Si no hay fila, la otra petición liberó la clave entre las dos sentencias
+                    if fila is not None:
+                        break
+        huella_existente, estado, codigo_estado, tipo_contenido, cuerpo = fila
+        return RegistroIdempotencia(
+            huella=huella_existente,
+            estado=estado,
+            codigo_estado=codigo_estado,
+            tipo_contenido=tipo_contenido,
+            cuerpo=bytes(cuerpo) if cuerpo is not None else None
+        )
+
+    def completar(self, alcance: str, clave: str, huella: str, codigo_estado: int,
+                  tipo_contenido: Optional[str], cuerpo: bytes) -> None:
+        query = """
+            UPDATE claves_idempotencia
+            SET estado = 'completada', codigo_estado = %s, tipo_contenido = %s, cuerpo = %s,
+                bloqueada_hasta = now()
+            WHERE alcance = %s AND clave = %s AND huella = %s
+        """
+        with self.connection_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, (codigo_estado, tipo_contenido, cuerpo, alcance, clave, huella))
+            conn.commit()
+
+    _RETENER = """
+        UPDATE claves_idempotencia
+        SET bloqueada_hasta = expira_en
+        WHERE alcance = %s AND clave = %s AND huella = %s AND estado = 'en_proceso'
+    """
+
+    def retener_en_transaccion(self, conn, alcance: str, clave: str, huella: str) -> None:
+        """
+        Extiende la reserva hasta que la clave vence, dentro de la transacción de
+        la operación protegida. Si el proceso cae entre ese commit y completar(),
+        la clave queda bloqueada (los reintentos reciben 409) en lugar de
+        liberarse a los IDEMPOTENCY_LOCK_SECONDS y volver a ejecutar el cobro.
+        """
+        with conn.cursor() as cursor:
+            cursor.execute(self._RETENER, (alcance, clave, huella))
+
+    def retener(self, alcance: str, clave: str, huella: str) -> None:
+        """Como retener_en_transaccion, en una transacción propia."""
+        with self.connection_manager.get_connection() as conn:
+            self.retener_en_transaccion(conn, alcance, clave, huella)
+            conn.commit()
+
+    def liberar(self, alcance: str, clave: str, huella: str) -> None:
+        """Borra una reserva cuya operación falló, para que un reintento la ejecute de nuevo."""
+        query = """
+            DELETE FROM claves_idempotencia
+            WHERE alcance = %s AND clave = %s AND huella = %s AND estado = 'en_proceso'
+        """
+        with self.connection_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, (alcance, clave, huella))
+            conn.commit()
+
+    def purgar_vencidas(self) -> int:
+        with self.connection_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM claves_idempotencia WHERE expira_en <= now()")
+                eliminadas = cursor.rowcount
+            conn.commit()
+        return eliminadas
@@ -0,0 +1,170 @@
+# infrastructure/database/postgresql_movimiento_saldo_repository.py
+
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from domain.models.movimiento_saldo import LineaEstadoCuenta, MovimientoSaldo, TipoMovimiento, TitularSaldo
+from domain.repositories.movimiento_saldo_repository import MovimientoSaldoRepository
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.read_replica import solo_lectura
+from infrastructure.database.row_mapper import cursor_tuplas
+
+logger = logging.getLogger(__name__)
+
+# Antigüedad mínima de un movimiento para entrar en una foto. Debe superar la
+# duración máxima de una transacción: un movimiento más viejo ya está confirmado.
+MARGEN_FOTOS_SEGUNDOS = 300
+
+# Última foto del titular más los movimientos posteriores
+_SALDO = """
+    WITH foto AS (
+        SELECT saldo, ultimo_movimiento_id
+        FROM saldos_snapshot
+        WHERE titular_tipo = %(tipo)s AND titular_id = %(id)s
+        ORDER BY ultimo_movimiento_id DESC
+        LIMIT 1
+    )
+    SELECT COALESCE((SELECT saldo FROM foto), 0) + COALESCE((
+        SELECT SUM(m.monto)
+        FROM movimientos_saldo m
+        WHERE m.titular_tipo = %(tipo)s AND m.titular_id = %(id)s
+          AND m.id > COALESCE((SELECT ultimo_movimiento_id FROM foto), 0)
+    ), 0)
+"""
+
+# Los últimos movimientos con el saldo que dejó cada uno: el saldo actual menos
+# lo que se movió después. Solo lee las filas pedidas y el delta desde la foto.
+_ESTADO_DE_CUENTA = f"""
+    WITH actual AS ({_SALDO.strip()}),
+    ultimos AS (
+        SELECT id, tipo, monto, referencia, fecha
+        FROM movimientos_saldo
+        WHERE titular_tipo = %(tipo)s AND titular_id = %(id)s
+          AND (%(desde)s::timestamp IS NULL OR fecha >= %(desde)s::timestamp)
+        ORDER BY id DESC
+        LIMIT %(limite)s
+    )
+    SELECT u.id, u.tipo, u.monto, u.referencia, u.fecha,
+           (SELECT * FROM actual) - COALESCE(SUM(u.monto) OVER (
+               ORDER BY u.id DESC ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+           ), 0) AS saldo
+    FROM ultimos u
+    ORDER BY u.id DESC
+"""
+
+# Una foto por titular con movimientos entre la toma anterior y la frontera.
+# La frontera es el movimiento más reciente con más antigüedad que el margen;
+# todo lo anterior a ella es visible, así que ninguna foto se salta un movimiento.
+_TOMAR_FOTOS = """
+    WITH limites AS (
+        SELECT COALESCE((SELECT MAX(ultimo_movimiento_id) FROM saldos_snapshot), 0) AS desde,
+               (SELECT id FROM movimientos_saldo
+                WHERE fecha < clock_timestamp() - make_interval(secs => %s)
+                ORDER BY id DESC
+                LIMIT 1) AS hasta
+    ),
+    delta AS (
+        SELECT m.titular_tipo, m.titular_id, MAX(m.id) AS ultimo_movimiento_id, SUM(m.monto) AS monto
+        FROM movimientos_saldo m, limites l
+        WHERE m.id > l.desde AND m.id <= l.hasta
+        GROUP BY m.titular_tipo, m.titular_id
+    )
+    INSERT INTO saldos_snapshot (titular_tipo, titular_id, ultimo_movimiento_id, saldo)
+    SELECT d.titular_tipo, d.titular_id, d.ultimo_movimiento_id,
+           COALESCE((SELECT s.saldo FROM saldos_snapshot s
+                     WHERE s.titular_tipo = d.titular_tipo AND s.titular_id = d.titular_id
+                     ORDER BY s.ultimo_movimiento_id DESC
+                     LIMIT 1), 0) + d.monto
+    FROM delta d
+    ON CONFLICT DO NOTHING
+"""
+
+# Saldo de la columna frente al del libro para todos los titulares. Con
+# desde_cero se ignoran las fotos y se suma todo el historial.
+_CONCILIAR = """
+    WITH saldos AS (
+        SELECT 'estudiante'::varchar AS titular_tipo, id AS titular_id, saldo FROM estudiantes
+        UNION ALL
+        SELECT 'usuario', id, saldo FROM usuarios
+    ),
+    fotos AS (
+        SELECT DISTINCT ON (titular_tipo, titular_id) titular_tipo, titular_id, ultimo_movimiento_id, saldo
+        FROM saldos_snapshot
+        WHERE NOT %(desde_cero)s
+        ORDER BY titular_tipo, titular_id, ultimo_movimiento_id DESC
+    ),
+    libro AS (
+        SELECT s.titular_tipo, s.titular_id, s.saldo,
+               COALESCE(f.saldo, 0) + COALESCE((
+                   SELECT SUM(m.monto)
+                   FROM movimientos_saldo m
+                   WHERE m.titular_tipo = s.titular_tipo AND m.titular_id = s.titular_id
+                     AND m.id > COALESCE(f.ultimo_movimiento_id, 0)
+               ), 0) AS saldo_libro
+        FROM saldos s
+        LEFT JOIN fotos f ON f.titular_tipo = s.titular_tipo AND f.titular_id = s.titular_id
+    )
+    SELECT titular_tipo, titular_id, saldo, saldo_libro
+    FROM libro
+    WHERE saldo <> saldo_libro
+    ORDER BY titular_tipo, titular_id
+"""
+
+
+class PostgresqlMovimientoSaldoRepository(MovimientoSaldoRepository):
+    def __init__(self, connection_manager: PostgresqlConnectionManager):
+        self.connection_manager = connection_manager
+
+    def saldo(self, titular_tipo: TitularSaldo, titular_id: int) -> Decimal:
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute(_SALDO, {"tipo": TitularSaldo(titular_tipo).value, "id": titular_id})
+                return cursor.fetchone()[0]
+
+    @solo_lectura
+    def estado_de_cuenta(
+        self, titular_tipo: TitularSaldo, titular_id: int,
+        desde: Optional[datetime] = None, limite: int = 100
+    ) -> List[LineaEstadoCuenta]:
+        titular_tipo = TitularSaldo(titular_tipo)
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute(_ESTADO_DE_CUENTA, {
+                    "tipo": titular_tipo.value, "id": titular_id, "desde": desde, "limite": limite
+                })
+                return [
+                    LineaEstadoCuenta(
+                        movimiento=MovimientoSaldo(
+                            titular_tipo=titular_tipo, titular_id=titular_id, tipo=TipoMovimiento(tipo),
+                            monto=monto, referencia=referencia, fecha=fecha, id=movimiento_id
+                        ),
+                        saldo=saldo
+                    )
+                    for movimiento_id, tipo, monto, referencia, fecha, saldo in cursor.fetchall()
+                ]
+
+    # --- Tareas periódicas (no forman parte del puerto de dominio) ---
+
+    def tomar_fotos(self, margen_segundos: int = MARGEN_FOTOS_SEGUNDOS) -> int:
+        """Guarda una foto del saldo de cada titular con movimientos nuevos. Devuelve cuántas."""
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute(_TOMAR_FOTOS, (margen_segundos,))
+                fotos = cursor.rowcount
+                conn.commit()
+        if fotos:
+            logger.info(f"📸 Fotos de saldo tomadas: {fotos}")
+        return fotos
+
+    def conciliar(self, desde_cero: bool = False) -> List[Dict]:
+        """Titulares cuyo saldo no coincide con el libro (lista vacía si todo cuadra)."""
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute(_CONCILIAR, {"desde_cero": desde_cero})
+                return [
+                    {"titular_tipo": titular_tipo, "titular_id": titular_id,
+                     "saldo": saldo, "saldo_libro": saldo_libro, "diferencia": saldo - saldo_libro}
+                    for titular_tipo, titular_id, saldo, saldo_libro in cursor.fetchall()
+                ]
@@ -7,9 +7,35 @@ from domain.models.compra import Compra, CompraItem
 from domain.repositories.precompra_repository import PrecompraRepository
 from domain.repositories.compra_repository import CompraRepository
 from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.read_replica import solo_lectura
+from infrastructure.database.row_mapper import MapeadorFilas, cursor_tuplas
 import json
 import logging
 
+
+def _precompra_desde_fila(id, id_compra, id_estudiante, fecha_precompra, costo_total, costo_adicional,
+                          entregado, fecha_entrega, activo, fecha_creacion, fecha_actualizacion) -> Precompra:
+    return Precompra(
+        id=id,
+        id_compra=id_compra,
+        id_estudiante=id_estudiante,
+        fecha_precompra=fecha_precompra,
+        costo_total=float(costo_total),
+        costo_adicional=float(costo_adicional),
+        entregado=entregado,
+        fecha_entrega=fecha_entrega,
+        activo=activo,
+        fecha_creacion=fecha_creacion,
+        fecha_actualizacion=fecha_actualizacion
+    )
+
+# Los listados usan SELECT *: el mapeador resuelve las posiciones por nombre de columna
+_MAPEADOR_PRECOMPRA = MapeadorFilas(
+    _precompra_desde_fila,
+    ("id", "id_compra", "id_estudiante", "fecha_precompra", "costo_total", "costo_adicional",
+     "entregado", "fecha_entrega", "activo", "fecha_creacion", "fecha_actualizacion")
+)
+
 class PostgresqlPrecompraRepository(PrecompraRepository):
     
     def __init__(self, connection_manager: PostgresqlConnectionManager, compra_repository: CompraRepository):
@@ -164,11 +190,9 @@ class PostgresqlPrecompraRepository(PrecompraRepository):
         """
         
         with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            with cursor_tuplas(conn) as cursor:
                 cursor.execute(query, (estudiante_id,))
-                results = cursor.fetchall()
-                
-                return [self._row_to_precompra(row) for row in results]
+                return _MAPEADOR_PRECOMPRA.mapear(cursor)
     
     def obtener_pendientes_entrega(self) -> List[Precompra]:
         query = """
@@ -178,11 +202,9 @@ class PostgresqlPrecompraRepository(PrecompraRepository):
         """
         
         with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            with cursor_tuplas(conn) as cursor:
                 cursor.execute(query)
-                results = cursor.fetchall()
-                
-                return [self._row_to_precompra(row) for row in results]
+                return _MAPEADOR_PRECOMPRA.mapear(cursor)
     
     def obtener_por_estudiante_pendientes(self, estudiante_id: int) -> List[Precompra]:
         query = """
@@ -192,11 +214,9 @@ class PostgresqlPrecompraRepository(PrecompraRepository):
         """
         
         with self.connection_manager.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            with cursor_tuplas(conn) as cursor:
                 cursor.execute(query, (estudiante_id,))
-                results = cursor.fetchall()
-                
-                return [self._row_to_precompra(row) for row in results]
+                return _MAPEADOR_PRECOMPRA.mapear(cursor)
     
     def eliminar(self, precompra_id: int) -> bool:
         query = """
@@ -276,6 +296,7 @@ class PostgresqlPrecompraRepository(PrecompraRepository):
             fecha_actualizacion=row['fecha_actualizacion']
         )
     
+    @solo_lectura
     def obtener_todas_con_detalles(self) -> List[dict]:
         """
         Obtiene TODAS las precompras con detalles usando una única consulta
@@ -1,6 +1,11 @@
 # app/infrastructure/repositories/postgresql_producto_repository.py
+from typing import Dict, Iterable
+
+from domain.models.alimento import Alimento
 from domain.services.producto_service import ProductoRepository
 from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.postgresql_alimento_repository import _MAPEADOR_ALIMENTO
+from infrastructure.database.row_mapper import cursor_tuplas
 
 class PostgresqlProductoRepository(ProductoRepository):
     def __init__(self, connection_manager: PostgresqlConnectionManager):
@@ -16,4 +21,26 @@ class PostgresqlProductoRepository(ProductoRepository):
                     (producto_id,)
                 )
                 result = cursor.fetchone()
-                return result is not None
\ No newline at end of file
+                return result is not None
+
+    def obtener_productos_por_ids(self, producto_ids: Iterable[int], bloquear: bool = False) -> Dict[int, Alimento]:
+        """
+        Todos los productos de un carrito en una sola consulta. No filtra por
+        activo para que quien llama distinga un producto inactivo de uno inexistente.
+        Con bloquear=True usa FOR UPDATE en orden de id, como el descuento de stock.
+        """
+        ids = sorted(set(producto_ids))
+        if not ids:
+            return {}
+        with self.connection_manager.get_connection() as connection:
+            with cursor_tuplas(connection) as cursor:
+                query = """
+                    SELECT id, nombre, precio, cantidad_en_stock, calorias, imagen, categoria,
+                           fecha_creacion, fecha_actualizacion, activo, version
+                    FROM alimentos
+                    WHERE id = ANY(%s)
+                """
+                if bloquear:
+                    query += " ORDER BY id FOR UPDATE"
+                cursor.execute(query, (ids,))
+                return {alimento.id: alimento for alimento in _MAPEADOR_ALIMENTO.mapear(cursor)}
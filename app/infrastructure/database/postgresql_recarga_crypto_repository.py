@@ -4,6 +4,7 @@ import logging
 
 from domain.models.recarga_crypto import RecargaCrypto, TipoCrypto, EstadoRecargaCrypto
 from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.read_replica import solo_lectura
 from psycopg2.extras import RealDictCursor
 import json
 
@@ -224,6 +225,7 @@ class PostgresqlRecargaCryptoRepository:
                 
                 return [self._map_row_to_recarga(result) for result in results]
     
+    @solo_lectura
     def listar_todas(self, offset: int = 0, limite: int = 50) -> List[RecargaCrypto]:
         """Lista todas las recargas crypto con paginación"""
         query = """
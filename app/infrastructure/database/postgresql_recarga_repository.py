@@ -8,9 +8,47 @@ import logging
 from domain.models.recarga import Recarga, EstadoRecarga
 from domain.repositories.recarga_repository import RecargaRepository
 from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.read_replica import solo_lectura
+from infrastructure.database.row_mapper import MapeadorFilas, cursor_tuplas
 
 logger = logging.getLogger(__name__)
 
+# Valores de status en BD → estado de dominio (incluye los alias en español)
+_ESTADOS_DB = {
+    "PENDING": EstadoRecarga.PENDIENTE,
+    "APPROVED": EstadoRecarga.APROBADA,
+    "COMPLETED": EstadoRecarga.APROBADA,  # ⚠️ Por si tu BD usa COMPLETED
+    "REJECTED": EstadoRecarga.RECHAZADA,
+    "CANCELLED": EstadoRecarga.CANCELADA,
+    # Compatibilidad con español
+    "PENDIENTE": EstadoRecarga.PENDIENTE,
+    "APROBADA": EstadoRecarga.APROBADA,
+    "RECHAZADA": EstadoRecarga.RECHAZADA,
+    "CANCELADA": EstadoRecarga.CANCELADA
+}
+
+
+def _recarga_desde_fila(id, user_id, amount, status, wompi_reference, created_at, updated_at) -> Optional[Recarga]:
+    try:
+        return Recarga(
+            id=str(id),
+            monto=float(amount),
+            usuario_id=str(user_id),
+            estado=_ESTADOS_DB.get(status.upper() if status else "", EstadoRecarga.PENDIENTE),
+            referencia_wompi=wompi_reference,
+            url_pago=None,
+            fecha_creacion=created_at,
+            fecha_actualizacion=updated_at
+        )
+    except Exception as e:
+        logger.error(f"❌ Error mapeando fila a Recarga {id}: {e}", exc_info=True)
+        return None
+
+_MAPEADOR_RECARGA = MapeadorFilas(
+    _recarga_desde_fila,
+    ("id", "user_id", "amount", "status", "wompi_reference", "created_at", "updated_at")
+)
+
 class PostgresqlRecargaRepository(RecargaRepository):
     """
     ✅ CORREGIDO: Implementación con manejo correcto de estados
@@ -102,7 +140,7 @@ class PostgresqlRecargaRepository(RecargaRepository):
     def buscar_por_usuario(self, usuario_id: str, limite: int = 10) -> List[Recarga]:
         """Busca las recargas de un usuario específico"""
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = cursor_tuplas(conn)
             try:
                 usuario_id_int = int(usuario_id)
             except ValueError:
@@ -120,13 +158,12 @@ class PostgresqlRecargaRepository(RecargaRepository):
                 """,
                 (usuario_id_int, limite)
             )
-            rows = cursor.fetchall()
-            return [self._map_row_to_recarga(row) for row in rows if row]
+            return [recarga for recarga in _MAPEADOR_RECARGA.mapear(cursor) if recarga is not None]
     
     def buscar_por_estado(self, estado: EstadoRecarga, limite: int = 100) -> List[Recarga]:
         """Busca recargas por estado"""
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = cursor_tuplas(conn)
             cursor.execute(
                 """
                 SELECT id, user_id, amount, status, wompi_reference, wompi_transaction_id,
@@ -138,8 +175,7 @@ class PostgresqlRecargaRepository(RecargaRepository):
                 """,
                 (self._map_estado_to_db(estado), limite)
             )
-            rows = cursor.fetchall()
-            return [self._map_row_to_recarga(row) for row in rows if row]
+            return [recarga for recarga in _MAPEADOR_RECARGA.mapear(cursor) if recarga is not None]
     
     def actualizar(self, recarga: Recarga) -> None:
         """✅ CORREGIDO: Actualiza una recarga con logs detallados"""
@@ -197,10 +233,11 @@ class PostgresqlRecargaRepository(RecargaRepository):
                 logger.error(f"❌ Error al actualizar recarga {recarga.id}: {e}", exc_info=True)
                 raise
     
+    @solo_lectura
     def listar_todas(self, offset: int = 0, limite: int = 50) -> List[Recarga]:
         """Lista todas las recargas con paginación"""
         with self.connection_manager.get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = cursor_tuplas(conn)
             cursor.execute(
                 """
                 SELECT id, user_id, amount, status, wompi_reference, wompi_transaction_id,
@@ -211,8 +248,7 @@ class PostgresqlRecargaRepository(RecargaRepository):
                 """,
                 (limite, offset)
             )
-            rows = cursor.fetchall()
-            return [self._map_row_to_recarga(row) for row in rows if row]
+            return [recarga for recarga in _MAPEADOR_RECARGA.mapear(cursor) if recarga is not None]
     
     def _map_row_to_recarga(self, row: dict) -> Optional[Recarga]:
         """Mapea una fila de la DB a un objeto Recarga"""
@@ -260,19 +296,6 @@ class PostgresqlRecargaRepository(RecargaRepository):
         # Normalizar a mayúsculas para comparación
         db_status_upper = db_status.upper() if db_status else ""
         
-        mapping = {
-            "PENDING": EstadoRecarga.PENDIENTE,
-            "APPROVED": EstadoRecarga.APROBADA,
-            "COMPLETED": EstadoRecarga.APROBADA,  # ⚠️ Por si tu BD usa COMPLETED
-            "REJECTED": EstadoRecarga.RECHAZADA,
-            "CANCELLED": EstadoRecarga.CANCELADA,
-            # Compatibilidad con español
-            "PENDIENTE": EstadoRecarga.PENDIENTE,
-            "APROBADA": EstadoRecarga.APROBADA,
-            "RECHAZADA": EstadoRecarga.RECHAZADA,
-            "CANCELADA": EstadoRecarga.CANCELADA
-        }
-        
-        resultado = mapping.get(db_status_upper, EstadoRecarga.PENDIENTE)
+        resultado = _ESTADOS_DB.get(db_status_upper, EstadoRecarga.PENDIENTE)
         logger.debug(f"Mapeo DB: {db_status} → {resultado.value}")
         return resultado
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 from contextlib import contextmanager
 import os
+import threading
 from dotenv import load_dotenv
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -10,57 +11,174 @@ from typing import Optional, List
 from domain.models.usuario import Usuario, RolUsuario
 from domain.repositories.usuario_repository import UsuarioRepository
 from domain.exceptions.exceptions import UsuarioNoEncontradoError
+from infrastructure.database.connection_pool import ConexionNoDisponibleError, PostgresqlConnectionPool
+from infrastructure.database.read_replica import EnrutadorReplica, en_solo_lectura
+from infrastructure.database.query_deadlines import aplicar_statement_timeout, traducir_cancelacion, verificar_plazo
+from infrastructure.database.prepared_statements import registro_sentencias
 
 load_dotenv()
 
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_NAME = os.getenv("DB_NAME", "foodcash_db")
+DB_USER = os.getenv("DB_USER", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
+# Configuración del pool de conexiones
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+DB_POOL_MAX_WAITING = int(os.getenv("DB_POOL_MAX_WAITING", "50"))
+
+# Réplica de lectura opcional (DSN de libpq o URL postgresql://)
+DB_REPLICA_DSN = os.getenv("DB_REPLICA_DSN")
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+DB_REPLICA_RETRY_INTERVAL = float(os.getenv("DB_REPLICA_RETRY_INTERVAL", "30"))
+
 class PostgresqlConnectionManager:
-    """Gestiona conexiones a la base de datos PostgreSQL"""
+    """
+    Gestiona conexiones a la base de datos PostgreSQL.
+    Las conexiones se toman prestadas de un pool y se devuelven al salir del
+    bloque `with`; cualquier transacción sin confirmar se deshace al devolverla.
+    Dentro de un método @solo_lectura las conexiones salen de la réplica, si
+    hay una configurada y está al día.
+    """
     
     def __init__(self, 
                  db_name: str = DB_NAME, 
                  db_user: str = DB_USER, 
                  db_password: str = DB_PASSWORD, 
                  db_host: str = DB_HOST, 
-                 db_port: str = DB_PORT):
+                 db_port: str = DB_PORT,
+                 pool_min_size: int = DB_POOL_MIN_SIZE,
+                 pool_max_size: int = DB_POOL_MAX_SIZE,
+                 pool_max_lifetime: float = DB_POOL_MAX_LIFETIME,
+                 pool_max_idle: float = DB_POOL_MAX_IDLE,
+                 pool_timeout: float = DB_POOL_TIMEOUT,
+                 pool_max_waiting: int = DB_POOL_MAX_WAITING,
+                 replica_dsn: Optional[str] = DB_REPLICA_DSN,
+                 replica_max_lag: float = DB_REPLICA_MAX_LAG):
         self.db_name = db_name
         self.db_user = db_user
         self.db_password = db_password
         self.db_host = db_host
         self.db_port = db_port
-        
-    @contextmanager
-    def get_connection(self):
-        conexion = None
-        try:
-            conexion = psycopg2.connect(
+        self.pool = PostgresqlConnectionPool(
+            connect_kwargs=dict(
                 dbname=self.db_name,
                 user=self.db_user,
                 password=self.db_password,
                 host=self.db_host,
                 port=self.db_port,
                 cursor_factory=RealDictCursor
+            ),
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            max_lifetime=pool_max_lifetime,
+            max_idle=pool_max_idle,
+            timeout=pool_timeout,
+            max_waiting=pool_max_waiting
+        )
+        self.replica: Optional[EnrutadorReplica] = None
+        if replica_dsn:
+            self.replica = EnrutadorReplica(
+                dsn=replica_dsn,
+                connect_kwargs=dict(cursor_factory=RealDictCursor),
+                max_lag=replica_max_lag,
+                check_interval=DB_REPLICA_CHECK_INTERVAL,
+                retry_interval=DB_REPLICA_RETRY_INTERVAL,
+                min_size=0,
+                max_size=pool_max_size,
+                max_lifetime=pool_max_lifetime,
+                max_idle=pool_max_idle,
+                timeout=pool_timeout,
+                max_waiting=pool_max_waiting
             )
-            yield conexion
+
+    def open(self) -> None:
+        """Precalienta el pool; se invoca una vez al arrancar la aplicación."""
+        self.pool.open()
+        if self.replica is not None:
+            self.replica.open()
+
+    def close(self) -> None:
+        """Cierra el pool; se invoca al apagar la aplicación."""
+        if self.replica is not None:
+            self.replica.close()
+        self.pool.close()
+
+    def estadisticas(self) -> dict:
+        """Métricas del pool primario y, si existe, de la réplica."""
+        resultado = {"primario": self.pool.estadisticas(), "replica": None}
+        if self.replica is not None:
+            resultado["replica"] = {**self.replica.estadisticas(), "pool": self.replica.pool.estadisticas()}
+        return resultado
+
+    def al_confirmar(self, funcion) -> None:
+        """
+        Misma interfaz que UnitOfWork.al_confirmar. Sin unidad de trabajo cada
+        repositorio confirma antes de devolver la conexión, así que se ejecuta ya.
+        """
+        funcion()
+
+    def _acquire(self):
+        """Elige el pool: réplica para lecturas marcadas si está sana, si no el primario."""
+        # La espera por una conexión también consume el plazo de la petición
+        restante = verificar_plazo()
+        if self.replica is not None and en_solo_lectura():
+            if self.replica.disponible():
+                try:
+                    conexion = self.replica.pool.acquire(timeout=restante)
+                    self.replica.registrar_lectura(en_replica=True)
+                    return conexion, self.replica.pool
+                except psycopg2.OperationalError as e:
+                    self.replica.marcar_caida(e)
+                except ConexionNoDisponibleError:
+                    # Réplica saturada pero sana: esta lectura va al primario
+                    pass
+            self.replica.registrar_lectura(en_replica=False)
+        return self.pool.acquire(timeout=restante), self.pool
+
+    @contextmanager
+    def get_connection(self):
+        conexion = None
+        pool = self.pool
+        try:
+            conexion, pool = self._acquire()
+            aplicar_statement_timeout(conexion)
+            with traducir_cancelacion():
+                yield conexion
         except psycopg2.OperationalError as e:
             print(f"❌ Error de conexión a PostgreSQL: {e}")
             raise
         finally:
             if conexion is not None:
-                conexion.close()
+                pool.release(conexion)
 
-def get_connection_manager():
+_connection_manager: Optional[PostgresqlConnectionManager] = None
+_connection_manager_lock = threading.Lock()
+
+def get_connection_manager() -> PostgresqlConnectionManager:
     """
-    Función de dependencia que crea y retorna una instancia del
-    gestor de conexiones. Esto evita que FastAPI exponga las
-    credenciales en los endpoints.
+    Función de dependencia que retorna el gestor de conexiones compartido
+    por todo el proceso (y con él, su pool). Esto evita que FastAPI exponga
+    las credenciales en los endpoints y que cada petición abra conexiones nuevas.
     """
-    return PostgresqlConnectionManager()
+    global _connection_manager
+    if _connection_manager is None:
+        with _connection_manager_lock:
+            if _connection_manager is None:
+                _connection_manager = PostgresqlConnectionManager()
+    return _connection_manager
+
+# Se ejecuta en cada petición autenticada (get_current_user)
+_USUARIO_POR_NOMBRE = registro_sentencias.registrar(
+    "usuario_por_nombre",
+    "SELECT id, usuario, contrasena, nombre, rol, saldo FROM usuarios WHERE usuario = %s"
+)
 
 class PostgresqlUsuarioRepository(UsuarioRepository):
     """Implementación del repositorio de usuarios con PostgreSQL"""
@@ -120,10 +238,7 @@ class PostgresqlUsuarioRepository(UsuarioRepository):
     def buscar_por_nombre_usuario(self, nombre_usuario: str) -> Optional[Usuario]:
         with self.connection_manager.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, usuario, contrasena, nombre, rol, saldo FROM usuarios WHERE usuario = %s",
-                (nombre_usuario,)
-            )
+            _USUARIO_POR_NOMBRE.ejecutar(cursor, (nombre_usuario,))
             usuario_db = cursor.fetchone()
             return self._map_row_to_usuario(usuario_db)
             
@@ -142,29 +257,13 @@ class PostgresqlUsuarioRepository(UsuarioRepository):
                 cursor.execute(
                     """
                     UPDATE usuarios 
-                    SET nombre = %s, saldo = %s, contrasena = %s, rol = %s
+                    SET nombre = %s, contrasena = %s, rol = %s
                     WHERE id = %s
                     """,
-                    (usuario.nombre, usuario.saldo, usuario.contrasena_hash, usuario.rol.value, int(usuario.id))
+                    (usuario.nombre, usuario.contrasena_hash, usuario.rol.value, int(usuario.id))
                 )
                 conn.commit()
 
-    def actualizar_saldo(self, nombre_usuario: str, nuevo_saldo: float) -> Optional[Usuario]:
-        with self.connection_manager.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    UPDATE usuarios 
-                    SET saldo = %s 
-                    WHERE usuario = %s 
-                    RETURNING id, usuario, nombre, rol, saldo, contrasena
-                    """,
-                    (nuevo_saldo, nombre_usuario)
-                )
-                conn.commit()
-                usuario_actualizado = cursor.fetchone()
-                return self._map_row_to_usuario(usuario_actualizado)
-    
     def listar_por_rol(self, rol: str) -> List[Usuario]:
         """Lista todos los usuarios con un rol específico"""
         with self.connection_manager.get_connection() as conn:
@@ -0,0 +1,126 @@
+# infrastructure/database/postgresql_saldo_repository.py
+
+from decimal import Decimal
+from typing import Dict, List
+
+from psycopg2.extras import execute_values
+
+from domain.exceptions.exceptions import SaldoInsuficienteError, UsuarioNoEncontradoError
+from domain.models.movimiento_saldo import MovimientoSaldo, TipoMovimiento, TitularSaldo
+from domain.repositories.saldo_repository import SaldoRepository
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.row_mapper import cursor_tuplas
+
+_TABLAS = {TitularSaldo.ESTUDIANTE: "estudiantes", TitularSaldo.USUARIO: "usuarios"}
+
+# Cambio condicional y movimiento del libro en una sola sentencia: la fila se
+# actualiza con el saldo que tenga al momento (no el leído antes) y solo si no
+# queda en negativo. Si el UPDATE no toca ninguna fila tampoco hay movimiento.
+_APLICAR = """
+    WITH cambio AS (
+        UPDATE {tabla}
+        SET saldo = saldo + %(monto)s
+        WHERE id = %(id)s AND saldo + %(monto)s >= 0
+        RETURNING id, saldo
+    ),
+    movimiento AS (
+        INSERT INTO movimientos_saldo (titular_tipo, titular_id, tipo, monto, referencia)
+        SELECT %(titular)s, id, %(tipo)s, %(monto)s, %(referencia)s
+        FROM cambio
+        RETURNING id, fecha
+    )
+    SELECT c.saldo, m.id, m.fecha
+    FROM cambio c, movimiento m
+"""
+
+_APLICAR_VARIOS = """
+    WITH movimientos (orden, titular_tipo, titular_id, tipo, monto, referencia) AS (VALUES %s),
+    totales AS (
+        SELECT titular_id, SUM(monto) AS monto
+        FROM movimientos
+        GROUP BY titular_id
+    ),
+    bloqueados AS (
+        -- Bloquea en orden de id, como el descuento de stock: dos lotes no se interbloquean
+        SELECT t.id
+        FROM {tabla} t
+        JOIN totales tot ON tot.titular_id = t.id
+        ORDER BY t.id
+        FOR UPDATE OF t
+    ),
+    cambio AS (
+        UPDATE {tabla} t
+        SET saldo = t.saldo + tot.monto
+        FROM totales tot
+        WHERE t.id = tot.titular_id
+          AND t.id IN (SELECT id FROM bloqueados)
+          AND t.saldo + tot.monto >= 0
+        RETURNING t.id, t.saldo
+    ),
+    registro AS (
+        INSERT INTO movimientos_saldo (titular_tipo, titular_id, tipo, monto, referencia)
+        SELECT m.titular_tipo, m.titular_id, m.tipo, m.monto, m.referencia
+        FROM movimientos m
+        JOIN cambio c ON c.id = m.titular_id
+        ORDER BY m.orden
+    )
+    SELECT id, saldo FROM cambio
+"""
+
+
+class PostgresqlSaldoRepository(SaldoRepository):
+    def __init__(self, connection_manager: PostgresqlConnectionManager):
+        self.connection_manager = connection_manager
+
+    def aplicar(self, movimiento: MovimientoSaldo) -> Decimal:
+        titular = TitularSaldo(movimiento.titular_tipo)
+        tabla = _TABLAS[titular]
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                cursor.execute(_APLICAR.format(tabla=tabla), {
+                    "titular": titular.value,
+                    "id": movimiento.titular_id,
+                    "tipo": TipoMovimiento(movimiento.tipo).value,
+                    "monto": movimiento.monto,
+                    "referencia": movimiento.referencia,
+                })
+                fila = cursor.fetchone()
+                if fila is None:
+                    # Solo en el camino de error: distinguir titular inexistente de saldo insuficiente
+                    cursor.execute(f"SELECT saldo FROM {tabla} WHERE id = %s", (movimiento.titular_id,))
+                    actual = cursor.fetchone()
+                    if actual is None:
+                        raise UsuarioNoEncontradoError(f"{titular.value.capitalize()} con ID {movimiento.titular_id} no encontrado")
+                    raise SaldoInsuficienteError(f"Saldo insuficiente. Saldo actual: {actual[0]}")
+                saldo, movimiento.id, movimiento.fecha = fila
+                conn.commit()
+        return saldo
+
+    def aplicar_varios(self, movimientos: List[MovimientoSaldo]) -> Dict[int, Decimal]:
+        if not movimientos:
+            return {}
+        titulares = {TitularSaldo(m.titular_tipo) for m in movimientos}
+        if len(titulares) != 1:
+            raise ValueError("aplicar_varios espera movimientos de un solo tipo de titular")
+        titular = titulares.pop()
+        afectados = {m.titular_id for m in movimientos}
+        filas = [
+            (orden, titular.value, m.titular_id, TipoMovimiento(m.tipo).value, m.monto, m.referencia)
+            for orden, m in enumerate(movimientos)
+        ]
+        with self.connection_manager.get_connection() as conn:
+            with cursor_tuplas(conn) as cursor:
+                saldos = dict(execute_values(
+                    cursor, _APLICAR_VARIOS.format(tabla=_TABLAS[titular]), filas,
+                    template="(%s::integer, %s::varchar, %s::integer, %s::varchar, %s::numeric, %s::varchar)",
+                    page_size=len(filas), fetch=True
+                ))
+                if len(saldos) != len(afectados):
+                    # Todo o nada: deshacer los saldos que sí se aplicaron
+                    conn.rollback()
+                    faltantes = sorted(afectados - saldos.keys())
+                    raise SaldoInsuficienteError(
+                        f"Saldo insuficiente o titular inexistente: {', '.join(map(str, faltantes))}"
+                    )
+                conn.commit()
+        return saldos
@@ -0,0 +1,119 @@
+# infrastructure/database/prepared_statements.py
+
+import logging
+import os
+import re
+import threading
+import weakref
+from typing import Dict, Sequence
+
+from dotenv import load_dotenv
+from psycopg2 import errors
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Desactivar detrás de un pooler en modo transacción (p. ej. PgBouncer),
+# donde la sesión del servidor no está ligada a la conexión del cliente
+DB_PREPARED_STATEMENTS = os.getenv("DB_PREPARED_STATEMENTS", "true").lower() in ("1", "true", "yes")
+
+_PARAMETRO = re.compile(r"%s")
+
+
+class SentenciaPreparada:
+    """
+    Consulta con nombre que se prepara (PREPARE) una sola vez por conexión
+    y después se ejecuta con EXECUTE, sin volver a analizar ni planificar.
+    """
+
+    def __init__(self, registro: "RegistroSentencias", nombre: str, sql: str):
+        self.registro = registro
+        self.nombre = nombre
+        self.sql = sql
+        self.num_parametros = len(_PARAMETRO.findall(sql))
+        contador = iter(range(1, self.num_parametros + 1))
+        self.sql_preparada = _PARAMETRO.sub(lambda _: f"${next(contador)}", sql)
+        marcadores = ", ".join(["%s"] * self.num_parametros)
+        self.sql_ejecucion = f"EXECUTE {nombre} ({marcadores})" if marcadores else f"EXECUTE {nombre}"
+
+    def ejecutar(self, cursor, parametros: Sequence = ()) -> None:
+        """Ejecuta la sentencia en el cursor dado; los resultados se leen con fetchone/fetchall."""
+        self.registro.ejecutar(cursor, self, parametros)
+
+
+class RegistroSentencias:
+    """
+    Registro de sentencias preparadas de las consultas más frecuentes.
+
+    Recuerda qué sentencias están preparadas en cada conexión física del pool
+    (las conexiones nuevas o recicladas empiezan vacías) y cuenta cuántas veces
+    se preparó y se ejecutó cada una.
+    """
+
+    def __init__(self, habilitado: bool = DB_PREPARED_STATEMENTS):
+        self.habilitado = habilitado
+        self._sentencias: Dict[str, SentenciaPreparada] = {}
+        self._preparadas = weakref.WeakKeyDictionary()
+        self._ejecuciones: Dict[str, int] = {}
+        self._preparaciones: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre: str, sql: str) -> SentenciaPreparada:
+        """Declara una sentencia; `sql` usa los marcadores %s habituales de psycopg2."""
+        with self._lock:
+            existente = self._sentencias.get(nombre)
+            if existente is not None:
+                if existente.sql != sql:
+                    raise ValueError(f"La sentencia preparada '{nombre}' ya está registrada con otro SQL")
+                return existente
+            sentencia = SentenciaPreparada(self, nombre, sql)
+            self._sentencias[nombre] = sentencia
+            self._ejecuciones[nombre] = 0
+            self._preparaciones[nombre] = 0
+            return sentencia
+
+    def ejecutar(self, cursor, sentencia: SentenciaPreparada, parametros: Sequence = ()) -> None:
+        if not self.habilitado:
+            cursor.execute(sentencia.sql, parametros)
+            return
+
+        conexion = cursor.connection
+        with self._lock:
+            preparadas = self._preparadas.setdefault(conexion, set())
+            preparar = sentencia.nombre not in preparadas
+
+        if preparar:
+            # PREPARE no es transaccional: sobrevive a un rollback posterior
+            cursor.execute(f"PREPARE {sentencia.nombre} AS {sentencia.sql_preparada}")
+            with self._lock:
+                preparadas.add(sentencia.nombre)
+                self._preparaciones[sentencia.nombre] += 1
+
+        try:
+            cursor.execute(sentencia.sql_ejecucion, parametros)
+        except errors.InvalidSqlStatementName:
+            # La sesión perdió sus sentencias (DEALLOCATE/DISCARD): volver a preparar en el próximo uso
+            with self._lock:
+                self._preparadas.pop(conexion, None)
+            logger.warning(f"⚠️ Sentencia preparada '{sentencia.nombre}' no encontrada en la conexión; se volverá a preparar")
+            raise
+
+        with self._lock:
+            self._ejecuciones[sentencia.nombre] += 1
+
+    def estadisticas(self) -> Dict[str, Dict[str, int]]:
+        """Ejecuciones y preparaciones por sentencia; la diferencia son los análisis ahorrados."""
+        with self._lock:
+            return {
+                nombre: {
+                    "ejecuciones": self._ejecuciones[nombre],
+                    "preparaciones": self._preparaciones[nombre],
+                    "reutilizaciones": max(self._ejecuciones[nombre] - self._preparaciones[nombre], 0),
+                }
+                for nombre in self._sentencias
+            }
+
+
+# Registro compartido por todos los repositorios del proceso
+registro_sentencias = RegistroSentencias()
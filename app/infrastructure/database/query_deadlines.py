@@ -0,0 +1,119 @@
+# infrastructure/database/query_deadlines.py
+
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from psycopg2 import errors
+
+from domain.exceptions.exceptions import TiempoAgotadoError
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Presupuesto total de base de datos por petición, en milisegundos, según el tipo de ruta
+PLAZOS_MS: Dict[str, int] = {
+    "pos": int(os.getenv("DB_DEADLINE_POS_MS", "2000")),
+    "padres": int(os.getenv("DB_DEADLINE_PADRES_MS", "5000")),
+    "admin": int(os.getenv("DB_DEADLINE_ADMIN_MS", "15000")),
+    # Exportaciones en streaming: su duración crece con el historial, 0 = sin plazo
+    "exportacion": int(os.getenv("DB_DEADLINE_EXPORTACION_MS", "0")),
+}
+
+# (clase de ruta, instante límite en time.monotonic())
+_plazo: ContextVar[Optional[Tuple[str, float]]] = ContextVar("plazo_consultas", default=None)
+
+_timeout_aplicado = weakref.WeakKeyDictionary()
+_agotadas: Dict[str, int] = {clase: 0 for clase in PLAZOS_MS}
+_lock = threading.Lock()
+
+
+def plazo_consultas(clase: str):
+    """
+    Crea la dependencia de FastAPI que fija el plazo de consultas de la petición.
+    Se declara por router o por endpoint: `dependencies=[Depends(plazo_consultas("pos"))]`.
+    La última dependencia evaluada gana, así un endpoint puede sobreescribir la de su router.
+    """
+    if clase not in PLAZOS_MS:
+        raise ValueError(f"Clase de ruta desconocida: {clase}")
+
+    async def fijar_plazo() -> None:
+        # Debe ser async: así el valor queda en el contexto de la petición
+        if PLAZOS_MS[clase] <= 0:
+            _plazo.set(None)
+            return
+        _plazo.set((clase, time.monotonic() + PLAZOS_MS[clase] / 1000))
+
+    return fijar_plazo
+
+
+def segundos_restantes() -> Optional[float]:
+    """Tiempo que le queda a la petición actual, o None si no tiene plazo."""
+    plazo = _plazo.get()
+    if plazo is None:
+        return None
+    return plazo[1] - time.monotonic()
+
+
+def verificar_plazo() -> Optional[float]:
+    """Lanza TiempoAgotadoError si el plazo ya venció; devuelve los segundos restantes."""
+    restante = segundos_restantes()
+    if restante is not None and restante <= 0:
+        registrar_tiempo_agotado()
+        raise TiempoAgotadoError("Se agotó el tiempo asignado a la petición")
+    return restante
+
+
+def aplicar_statement_timeout(conexion) -> None:
+    """
+    Ajusta `statement_timeout` de la conexión recién tomada del pool al tiempo
+    que le queda a la petición, o lo restablece si la petición no tiene plazo.
+    """
+    restante = verificar_plazo()
+    objetivo = 0 if restante is None else max(int(restante * 1000), 1)
+    if objetivo == 0 and _timeout_aplicado.get(conexion, 0) == 0:
+        return
+    # Fuera de transacción, para que un rollback posterior no deshaga el SET
+    autocommit = conexion.autocommit
+    conexion.autocommit = True
+    try:
+        with conexion.cursor() as cursor:
+            cursor.execute("SET statement_timeout = %s", (objetivo,))
+    finally:
+        conexion.autocommit = autocommit
+    _timeout_aplicado[conexion] = objetivo
+
+
+@contextmanager
+def traducir_cancelacion():
+    """Convierte la cancelación por statement_timeout en TiempoAgotadoError."""
+    try:
+        yield
+    except errors.QueryCanceled as e:
+        registrar_tiempo_agotado()
+        raise TiempoAgotadoError("La consulta superó el tiempo asignado a la petición") from e
+
+
+def registrar_tiempo_agotado() -> None:
+    plazo = _plazo.get()
+    clase = plazo[0] if plazo is not None else "sin_plazo"
+    with _lock:
+        _agotadas[clase] = _agotadas.get(clase, 0) + 1
+    logger.warning(f"⏱️ Consulta cancelada por plazo agotado (ruta {clase})")
+
+
+def estadisticas_plazos() -> Dict[str, Dict[str, int]]:
+    """Plazo configurado y número de consultas agotadas por clase de ruta."""
+    with _lock:
+        agotadas = dict(_agotadas)
+    return {
+        clase: {"plazo_ms": PLAZOS_MS.get(clase, 0), "agotadas": total}
+        for clase, total in agotadas.items()
+    }
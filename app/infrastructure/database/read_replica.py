@@ -0,0 +1,163 @@
+# infrastructure/database/read_replica.py
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from infrastructure.database.connection_pool import PostgresqlConnectionPool
+
+logger = logging.getLogger(__name__)
+
+_solo_lectura: ContextVar[bool] = ContextVar("solo_lectura", default=False)
+
+# Segundos de retraso de la réplica; 0 si ya aplicó todo lo recibido del primario
+_CONSULTA_RETRASO = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END AS retraso
+"""
+
+
+def solo_lectura(func):
+    """
+    Marca un método de repositorio como de solo lectura: sus consultas pueden
+    enviarse a la réplica si hay una configurada y está al día.
+    En generadores la marca se aplica en cada reanudación, que es cuando
+    realmente se piden las conexiones.
+    """
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def envoltura_generador(*args, **kwargs):
+            generador = func(*args, **kwargs)
+            try:
+                while True:
+                    token = _solo_lectura.set(True)
+                    try:
+                        valor = next(generador)
+                    except StopIteration:
+                        return
+                    finally:
+                        _solo_lectura.reset(token)
+                    yield valor
+            finally:
+                generador.close()
+        return envoltura_generador
+
+    @functools.wraps(func)
+    def envoltura(*args, **kwargs):
+        token = _solo_lectura.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _solo_lectura.reset(token)
+    return envoltura
+
+
+def en_solo_lectura() -> bool:
+    """Indica si el código actual se ejecuta dentro de un método @solo_lectura."""
+    return _solo_lectura.get()
+
+
+class EnrutadorReplica:
+    """
+    Pool de conexiones a la réplica de lectura con comprobación de salud.
+
+    La réplica se considera utilizable mientras responda y su retraso no supere
+    `max_lag` segundos. El retraso se consulta como mucho cada `check_interval`
+    segundos; si la réplica falla se descarta durante `retry_interval` segundos
+    y las lecturas vuelven al primario.
+    """
+
+    def __init__(self,
+                 dsn: str,
+                 connect_kwargs: Dict[str, Any],
+                 max_lag: float = 5.0,
+                 check_interval: float = 5.0,
+                 retry_interval: float = 30.0,
+                 **pool_kwargs):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.retry_interval = retry_interval
+        self.pool = PostgresqlConnectionPool(connect_kwargs=dict(connect_kwargs, dsn=dsn), **pool_kwargs)
+
+        self._lock = threading.Lock()
+        self._comprobando = False
+        self._ultima_comprobacion = 0.0
+        self._retraso: Optional[float] = None
+        self._caida_hasta = 0.0
+        self.lecturas_replica = 0
+        self.lecturas_primario = 0
+
+    def open(self) -> None:
+        try:
+            self.pool.open()
+        except Exception as e:
+            self.marcar_caida(e)
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def disponible(self) -> bool:
+        """True si la réplica está arriba y al día; refresca el retraso si está vencido."""
+        ahora = time.monotonic()
+        with self._lock:
+            if ahora < self._caida_hasta:
+                return False
+            comprobar = not self._comprobando and ahora - self._ultima_comprobacion >= self.check_interval
+            if comprobar:
+                self._comprobando = True
+        if comprobar:
+            self._comprobar_retraso()
+        with self._lock:
+            return self._retraso is not None and self._retraso <= self.max_lag
+
+    def marcar_caida(self, error: Exception) -> None:
+        with self._lock:
+            self._caida_hasta = time.monotonic() + self.retry_interval
+            self._retraso = None
+        logger.warning(f"⚠️ Réplica de lectura no disponible, se usará el primario: {error}")
+
+    def registrar_lectura(self, en_replica: bool) -> None:
+        with self._lock:
+            if en_replica:
+                self.lecturas_replica += 1
+            else:
+                self.lecturas_primario += 1
+
+    def _comprobar_retraso(self) -> None:
+        retraso = None
+        try:
+            conexion = self.pool.acquire()
+            try:
+                with conexion.cursor() as cursor:
+                    cursor.execute(_CONSULTA_RETRASO)
+                    fila = cursor.fetchone()
+                    valor = fila["retraso"] if isinstance(fila, dict) else fila[0]
+                    retraso = float(valor)
+            finally:
+                self.pool.release(conexion)
+        except Exception as e:
+            self.marcar_caida(e)
+        finally:
+            with self._lock:
+                self._comprobando = False
+                self._ultima_comprobacion = time.monotonic()
+                if retraso is not None:
+                    self._retraso = retraso
+        if retraso is not None and retraso > self.max_lag:
+            logger.warning(f"⚠️ Réplica con {retraso:.1f}s de retraso (máximo {self.max_lag:.1f}s): lecturas al primario")
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "retraso_segundos": self._retraso,
+                "caida": time.monotonic() < self._caida_hasta,
+                "lecturas_replica": self.lecturas_replica,
+                "lecturas_primario": self.lecturas_primario,
+            }
@@ -0,0 +1,77 @@
+# infrastructure/database/row_mapper.py
+
+from operator import itemgetter
+from typing import Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from psycopg2.extensions import cursor as CursorTuplas
+
+T = TypeVar("T")
+
+
+def cursor_tuplas(conn):
+    """
+    Abre un cursor que devuelve tuplas aunque la conexión use RealDictCursor.
+
+    Los listados grandes lo usan junto con un MapeadorFilas: así no se crea un
+    dict por fila que luego se copia al objeto de dominio.
+    """
+    return conn.cursor(cursor_factory=CursorTuplas)
+
+
+class MapeadorFilas(Generic[T]):
+    """
+    Convierte filas tupla en objetos de dominio con posiciones precalculadas.
+
+    `fabrica` recibe los valores en el orden de `columnas`. Las posiciones se
+    resuelven una sola vez por forma de resultado (cursor.description), de modo
+    que el mapeo por fila es un itemgetter más la llamada a la fábrica.
+    """
+
+    def __init__(self, fabrica: Callable[..., T], columnas: Sequence[str]):
+        if not columnas:
+            raise ValueError("El mapeador necesita al menos una columna")
+        self.fabrica = fabrica
+        self.columnas: Tuple[str, ...] = tuple(columnas)
+        self._extractores: Dict[Tuple[str, ...], Optional[Callable]] = {}
+
+    def _extractor(self, description) -> Optional[Callable]:
+        """itemgetter de las columnas pedidas, o None si la fila ya viene en ese orden."""
+        nombres = tuple(columna.name for columna in description)
+        try:
+            return self._extractores[nombres]
+        except KeyError:
+            pass
+
+        posicion = {nombre: i for i, nombre in enumerate(nombres)}
+        faltantes = [c for c in self.columnas if c not in posicion]
+        if faltantes:
+            raise ValueError(f"El resultado no trae las columnas: {', '.join(faltantes)}")
+
+        posiciones = [posicion[c] for c in self.columnas]
+        if posiciones == list(range(len(nombres))):
+            extractor = None
+        elif len(posiciones) == 1:
+            # itemgetter de un solo índice devuelve el valor, no una tupla
+            unica = posiciones[0]
+            extractor = lambda fila: (fila[unica],)
+        else:
+            extractor = itemgetter(*posiciones)
+        self._extractores[nombres] = extractor
+        return extractor
+
+    def mapear(self, cursor) -> List[T]:
+        """Mapea todas las filas pendientes del cursor."""
+        extraer = self._extractor(cursor.description)
+        fabrica = self.fabrica
+        filas = cursor.fetchall()
+        if extraer is None:
+            return [fabrica(*fila) for fila in filas]
+        return [fabrica(*extraer(fila)) for fila in filas]
+
+    def mapear_uno(self, cursor) -> Optional[T]:
+        """Mapea la siguiente fila del cursor, o None si no hay más."""
+        fila = cursor.fetchone()
+        if fila is None:
+            return None
+        extraer = self._extractor(cursor.description)
+        return self.fabrica(*(fila if extraer is None else extraer(fila)))
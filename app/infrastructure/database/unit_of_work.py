@@ -0,0 +1,155 @@
+# infrastructure/database/unit_of_work.py
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, List, Tuple
+
+from infrastructure.database.postgresql_repository import PostgresqlConnectionManager, get_connection_manager
+from infrastructure.database.read_replica import en_solo_lectura
+from infrastructure.database.query_deadlines import traducir_cancelacion
+
+logger = logging.getLogger(__name__)
+
+# Funciones que cada unidad de trabajo de la petición ejecuta en su transacción antes del commit
+_antes_de_confirmar: ContextVar[Tuple[Callable[[Any], None], ...]] = ContextVar("antes_de_confirmar", default=())
+
+
+@contextmanager
+def antes_de_confirmar(funcion: Callable[[Any], None]):
+    """
+    Dentro del bloque, toda unidad de trabajo que confirme escrituras ejecuta
+    antes `funcion(conexion)` en su misma transacción: lo que haga queda
+    confirmado junto con la operación, o deshecho con ella.
+    """
+    token = _antes_de_confirmar.set(_antes_de_confirmar.get() + (funcion,))
+    try:
+        yield
+    finally:
+        _antes_de_confirmar.reset(token)
+
+
+class _ConexionCompartida:
+    """
+    Envoltorio de la conexión de una unidad de trabajo.
+    Los repositorios siguen llamando a commit()/rollback() como siempre, pero
+    la decisión final se toma una sola vez al cerrar la unidad de trabajo.
+    """
+
+    def __init__(self, conexion, unidad_de_trabajo: "UnitOfWork"):
+        self._conexion = conexion
+        self._unidad_de_trabajo = unidad_de_trabajo
+
+    def commit(self) -> None:
+        # El commit se difiere al final de la unidad de trabajo
+        pass
+
+    def rollback(self) -> None:
+        # Un rollback parcial invalida toda la unidad de trabajo
+        self._unidad_de_trabajo.marcar_para_rollback()
+
+    def close(self) -> None:
+        # La conexión se devuelve al pool al cerrar la unidad de trabajo
+        pass
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+class UnitOfWork:
+    """
+    Unidad de trabajo: une una conexión y una transacción a una petición HTTP.
+
+    Expone la misma interfaz `get_connection()` que PostgresqlConnectionManager,
+    de modo que se inyecta en los repositorios en lugar del gestor. La conexión
+    se toma del pool en el primer uso, todos los repositorios la comparten y al
+    final se hace un único commit (o rollback si hubo errores).
+    """
+
+    def __init__(self, connection_manager: PostgresqlConnectionManager):
+        self.connection_manager = connection_manager
+        self._contexto = None
+        self._conexion = None
+        self._solo_rollback = False
+        self._al_confirmar: List[Callable[[], None]] = []
+
+    @contextmanager
+    def get_connection(self):
+        if self._conexion is None and en_solo_lectura():
+            # Lectura sin escrituras previas en la petición: puede ir a la réplica
+            with self.connection_manager.get_connection() as conexion:
+                yield conexion
+            return
+        if self._conexion is None:
+            self._contexto = self.connection_manager.get_connection()
+            self._conexion = _ConexionCompartida(self._contexto.__enter__(), self)
+        with traducir_cancelacion():
+            yield self._conexion
+
+    def marcar_para_rollback(self) -> None:
+        self._solo_rollback = True
+
+    def al_confirmar(self, funcion: Callable[[], None]) -> None:
+        """
+        Ejecuta `funcion` después del próximo commit (p. ej. llenar una caché con
+        lo recién insertado). Si la transacción se deshace, se descarta.
+        """
+        self._al_confirmar.append(funcion)
+
+    def commit(self) -> None:
+        """Confirma lo hecho hasta ahora; la unidad de trabajo sigue utilizable."""
+        if self._conexion is not None:
+            if self._solo_rollback:
+                self.rollback()
+                return
+            for funcion in _antes_de_confirmar.get():
+                funcion(self._conexion._conexion)
+            self._conexion._conexion.commit()
+        pendientes, self._al_confirmar = self._al_confirmar, []
+        for funcion in pendientes:
+            try:
+                funcion()
+            except Exception as e:
+                # Lo confirmado ya es definitivo: un fallo aquí no debe convertirse en error de la petición
+                logger.warning(f"⚠️ Falló una acción posterior al commit: {e}")
+
+    def rollback(self) -> None:
+        self._al_confirmar = []
+        if self._conexion is None:
+            return
+        self._conexion._conexion.rollback()
+        self._solo_rollback = False
+
+    def close(self, exc_type=None, exc=None, tb=None) -> None:
+        """Termina la transacción y devuelve la conexión al pool."""
+        if self._conexion is None:
+            return
+        contexto = self._contexto
+        self._contexto = None
+        self._conexion = None
+        # El gestor deshace todo lo no confirmado al devolver la conexión
+        contexto.__exit__(exc_type, exc, tb)
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        except BaseException as error:
+            self.close(type(error), error, error.__traceback__)
+            raise
+        self.close(exc_type, exc, tb)
+        return False
+
+
+def get_unit_of_work():
+    """
+    Función de dependencia: una unidad de trabajo por petición.
+    FastAPI la cierra (commit o rollback) antes de enviar la respuesta.
+    """
+    with UnitOfWork(get_connection_manager()) as unidad_de_trabajo:
+        yield unidad_de_trabajo
@@ -1,12 +1,20 @@
 # main.py
 
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from presentation.routers.auth_router import router as auth_router
-from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository, PostgresqlConnectionManager
+from presentation.routers.auth_router import router as auth_router, get_admin_user
+from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository, get_connection_manager
+from infrastructure.database.db_executor import shutdown_db_executor
+from infrastructure.database.query_deadlines import plazo_consultas
+from infrastructure.database.migrations import Migrador
+from infrastructure.database.health import VerificadorSaludBD, estadisticas_bd
+from domain.exceptions.exceptions import CapacidadAgotadaError, TiempoAgotadoError
 from infrastructure.security.password_hasher import PasswordHasher
 from domain.services.autenticacion_service import AutenticacionService
 from presentation.routers.alimento_routher import router as alimento_router
@@ -15,6 +23,14 @@ from presentation.routers.compra_routher import router as compra_router
 from presentation.routers.alimentoBloqueado_routher import router as alimentoBloqueado_routher
 from presentation.routers.precompra_routher import router as precompra_routher
 from presentation.routers.recargas_routher import router as recargas_router
+from presentation.routers.pos_router import router as pos_router
+from presentation.middleware.idempotencia import MiddlewareIdempotencia
+from infrastructure.database.postgresql_idempotencia_repository import PostgresqlIdempotenciaRepository
+from infrastructure.database.postgresql_movimiento_saldo_repository import PostgresqlMovimientoSaldoRepository
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
+from infrastructure.database.libro_saldos import INTERVALO_FOTOS_SEGUNDOS, tomar_fotos_periodicamente
+from infrastructure.cache.invalidacion import INVALIDACION_ENTRE_PROCESOS
+from infrastructure.cache.escucha_invalidaciones import escucha_invalidaciones
 
 # Importar dependencias para alimentos
 from dependencies import get_alimento_service
@@ -22,23 +38,57 @@ from dependencies import get_alimento_service
 # Cargar variables de entorno
 load_dotenv()
 
-# Configurar dependencias
-connection_manager = PostgresqlConnectionManager(
-    db_name=os.getenv("DB_NAME", "foodcash_db"),
-    db_user=os.getenv("DB_USER", "postgres"),
-    db_password=os.getenv("DB_PASSWORD", "postgres"),
-    db_host=os.getenv("DB_HOST", "localhost"),
-    db_port=os.getenv("DB_PORT", "5432")
-)
+# Configurar dependencias (gestor de conexiones compartido por todo el proceso)
+connection_manager = get_connection_manager()
 usuario_repository = PostgresqlUsuarioRepository(connection_manager)
 password_hasher = PasswordHasher()
-autenticacion_service = AutenticacionService(usuario_repository, password_hasher)
+autenticacion_service = AutenticacionService(
+    usuario_repository, password_hasher, PostgresqlSaldoRepository(connection_manager)
+)
+verificador_salud_bd = VerificadorSaludBD(connection_manager)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Abrir el pool una sola vez al arrancar y cerrarlo al apagar
+    connection_manager.open()
+    if os.getenv("DB_MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes"):
+        # En despliegues con varias instancias el advisory lock serializa la migración
+        Migrador(connection_manager).aplicar()
+    if INVALIDACION_ENTRE_PROCESOS:
+        # Cada worker escucha las escrituras de los demás para invalidar sus cachés
+        escucha_invalidaciones.iniciar(connection_manager.pool.connect_kwargs)
+    fotos_saldo = None
+    if INTERVALO_FOTOS_SEGUNDOS > 0:
+        fotos_saldo = asyncio.create_task(
+            tomar_fotos_periodicamente(PostgresqlMovimientoSaldoRepository(connection_manager))
+        )
+    yield
+    if fotos_saldo:
+        fotos_saldo.cancel()
+    escucha_invalidaciones.detener()
+    shutdown_db_executor()
+    connection_manager.close()
 
 # Crear aplicación FastAPI
 app = FastAPI(
     title="FoodCash API",
     description="API para gestión de cafeterías escolares",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Idempotency-Key en las rutas que mueven saldo o stock. Se registra antes que
+# CORS para que las respuestas repetidas también lleven las cabeceras CORS.
+app.add_middleware(
+    MiddlewareIdempotencia,
+    repositorio=PostgresqlIdempotenciaRepository(connection_manager),
+    rutas=[
+        ("POST", r"^/estudiantes/\d+/descargaSaldo$"),
+        ("POST", r"^/guardarCompra$"),
+        ("POST", r"^/usuarios/[^/]+/recarga-saldo$"),
+        ("POST", r"^/api/precompras/nueva$"),
+        ("POST", r"^/pos/checkout$"),
+    ],
 )
 
 # Configuración de CORS
@@ -56,16 +106,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursores de paginación de los listados de compras y respuestas idempotentes repetidas
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "Idempotency-Replayed"],
 )
 
+# Plazos de consultas por tipo de ruta (los endpoints de reportes usan "admin")
+plazo_pos = [Depends(plazo_consultas("pos"))]
+plazo_padres = [Depends(plazo_consultas("padres"))]
+
 # Configurar rutas
-app.include_router(auth_router, prefix="", tags=["Autenticación"])
-app.include_router(alimento_router, prefix="", tags=["Alimentos"])
-app.include_router(estudiante_router, prefix="", tags=["Estudiantes"])
-app.include_router(compra_router, prefix="", tags=["Compras"])
-app.include_router(alimentoBloqueado_routher, prefix="", tags=["Alimentos Bloqueados"])
-app.include_router(precompra_routher, prefix="", tags=["Precompras"])
-app.include_router(recargas_router, prefix="", tags=["Recargas"])
+app.include_router(auth_router, prefix="", tags=["Autenticación"], dependencies=plazo_padres)
+app.include_router(alimento_router, prefix="", tags=["Alimentos"], dependencies=plazo_pos)
+app.include_router(estudiante_router, prefix="", tags=["Estudiantes"], dependencies=plazo_pos)
+app.include_router(compra_router, prefix="", tags=["Compras"], dependencies=plazo_pos)
+app.include_router(pos_router, prefix="", tags=["Punto de venta"], dependencies=plazo_pos)
+app.include_router(alimentoBloqueado_routher, prefix="", tags=["Alimentos Bloqueados"], dependencies=plazo_padres)
+app.include_router(precompra_routher, prefix="", tags=["Precompras"], dependencies=plazo_padres)
+app.include_router(recargas_router, prefix="", tags=["Recargas"], dependencies=plazo_padres)
+
+@app.exception_handler(TiempoAgotadoError)
+async def tiempo_agotado_handler(request: Request, exc: TiempoAgotadoError):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.exception_handler(CapacidadAgotadaError)
+async def capacidad_agotada_handler(request: Request, exc: CapacidadAgotadaError):
+    # Pool saturado: el cliente puede reintentar en breve
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 @app.get("/", tags=["Root"])
 def read_root():
@@ -77,9 +143,25 @@ def read_root():
     }
 
 @app.get("/health", tags=["Health"])
-def health_check():
-    """Endpoint para verificar el estado de la API"""
-    return {
+def health_check(deep: bool = False):
+    """
+    Endpoint para verificar el estado de la API.
+    Con ?deep=true también comprueba la base de datos (SELECT 1 cacheado unos segundos).
+    """
+    respuesta = {
         "status": "healthy",
         "service": "FoodCash API"
-    }
\ No newline at end of file
+    }
+    if not deep:
+        return respuesta
+    base_datos = verificador_salud_bd.verificar()
+    respuesta["database"] = base_datos
+    if not base_datos["ok"]:
+        respuesta["status"] = "unhealthy"
+        return JSONResponse(status_code=503, content=respuesta)
+    return respuesta
+
+@app.get("/health/db", tags=["Health"], dependencies=[Depends(get_admin_user)])
+def database_stats():
+    """Métricas del pool de conexiones, réplica, sentencias preparadas, plazos y cachés (solo administradores)"""
+    return estadisticas_bd(connection_manager)
\ No newline at end of file
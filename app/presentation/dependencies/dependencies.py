@@ -8,6 +8,8 @@ from infrastructure.database.postgresql_recarga_repository import PostgresqlReca
 from infrastructure.database.postgresql_estudiante_repository import PostgresqlEstudianteRepository  # ← NUEVO
 from infrastructure.database.postgresql_repository import get_connection_manager
 from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
 from infrastructure.security.jwt_handler import JWTHandler
 
 security = HTTPBearer()
@@ -19,23 +21,25 @@ def get_recarga_repository():
     connection_manager = get_connection_manager()
     return PostgresqlRecargaRepository(connection_manager)
 
-def get_recarga_service():
+def get_recarga_service(uow: UnitOfWork = Depends(get_unit_of_work)):
     """
     Función de dependencia que crea el servicio de recargas
-    Inyecta los repositorios de recargas, usuarios y estudiantes
+    Inyecta los repositorios de recargas, usuarios, estudiantes y movimientos.
+    Comparten la unidad de trabajo: al aprobar una recarga, el estado, el saldo
+    y el movimiento del libro se confirman juntos.
     """
-    connection_manager = get_connection_manager()
-    
     # Crear repositorios
-    recarga_repository = PostgresqlRecargaRepository(connection_manager)
-    usuario_repository = PostgresqlUsuarioRepository(connection_manager)
-    estudiante_repository = PostgresqlEstudianteRepository(connection_manager)  # ← NUEVO
+    recarga_repository = PostgresqlRecargaRepository(uow)
+    usuario_repository = PostgresqlUsuarioRepository(uow)
+    estudiante_repository = PostgresqlEstudianteRepository(uow)  # ← NUEVO
+    saldo_repository = PostgresqlSaldoRepository(uow)
     
     # Crear y retornar el servicio
     return RecargaService(
         recarga_repository=recarga_repository,
         usuario_repository=usuario_repository,
-        estudiante_repository=estudiante_repository  # ← NUEVO
+        estudiante_repository=estudiante_repository,  # ← NUEVO
+        saldo_repository=saldo_repository
     )
 
 def get_current_user_id(token: str = Depends(security)) -> str:
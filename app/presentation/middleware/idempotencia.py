@@ -0,0 +1,314 @@
+# presentation/middleware/idempotencia.py
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+from dotenv import load_dotenv
+
+from infrastructure.database.db_executor import ejecutar_en_bd
+from infrastructure.database.postgresql_idempotencia_repository import PostgresqlIdempotenciaRepository
+from infrastructure.database.unit_of_work import antes_de_confirmar
+from infrastructure.security.jwt_handler import JWTHandler
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CABECERA_CLAVE = b"idempotency-key"
+CABECERA_REPETIDA = b"idempotency-replayed"
+
+# Tiempo durante el que una clave devuelve la respuesta original
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# Tras este tiempo una reserva 'en_proceso' se considera abandonada (proceso caído)
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+# Espera máxima de un duplicado concurrente antes de responder 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "15"))
+# Respuestas completadas que se guardan en memoria para no ir a la base de datos
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1000"))
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "600"))
+
+_LONGITUD_MAXIMA_CLAVE = 255
+# Esperas entre reintentos de completar(): la operación ya se confirmó y la respuesta debe quedar
+_ESPERAS_COMPLETAR = (0.1, 0.5, 2.0)
+# Respuestas que no se guardan: el mismo reintento puede salir distinto
+_CODIGOS_NO_GUARDADOS = {401, 403, 408, 409, 429}
+
+
+@dataclass(slots=True)
+class _RespuestaGuardada:
+    huella: str
+    codigo_estado: int
+    tipo_contenido: Optional[str]
+    cuerpo: bytes
+    vence: float
+
+
+async def _respuesta_json(send, codigo_estado: int, detalle: str, cabeceras: Iterable[Tuple[bytes, bytes]] = ()):
+    cuerpo = json.dumps({"detail": detalle}).encode("utf-8")
+    await _enviar(send, codigo_estado, b"application/json", cuerpo, cabeceras)
+
+
+async def _enviar(send, codigo_estado: int, tipo_contenido: Optional[bytes], cuerpo: bytes,
+                  cabeceras: Iterable[Tuple[bytes, bytes]] = ()):
+    lista = [(b"content-length", str(len(cuerpo)).encode("latin-1")), *cabeceras]
+    if tipo_contenido:
+        lista.append((b"content-type", tipo_contenido))
+    await send({"type": "http.response.start", "status": codigo_estado, "headers": lista})
+    await send({"type": "http.response.body", "body": cuerpo})
+
+
+class MiddlewareIdempotencia:
+    """
+    Cabecera Idempotency-Key para las rutas que mueven saldo o stock.
+
+    La primera petición con una clave reserva la fila en claves_idempotencia y
+    se ejecuta; su respuesta queda guardada (en la tabla y en memoria) y los
+    reintentos con la misma clave la reciben sin volver a ejecutar nada, con
+    la cabecera Idempotency-Replayed: true. Un duplicado que llega mientras la
+    primera sigue en curso espera su resultado: en el mismo proceso sobre un
+    futuro, desde otro proceso consultando la tabla. La misma clave con otra
+    petición (otro cuerpo u otro usuario) se rechaza con 422; un token renovado
+    del mismo usuario sigue valiendo.
+
+    Las peticiones sin cabecera pasan sin cambios. Las respuestas 5xx no se
+    guardan: la reserva se libera y el reintento se ejecuta de nuevo.
+
+    Cada unidad de trabajo de la petición extiende la reserva hasta que la
+    clave vence en la misma transacción que la operación. Si el proceso cae
+    entre ese commit y el guardado de la respuesta, la clave queda bloqueada
+    y los reintentos reciben 409 hasta que vence: nunca se vuelve a ejecutar
+    un cobro ya confirmado. Las rutas que escriben sin unidad de trabajo no
+    tienen esa garantía: una caída en ese intervalo libera la reserva a los
+    IDEMPOTENCY_LOCK_SECONDS y el reintento se ejecuta otra vez.
+    """
+
+    def __init__(self, app, repositorio: PostgresqlIdempotenciaRepository, rutas: Iterable[Tuple[str, str]],
+                 ttl: float = IDEMPOTENCY_TTL_SECONDS, bloqueo: float = IDEMPOTENCY_LOCK_SECONDS,
+                 espera: float = IDEMPOTENCY_WAIT_SECONDS, tamano_cache: int = IDEMPOTENCY_CACHE_SIZE,
+                 jwt_handler: Optional[JWTHandler] = None):
+        self.app = app
+        self.repositorio = repositorio
+        self.jwt_handler = jwt_handler or JWTHandler()
+        self.rutas: List[Tuple[str, Pattern]] = [(metodo.upper(), re.compile(patron)) for metodo, patron in rutas]
+        self.ttl = ttl
+        self.bloqueo = bloqueo
+        self.espera = espera
+        self.tamano_cache = tamano_cache
+        self._cache: "OrderedDict[Tuple[str, str], _RespuestaGuardada]" = OrderedDict()
+        self._en_curso: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._proxima_purga = time.monotonic() + IDEMPOTENCY_PURGE_INTERVAL
+
+    def _protegida(self, metodo: str, ruta: str) -> bool:
+        return any(metodo == m and patron.match(ruta) for m, patron in self.rutas)
+
+    def _sujeto(self, autorizacion: bytes) -> bytes:
+        """Usuario del token si es válido; si no, la cabecera tal cual (el endpoint responderá 401)."""
+        esquema, _, token = autorizacion.decode("latin-1").partition(" ")
+        if esquema.lower() == "bearer" and token:
+            payload = self.jwt_handler.verify_access_token(token.strip())
+            if payload and payload.get("sub"):
+                return f"usuario:{payload['sub']}".encode("utf-8")
+        return autorizacion
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._protegida(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        cabeceras = dict(scope["headers"])
+        clave_cruda = cabeceras.get(CABECERA_CLAVE)
+        if clave_cruda is None:
+            await self.app(scope, receive, send)
+            return
+        clave = clave_cruda.decode("latin-1").strip()
+        if not clave or len(clave) > _LONGITUD_MAXIMA_CLAVE:
+            await _respuesta_json(send, 400, f"Idempotency-Key debe tener entre 1 y {_LONGITUD_MAXIMA_CLAVE} caracteres")
+            return
+
+        cuerpo = await self._leer_cuerpo(receive)
+        alcance = f"{scope['method']} {scope['path']}"
+        huella = hashlib.sha256(b"\0".join((
+            scope["method"].encode("latin-1"), scope["path"].encode("utf-8"), scope.get("query_string", b""),
+            self._sujeto(cabeceras.get(b"authorization", b"")), cuerpo
+        ))).hexdigest()
+        identificador = (alcance, clave)
+
+        limite = time.monotonic() + self.espera
+        while True:
+            guardada = self._en_cache(identificador)
+            if guardada is not None:
+                await self._repetir(send, guardada, huella)
+                return
+
+            futuro = self._en_curso.get(identificador)
+            if futuro is not None:
+                # Duplicado en este proceso: espera a la primera ejecución
+                try:
+                    await asyncio.wait_for(asyncio.shield(futuro), max(0.0, limite - time.monotonic()))
+                except asyncio.TimeoutError:
+                    await self._en_proceso(send)
+                    return
+                continue
+
+            futuro = asyncio.get_running_loop().create_future()
+            self._en_curso[identificador] = futuro
+            try:
+                registro = await ejecutar_en_bd(self.repositorio.reservar, alcance, clave, huella, self.bloqueo, self.ttl)
+            except BaseException:
+                self._terminar(identificador, futuro)
+                raise
+            if registro is None:
+                break
+            self._terminar(identificador, futuro)
+
+            if registro.huella != huella:
+                await _respuesta_json(send, 422, "Idempotency-Key ya se usó con otra petición")
+                return
+            if registro.estado == "completada":
+                guardada = self._guardar_en_cache(identificador, huella, registro.codigo_estado,
+                                                  registro.tipo_contenido, registro.cuerpo or b"")
+                await self._repetir(send, guardada, huella)
+                return
+            # En curso en otro proceso: se consulta la tabla hasta que termine
+            if time.monotonic() >= limite:
+                await self._en_proceso(send)
+                return
+            await asyncio.sleep(0.05)
+
+        try:
+            await self._ejecutar(scope, receive, send, cuerpo, alcance, clave, huella, identificador)
+        finally:
+            self._terminar(identificador, futuro)
+        await self._purgar_si_toca()
+
+    async def _ejecutar(self, scope, receive, send, cuerpo: bytes, alcance: str, clave: str, huella: str,
+                        identificador: Tuple[str, str]) -> None:
+        """Ejecuta la petición reservada guardando la respuesta antes de enviarla."""
+        entregado = False
+
+        async def recibir():
+            nonlocal entregado
+            if not entregado:
+                entregado = True
+                return {"type": "http.request", "body": cuerpo, "more_body": False}
+            return await receive()
+
+        inicio = None
+        partes: List[bytes] = []
+
+        async def capturar(mensaje):
+            nonlocal inicio
+            if mensaje["type"] == "http.response.start":
+                inicio = mensaje
+            elif mensaje["type"] == "http.response.body":
+                partes.append(mensaje.get("body", b""))
+
+        retener = functools.partial(self.repositorio.retener_en_transaccion,
+                                    alcance=alcance, clave=clave, huella=huella)
+        try:
+            with antes_de_confirmar(retener):
+                await self.app(scope, recibir, capturar)
+        except BaseException:
+            await ejecutar_en_bd(self.repositorio.liberar, alcance, clave, huella)
+            raise
+
+        codigo_estado = inicio["status"]
+        cuerpo_respuesta = b"".join(partes)
+        if codigo_estado >= 500 or codigo_estado in _CODIGOS_NO_GUARDADOS:
+            await ejecutar_en_bd(self.repositorio.liberar, alcance, clave, huella)
+        else:
+            tipo = next((valor for nombre, valor in inicio["headers"] if nombre.lower() == b"content-type"), None)
+            tipo_contenido = tipo.decode("latin-1") if tipo is not None else None
+            # Primero en memoria: los reintentos a este proceso se repiten aunque la tabla falle
+            self._guardar_en_cache(identificador, huella, codigo_estado, tipo_contenido, cuerpo_respuesta)
+            await self._completar(alcance, clave, huella, codigo_estado, tipo_contenido, cuerpo_respuesta)
+
+        await send(inicio)
+        await send({"type": "http.response.body", "body": cuerpo_respuesta})
+
+    async def _completar(self, alcance: str, clave: str, huella: str, codigo_estado: int,
+                         tipo_contenido: Optional[str], cuerpo: bytes) -> None:
+        """Guarda la respuesta en la tabla; si no se puede, deja la clave bloqueada hasta vencer."""
+        for intento, espera in enumerate((0.0,) + _ESPERAS_COMPLETAR):
+            await asyncio.sleep(espera)
+            try:
+                await ejecutar_en_bd(self.repositorio.completar, alcance, clave, huella,
+                                     codigo_estado, tipo_contenido, cuerpo)
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Intento {intento + 1} de guardar la respuesta de la clave {clave} falló: {e}")
+        # La operación ya se confirmó: otros procesos deben recibir 409, nunca ejecutarla otra vez
+        try:
+            await ejecutar_en_bd(self.repositorio.retener, alcance, clave, huella)
+            logger.error(f"❌ No se pudo guardar la respuesta de la clave de idempotencia {clave}: "
+                         f"queda bloqueada hasta vencer")
+        except Exception as e:
+            logger.error(f"❌ No se pudo guardar ni bloquear la clave de idempotencia {clave}: {e}")
+
+    async def _repetir(self, send, guardada: _RespuestaGuardada, huella: str) -> None:
+        if guardada.huella != huella:
+            await _respuesta_json(send, 422, "Idempotency-Key ya se usó con otra petición")
+            return
+        tipo = guardada.tipo_contenido.encode("latin-1") if guardada.tipo_contenido else None
+        await _enviar(send, guardada.codigo_estado, tipo, guardada.cuerpo, [(CABECERA_REPETIDA, b"true")])
+
+    async def _en_proceso(self, send) -> None:
+        await _respuesta_json(send, 409, "Una petición con la misma Idempotency-Key sigue en curso",
+                              [(b"retry-after", b"1")])
+
+    def _terminar(self, identificador: Tuple[str, str], futuro: asyncio.Future) -> None:
+        if self._en_curso.get(identificador) is futuro:
+            del self._en_curso[identificador]
+        if not futuro.done():
+            futuro.set_result(None)
+
+    def _en_cache(self, identificador: Tuple[str, str]) -> Optional[_RespuestaGuardada]:
+        guardada = self._cache.get(identificador)
+        if guardada is None:
+            return None
+        if guardada.vence <= time.monotonic():
+            del self._cache[identificador]
+            return None
+        self._cache.move_to_end(identificador)
+        return guardada
+
+    def _guardar_en_cache(self, identificador: Tuple[str, str], huella: str, codigo_estado: int,
+                          tipo_contenido: Optional[str], cuerpo: bytes) -> _RespuestaGuardada:
+        guardada = _RespuestaGuardada(huella, codigo_estado, tipo_contenido, cuerpo, time.monotonic() + self.ttl)
+        if self.tamano_cache > 0:
+            self._cache[identificador] = guardada
+            self._cache.move_to_end(identificador)
+            while len(self._cache) > self.tamano_cache:
+                self._cache.popitem(last=False)
+        return guardada
+
+    async def _purgar_si_toca(self) -> None:
+        if time.monotonic() < self._proxima_purga:
+            return
+        self._proxima_purga = time.monotonic() + IDEMPOTENCY_PURGE_INTERVAL
+        try:
+            eliminadas = await ejecutar_en_bd(self.repositorio.purgar_vencidas)
+            if eliminadas:
+                logger.info(f"🔧 {eliminadas} claves de idempotencia vencidas eliminadas")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudieron purgar las claves de idempotencia: {e}")
+
+    @staticmethod
+    async def _leer_cuerpo(receive) -> bytes:
+        partes = []
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] != "http.request":
+                break
+            partes.append(mensaje.get("body", b""))
+            if not mensaje.get("more_body", False):
+                break
+        return b"".join(partes)
@@ -2,10 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 from application.dto.alimentoBloqueado_dto import BloquearAlimentoDTO, AlimentoBloqueadoDTO
 from domain.services.alimentoBloqueado_service import AlimentoBloqueadoService
-from domain.exceptions.exceptions import UsuarioNoEncontradoError
-from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from domain.exceptions.exceptions import UsuarioNoEncontradoError, CapacidadAgotadaError
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
 from infrastructure.database.postgresql_estudiante_repository import PostgresqlEstudianteRepository
 from infrastructure.database.postgresql_alimentoBloqueado_repository import PostgresqlAlimentoBloqueadoRepository
+from infrastructure.database.db_executor import ejecutar_en_bd
+from infrastructure.database.query_deadlines import plazo_consultas
 
 router = APIRouter(tags=["Alimentos Bloqueados"])
 
@@ -36,10 +38,9 @@ class AlimentoBloqueadoController:
         ]
 
 # Dependencias
-def get_alimento_bloqueado_service() -> AlimentoBloqueadoService:
-    connection_manager = PostgresqlConnectionManager()
-    alimento_bloqueado_repo = PostgresqlAlimentoBloqueadoRepository(connection_manager)
-    estudiante_repo = PostgresqlEstudianteRepository(connection_manager)
+def get_alimento_bloqueado_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> AlimentoBloqueadoService:
+    alimento_bloqueado_repo = PostgresqlAlimentoBloqueadoRepository(uow)
+    estudiante_repo = PostgresqlEstudianteRepository(uow)
     return AlimentoBloqueadoService(alimento_bloqueado_repo, estudiante_repo)
 
 def get_alimento_bloqueado_controller(
@@ -58,11 +59,13 @@ async def bloquear_alimento(
     Bloquea un alimento específico para un estudiante.
     """
     try:
-        return controller.bloquear_alimento(estudiante_id, datos)
+        return await ejecutar_en_bd(controller.bloquear_alimento, estudiante_id, datos)
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
@@ -76,7 +79,7 @@ async def desbloquear_alimento(
     Desbloquea un alimento específico para un estudiante.
     """
     try:
-        eliminado = controller.desbloquear_alimento(estudiante_id, id_alimento)
+        eliminado = await ejecutar_en_bd(controller.desbloquear_alimento, estudiante_id, id_alimento)
         if not eliminado:
             raise HTTPException(status_code=404, detail="Bloqueo no encontrado para el estudiante y alimento especificados")
         return {"message": "Alimento desbloqueado exitosamente"}
@@ -85,10 +88,12 @@ async def desbloquear_alimento(
     except HTTPException:
         # Re-raise HTTPExceptions para mantener el status code original
         raise
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
-@router.get("/estudiantes/{estudiante_id}/alimentosBloqueados", response_model=List[AlimentoBloqueadoDTO])
+@router.get("/estudiantes/{estudiante_id}/alimentosBloqueados", response_model=List[AlimentoBloqueadoDTO], dependencies=[Depends(plazo_consultas("pos"))])
 async def obtener_alimentos_bloqueados_por_estudiante(
     estudiante_id: int,
     controller: AlimentoBloqueadoController = Depends(get_alimento_bloqueado_controller)
@@ -97,8 +102,10 @@ async def obtener_alimentos_bloqueados_por_estudiante(
     Lista todos los alimentos bloqueados para un estudiante específico.
     """
     try:
-        return controller.obtener_alimentos_bloqueados_por_estudiante(estudiante_id)
+        return await ejecutar_en_bd(controller.obtener_alimentos_bloqueados_por_estudiante, estudiante_id)
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
@@ -1,51 +1,135 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from typing import List, Optional
 from domain.services.alimento_service import AlimentoService
+from domain.exceptions.exceptions import CapacidadAgotadaError
 from application.dto.alimento_dto import (
     AlimentoResponseDTO, 
+    AlimentoCambioDTO, 
     AlimentoCreateDTO, 
+    CambiosCatalogoDTO, 
     AlimentoUpdateDTO,
     DisminuirInventarioDTO
 )
 
 # Importa la función desde el módulo de dependencias para evitar el ciclo
 from dependencies import get_alimento_service
+from infrastructure.database.db_executor import ejecutar_en_bd
+from presentation.utils.cache_http import etag_coincide
 
 router = APIRouter(prefix="/api/alimentos", tags=["Alimentos"])
 
+# Los clientes pueden guardar la respuesta, pero deben revalidarla con If-None-Match en cada uso
+_CACHE_CONTROL_CATALOGO = "no-cache"
+
+
+def _respuesta_condicional(response: Response, if_none_match: Optional[str], etag: str) -> Optional[Response]:
+    """Pone ETag y Cache-Control; devuelve un 304 si el cliente ya tiene esa versión."""
+    cabeceras = {"ETag": etag, "Cache-Control": _CACHE_CONTROL_CATALOGO}
+    if etag_coincide(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+    response.headers.update(cabeceras)
+    return None
+
 @router.get("/", response_model=List[AlimentoResponseDTO], status_code=status.HTTP_200_OK)
 async def listar_alimentos(
+    response: Response,
     nombre: Optional[str] = Query(None, description="Filtrar por nombre"),
     categoria: Optional[str] = Query(None, description="Filtrar por categoría"),
+    if_none_match: Optional[str] = Header(None),
     service: AlimentoService = Depends(get_alimento_service)
 ):
+    """
+    Lista los alimentos activos. El ETag es la versión del catálogo: cambia con
+    cualquier alta, cambio, baja o movimiento de stock, y mientras no cambie
+    se responde 304 sin cuerpo.
+    """
     try:
-        filtros = {}
-        if nombre:
-            filtros["nombre"] = nombre
-        if categoria:
-            filtros["categoria"] = categoria
-        alimentos = service.listar_alimentos(filtros)
+        catalogo = await ejecutar_en_bd(service.catalogo)
+        no_modificado = _respuesta_condicional(response, if_none_match, f'"c{catalogo.version}"')
+        if no_modificado is not None:
+            return no_modificado
+        alimentos = catalogo.filtrar(nombre=nombre, categoria=categoria)
         return [AlimentoResponseDTO.from_orm(a) for a in alimentos]
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error al listar alimentos"
         )
 
+# Antes de /{alimento_id}, que de otro modo capturaría "buscar" y "changes"
+@router.get("/buscar", response_model=List[AlimentoResponseDTO], status_code=status.HTTP_200_OK)
+async def buscar_alimentos(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar en nombre y categoría"),
+    limite: int = Query(20, ge=1, le=100, description="Máximo de resultados"),
+    service: AlimentoService = Depends(get_alimento_service)
+):
+    """
+    Búsqueda para el buscador del POS: sin importar tildes ni mayúsculas,
+    admite prefijos mientras se escribe y errores de tipeo, y devuelve los
+    resultados del más al menos parecido.
+    """
+    try:
+        alimentos = await ejecutar_en_bd(service.buscar_alimentos, q, limite)
+        return [AlimentoResponseDTO.from_orm(a) for a in alimentos]
+    except CapacidadAgotadaError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al buscar alimentos"
+        )
+
+@router.get("/changes", response_model=CambiosCatalogoDTO, status_code=status.HTTP_200_OK)
+async def listar_cambios(
+    since: int = Query(0, ge=0, description="Última versión del catálogo que tiene el cliente"),
+    limite: int = Query(500, ge=1, le=5000, description="Máximo de alimentos por respuesta"),
+    service: AlimentoService = Depends(get_alimento_service)
+):
+    """
+    Alimentos creados, modificados, dados de baja o con movimiento de stock
+    después de la versión `since`, para mantener al día un catálogo local.
+    Las bajas llegan con activo = false. La versión de la respuesta es el
+    próximo `since`; con `hay_mas` conviene volver a pedir de inmediato.
+    """
+    try:
+        cambios = await ejecutar_en_bd(service.listar_cambios, since, limite)
+        return CambiosCatalogoDTO(
+            version=cambios.version,
+            hay_mas=cambios.hay_mas,
+            reiniciar=cambios.reiniciar,
+            alimentos=[AlimentoCambioDTO.from_orm(a) for a in cambios.alimentos]
+        )
+    except CapacidadAgotadaError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al listar los cambios del catálogo"
+        )
+
 @router.get("/{alimento_id}", response_model=AlimentoResponseDTO, status_code=status.HTTP_200_OK)
 async def obtener_alimento(
     alimento_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     service: AlimentoService = Depends(get_alimento_service)
 ):
     try:
-        alimento = service.obtener_alimento_por_id(alimento_id)
-        return AlimentoResponseDTO.from_orm(alimento)
+        alimento = await ejecutar_en_bd(service.obtener_alimento_por_id, alimento_id)
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    # El ETag de un alimento solo cambia cuando cambia ese alimento
+    no_modificado = _respuesta_condicional(response, if_none_match, f'"a{alimento.id}-{alimento.version}"')
+    if no_modificado is not None:
+        return no_modificado
+    return AlimentoResponseDTO.from_orm(alimento)
 
 @router.post("/", response_model=AlimentoResponseDTO, status_code=status.HTTP_201_CREATED)
 async def crear_alimento(
@@ -53,7 +137,7 @@ async def crear_alimento(
     service: AlimentoService = Depends(get_alimento_service)
 ):
     try:
-        alimento = service.crear_alimento(
+        alimento = await ejecutar_en_bd(service.crear_alimento,
             nombre=alimento_data.nombre,
             precio=alimento_data.precio,
             cantidad_en_stock=alimento_data.cantidad_en_stock,
@@ -62,6 +146,8 @@ async def crear_alimento(
             categoria=alimento_data.categoria
         )
         return AlimentoResponseDTO.from_orm(alimento)
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -75,7 +161,7 @@ async def actualizar_alimento(
     service: AlimentoService = Depends(get_alimento_service)
 ):
     try:
-        alimento = service.actualizar_alimento(
+        alimento = await ejecutar_en_bd(service.actualizar_alimento,
             alimento_id=alimento_id,
             nombre=alimento_data.nombre,
             precio=alimento_data.precio,
@@ -85,6 +171,8 @@ async def actualizar_alimento(
             categoria=alimento_data.categoria
         )
         return AlimentoResponseDTO.from_orm(alimento)
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,8 +185,10 @@ async def eliminar_alimento(
     service: AlimentoService = Depends(get_alimento_service)
 ):
     try:
-        service.eliminar_alimento(alimento_id)
+        await ejecutar_en_bd(service.eliminar_alimento, alimento_id)
         return None
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -116,7 +206,7 @@ async def disminuir_inventario(
     Recibe la cantidad a restar en el body y actualiza el stock del alimento identificado por alimento_id.
     """
     try:
-        alimento_actualizado = service.disminuir_inventario(alimento_id, datos.cantidad)
+        alimento_actualizado = await ejecutar_en_bd(service.disminuir_inventario, alimento_id, datos.cantidad)
         return AlimentoResponseDTO.from_orm(alimento_actualizado)
     except ValueError as e:
         # Para errores de validación (cantidad negativa, etc.)
@@ -130,6 +220,8 @@ async def disminuir_inventario(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Alimento con id {alimento_id} no encontrado"
         )
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         # Para otros errores inesperados
         raise HTTPException(
@@ -6,9 +6,13 @@ from typing import Dict, Any, List
 
 from application.dto.usuario_dto import RegistroUsuarioDTO, LoginDTO, UsuarioRespuestaDTO, TokenDTO, SaldoUpdateDTO, UsuarioListaDTO
 from domain.services.autenticacion_service import AutenticacionService
-from domain.exceptions.exceptions import UsuarioYaExisteError, CredencialesInvalidasError, UsuarioNoEncontradoError
+from domain.exceptions.exceptions import UsuarioYaExisteError, CredencialesInvalidasError, UsuarioNoEncontradoError, CapacidadAgotadaError
 from domain.models.usuario import Usuario, RolUsuario
-from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository, PostgresqlConnectionManager, get_connection_manager
+from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
+from infrastructure.database.db_executor import ejecutar_en_bd
+from infrastructure.database.query_deadlines import plazo_consultas
 from infrastructure.security.password_hasher import PasswordHasher
 from infrastructure.security.jwt_handler import JWTHandler
 
@@ -16,6 +20,8 @@ router = APIRouter(tags=["autenticación"])
 
 # Esquema OAuth2 para obtener el token del header Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token") 
+# Variante que no exige el header, para endpoints donde solo algunos modos requieren sesión
+oauth2_scheme_opcional = OAuth2PasswordBearer(tokenUrl="/token", auto_error=False)
 
 # --- Dependencias ---
 
@@ -26,11 +32,12 @@ def get_jwt_handler():
     return JWTHandler()
 
 def get_autenticacion_service(
-    connection_manager: PostgresqlConnectionManager = Depends(get_connection_manager),
+    uow: UnitOfWork = Depends(get_unit_of_work),
     password_hasher: PasswordHasher = Depends(get_password_hasher)
 ):
-    usuario_repository = PostgresqlUsuarioRepository(connection_manager)
-    return AutenticacionService(usuario_repository, password_hasher)
+    usuario_repository = PostgresqlUsuarioRepository(uow)
+    saldo_repository = PostgresqlSaldoRepository(uow)
+    return AutenticacionService(usuario_repository, password_hasher, saldo_repository)
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -55,7 +62,7 @@ async def get_current_user(
         raise credentials_exception
         
     try:
-        user = autenticacion_service.obtener_usuario_por_nombre(username)
+        user = await ejecutar_en_bd(autenticacion_service.obtener_usuario_por_nombre, username)
         return user
     except UsuarioNoEncontradoError:
         raise credentials_exception
@@ -174,9 +181,9 @@ async def registrar_usuario_endpoint(
     Endpoint para registrar un nuevo usuario.
     ⚠️ TEMPORAL: Sin autenticación para pruebas
     """
-    return auth_controller.registrar_usuario(datos)
+    return await ejecutar_en_bd(auth_controller.registrar_usuario, datos)
 
-@router.get("/usuarios/rol/{rol}", response_model=List[UsuarioListaDTO])
+@router.get("/usuarios/rol/{rol}", response_model=List[UsuarioListaDTO], dependencies=[Depends(plazo_consultas("admin"))])
 async def listar_usuarios_por_rol_endpoint(
     rol: str,
     autenticacion_service: AutenticacionService = Depends(get_autenticacion_service)
@@ -186,12 +193,14 @@ async def listar_usuarios_por_rol_endpoint(
     ⚠️ TEMPORAL: Sin autenticación para pruebas
     """
     try:
-        usuarios = autenticacion_service.listar_usuarios_por_rol(rol)
+        usuarios = await ejecutar_en_bd(autenticacion_service.listar_usuarios_por_rol, rol)
         return [UsuarioListaDTO(
             id=u.id,
             usuario=u.usuario,
             nombre=u.nombre
         ) for u in usuarios]
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al listar usuarios: {str(e)}")
 
@@ -201,7 +210,7 @@ async def login_endpoint(
     auth_controller: AuthController = Depends(get_auth_controller)
 ) -> TokenDTO:
     """Endpoint para iniciar sesión y obtener un token JWT."""
-    return auth_controller.login_for_access_token(datos)
+    return await ejecutar_en_bd(auth_controller.login_for_access_token, datos)
 
 @router.post("/token", response_model=TokenDTO, include_in_schema=False)
 async def login_for_access_token_form(
@@ -210,7 +219,7 @@ async def login_for_access_token_form(
 ) -> TokenDTO:
     """Endpoint para login usando form-data (estándar OAuth2)."""
     login_data = LoginDTO(usuario=form_data.username, contraseña=form_data.password)
-    return auth_controller.login_for_access_token(login_data)
+    return await ejecutar_en_bd(auth_controller.login_for_access_token, login_data)
 
 # --- Endpoints Protegidos (CON AUTENTICACIÓN) ---
 
@@ -230,7 +239,7 @@ async def obtener_usuario_endpoint(
     Solo el propio usuario o un admin pueden acceder.
     """
     verify_user_access(usuario, current_user)
-    return auth_controller.obtener_usuario_por_nombre(usuario)
+    return await ejecutar_en_bd(auth_controller.obtener_usuario_por_nombre, usuario)
 
 @router.post("/usuarios/{usuario}/recarga-saldo", response_model=UsuarioRespuestaDTO)
 async def actualizar_saldo_endpoint(
@@ -244,7 +253,7 @@ async def actualizar_saldo_endpoint(
     Solo el propio usuario o un admin pueden realizar esta acción.
     """
     verify_user_access(usuario, current_user)
-    return auth_controller.actualizar_saldo(usuario, recarga_data.monto)
+    return await ejecutar_en_bd(auth_controller.actualizar_saldo, usuario, recarga_data.monto)
 
 @router.post("/usuarios/{usuario}/descarga-saldo", response_model=UsuarioRespuestaDTO)
 async def descarga_saldo_endpoint(
@@ -258,4 +267,4 @@ async def descarga_saldo_endpoint(
     Solo el propio usuario o un admin pueden realizar esta acción.
     """
     verify_user_access(usuario, current_user)
-    return auth_controller.descargar_saldo(usuario, descarga_data.monto)
\ No newline at end of file
+    return await ejecutar_en_bd(auth_controller.descargar_saldo, usuario, descarga_data.monto)
\ No newline at end of file
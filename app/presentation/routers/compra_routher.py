@@ -1,12 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import threading
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from fastapi import FastAPI
-from typing import List
-from application.dto.compra_dto import CompraInputDTO, CompraOutputDTO
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Iterator, List, Literal, Optional
+from application.dto.compra_dto import CompraInputDTO, CompraOutputDTO, PaginaComprasDTO
 from domain.services.compra_service import CompraService
-from domain.exceptions.exceptions import UsuarioNoEncontradoError, ProductoNoEncontradoError, CompraError
+from domain.services.autenticacion_service import AutenticacionService
+from domain.exceptions.exceptions import (
+    UsuarioNoEncontradoError, ProductoNoEncontradoError, CompraError, CapacidadAgotadaError,
+    CursorPaginacionInvalidoError, LineasCompraInvalidasError
+)
+from infrastructure.cache.cache_recibos import CacheRecibos, ReciboCacheado
 from infrastructure.database.postgresql_compra_repository import PostgresqlCompraRepository
-from infrastructure.database.postgresql_repository import PostgresqlConnectionManager,PostgresqlUsuarioRepository
+from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository, get_connection_manager
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
 from infrastructure.database.postgresql_producto_repository import PostgresqlProductoRepository
+from infrastructure.database.db_executor import ejecutar_en_bd
+from infrastructure.database.query_deadlines import plazo_consultas
+from infrastructure.security.jwt_handler import JWTHandler
+from presentation.utils.cache_http import etag_coincide
+from presentation.routers.auth_router import (
+    oauth2_scheme_opcional, get_autenticacion_service, get_jwt_handler, get_current_user, get_admin_user
+)
 
 app = FastAPI(debug=True)
 router = APIRouter(tags=["compras"])
@@ -18,36 +35,114 @@ class CompraController:
     def guardar_compra(self, datos: CompraInputDTO) -> CompraOutputDTO:
         return self.service.guardar_compra(datos)
 
-    def obtener_compra(self, compra_id: int) -> CompraOutputDTO:
-        compra = self.service.obtener_compra_por_id(compra_id)
-        if not compra:
+    def obtener_compra(self, compra_id: int) -> ReciboCacheado:
+        recibo = self.service.obtener_recibo(compra_id)
+        if not recibo:
             raise HTTPException(status_code=404, detail="Compra no encontrada")
-        return compra
+        return recibo
 
     def obtener_compras_usuario(self, usuario_id: int) -> List[CompraOutputDTO]:
         return self.service.obtener_compras_por_usuario_id(usuario_id)
+
+    def obtener_pagina_compras(self, usuario_id: Optional[int], limit: int, after: Optional[str],
+                               before: Optional[str], desde: Optional[datetime],
+                               hasta: Optional[datetime]) -> PaginaComprasDTO:
+        return self.service.obtener_pagina_compras(usuario_id, limit, after, before, desde, hasta)
     
     def obtener_ultimas_compras_usuario(self, usuario_id: int, limit: int = 5) -> List[CompraOutputDTO]:
         """Obtiene las últimas N compras de un usuario"""
         return self.service.obtener_ultimas_compras_por_usuario_id(usuario_id, limit)
     
-    def obtener_todas_las_compras(self) -> List[CompraOutputDTO]:
+    def obtener_todas_las_compras(self, desde: Optional[datetime] = None,
+                                  hasta: Optional[datetime] = None) -> List[CompraOutputDTO]:
         """Llama al servicio para obtener todas las compras."""
-        return self.service.obtener_todas_las_compras()
+        if desde is None and hasta is None:
+            return self.service.obtener_todas_las_compras()
+        return self.service.obtener_todas_las_compras_en_rango(desde, hasta)
 
 # Dependencias
-def get_compra_service() -> CompraService:
-    cm = PostgresqlConnectionManager()
-    compra_repo = PostgresqlCompraRepository(cm)
-    usuario_repo = PostgresqlUsuarioRepository(cm)
-    producto_repo = PostgresqlProductoRepository(cm)
-    return CompraService(compra_repo, usuario_repo, producto_repo)
+def get_compra_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> CompraService:
+    # Todos los repositorios comparten la conexión y la transacción de la petición
+    compra_repo = PostgresqlCompraRepository(uow)
+    usuario_repo = PostgresqlUsuarioRepository(uow)
+    producto_repo = PostgresqlProductoRepository(uow)
+    return CompraService(compra_repo, usuario_repo, producto_repo, CacheRecibos(unidad_de_trabajo=uow))
+
+def get_compra_exportacion_service() -> CompraService:
+    # La exportación se transmite después de que terminan las dependencias de la
+    # petición, así que no puede usar la conexión de la unidad de trabajo
+    connection_manager = get_connection_manager()
+    return CompraService(
+        PostgresqlCompraRepository(connection_manager),
+        PostgresqlUsuarioRepository(connection_manager),
+        PostgresqlProductoRepository(connection_manager)
+    )
 
 def get_compra_controller(
     service: CompraService = Depends(get_compra_service)
 ) -> CompraController:
     return CompraController(service)
 
+async def requerir_admin_si_todas(
+    todas: bool = Query(False, description="Devuelve el historial completo sin paginar (solo administradores)"),
+    token: Optional[str] = Depends(oauth2_scheme_opcional),
+    autenticacion_service: AutenticacionService = Depends(get_autenticacion_service),
+    jwt_handler: JWTHandler = Depends(get_jwt_handler)
+) -> bool:
+    """El listado sin paginar es opcional y solo para administradores; la paginación no cambia de permisos."""
+    if not todas:
+        return False
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="El listado completo requiere autenticación de administrador",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    await get_admin_user(await get_current_user(token, autenticacion_service, jwt_handler))
+    return True
+
+def _paginar(response: Response, pagina: PaginaComprasDTO) -> List[CompraOutputDTO]:
+    """El cuerpo sigue siendo la lista; los cursores viajan en cabeceras."""
+    if pagina.siguiente:
+        response.headers["X-Next-Cursor"] = pagina.siguiente
+    if pagina.anterior:
+        response.headers["X-Prev-Cursor"] = pagina.anterior
+    return pagina.compras
+
+class _TrozosSerializados:
+    """
+    Envoltorio de la exportación para pedir lotes desde el executor. Cada
+    llamada puede caer en un hilo distinto, y si el cliente se desconecta el
+    cierre puede llegar mientras otro hilo sigue en next(): el lock hace que
+    close() espere a ese lote, en lugar de fallar con "generator already
+    executing" y dejar la conexión del cursor con nombre prestada.
+    """
+
+    def __init__(self, trozos: Iterator[str]):
+        self._trozos = trozos
+        self._lock = threading.Lock()
+
+    def siguiente(self, defecto: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            return next(self._trozos, defecto)
+
+    def cerrar(self) -> None:
+        with self._lock:
+            self._trozos.close()
+
+async def _transmitir(primero: str, trozos: _TrozosSerializados) -> AsyncIterator[str]:
+    """Entrega los trozos de la exportación pidiendo cada lote en el executor de base de datos."""
+    try:
+        yield primero
+        while True:
+            trozo = await ejecutar_en_bd(trozos.siguiente)
+            if trozo is None:
+                break
+            yield trozo
+    finally:
+        # shield: una segunda cancelación no debe dejar el cursor sin cerrar
+        await asyncio.shield(ejecutar_en_bd(trozos.cerrar))
+
 # Endpoints
 @router.post("/guardarCompra", response_model=CompraOutputDTO)
 async def guardar_compra(
@@ -55,34 +150,98 @@ async def guardar_compra(
     controller: CompraController = Depends(get_compra_controller)
 ) -> CompraOutputDTO:
     try:
-        return controller.guardar_compra(datos)
+        return await ejecutar_en_bd(controller.guardar_compra, datos)
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ProductoNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except LineasCompraInvalidasError as e:
+        raise HTTPException(status_code=400, detail={"mensaje": str(e), "lineas": e.errores})
     except CompraError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Declarado antes de /compras/{compra_id} para que "exportar" no se tome como id
+@router.get(
+    "/compras/exportar",
+    response_class=StreamingResponse,
+    dependencies=[Depends(get_admin_user), Depends(plazo_consultas("exportacion"))]
+)
+async def exportar_compras(
+    formato: Literal["csv", "ndjson"] = "csv",
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = Query(None, description="Fin del rango, exclusivo: fecha < hasta"),
+    categoria: Optional[str] = None,
+    lote: int = Query(1000, ge=100, le=10000),
+    service: CompraService = Depends(get_compra_exportacion_service)
+):
+    """
+    Exporta el historial de ventas (una fila por item) en CSV o NDJSON, en streaming
+    desde un cursor del servidor: la memoria usada no crece con el historial.
+    Solo administradores.
+    """
+    trozos = _TrozosSerializados(service.exportar_compras(formato, desde, hasta, categoria, lote))
+    # El primer trozo se pide antes de responder: así los errores de conexión
+    # todavía pueden devolverse como 503/504 y no como una descarga cortada
+    primero = await ejecutar_en_bd(trozos.siguiente, "")
+    media_type = "text/csv; charset=utf-8" if formato == "csv" else "application/x-ndjson"
+    nombre = f"compras_{datetime.now():%Y%m%d_%H%M%S}.{formato}"
+    return StreamingResponse(
+        _transmitir(primero, trozos),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
+
 @router.get("/compras/{compra_id}", response_model=CompraOutputDTO)
 async def obtener_compra(
     compra_id: int,
+    if_none_match: Optional[str] = Header(None),
     controller: CompraController = Depends(get_compra_controller)
-) -> CompraOutputDTO:
+) -> Response:
+    """
+    Recibo de una compra. Las compras no cambian, así que el recibo se sirve
+    desde la caché del proceso con un ETag fuerte; con If-None-Match responde 304.
+    """
     try:
-        return controller.obtener_compra(compra_id)
+        recibo = await ejecutar_en_bd(controller.obtener_compra, compra_id)
+    except (HTTPException, CapacidadAgotadaError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    cabeceras = {"ETag": recibo.etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if etag_coincide(if_none_match, recibo.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+    return Response(content=recibo.cuerpo, media_type="application/json", headers=cabeceras)
 
 
 @router.get("/compras/usuario/{usuario_id}", response_model=List[CompraOutputDTO])
 async def obtener_compras_usuario(
     usuario_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = Query(None, description="Cursor X-Next-Cursor: compras más antiguas"),
+    before: Optional[str] = Query(None, description="Cursor X-Prev-Cursor: compras más recientes"),
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = Query(None, description="Fin del rango, exclusivo: fecha < hasta"),
+    todas: bool = Depends(requerir_admin_si_todas),
     controller: CompraController = Depends(get_compra_controller)
 ) -> List[CompraOutputDTO]:
+    """
+    Historial de compras de un usuario, paginado por (fecha, id) de la más reciente a la más antigua.
+    El cursor de la página siguiente llega en la cabecera X-Next-Cursor.
+    """
     try:
-        return controller.obtener_compras_usuario(usuario_id)
+        if todas:
+            return await ejecutar_en_bd(controller.obtener_compras_usuario, usuario_id)
+        pagina = await ejecutar_en_bd(
+            controller.obtener_pagina_compras, usuario_id, limit, after, before, desde, hasta
+        )
+        return _paginar(response, pagina)
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CursorPaginacionInvalidoError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -94,23 +253,42 @@ async def obtener_ultimas_compras_usuario(
     controller: CompraController = Depends(get_compra_controller)
 ) -> List[CompraOutputDTO]:
     try:
-        return controller.obtener_ultimas_compras_usuario(usuario_id, limit)
+        return await ejecutar_en_bd(controller.obtener_ultimas_compras_usuario, usuario_id, limit)
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-@router.get("/compras", response_model=List[CompraOutputDTO])
+@router.get("/compras", response_model=List[CompraOutputDTO], dependencies=[Depends(plazo_consultas("admin"))])
 async def obtener_todas_las_compras(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = Query(None, description="Cursor X-Next-Cursor: compras más antiguas"),
+    before: Optional[str] = Query(None, description="Cursor X-Prev-Cursor: compras más recientes"),
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = Query(None, description="Fin del rango, exclusivo: fecha < hasta"),
+    todas: bool = Depends(requerir_admin_si_todas),
     controller: CompraController = Depends(get_compra_controller),
 ) -> List[CompraOutputDTO]:
     """
-    Obtiene un listado de todas las compras realizadas en el sistema.
+    Obtiene las compras realizadas en el sistema, paginadas por (fecha, id).
     Este endpoint es más eficiente para el dashboard de administrador
-    que iterar por cada usuario.
+    que iterar por cada usuario. Con ?todas=true (solo administradores)
+    devuelve el rango completo sin paginar.
     """
     try:
-        return controller.obtener_todas_las_compras()
+        if todas:
+            return await ejecutar_en_bd(controller.obtener_todas_las_compras, desde, hasta)
+        pagina = await ejecutar_en_bd(
+            controller.obtener_pagina_compras, None, limit, after, before, desde, hasta
+        )
+        return _paginar(response, pagina)
+    except CursorPaginacionInvalidoError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
 
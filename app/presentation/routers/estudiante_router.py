@@ -4,22 +4,25 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 from application.dto.estudiante_dto import EstudianteDTO, CrearEstudianteDTO, RecargaSaldoDTO, DescargaSaldoDTO
 from domain.services.estudiante_service import EstudianteService
-from domain.exceptions.exceptions import UsuarioNoEncontradoError
+from domain.exceptions.exceptions import UsuarioNoEncontradoError, CapacidadAgotadaError
 from domain.models.usuario import Usuario
-from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
+from infrastructure.database.query_deadlines import plazo_consultas
 from infrastructure.database.postgresql_estudiante_repository import PostgresqlEstudianteRepository
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
+from domain.models.movimiento_saldo import TipoMovimiento
 from presentation.routers.auth_router import get_current_user
 
 router = APIRouter(tags=["Estudiantes"])
 
-def get_estudiante_service():
-    connection_manager = PostgresqlConnectionManager()
-    estudiante_repo = PostgresqlEstudianteRepository(connection_manager)
-    return EstudianteService(estudiante_repo)
+def get_estudiante_service(uow: UnitOfWork = Depends(get_unit_of_work)):
+    estudiante_repo = PostgresqlEstudianteRepository(uow)
+    saldo_repo = PostgresqlSaldoRepository(uow)
+    return EstudianteService(estudiante_repo, saldo_repo)
 
 # --- Endpoint público (SIN AUTENTICACIÓN) ---
 
-@router.post("/estudiantes", response_model=EstudianteDTO, status_code=201)
+@router.post("/estudiantes", response_model=EstudianteDTO, status_code=201, dependencies=[Depends(plazo_consultas("padres"))])
 def crear_estudiante(
     datos: CrearEstudianteDTO,
     service: EstudianteService = Depends(get_estudiante_service)
@@ -39,12 +42,14 @@ def crear_estudiante(
         return EstudianteDTO(**estudiante.__dict__)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al crear estudiante: {str(e)}")
 
 # --- Endpoints protegidos (CON AUTENTICACIÓN) ---
 
-@router.get("/estudiantes/{responsable}/hijos", response_model=List[EstudianteDTO])
+@router.get("/estudiantes/{responsable}/hijos", response_model=List[EstudianteDTO], dependencies=[Depends(plazo_consultas("padres"))])
 def listar_hijos(
     responsable: str, 
     service: EstudianteService = Depends(get_estudiante_service),
@@ -56,7 +61,7 @@ def listar_hijos(
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-@router.post("/estudiantes/{estudiante_id}/recargaSaldo", response_model=EstudianteDTO)
+@router.post("/estudiantes/{estudiante_id}/recargaSaldo", response_model=EstudianteDTO, dependencies=[Depends(plazo_consultas("padres"))])
 def actualizar_saldo(
     estudiante_id: int,
     datos: RecargaSaldoDTO,
@@ -79,7 +84,9 @@ def descargar_saldo(
     current_user: Usuario = Depends(get_current_user)
 ):
     try:
-        estudiante = service.descargar_saldo_estudiante(estudiante_id, datos.monto)
+        estudiante = service.descargar_saldo_estudiante(
+            estudiante_id, datos.monto, TipoMovimiento(datos.tipo), datos.referencia
+        )
         return EstudianteDTO(**estudiante.__dict__)
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,86 @@
+# presentation/routers/pos_router.py
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from application.dto.pos_dto import CheckoutInputDTO, ReciboDTO, SincronizacionInputDTO, SincronizacionDTO
+from domain.services.compra_service import CompraService
+from domain.services.pos_service import PosService
+from domain.models.usuario import Usuario
+from domain.exceptions.exceptions import (
+    UsuarioNoEncontradoError, CompraError, CompraDuplicadaError, LineasCompraInvalidasError
+)
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
+from infrastructure.database.postgresql_repository import PostgresqlUsuarioRepository
+from infrastructure.database.postgresql_estudiante_repository import PostgresqlEstudianteRepository
+from infrastructure.database.postgresql_alimentoBloqueado_repository import PostgresqlAlimentoBloqueadoRepository
+from infrastructure.database.postgresql_compra_repository import PostgresqlCompraRepository
+from infrastructure.database.postgresql_producto_repository import PostgresqlProductoRepository
+from infrastructure.database.db_executor import ejecutar_en_bd
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
+from infrastructure.cache.cache_recibos import CacheRecibos
+from presentation.routers.auth_router import get_current_user
+
+router = APIRouter(tags=["Punto de venta"])
+
+# Dependencias
+def get_pos_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> PosService:
+    # Cobro y compra comparten la conexión: un único commit al terminar la petición
+    compra_repo = PostgresqlCompraRepository(uow)
+    producto_repo = PostgresqlProductoRepository(uow)
+    compra_service = CompraService(compra_repo, PostgresqlUsuarioRepository(uow), producto_repo,
+                                   CacheRecibos(unidad_de_trabajo=uow))
+    return PosService(
+        PostgresqlEstudianteRepository(uow),
+        PostgresqlAlimentoBloqueadoRepository(uow),
+        compra_repo,
+        producto_repo,
+        compra_service,
+        PostgresqlSaldoRepository(uow)
+    )
+
+# Endpoints
+@router.post("/pos/checkout", response_model=ReciboDTO)
+async def checkout(
+    datos: CheckoutInputDTO,
+    service: PosService = Depends(get_pos_service),
+    current_user: Usuario = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+) -> ReciboDTO:
+    """
+    Cierra una venta del punto de venta: valida bloqueos, stock y precios,
+    descuenta el saldo del estudiante y registra la compra en una sola
+    transacción. Si algo falla no se cobra ni se registra nada.
+    La Idempotency-Key queda en la compra: si la misma venta llega luego por
+    /pos/sync se reconoce como duplicada.
+    """
+    try:
+        return await ejecutar_en_bd(service.checkout, datos.estudiante_id, datos.items, idempotency_key)
+    except CompraDuplicadaError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UsuarioNoEncontradoError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LineasCompraInvalidasError as e:
+        raise HTTPException(status_code=400, detail={"mensaje": str(e), "lineas": e.errores})
+    except CompraError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/pos/sync", response_model=SincronizacionDTO)
+async def sincronizar(
+    datos: SincronizacionInputDTO,
+    service: PosService = Depends(get_pos_service),
+    current_user: Usuario = Depends(get_current_user)
+) -> SincronizacionDTO:
+    """
+    Sincroniza las ventas que la caja hizo sin conexión, en el orden en que
+    se hicieron (fecha_cliente). Responde 200 con el resultado de cada venta,
+    en el orden del lote (aceptada,
+    rechazada con su motivo, o duplicada si su clave ya estaba registrada);
+    la caja puede reenviar el lote completo sin riesgo de cobrar dos veces.
+    """
+    try:
+        return await ejecutar_en_bd(service.sincronizar, datos.ventas)
+    except CompraError as e:
+        # Otra sincronización cambió stock o claves a la vez: el lote completo se puede reenviar
+        raise HTTPException(status_code=409, detail=str(e))
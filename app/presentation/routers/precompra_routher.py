@@ -13,15 +13,19 @@ from domain.services.precompra_service import PrecompraService
 from domain.exceptions.exceptions import (
     UsuarioNoEncontradoError, 
     PrecompraError, 
-    ProductoNoEncontradoError
+    ProductoNoEncontradoError,
+    CapacidadAgotadaError,
+    StockInsuficienteError
 )
 
 # Importar TODAS las dependencias de repositorios necesarias
-from infrastructure.database.postgresql_repository import PostgresqlConnectionManager
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
 from infrastructure.database.postgresql_precompra_repository import PostgresqlPrecompraRepository
 from infrastructure.database.postgresql_estudiante_repository import PostgresqlEstudianteRepository
 from infrastructure.database.postgresql_compra_repository import PostgresqlCompraRepository
 from infrastructure.database.postgresql_alimento_repository import PostgresqlAlimentoRepository
+from infrastructure.database.db_executor import ejecutar_en_bd
+from infrastructure.database.query_deadlines import plazo_consultas
 
 # --- Router de la API ---
 router = APIRouter(prefix="/api/precompras", tags=["Precompras"])
@@ -29,18 +33,19 @@ router = APIRouter(prefix="/api/precompras", tags=["Precompras"])
 
 # --- Dependencias actualizadas ---
 
-def get_precompra_service() -> PrecompraService:
+def get_precompra_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> PrecompraService:
     """
     Crea y devuelve una instancia del servicio de precompras con todas
     sus dependencias de repositorios inyectadas.
+    Los repositorios comparten la unidad de trabajo de la petición, así que
+    la precompra y su compra se confirman (o deshacen) juntas.
     """
-    cm = PostgresqlConnectionManager()
     # Se necesita el repositorio de compras para el método que crea la compra
-    compra_repo = PostgresqlCompraRepository(cm)
-    precompra_repo = PostgresqlPrecompraRepository(cm, compra_repo)
-    estudiante_repo = PostgresqlEstudianteRepository(cm)
+    compra_repo = PostgresqlCompraRepository(uow)
+    precompra_repo = PostgresqlPrecompraRepository(uow, compra_repo)
+    estudiante_repo = PostgresqlEstudianteRepository(uow)
     # El servicio ahora necesita el AlimentoRepository para validar productos y precios
-    alimento_repo = PostgresqlAlimentoRepository(cm)
+    alimento_repo = PostgresqlAlimentoRepository(uow)
     
     return PrecompraService(precompra_repo, estudiante_repo, compra_repo, alimento_repo)
 
@@ -60,7 +65,7 @@ async def crear_precompra_nueva(
         # El servicio espera una lista de diccionarios, no objetos Pydantic
         items_dict = [item.dict() for item in datos.items]
         
-        precompra = service.crear_precompra_nueva(
+        precompra = await ejecutar_en_bd(service.crear_precompra_nueva,
             estudiante_id=datos.estudiante_id,
             items_productos=items_dict,
             costo_adicional=datos.costo_adicional
@@ -68,8 +73,10 @@ async def crear_precompra_nueva(
         return precompra
     except (UsuarioNoEncontradoError, ProductoNoEncontradoError) as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
-    except PrecompraError as e:
+    except (PrecompraError, StockInsuficienteError) as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error interno: {str(e)}")
 
@@ -84,13 +91,15 @@ async def calcular_costo_precompra(
     """
     try:
         items_dict = [item.dict() for item in datos.items]
-        calculo = service.calcular_costo_precompra(
+        calculo = await ejecutar_en_bd(service.calcular_costo_precompra,
             items_productos=items_dict,
             costo_adicional=datos.costo_adicional
         )
         return calculo
     except ProductoNoEncontradoError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error interno: {str(e)}")
 
@@ -103,10 +112,12 @@ async def obtener_precompra_con_detalles(
     Obtiene una precompra con todos los detalles de la compra y sus productos.
     """
     try:
-        detalles = service.obtener_precompra_con_detalles(precompra_id)
+        detalles = await ejecutar_en_bd(service.obtener_precompra_con_detalles, precompra_id)
         return detalles
     except PrecompraError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error interno: {str(e)}")
 
@@ -117,31 +128,31 @@ async def obtener_precompra(
 ) -> PrecompraResponseDTO:
     """Obtiene los datos básicos de una precompra por su ID."""
     try:
-        precompra = service.obtener_precompra_por_id(precompra_id)
+        precompra = await ejecutar_en_bd(service.obtener_precompra_por_id, precompra_id)
         return precompra
     except PrecompraError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
-@router.patch("/{precompra_id}/entregar", response_model=PrecompraResponseDTO)
+@router.patch("/{precompra_id}/entregar", response_model=PrecompraResponseDTO, dependencies=[Depends(plazo_consultas("pos"))])
 async def marcar_como_entregado(
     precompra_id: int,
     service: PrecompraService = Depends(get_precompra_service)
 ) -> PrecompraResponseDTO:
     """Marca una precompra como entregada."""
     try:
-        precompra = service.marcar_como_entregado(precompra_id)
+        precompra = await ejecutar_en_bd(service.marcar_como_entregado, precompra_id)
         return precompra
     except PrecompraError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-@router.patch("/{precompra_id}/cancelar-entrega", response_model=PrecompraResponseDTO)
+@router.patch("/{precompra_id}/cancelar-entrega", response_model=PrecompraResponseDTO, dependencies=[Depends(plazo_consultas("pos"))])
 async def cancelar_entrega(
     precompra_id: int,
     service: PrecompraService = Depends(get_precompra_service)
 ) -> PrecompraResponseDTO:
     """Cancela la entrega de una precompra (la marca como no entregada)."""
     try:
-        precompra = service.cancelar_entrega(precompra_id)
+        precompra = await ejecutar_en_bd(service.cancelar_entrega, precompra_id)
         return precompra
     except PrecompraError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -153,7 +164,7 @@ async def eliminar_precompra(
 ):
     """Elimina lógicamente una precompra (la marca como inactiva)."""
     try:
-        success = service.eliminar_precompra(precompra_id)
+        success = await ejecutar_en_bd(service.eliminar_precompra, precompra_id)
         if not success:
              # Esto puede ocurrir si el ID no existe o ya está inactivo
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Precompra con ID {precompra_id} no encontrada o ya eliminada.")
@@ -171,7 +182,7 @@ async def obtener_precompras_estudiante(
 ) -> List[PrecompraResponseDTO]:
     """Obtiene todas las precompras activas de un estudiante."""
     try:
-        return service.obtener_precompras_estudiante(estudiante_id)
+        return await ejecutar_en_bd(service.obtener_precompras_estudiante, estudiante_id)
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
@@ -182,19 +193,19 @@ async def obtener_precompras_pendientes_estudiante(
 ) -> List[PrecompraResponseDTO]:
     """Obtiene las precompras pendientes de entrega para un estudiante."""
     try:
-        return service.obtener_precompras_pendientes_estudiante(estudiante_id)
+        return await ejecutar_en_bd(service.obtener_precompras_pendientes_estudiante, estudiante_id)
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
-@router.get("/pendientes/todas", response_model=List[PrecompraResponseDTO])
+@router.get("/pendientes/todas", response_model=List[PrecompraResponseDTO], dependencies=[Depends(plazo_consultas("admin"))])
 async def obtener_todas_pendientes(
     service: PrecompraService = Depends(get_precompra_service)
 ) -> List[PrecompraResponseDTO]:
     """Obtiene todas las precompras pendientes de entrega de todos los estudiantes."""
-    return service.obtener_precompras_pendientes()
+    return await ejecutar_en_bd(service.obtener_precompras_pendientes)
 
 
-@router.get("/todas/detalladas", response_model=List[PrecompraHistorialDetalladoDTO])
+@router.get("/todas/detalladas", response_model=List[PrecompraHistorialDetalladoDTO], dependencies=[Depends(plazo_consultas("admin"))])
 async def obtener_todas_detalladas(
     service: PrecompraService = Depends(get_precompra_service)
 ):
@@ -203,7 +214,9 @@ async def obtener_todas_detalladas(
     el nombre del estudiante y los items de cada una. Ideal para el panel de admin.
     """
     try:
-        return service.obtener_todas_las_precompras_detalladas()
+        return await ejecutar_en_bd(service.obtener_todas_las_precompras_detalladas)
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         # Manejo de error genérico para el caso de que la DB falle
         raise HTTPException(
@@ -222,4 +235,4 @@ async def obtener_historial_estudiante(
     """
     # Necesitarás implementar la lógica en tu servicio y repositorio para
     # llamar a la consulta SQL que hicimos para el admin, pero con un WHERE id_estudiante = ...
-    return service.obtener_historial_por_estudiante(estudiante_id)
\ No newline at end of file
+    return await ejecutar_en_bd(service.obtener_historial_por_estudiante, estudiante_id)
\ No newline at end of file
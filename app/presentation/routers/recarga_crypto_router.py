@@ -17,9 +17,11 @@ from application.dto.recarga_crypto_dto import (
 from domain.services.recarga_crypto_service import RecargaCryptoService
 from infrastructure.service.celo_service import CeloService
 from infrastructure.database.postgresql_repository import (
-    PostgresqlConnectionManager,
+    get_connection_manager,
     PostgresqlUsuarioRepository
 )
+from infrastructure.database.postgresql_saldo_repository import PostgresqlSaldoRepository
+from infrastructure.database.unit_of_work import UnitOfWork, get_unit_of_work
 # Necesitarás crear este repositorio
 # from infrastructure.database.postgresql_recarga_crypto_repository import PostgresqlRecargaCryptoRepository
 
@@ -39,11 +41,18 @@ def get_celo_service() -> CeloService:
     return CeloService(use_testnet=use_testnet)
 
 def get_recarga_crypto_service(
-    celo_service: CeloService = Depends(get_celo_service)
+    celo_service: CeloService = Depends(get_celo_service),
+    uow: UnitOfWork = Depends(get_unit_of_work)
 ) -> RecargaCryptoService:
-    """Crea instancia del servicio de recargas crypto"""
-    connection_manager = PostgresqlConnectionManager()
-    usuario_repo = PostgresqlUsuarioRepository(connection_manager)
+    """
+    Crea instancia del servicio de recargas crypto.
+    El saldo y su movimiento comparten la unidad de trabajo; los estados de la
+    recarga se confirman al momento para no retener una conexión mientras se
+    consulta la blockchain.
+    """
+    connection_manager = get_connection_manager()
+    usuario_repo = PostgresqlUsuarioRepository(uow)
+    saldo_repo = PostgresqlSaldoRepository(uow)
     
     # ✅ REPOSITORIO POSTGRESQL IMPLEMENTADO
     from infrastructure.database.postgresql_recarga_crypto_repository import PostgresqlRecargaCryptoRepository
@@ -52,7 +61,8 @@ def get_recarga_crypto_service(
     return RecargaCryptoService(
         celo_service=celo_service,
         recarga_crypto_repository=recarga_crypto_repo,
-        usuario_repository=usuario_repo
+        usuario_repository=usuario_repo,
+        saldo_repository=saldo_repo
     )
 
 
@@ -15,9 +15,11 @@ from application.dto.recarga_dto import (
 )
 from domain.services.recarga_service import RecargaService
 from domain.models.recarga import EstadoRecarga
-from domain.exceptions.exceptions import UsuarioNoEncontradoError
+from domain.exceptions.exceptions import UsuarioNoEncontradoError, CapacidadAgotadaError
 from infrastructure.service.wompi_service import WompiService
 from presentation.dependencies.dependencies import get_recarga_service
+from infrastructure.database.db_executor import ejecutar_en_bd
+from infrastructure.database.query_deadlines import plazo_consultas
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -131,14 +133,14 @@ async def iniciar_recarga(
         logger.info(f"[INICIAR_RECARGA] Usuario {request.usuario_id}, monto: {request.monto}")
 
         # 1) Crear recarga pendiente (servicio de dominio)
-        recarga = recarga_service.crear_recarga_pendiente(
+        recarga = await ejecutar_en_bd(recarga_service.crear_recarga_pendiente,
             usuario_id=request.usuario_id,
             monto=request.monto
         )
         logger.info(f"[RECARGA_CREADA] ID: {recarga.id}")
 
         # 2) Obtener configuración del domain service (estructura interna)
-        config_recarga = recarga_service.obtener_configuracion_widget(recarga.id)
+        config_recarga = await ejecutar_en_bd(recarga_service.obtener_configuracion_widget, recarga.id)
         logger.debug("[CONFIG_DOMAIN] Configuración obtenida: %s", {
             k: (v if k != 'customer_data' else '[CUSTOMER_DATA]') for k, v in config_recarga.items()
         })
@@ -233,6 +235,8 @@ async def iniciar_recarga(
     except HTTPException:
         # Re-raise HTTPExceptions as-is
         raise
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         logger.error(f"[UNEXPECTED_ERROR] {type(e).__name__}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -244,7 +248,7 @@ async def verificar_estado_recarga(
     recarga_service: RecargaService = Depends(get_recarga_service),
 ):
     try:
-        recarga = recarga_service.verificar_estado_recarga(recarga_id)
+        recarga = await ejecutar_en_bd(recarga_service.verificar_estado_recarga, recarga_id)
 
         return EstadoRecargaResponse(
             recarga_id=recarga.id,
@@ -259,6 +263,8 @@ async def verificar_estado_recarga(
 
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         logger.error(f"Error verificar estado: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -270,7 +276,7 @@ async def cancelar_recarga(
     recarga_service: RecargaService = Depends(get_recarga_service),
 ):
     try:
-        recarga = recarga_service.cancelar_recarga_pendiente(recarga_id)
+        recarga = await ejecutar_en_bd(recarga_service.cancelar_recarga_pendiente, recarga_id)
 
         return RecargaResponse(
             id=recarga.id,
@@ -285,6 +291,8 @@ async def cancelar_recarga(
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         logger.error(f"Error cancelar recarga: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -297,7 +305,7 @@ async def obtener_recargas_usuario(
     recarga_service: RecargaService = Depends(get_recarga_service),
 ):
     try:
-        recargas = recarga_service.obtener_recargas_usuario(usuario_id, limite)
+        recargas = await ejecutar_en_bd(recarga_service.obtener_recargas_usuario, usuario_id, limite)
 
         return [
             RecargaResponse(
@@ -314,6 +322,8 @@ async def obtener_recargas_usuario(
 
     except UsuarioNoEncontradoError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         logger.error(f"Error obtener recargas usuario: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -325,7 +335,7 @@ async def obtener_recarga_por_id(
     recarga_service: RecargaService = Depends(get_recarga_service),
 ):
     try:
-        recarga = recarga_service.obtener_recarga_por_id(recarga_id)
+        recarga = await ejecutar_en_bd(recarga_service.obtener_recarga_por_id, recarga_id)
 
         if not recarga:
             raise HTTPException(status_code=404, detail="Recarga no encontrada")
@@ -341,6 +351,8 @@ async def obtener_recarga_por_id(
             fecha_actualizacion=recarga.fecha_actualizacion
         )
 
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         logger.error(f"Error obtener recarga: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno del servidor")
@@ -387,7 +399,7 @@ async def webhook_wompi(
         if processed_event.get("event_type") == "payment_update":
             if wompi_service.es_evento_final(processed_event.get("status")):
                 try:
-                    recarga = recarga_service.procesar_webhook_pago(
+                    recarga = await ejecutar_en_bd(recarga_service.procesar_webhook_pago,
                         referencia_wompi=processed_event.get("reference"),
                         estado_pago=processed_event.get("status"),
                         transaction_id=processed_event.get("transaction_id"),
@@ -396,6 +408,8 @@ async def webhook_wompi(
 
                     logger.info(f"Recarga {recarga.id} actualizada a {recarga.estado.value}")
 
+                except CapacidadAgotadaError:
+                    raise
                 except Exception as e:
                     logger.error(f"Error procesando pago en webhook: {e}", exc_info=True)
                     return JSONResponse(
@@ -425,6 +439,8 @@ async def webhook_wompi(
     except json.JSONDecodeError:
         logger.error("JSON inválido en webhook")
         return JSONResponse(status_code=200, content={"status": "error", "message": "JSON inválido"})
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         logger.error(f"Error procesando webhook WOMPI: {e}", exc_info=True)
         return JSONResponse(
@@ -433,14 +449,14 @@ async def webhook_wompi(
         )
 
 
-@router.post("/admin/confirmar", response_model=RecargaResponse)
+@router.post("/admin/confirmar", response_model=RecargaResponse, dependencies=[Depends(plazo_consultas("admin"))])
 async def confirmar_recarga_manual(
     recarga_id: str,
     nuevo_estado: EstadoRecarga,
     recarga_service: RecargaService = Depends(get_recarga_service),
 ):
     try:
-        recarga = recarga_service.confirmar_recarga_manual(
+        recarga = await ejecutar_en_bd(recarga_service.confirmar_recarga_manual,
             recarga_id=recarga_id,
             nuevo_estado=nuevo_estado
         )
@@ -458,6 +474,8 @@ async def confirmar_recarga_manual(
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CapacidadAgotadaError:
+        raise
     except Exception as e:
         logger.error(f"Error confirmar recarga manual: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno del servidor")
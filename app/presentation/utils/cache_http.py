@@ -0,0 +1,16 @@
+# presentation/utils/cache_http.py
+
+from typing import Optional
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara la cabecera If-None-Match con el ETag actual (RFC 9110: comparación
+    débil, así que W/"x" coincide con "x"). Admite listas separadas por comas y "*".
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    sin_debil = lambda valor: valor.strip().removeprefix("W/")
+    return sin_debil(etag) in (sin_debil(candidato) for candidato in if_none_match.split(","))